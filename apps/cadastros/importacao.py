@@ -0,0 +1,324 @@
+"""
+Importação em lote de clientes, empresas e itens a partir de CSV ou XLSX.
+
+O arquivo é lido linha a linha (CSV com o módulo `csv`, XLSX com o
+openpyxl em modo read_only), cada linha é validada pelos próprios campos do
+model (incluindo os validadores de CPF/CNPJ) e os registros válidos são
+gravados com `bulk_create` em lotes, cada lote em uma transação.
+
+Registros já cadastrados são ignorados: clientes e empresas pelo CPF/CNPJ
+normalizado (só dígitos), itens pelo tipo + nome.
+"""
+import csv
+import io
+import re
+import unicodedata
+import zipfile
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from apps.servicos.models import HistoricoPreco, Item, MovimentoEstoque
+from .models import Cliente, Empresa
+
+
+TAMANHO_LOTE = 1000
+
+# Bytes lidos do início do CSV para detectar codificação e separador
+AMOSTRA_CSV = 64 * 1024
+
+
+class ArquivoInvalido(Exception):
+    """O arquivo não pôde ser lido como CSV ou XLSX (corrompido, binário, outro formato)."""
+
+
+def somente_digitos(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def _digitos_documento(valor, tamanho):
+    # Planilhas costumam guardar CPF/CNPJ como número, perdendo os zeros à esquerda
+    if isinstance(valor, (int, float)):
+        return str(int(valor)).zfill(tamanho)
+    return somente_digitos(valor)
+
+
+def formatar_cpf(valor):
+    digitos = _digitos_documento(valor, 11)
+    if len(digitos) != 11:
+        return valor
+    return f'{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}'
+
+
+def formatar_cnpj(valor):
+    digitos = _digitos_documento(valor, 14)
+    if len(digitos) != 14:
+        return valor
+    return f'{digitos[:2]}.{digitos[2:5]}.{digitos[5:8]}/{digitos[8:12]}-{digitos[12:]}'
+
+
+def normalizar_texto(valor):
+    """Minúsculas, sem acentos e com espaços trocados por '_' (cabeçalhos e escolhas)."""
+    valor = unicodedata.normalize('NFKD', str(valor or '')).encode('ascii', 'ignore').decode()
+    return re.sub(r'\s+', '_', valor.strip().lower())
+
+
+def normalizar_decimal(valor):
+    """Aceita '1.234,56', '1234,56' e '1234.56'."""
+    if valor is None or isinstance(valor, (int, float)):
+        return valor
+    valor = str(valor).strip().replace('R$', '').strip()
+    if ',' in valor:
+        valor = valor.replace('.', '').replace(',', '.')
+    return valor
+
+
+def normalizar_tipo_item(valor):
+    tipo = normalizar_texto(valor)
+    return {'servicos': 'servico', 'produtos': 'produto'}.get(tipo, tipo)
+
+
+class Importador:
+    """Descreve como as colunas de um arquivo viram um model."""
+
+    def __init__(self, model, campos, campos_chave, chave, aliases=None, conversores=None, apos_gravar=None):
+        self.model = model
+        self.campos = campos
+        self.campos_chave = campos_chave
+        self.chave = chave
+        self.aliases = aliases or {}
+        self.conversores = conversores or {}
+        # Chamado com cada lote gravado, dentro da mesma transação
+        self.apos_gravar = apos_gravar
+
+    def coluna(self, cabecalho):
+        nome = normalizar_texto(cabecalho)
+        nome = self.aliases.get(nome, nome)
+        return nome if nome in self.campos else None
+
+    def chaves_existentes(self):
+        """Chaves de deduplicação dos registros já cadastrados."""
+        existentes = set()
+        for valores in self.model.objects.values(*self.campos_chave).iterator():
+            chave = self.chave(valores)
+            if chave:
+                existentes.add(chave)
+        return existentes
+
+
+def _chave_documento(campo):
+    def chave(valores):
+        return somente_digitos(valores.get(campo)) or None
+    return chave
+
+
+def _chave_item(valores):
+    return (valores.get('tipo'), normalizar_texto(valores.get('nome')))
+
+
+def _registrar_itens(itens):
+    # bulk_create não passa por Item.save(), que é quem grava o histórico de
+    # preços e o estoque inicial no livro de estoque (só de produtos)
+    HistoricoPreco.objects.bulk_create(
+        HistoricoPreco(item=item, preco=item.preco, origem='importacao') for item in itens
+    )
+    MovimentoEstoque.objects.bulk_create(
+        MovimentoEstoque(
+            item=item, tipo='entrada', quantidade=item.quantidade_estoque, observacao='Importação'
+        )
+        for item in itens if item.tipo == 'produto' and item.quantidade_estoque
+    )
+
+
+IMPORTADORES = {
+    'clientes': Importador(
+        Cliente,
+        ['nome', 'cpf', 'telefone', 'email', 'endereco', 'observacoes'],
+        ['cpf'],
+        _chave_documento('cpf'),
+        aliases={'e-mail': 'email', 'celular': 'telefone', 'observacao': 'observacoes'},
+        conversores={'cpf': formatar_cpf},
+    ),
+    'empresas': Importador(
+        Empresa,
+        ['nome', 'cnpj', 'nome_contato', 'telefone', 'email', 'endereco', 'observacoes'],
+        ['cnpj'],
+        _chave_documento('cnpj'),
+        aliases={
+            'e-mail': 'email', 'contato': 'nome_contato', 'razao_social': 'nome',
+            'observacao': 'observacoes',
+        },
+        conversores={'cnpj': formatar_cnpj},
+    ),
+    'itens': Importador(
+        Item,
+        ['tipo', 'nome', 'preco', 'descricao', 'quantidade_estoque', 'estoque_minimo'],
+        ['tipo', 'nome'],
+        _chave_item,
+        aliases={'estoque': 'quantidade_estoque', 'valor': 'preco'},
+        conversores={
+            'tipo': normalizar_tipo_item,
+            'preco': normalizar_decimal,
+            'quantidade_estoque': lambda v: v if v not in ('', None) else 0,
+            'estoque_minimo': lambda v: v if v not in ('', None) else 0,
+        },
+        apos_gravar=_registrar_itens,
+    ),
+}
+
+
+class ResultadoImportacao:
+    """Totais da importação e erros por linha (número da linha no arquivo)."""
+
+    def __init__(self):
+        self.linhas = 0
+        self.criados = 0
+        self.duplicados = 0
+        self.erros = []
+
+    @property
+    def com_erro(self):
+        return len({linha for linha, _, _ in self.erros})
+
+    def adicionar_erro(self, linha, coluna, mensagem):
+        self.erros.append((linha, coluna, mensagem))
+
+    def relatorio_erros(self, destino):
+        """Escreve os erros em CSV (linha;coluna;erro) no arquivo texto `destino`."""
+        escritor = csv.writer(destino, delimiter=';')
+        escritor.writerow(['linha', 'coluna', 'erro'])
+        escritor.writerows(self.erros)
+
+
+def _ler_csv(arquivo):
+    amostra = arquivo.read(AMOSTRA_CSV)
+    arquivo.seek(0)
+    try:
+        amostra.decode('utf-8-sig')
+        codificacao = 'utf-8-sig'
+    except UnicodeDecodeError:
+        # Corte no meio de um caractere multibyte não indica outra codificação
+        try:
+            amostra[:-3].decode('utf-8-sig')
+            codificacao = 'utf-8-sig'
+        except UnicodeDecodeError:
+            codificacao = 'cp1252'
+    texto_amostra = amostra.decode(codificacao, errors='ignore')
+    try:
+        dialeto = csv.Sniffer().sniff(texto_amostra.split('\n', 1)[0], delimiters=';,\t')
+        delimitador = dialeto.delimiter
+    except csv.Error:
+        delimitador = ';'
+
+    texto = io.TextIOWrapper(arquivo, encoding=codificacao, newline='')
+    try:
+        leitor = csv.reader(texto, delimiter=delimitador)
+        yield from leitor
+    except (csv.Error, UnicodeDecodeError) as erro:
+        raise ArquivoInvalido(f'Não foi possível ler o CSV: {erro}') from erro
+    finally:
+        texto.detach()
+
+
+def _ler_xlsx(arquivo):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    # Um zip sem as partes esperadas falha com KeyError; XML inválido, com ValueError/TypeError
+    erros = (zipfile.BadZipFile, InvalidFileException, KeyError, ValueError, TypeError, EOFError)
+    try:
+        livro = load_workbook(arquivo, read_only=True, data_only=True)
+    except erros as erro:
+        raise ArquivoInvalido('O arquivo não é uma planilha XLSX válida.') from erro
+    try:
+        for linha in livro.worksheets[0].iter_rows(values_only=True):
+            yield ['' if valor is None else valor for valor in linha]
+    except erros as erro:
+        raise ArquivoInvalido('A planilha está corrompida e não pôde ser lida até o fim.') from erro
+    finally:
+        livro.close()
+
+
+def ler_arquivo(arquivo, nome):
+    """Gera as linhas (listas de valores) de um arquivo binário CSV ou XLSX."""
+    if nome.lower().endswith(('.xlsx', '.xlsm')):
+        return _ler_xlsx(arquivo)
+    return _ler_csv(arquivo)
+
+
+def importar(tipo, arquivo, nome, tamanho_lote=TAMANHO_LOTE, simular=False):
+    """
+    Importa um arquivo para o model de `tipo` ('clientes', 'empresas' ou 'itens').
+
+    Com `simular=True` o arquivo é validado e deduplicado sem gravar nada.
+    Levanta `ArquivoInvalido` se o arquivo não puder ser lido; os lotes
+    gravados antes do ponto ilegível permanecem.
+    """
+    importador = IMPORTADORES[tipo]
+    model = importador.model
+    campos_model = {campo: model._meta.get_field(campo) for campo in importador.campos}
+    resultado = ResultadoImportacao()
+
+    linhas = ler_arquivo(arquivo, nome)
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        resultado.adicionar_erro(1, '', 'Arquivo vazio.')
+        return resultado
+    colunas = [importador.coluna(c) for c in cabecalho]
+    if 'nome' not in colunas:
+        resultado.adicionar_erro(1, '', 'Coluna "nome" não encontrada no cabeçalho.')
+        return resultado
+
+    existentes = importador.chaves_existentes()
+    lote = []
+
+    def gravar():
+        if lote and not simular:
+            with transaction.atomic():
+                model.objects.bulk_create(lote)
+                if importador.apos_gravar:
+                    importador.apos_gravar(lote)
+        resultado.criados += len(lote)
+        lote.clear()
+
+    for numero, valores in enumerate(linhas, start=2):
+        if not any(str(v).strip() for v in valores):
+            continue
+        resultado.linhas += 1
+
+        dados = {}
+        for coluna, valor in zip(colunas, valores):
+            if coluna is None:
+                continue
+            if isinstance(valor, str):
+                valor = valor.strip()
+            conversor = importador.conversores.get(coluna)
+            dados[coluna] = conversor(valor) if conversor else valor
+
+        limpos = {}
+        valido = True
+        for campo, field in campos_model.items():
+            valor = dados.get(campo, '')
+            if valor in ('', None) and field.has_default():
+                continue
+            try:
+                limpos[campo] = field.clean(valor, None)
+            except ValidationError as erro:
+                resultado.adicionar_erro(numero, campo, ' '.join(erro.messages))
+                valido = False
+        if not valido:
+            continue
+
+        chave = importador.chave(limpos)
+        if chave:
+            if chave in existentes:
+                resultado.duplicados += 1
+                continue
+            existentes.add(chave)
+
+        lote.append(model(**limpos))
+        if len(lote) >= tamanho_lote:
+            gravar()
+
+    gravar()
+    return resultado
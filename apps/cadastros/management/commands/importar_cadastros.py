@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cadastros.importacao import IMPORTADORES, TAMANHO_LOTE, ArquivoInvalido, importar
+
+
+class Command(BaseCommand):
+    help = 'Importa clientes, empresas ou itens de um arquivo CSV ou XLSX.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=sorted(IMPORTADORES), help='O que importar')
+        parser.add_argument('arquivo', help='Caminho do arquivo .csv ou .xlsx')
+        parser.add_argument('--relatorio', help='Grava os erros por linha neste arquivo CSV')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Registros por bulk_create')
+        parser.add_argument('--simular', action='store_true', help='Valida sem gravar')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                resultado = importar(
+                    options['tipo'],
+                    arquivo,
+                    options['arquivo'],
+                    tamanho_lote=options['lote'],
+                    simular=options['simular'],
+                )
+        except OSError as erro:
+            raise CommandError(f'Não foi possível ler o arquivo: {erro}')
+        except ArquivoInvalido as erro:
+            raise CommandError(str(erro))
+
+        if options['relatorio'] and resultado.erros:
+            with open(options['relatorio'], 'w', newline='', encoding='utf-8') as destino:
+                resultado.relatorio_erros(destino)
+
+        duracao = time.perf_counter() - inicio
+        acao = 'validado(s)' if options['simular'] else 'importado(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.criados} registro(s) {acao}, {resultado.duplicados} duplicado(s) ignorado(s), '
+            f'{resultado.com_erro} linha(s) com erro de {resultado.linhas} em {duracao:.1f}s.'
+        ))
+        if resultado.erros and not options['relatorio']:
+            for linha, coluna, mensagem in resultado.erros[:20]:
+                self.stdout.write(f'  linha {linha} [{coluna}]: {mensagem}')
+            if len(resultado.erros) > 20:
+                self.stdout.write(f'  ... use --relatorio para ver todos os {len(resultado.erros)} erros.')
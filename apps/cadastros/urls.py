@@ -25,6 +25,9 @@ urlpatterns = [
     path('funcionarios/<int:pk>/editar/', views.FuncionarioUpdateView.as_view(), name='funcionario_update'),
     path('funcionarios/<int:pk>/excluir/', views.FuncionarioDeleteView.as_view(), name='funcionario_delete'),
     
+    # Importação em lote
+    path('importar/', views.importar_cadastros, name='importar'),
+    
     # API para busca
     path('api/buscar-cliente-empresa/', views.buscar_cliente_empresa, name='buscar_cliente_empresa'),
 ]
@@ -6,8 +6,28 @@ from django.contrib import messages
 from django.urls import reverse_lazy
 from django.http import JsonResponse
 from django.db.models import Q
+import io
 
 from .models import Empresa, Cliente, Funcionario
+from .importacao import IMPORTADORES, ArquivoInvalido, importar
+
+
+class HistoricoFinanceiroMixin:
+    """Adiciona o saldo e as últimas vendas do cliente/empresa ao contexto."""
+    tipo_destinatario = None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        from apps.financeiro.models import SaldoCliente, Venda
+
+        filtro = {f'{self.tipo_destinatario}_id': self.object.pk}
+        vendas = Venda.objects.filter(**filtro)
+        if self.tipo_destinatario == 'cliente':
+            vendas = vendas.filter(empresa__isnull=True)
+        # Sem registro o destinatário ainda não tem vendas; o template mostra zeros
+        context['saldo'] = SaldoCliente.objects.filter(**filtro).first()
+        context['ultimas_vendas'] = vendas.order_by('-data_entrada', '-id')[:10]
+        return context
 
 
 class EmpresaListView(LoginRequiredMixin, ListView):
@@ -28,8 +48,9 @@ class EmpresaListView(LoginRequiredMixin, ListView):
         return queryset
 
 
-class EmpresaDetailView(LoginRequiredMixin, DetailView):
+class EmpresaDetailView(LoginRequiredMixin, HistoricoFinanceiroMixin, DetailView):
     model = Empresa
+    tipo_destinatario = 'empresa'
     template_name = 'cadastros/empresa_detail.html'
 
 
@@ -83,8 +104,9 @@ class ClienteListView(LoginRequiredMixin, ListView):
         return queryset
 
 
-class ClienteDetailView(LoginRequiredMixin, DetailView):
+class ClienteDetailView(LoginRequiredMixin, HistoricoFinanceiroMixin, DetailView):
     model = Cliente
+    tipo_destinatario = 'cliente'
     template_name = 'cadastros/cliente_detail.html'
 
 
@@ -217,3 +239,41 @@ def buscar_cliente_empresa(request):
             })
     
     return JsonResponse({'resultados': resultados})
+
+
+@login_required
+def importar_cadastros(request):
+    """Upload de CSV/XLSX para importar clientes, empresas ou itens em lote."""
+    tipo = request.POST.get('tipo') or request.GET.get('tipo') or 'clientes'
+    if tipo not in IMPORTADORES:
+        tipo = 'clientes'
+    context = {'tipo': tipo, 'tipos': [('clientes', 'Clientes'), ('empresas', 'Empresas'), ('itens', 'Produtos e Serviços')]}
+
+    if request.method == 'POST':
+        arquivo = request.FILES.get('arquivo')
+        if not arquivo:
+            messages.error(request, 'Selecione um arquivo CSV ou XLSX.')
+            return render(request, 'cadastros/importar.html', context)
+        if not arquivo.name.lower().endswith(('.csv', '.txt', '.xlsx', '.xlsm')):
+            messages.error(request, 'Formato não suportado. Envie um arquivo .csv ou .xlsx.')
+            return render(request, 'cadastros/importar.html', context)
+
+        simular = bool(request.POST.get('simular'))
+        try:
+            resultado = importar(tipo, arquivo.file, arquivo.name, simular=simular)
+        except ArquivoInvalido as erro:
+            messages.error(request, str(erro))
+            return render(request, 'cadastros/importar.html', context)
+
+        relatorio = io.StringIO()
+        resultado.relatorio_erros(relatorio)
+        context.update({
+            'resultado': resultado,
+            'simular': simular,
+            'erros': resultado.erros[:200],
+            'relatorio': relatorio.getvalue() if resultado.erros else '',
+        })
+        if not simular and resultado.criados:
+            messages.success(request, f'{resultado.criados} registro(s) importado(s) com sucesso!')
+
+    return render(request, 'cadastros/importar.html', context)
@@ -1,7 +1,20 @@
 from django.contrib import admin
-from .models import ConfiguracaoEmpresa
+from .models import ConfiguracaoEmpresa, ConsultaLenta
 
 
 @admin.register(ConfiguracaoEmpresa)
 class ConfiguracaoEmpresaAdmin(admin.ModelAdmin):
     list_display = ('nome', 'cnpj', 'telefone', 'email')
+
+
+@admin.register(ConsultaLenta)
+class ConsultaLentaAdmin(admin.ModelAdmin):
+    list_display = ('criado_em', 'duracao_ms', 'view', 'assinatura')
+    list_filter = ('view',)
+    search_fields = ('impressao', 'assinatura')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
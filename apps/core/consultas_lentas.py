@@ -0,0 +1,128 @@
+"""
+Registro de consultas SQL lentas.
+
+`ConsultasLentasMiddleware` cronometra cada consulta com
+`connection.execute_wrapper` e guarda as que passam de
+CONSULTAS_LENTAS_LIMITE_MS. Ao fim da requisição, fora das transações da
+view, cada uma recebe o plano de execução (EXPLAIN, que não executa a
+consulta) e é gravada em `ConsultaLenta`, que mantém apenas as últimas
+CONSULTAS_LENTAS_MAXIMO linhas. Os valores dos parâmetros não são gravados,
+só um hash deles, porque podem conter dados de clientes.
+"""
+import hashlib
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+from django.db.models import Count, Max, Sum
+
+from .instrumentacao import impressao_digital
+from .models import ConsultaLenta
+
+
+logger = logging.getLogger(__name__)
+
+# Só estes comandos aceitam EXPLAIN sem efeitos colaterais
+COMANDOS_COM_PLANO = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+TAMANHO_MAXIMO_SQL = 10000
+
+
+def _hash(texto):
+    return hashlib.sha1(texto.encode('utf-8', 'replace')).hexdigest()[:16]
+
+
+def plano_execucao(alias, sql, params):
+    """Saída do EXPLAIN da consulta no banco `alias` ('' se não for possível)."""
+    if not sql.lstrip().upper().startswith(COMANDOS_COM_PLANO):
+        return ''
+    conexao = connections[alias]
+    try:
+        with conexao.cursor() as cursor:
+            cursor.execute(f'{conexao.ops.explain_query_prefix()} {sql}', params)
+            linhas = cursor.fetchall()
+    except (DatabaseError, TypeError, ValueError) as erro:
+        return f'EXPLAIN falhou: {erro}'
+    return '\n'.join(' | '.join(str(coluna) for coluna in linha) for linha in linhas)
+
+
+class _Cronometro:
+    def __init__(self, alias, limite):
+        self.alias = alias
+        self.limite = limite
+        self.lentas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            if duracao >= self.limite:
+                self.lentas.append((self.alias, sql, params, many, duracao))
+
+
+def registrar(lentas, view):
+    """Grava as consultas lentas com o plano de cada uma e descarta as mais antigas."""
+    registros = []
+    for alias, sql, params, many, duracao in lentas:
+        impressao = impressao_digital(sql)
+        registros.append(ConsultaLenta(
+            assinatura=_hash(impressao),
+            impressao=impressao[:TAMANHO_MAXIMO_SQL],
+            sql=sql[:TAMANHO_MAXIMO_SQL],
+            parametros_hash=_hash(repr(params)),
+            view=view[:200],
+            duracao_ms=round(duracao * 1000, 2),
+            # executemany: um plano por linha de parâmetros não ajudaria
+            plano='' if many else plano_execucao(alias, sql, params),
+        ))
+        logger.warning(
+            'Consulta lenta (%.0f ms) em %s [%s]: %s',
+            duracao * 1000, view or '-', registros[-1].assinatura, impressao[:500]
+        )
+    criados = ConsultaLenta.objects.bulk_create(registros)
+    ultimo = criados[-1].pk if criados and criados[-1].pk else ConsultaLenta.objects.aggregate(m=Max('pk'))['m']
+    if ultimo:
+        ConsultaLenta.objects.filter(pk__lte=ultimo - settings.CONSULTAS_LENTAS_MAXIMO).delete()
+
+
+def piores(limite=50):
+    """Consultas agrupadas pela assinatura, ordenadas pelo tempo total."""
+    return ConsultaLenta.objects.values('assinatura').annotate(
+        vezes=Count('id'),
+        total_ms=Sum('duracao_ms'),
+        maximo_ms=Max('duracao_ms'),
+        ultima=Max('criado_em'),
+        ultimo_id=Max('id'),
+    ).order_by('-total_ms')[:limite]
+
+
+class ConsultasLentasMiddleware:
+    """Cronometra as consultas de cada requisição e registra as lentas ao final."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'CONSULTAS_LENTAS_ATIVO', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limite = settings.CONSULTAS_LENTAS_LIMITE_MS / 1000
+
+    def __call__(self, request):
+        cronometros = [_Cronometro(alias, self.limite) for alias in connections]
+        with ExitStack() as pilha:
+            for cronometro in cronometros:
+                pilha.enter_context(connections[cronometro.alias].execute_wrapper(cronometro))
+            response = self.get_response(request)
+
+        lentas = [consulta for cronometro in cronometros for consulta in cronometro.lentas]
+        if lentas:
+            match = getattr(request, 'resolver_match', None)
+            view = (match.view_name if match else None) or request.path
+            try:
+                registrar(lentas, view)
+            except DatabaseError:
+                logger.exception('Não foi possível registrar as consultas lentas')
+        return response
@@ -0,0 +1,13 @@
+from django.conf import settings
+
+from .models import ConfiguracaoEmpresa
+
+
+def configuracao_empresa(request):
+    """Disponibiliza a configuração da empresa (em cache) como `configuracao_empresa`."""
+    return {'configuracao_empresa': ConfiguracaoEmpresa.obter()}
+
+
+def assets(request):
+    """`assets_locais`: se o CSS e o JS compilados estão em static/ (ver `npm run build`)."""
+    return {'assets_locais': settings.ASSETS_LOCAIS}
@@ -0,0 +1,737 @@
+"""
+Dados sintéticos para testes de carga e de escala.
+
+Gera cadastros, orçamentos, vendas (com itens, parcelas e baixas de
+estoque), despesas e folhas de pagamento com a cara dos dados de produção:
+poucos clientes e itens concentram a maior parte das vendas, o movimento
+cresce ao longo dos anos e cai nos sábados, domingos e meses de férias,
+vendas antigas estão concluídas e as recentes em andamento, e parte das
+parcelas fica vencida em aberto. A mesma semente e a mesma data final
+geram sempre os mesmos dados.
+
+Os registros são gravados com bulk_create em lotes, sem passar por save()
+e pelos signals. Os ids de cadastros, orçamentos, vendas e itens da venda
+são definidos aqui (para ligar os registros sem consultar o banco) e as
+sequências do banco são acertadas no final; os números VND/ORC continuam
+a numeração existente. Os agregados que os signals manteriam (saldos de
+clientes, resumo mensal de itens, posições de estoque) são reconstruídos
+ao final. Deve rodar com o banco sem outros acessos.
+"""
+import math
+import random
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from apps.cadastros.models import Cliente, Empresa, Funcionario
+from apps.financeiro.models import (
+    CategoriaDespesa, Despesa, FolhaPagamento, ItemVenda, Parcela, ResumoItemMensal, SaldoCliente,
+    Venda,
+)
+from apps.orcamentos.models import ItemOrcamento, Orcamento
+from apps.servicos.estoque import registrar_posicoes
+from apps.servicos.models import HistoricoPreco, Item, MovimentoEstoque, PosicaoEstoque
+
+
+# Vendas gravadas por transação (com seus orçamentos, itens, parcelas e movimentos)
+TAMANHO_LOTE = 5000
+
+VOLUMES_PADRAO = {
+    'clientes': 10_000,
+    'empresas': 1_000,
+    'itens': 2_000,
+    'funcionarios': 15,
+    'vendas': 1_000_000,
+    'orcamentos': 150_000,
+    'despesas': 200_000,
+}
+
+CENTAVO = Decimal('0.01')
+
+NOMES = [
+    'Ana', 'Antônio', 'Bruno', 'Carla', 'Carlos', 'Daniela', 'Diego', 'Eduardo', 'Elaine', 'Fábio',
+    'Fernanda', 'Francisco', 'Gabriela', 'Gustavo', 'Helena', 'Igor', 'Joana', 'João', 'José', 'Juliana',
+    'Luciana', 'Luiz', 'Marcelo', 'Márcia', 'Maria', 'Paulo', 'Pedro', 'Rafael', 'Sandra', 'Vanessa',
+]
+SOBRENOMES = [
+    'Almeida', 'Alves', 'Barbosa', 'Cardoso', 'Carvalho', 'Costa', 'Dias', 'Ferreira', 'Gomes', 'Lima',
+    'Martins', 'Melo', 'Moreira', 'Nascimento', 'Oliveira', 'Pereira', 'Ribeiro', 'Rocha', 'Rodrigues',
+    'Santos', 'Silva', 'Souza', 'Teixeira', 'Vieira',
+]
+RAMOS = [
+    'Metalúrgica', 'Usinagem', 'Indústria', 'Agropecuária', 'Mineração', 'Transportadora',
+    'Construtora', 'Auto Peças', 'Serralheria', 'Frigorífico', 'Usina', 'Cerâmica',
+]
+NATUREZAS = ['Ltda', 'Ltda', 'Ltda', 'S.A.', 'ME', 'EPP']
+DDDS = ['11', '16', '19', '31', '34', '41', '62', '65', '66', '67']
+
+PECAS = [
+    'Eixo', 'Bucha', 'Flange', 'Engrenagem', 'Pino', 'Polia', 'Mancal', 'Luva', 'Arruela',
+    'Parafuso especial', 'Cubo', 'Anel de vedação', 'Acoplamento', 'Rosca sem fim', 'Espaçador',
+]
+MATERIAIS = ['aço 1020', 'aço 1045', 'aço inox 304', 'bronze', 'latão', 'alumínio', 'nylon', 'ferro fundido']
+SERVICOS = [
+    'Torneamento', 'Fresagem', 'Solda', 'Retífica', 'Usinagem CNC', 'Recuperação de eixo',
+    'Abertura de rosca', 'Balanceamento', 'Brochamento', 'Furação', 'Metalização', 'Desempeno',
+]
+COMPLEMENTOS = ['simples', 'de precisão', 'em peça grande', 'urgente', 'com material do cliente', 'em série']
+CARGOS = [('Torneiro', 3200), ('Fresador', 3400), ('Soldador', 2900), ('Operador CNC', 3800), ('Auxiliar', 1900)]
+
+# Peso do dia da semana (segunda a domingo) e do mês no volume de vendas
+PESO_DIA_SEMANA = (1.0, 1.1, 1.1, 1.05, 0.95, 0.35, 0.0)
+PESO_MES = {1: 0.7, 2: 0.9, 7: 0.9, 12: 0.8}
+CRESCIMENTO_ANUAL = 0.12
+
+# Itens por venda e quantidade por item de produto
+ITENS_POR_VENDA = ([1, 2, 3, 4, 5, 6, 8], [44, 24, 14, 8, 5, 3, 2])
+QUANTIDADES_PRODUTO = ([1, 2, 3, 4, 5, 6, 10, 12, 20, 50], [30, 18, 12, 9, 8, 6, 7, 4, 4, 2])
+DESCONTOS = [Decimal('0')] * 16 + [Decimal('3'), Decimal('5'), Decimal('5'), Decimal('10')]
+FORMAS_PAGAMENTO = (
+    ['pix', 'dinheiro', 'cartao_credito', 'cartao_debito', 'boleto', 'transferencia', 'cheque'],
+    [35, 10, 20, 10, 15, 8, 2],
+)
+FORMAS_PARCELAVEIS = {'cartao_credito', 'boleto', 'cheque'}
+NUMERO_PARCELAS = ([2, 3, 4, 5, 6, 10, 12], [30, 30, 15, 8, 10, 4, 3])
+STATUS_ORCAMENTO = (['convertido', 'aprovado', 'rejeitado', 'pendente'], [45, 8, 27, 20])
+
+# Despesas fixas mensais: (descrição, categoria, valor mediano, dispersão, dia do mês)
+DESPESAS_FIXAS = [
+    ('Aluguel do galpão', 'Aluguel', 3500, 0.0, 5),
+    ('Energia elétrica', 'Energia', 1800, 0.25, 10),
+    ('Água e esgoto', 'Água', 250, 0.2, 10),
+    ('Internet e telefone', 'Comunicação', 220, 0.05, 15),
+    ('Honorários do contador', 'Contabilidade', 900, 0.0, 5),
+]
+# Alíquota aproximada do Simples Nacional sobre a receita do mês anterior
+ALIQUOTA_IMPOSTO = Decimal('0.06')
+# Despesas variáveis: categoria -> (descrições, valor mediano, dispersão, peso)
+DESPESAS_VARIAVEIS = {
+    'Material': (
+        ['Barra de aço SAE 1045', 'Barra de bronze', 'Tarugo de alumínio', 'Chapa de aço',
+         'Tubo trefilado', 'Barra de inox 304'],
+        600, 0.9, 40,
+    ),
+    'Ferramentas': (
+        ['Pastilha de metal duro', 'Broca HSS', 'Bedame', 'Fresa de topo', 'Macho e cossinete', 'Disco de corte'],
+        180, 0.8, 18,
+    ),
+    'Manutenção': (
+        ['Manutenção do torno', 'Óleo hidráulico', 'Correia', 'Rolamento do cabeçote', 'Reparo elétrico'],
+        450, 1.0, 10,
+    ),
+    'Transporte': (['Combustível', 'Frete', 'Pedágio', 'Manutenção do veículo'], 150, 0.7, 17),
+    'Consumo': (
+        ['Óleo solúvel', 'Estopa', 'EPI', 'Material de limpeza', 'Material de escritório'], 90, 0.7, 15,
+    ),
+}
+CORES_CATEGORIAS = {
+    'Aluguel': '#EF4444', 'Energia': '#F59E0B', 'Água': '#0EA5E9', 'Comunicação': '#8B5CF6',
+    'Contabilidade': '#64748B', 'Impostos': '#DC2626', 'Material': '#3B82F6', 'Ferramentas': '#10B981',
+    'Manutenção': '#F97316', 'Transporte': '#14B8A6', 'Consumo': '#A3A3A3',
+}
+
+# Modelos com ids definidos pelo gerador; as sequências são acertadas no final
+MODELOS_COM_ID = [Cliente, Empresa, Funcionario, Item, Orcamento, Venda, ItemVenda]
+# Modelos com campos auto_now/auto_now_add preenchidos pelo gerador
+MODELOS_COM_DATAS = [Cliente, Empresa, Funcionario, Item, Orcamento, Venda, Despesa, FolhaPagamento]
+
+
+def _digito(digitos, pesos):
+    resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+    return 0 if resto < 2 else 11 - resto
+
+
+def _cpf(base):
+    """CPF formatado e com dígitos verificadores válidos a partir de 9 dígitos."""
+    digitos = [int(c) for c in f'{base:09d}']
+    digitos.append(_digito(digitos, range(10, 1, -1)))
+    digitos.append(_digito(digitos, range(11, 1, -1)))
+    d = ''.join(map(str, digitos))
+    return f'{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}'
+
+
+def _cnpj(base):
+    """CNPJ formatado e com dígitos verificadores válidos a partir de 12 dígitos."""
+    pesos = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    digitos = [int(c) for c in f'{base:012d}']
+    digitos.append(_digito(digitos, pesos))
+    digitos.append(_digito(digitos, [6] + pesos))
+    d = ''.join(map(str, digitos))
+    return f'{d[:2]}.{d[2:5]}.{d[5:8]}/{d[8:12]}-{d[12:]}'
+
+
+@contextmanager
+def _datas_manuais(modelos):
+    """Desliga auto_now/auto_now_add para que as datas informadas sejam gravadas."""
+    campos = [
+        (campo, campo.auto_now, campo.auto_now_add)
+        for modelo in modelos for campo in modelo._meta.concrete_fields
+        if isinstance(campo, models.DateField) and (campo.auto_now or campo.auto_now_add)
+    ]
+    for campo, _, _ in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in campos:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def _ultimo_numero(modelo, prefixo):
+    """Último número da sequência VND/ORC, pelo mesmo critério do save() do modelo."""
+    ultimo = modelo.objects.order_by('-id').values_list('numero', flat=True).first()
+    return int(ultimo.replace(prefixo, '')) if ultimo else 0
+
+
+class GeradorDadosSinteticos:
+    """
+    Gera e grava os dados. `ate` é o último dia do período (ontem por
+    padrão; não pode ser hoje ou depois, para que nenhum registro fique no
+    futuro) e o período começa no primeiro dia do mesmo mês `anos` anos
+    antes. `progresso` recebe mensagens de andamento.
+    """
+
+    def __init__(self, semente=42, anos=5, ate=None, tamanho_lote=TAMANHO_LOTE, progresso=None):
+        self.aleatorio = random.Random(semente)
+        self.ate = ate or timezone.localdate() - timedelta(days=1)
+        if self.ate >= timezone.localdate():
+            raise ValueError('A data final dos dados sintéticos deve ser anterior a hoje.')
+        self.inicio = date(self.ate.year - anos, self.ate.month, 1)
+        self.tamanho_lote = tamanho_lote
+        self.progresso = progresso or (lambda mensagem: None)
+        self.fuso = timezone.get_current_timezone()
+        self.gravados = Counter()
+        self.pendentes = defaultdict(list)
+        # Fator acumulado dos reajustes anuais de preços e salários, por ano
+        self.fatores = {}
+        fator = Decimal('1')
+        for ano in range(self.inicio.year, self.ate.year + 1):
+            if ano > self.inicio.year:
+                fator *= 1 + Decimal(self.aleatorio.randint(30, 90)) / 1000
+            self.fatores[ano] = fator
+
+    def gerar(self, clientes, empresas, itens, funcionarios, vendas, orcamentos, despesas):
+        """Gera os volumes informados. Devolve {nome do modelo: registros gravados}."""
+        self.ids = {
+            modelo: modelo.objects.aggregate(maior=models.Max('pk'))['maior'] or 0
+            for modelo in MODELOS_COM_ID
+        }
+        self.numero_venda = _ultimo_numero(Venda, 'VND')
+        self.numero_orcamento = _ultimo_numero(Orcamento, 'ORC')
+        with _datas_manuais(MODELOS_COM_DATAS):
+            self._gerar_destinatarios(clientes, empresas)
+            self._gerar_itens(itens)
+            self.categorias = self._categorias()
+            self.gravar()
+            self._gerar_movimento(vendas, orcamentos)
+            self._gerar_reposicoes()
+            self._gerar_despesas(despesas)
+            self._gerar_folhas(funcionarios)
+            self.gravar()
+        self._acertar_sequencias()
+        self._reconstruir_agregados()
+        return dict(self.gravados)
+
+    # Gravação
+
+    def _novo_id(self, modelo):
+        self.ids[modelo] += 1
+        return self.ids[modelo]
+
+    def _adicionar(self, objeto):
+        self.pendentes[type(objeto)].append(objeto)
+
+    def gravar(self):
+        """Grava os registros pendentes em uma transação, respeitando as dependências."""
+        ordem = [
+            Cliente, Empresa, Funcionario, Item, HistoricoPreco, Orcamento, ItemOrcamento, Venda,
+            ItemVenda, Parcela, MovimentoEstoque, PosicaoEstoque, Despesa, FolhaPagamento,
+        ]
+        with transaction.atomic():
+            for modelo in ordem:
+                objetos = self.pendentes.pop(modelo, [])
+                if objetos:
+                    modelo.objects.bulk_create(objetos)
+                    self.gravados[modelo._meta.verbose_name_plural] += len(objetos)
+
+    def _acertar_sequencias(self):
+        # No PostgreSQL as sequências não avançam com ids informados no INSERT
+        comandos = connection.ops.sequence_reset_sql(no_style(), MODELOS_COM_ID)
+        if comandos:
+            with connection.cursor() as cursor:
+                for sql in comandos:
+                    cursor.execute(sql)
+
+    def _reconstruir_agregados(self):
+        self.progresso('Reconstruindo saldos de clientes, resumo de itens e posições de estoque...')
+        SaldoCliente.reconstruir()
+        ResumoItemMensal.reconstruir()
+        registrar_posicoes()
+
+    # Sorteios
+
+    def _momento(self, dia, hora=None):
+        """Data e hora no fuso local, em horário comercial se a hora não for informada."""
+        if hora is None:
+            hora = self.aleatorio.randint(7, 17)
+        return datetime(dia.year, dia.month, dia.day, hora, self.aleatorio.randint(0, 59), tzinfo=self.fuso)
+
+    def _valor(self, mediana, dispersao, minimo=Decimal('1')):
+        """Valor com distribuição log-normal em torno da mediana."""
+        valor = Decimal(self.aleatorio.lognormvariate(math.log(mediana), dispersao)).quantize(CENTAVO)
+        return max(valor, minimo)
+
+    def _telefone(self):
+        return (
+            f'({self.aleatorio.choice(DDDS)}) 9{self.aleatorio.randint(1000, 9999)}-'
+            f'{self.aleatorio.randint(0, 9999):04d}'
+        )
+
+    def _nome_pessoa(self):
+        return (
+            f'{self.aleatorio.choice(NOMES)} {self.aleatorio.choice(SOBRENOMES)} '
+            f'{self.aleatorio.choice(SOBRENOMES)}'
+        )
+
+    def _dias(self):
+        dia = self.inicio
+        while dia <= self.ate:
+            yield dia
+            dia += timedelta(days=1)
+
+    def _distribuir(self, total, dias):
+        """Reparte `total` entre os dias pelo peso de cada um (dia da semana, mês e crescimento)."""
+        pesos = [
+            PESO_DIA_SEMANA[dia.weekday()] * PESO_MES.get(dia.month, 1.0)
+            * (1 + CRESCIMENTO_ANUAL) ** ((dia - self.inicio).days / 365)
+            for dia in dias
+        ]
+        soma = sum(pesos)
+        acumulados = [round(total * parcial / soma) for parcial in accumulate(pesos)]
+        return [atual - anterior for anterior, atual in zip([0] + acumulados, acumulados)]
+
+    # Cadastros
+
+    def _gerar_destinatarios(self, quantidade_clientes, quantidade_empresas):
+        self.progresso(f'Gerando {quantidade_clientes} clientes e {quantidade_empresas} empresas...')
+        # Popularidade com cauda longa (Pareto): poucos compram muito
+        self.clientes, self.empresas = [], []
+        for _ in range(quantidade_clientes):
+            pk = self._novo_id(Cliente)
+            criado = self._momento(self.inicio - timedelta(days=self.aleatorio.randint(0, 730)))
+            self._adicionar(Cliente(
+                pk=pk,
+                nome=self._nome_pessoa(),
+                cpf=_cpf(self.aleatorio.randrange(10 ** 8, 10 ** 9)),
+                telefone=self._telefone(),
+                email=f'cliente{pk}@exemplo.com.br',
+                ativo=self.aleatorio.random() > 0.05,
+                created_at=criado,
+                updated_at=criado,
+            ))
+            self.clientes.append(pk)
+        for _ in range(quantidade_empresas):
+            pk = self._novo_id(Empresa)
+            criado = self._momento(self.inicio - timedelta(days=self.aleatorio.randint(0, 730)))
+            self._adicionar(Empresa(
+                pk=pk,
+                nome=f'{self.aleatorio.choice(RAMOS)} {self.aleatorio.choice(SOBRENOMES)} '
+                     f'{self.aleatorio.choice(NATUREZAS)}',
+                cnpj=_cnpj(self.aleatorio.randrange(10 ** 11, 10 ** 12)),
+                nome_contato=self._nome_pessoa(),
+                telefone=self._telefone(),
+                email=f'compras{pk}@exemplo.com.br',
+                ativo=self.aleatorio.random() > 0.05,
+                created_at=criado,
+                updated_at=criado,
+            ))
+            self.empresas.append(pk)
+        self.pesos_clientes = list(accumulate(self.aleatorio.paretovariate(1.16) for _ in self.clientes))
+        self.pesos_empresas = list(accumulate(self.aleatorio.paretovariate(1.16) for _ in self.empresas))
+
+    def _gerar_itens(self, quantidade):
+        self.progresso(f'Gerando {quantidade} itens...')
+        self.itens = []
+        self.produtos = {}
+        self.precos = {}
+        nomes = set()
+        for numero in range(quantidade):
+            pk = self._novo_id(Item)
+            if self.aleatorio.random() < 0.6:
+                tipo = 'produto'
+                nome = (
+                    f'{self.aleatorio.choice(PECAS)} {self.aleatorio.choice(MATERIAIS)} '
+                    f'{self.aleatorio.choice([6, 8, 10, 12, 16, 20, 25, 32, 40, 50, 63, 80, 100])}mm'
+                )
+                preco_inicial = self._valor(80, 0.8)
+                minimo = self.aleatorio.randint(2, 20)
+                # Alguns produtos abaixo do mínimo, para a tela de reposição
+                estoque = self.aleatorio.randint(0, minimo) if self.aleatorio.random() < 0.1 else \
+                    self.aleatorio.randint(minimo + 1, minimo * 5)
+            else:
+                tipo = 'servico'
+                nome = f'{self.aleatorio.choice(SERVICOS)} {self.aleatorio.choice(COMPLEMENTOS)}'
+                preco_inicial = self._valor(250, 0.7)
+                minimo = estoque = 0
+            if nome in nomes:
+                nome = f'{nome} ({numero + 1})'
+            nomes.add(nome)
+
+            self.precos[pk] = {
+                ano: (preco_inicial * fator).quantize(CENTAVO) for ano, fator in self.fatores.items()
+            }
+            criado = self._momento(self.inicio - timedelta(days=self.aleatorio.randint(1, 365)))
+            self._adicionar(Item(
+                pk=pk,
+                tipo=tipo,
+                nome=nome,
+                preco=self.precos[pk][self.ate.year],
+                quantidade_estoque=estoque,
+                estoque_minimo=minimo,
+                created_at=criado,
+                updated_at=criado,
+            ))
+            # bulk_create não passa por Item.save(), que grava o histórico de
+            # preços e o estoque inicial no livro de estoque
+            self._adicionar(HistoricoPreco(item_id=pk, preco=preco_inicial, vigente_desde=criado, origem='cadastro'))
+            for ano in self.fatores:
+                if ano > self.inicio.year:
+                    self._adicionar(HistoricoPreco(
+                        item_id=pk,
+                        preco=self.precos[pk][ano],
+                        vigente_desde=self._momento(date(ano, 1, 1), hora=0),
+                        origem='reajuste',
+                        descricao=f'Reajuste anual {ano}',
+                    ))
+            if estoque:
+                self._adicionar(MovimentoEstoque(
+                    item_id=pk, tipo='entrada', quantidade=estoque, observacao='Estoque inicial', data=criado
+                ))
+            if tipo == 'produto':
+                self.produtos[pk] = estoque
+            self.itens.append(pk)
+
+        # Popularidade dos itens segue a lei de Zipf, em ordem sorteada
+        posicoes = list(range(1, len(self.itens) + 1))
+        self.aleatorio.shuffle(posicoes)
+        self.pesos_itens = list(accumulate(1 / posicao ** 1.1 for posicao in posicoes))
+
+    def _categorias(self):
+        categorias = {}
+        for nome, cor in CORES_CATEGORIAS.items():
+            categorias[nome], _ = CategoriaDespesa.objects.get_or_create(nome=nome, defaults={'cor': cor})
+        # Mesma categoria usada por FolhaPagamento.gerar_folha
+        categorias['Salários'], _ = CategoriaDespesa.objects.get_or_create(
+            nome='Salários',
+            defaults={'cor': '#4CAF50', 'descricao': 'Pagamento de salários dos funcionários'}
+        )
+        return categorias
+
+    # Orçamentos e vendas
+
+    def _destinatario(self):
+        """(cliente_id, empresa_id) sorteado pela popularidade; empresas fazem um terço das compras."""
+        if self.empresas and (not self.clientes or self.aleatorio.random() < 0.35):
+            return None, self.aleatorio.choices(self.empresas, cum_weights=self.pesos_empresas)[0]
+        if self.clientes:
+            return self.aleatorio.choices(self.clientes, cum_weights=self.pesos_clientes)[0], None
+        return None, None
+
+    def _linhas(self, dia):
+        """Itens de uma venda ou orçamento: [(item_id, quantidade, valor unitário)]."""
+        quantidade = self.aleatorio.choices(*ITENS_POR_VENDA)[0]
+        escolhidos = dict.fromkeys(
+            self.aleatorio.choices(self.itens, cum_weights=self.pesos_itens, k=quantidade)
+        )
+        return [
+            (
+                item_id,
+                self.aleatorio.choices(*QUANTIDADES_PRODUTO)[0] if item_id in self.produtos
+                else self.aleatorio.randint(1, 2),
+                self.precos[item_id][dia.year],
+            )
+            for item_id in escolhidos
+        ]
+
+    def _gerar_movimento(self, total_vendas, total_orcamentos):
+        self.progresso(f'Gerando {total_vendas} vendas e {total_orcamentos} orçamentos...')
+        # Saídas de produtos por (item, ano, mês) para as compras de reposição
+        self.saidas = Counter()
+        # Receita das vendas concluídas por (ano, mês), base dos impostos
+        self.receitas = Counter()
+        if not self.itens:
+            return
+        dias = list(self._dias())
+        pendentes = gravadas = 0
+        for dia, vendas, orcamentos in zip(
+            dias, self._distribuir(total_vendas, dias), self._distribuir(total_orcamentos, dias)
+        ):
+            convertidos = 0
+            for _ in range(orcamentos):
+                orcamento, linhas = self._orcamento(dia)
+                if orcamento.status == 'convertido':
+                    if convertidos < vendas:
+                        convertidos += 1
+                        entrada = min(dia + timedelta(days=self.aleatorio.randint(0, 7)), self.ate)
+                        self._venda(entrada, linhas, orcamento)
+                    else:
+                        orcamento.status = 'aprovado'
+            for _ in range(vendas - convertidos):
+                self._venda(dia, self._linhas(dia))
+
+            pendentes += vendas
+            if pendentes >= self.tamanho_lote:
+                self.gravar()
+                gravadas += pendentes
+                pendentes = 0
+                if gravadas % (self.tamanho_lote * 20) < self.tamanho_lote:
+                    self.progresso(f'  {gravadas} vendas gravadas (até {dia:%d/%m/%Y})')
+        self.gravar()
+
+    def _orcamento(self, dia):
+        cliente_id, empresa_id = self._destinatario()
+        linhas = self._linhas(dia)
+        validade = dia + timedelta(days=15)
+        status = 'pendente' if validade >= self.ate else self.aleatorio.choices(*STATUS_ORCAMENTO)[0]
+        criado = self._momento(dia)
+        self.numero_orcamento += 1
+        orcamento = Orcamento(
+            pk=self._novo_id(Orcamento),
+            numero=f'ORC{self.numero_orcamento:05d}',
+            cliente_id=cliente_id,
+            empresa_id=empresa_id,
+            status=status,
+            data_emissao=dia,
+            validade=validade,
+            desconto=self.aleatorio.choice(DESCONTOS),
+            created_at=criado,
+            updated_at=criado,
+        )
+        self._adicionar(orcamento)
+        for item_id, quantidade, valor_unitario in linhas:
+            self._adicionar(ItemOrcamento(
+                orcamento_id=orcamento.pk, item_id=item_id, quantidade=quantidade, valor_unitario=valor_unitario
+            ))
+        return orcamento, linhas
+
+    def _venda(self, dia, linhas, orcamento=None):
+        if orcamento:
+            cliente_id, empresa_id, desconto = orcamento.cliente_id, orcamento.empresa_id, orcamento.desconto
+        else:
+            cliente_id, empresa_id = self._destinatario()
+            desconto = self.aleatorio.choice(DESCONTOS)
+        subtotal = sum(quantidade * valor for _, quantidade, valor in linhas)
+        total = subtotal - subtotal * (desconto / 100)
+
+        forma = self.aleatorio.choices(*FORMAS_PAGAMENTO)[0]
+        parcelas = 1
+        if forma in FORMAS_PARCELAVEIS and total >= 300 and self.aleatorio.random() < 0.6:
+            parcelas = self.aleatorio.choices(*NUMERO_PARCELAS)[0]
+
+        # Prazo de entrega: a maioria em poucos dias, alguns serviços demoram semanas
+        conclusao = dia + timedelta(days=min(int(self.aleatorio.expovariate(1 / 5)), 60))
+        sorteio = self.aleatorio.random()
+        if sorteio < 0.03:
+            status, conclusao = 'cancelado', None
+        elif conclusao <= self.ate and sorteio < 0.98:
+            status = 'concluido'
+        else:
+            status, conclusao = 'em_andamento', None
+
+        criado = self._momento(dia)
+        self.numero_venda += 1
+        venda = Venda(
+            pk=self._novo_id(Venda),
+            numero=f'VND{self.numero_venda:05d}',
+            orcamento_id=orcamento.pk if orcamento else None,
+            cliente_id=cliente_id,
+            empresa_id=empresa_id,
+            status=status,
+            data_entrada=dia,
+            data_conclusao=conclusao,
+            desconto=desconto,
+            forma_pagamento=forma,
+            tipo_pagamento='parcelado' if parcelas > 1 else 'a_vista',
+            numero_parcelas=parcelas,
+            created_at=criado,
+            updated_at=self._momento(conclusao) if conclusao else criado,
+        )
+        self._adicionar(venda)
+
+        for item_id, quantidade, valor_unitario in linhas:
+            item_venda = ItemVenda(
+                pk=self._novo_id(ItemVenda),
+                venda_id=venda.pk,
+                item_id=item_id,
+                quantidade=quantidade,
+                valor_unitario=valor_unitario,
+            )
+            self._adicionar(item_venda)
+            # Venda.concluir() dá baixa no estoque dos produtos
+            if status == 'concluido' and item_id in self.produtos:
+                self._adicionar(MovimentoEstoque(
+                    item_id=item_id,
+                    tipo='saida',
+                    quantidade=-quantidade,
+                    item_venda_id=item_venda.pk,
+                    observacao=f'Venda #{venda.numero}',
+                    data=venda.updated_at,
+                ))
+                self.saidas[item_id, conclusao.year, conclusao.month] += quantidade
+        if status == 'concluido':
+            self.receitas[conclusao.year, conclusao.month] += total
+
+        # Mesmas parcelas de Venda.gerar_parcelas(); concluir() baixa todas na conclusão
+        for numero in range(1, parcelas + 1):
+            vencimento = dia + relativedelta(months=numero - 1)
+            pagamento = None
+            if status == 'concluido':
+                pagamento = conclusao
+            elif status == 'em_andamento' and vencimento < self.ate and self.aleatorio.random() < 0.85:
+                atraso = min(int(self.aleatorio.expovariate(1 / 3)), 30)
+                pagamento = min(vencimento + timedelta(days=atraso), self.ate)
+            self._adicionar(Parcela(
+                venda_id=venda.pk,
+                numero=numero,
+                valor=total / parcelas,
+                data_vencimento=vencimento,
+                data_pagamento=pagamento,
+                pago=pagamento is not None,
+            ))
+
+    def _gerar_reposicoes(self):
+        """
+        Compra de reposição no primeiro dia de cada mês com a quantidade que
+        sai no mês, para que o livro de estoque nunca fique negativo e o
+        estoque de cada produto termine cada mês no valor inicial (que é o
+        cadastrado). Grava também a posição de estoque de cada fim de mês.
+        """
+        for (item_id, ano, mes), quantidade in sorted(self.saidas.items()):
+            self._adicionar(MovimentoEstoque(
+                item_id=item_id,
+                tipo='entrada',
+                quantidade=quantidade,
+                observacao='Compra de reposição',
+                data=self._momento(date(ano, mes, 1), hora=7),
+            ))
+        mes = self.inicio
+        while mes + relativedelta(months=1) <= self.ate:
+            fim = mes + relativedelta(months=1) - timedelta(days=1)
+            momento = datetime(fim.year, fim.month, fim.day, 23, 59, tzinfo=self.fuso)
+            for item_id, estoque in self.produtos.items():
+                self._adicionar(PosicaoEstoque(item_id=item_id, data=momento, quantidade=estoque))
+            mes += relativedelta(months=1)
+        self.gravar()
+
+    # Despesas e folha
+
+    def _meses(self):
+        mes = self.inicio
+        while mes <= self.ate:
+            yield mes
+            mes += relativedelta(months=1)
+
+    def _despesa(self, descricao, categoria, valor, dia, tipo, funcionario_id=None):
+        criado = self._momento(dia)
+        self._adicionar(Despesa(
+            descricao=descricao,
+            categoria=self.categorias[categoria],
+            valor=valor,
+            data=dia,
+            tipo=tipo,
+            funcionario_id=funcionario_id,
+            created_at=criado,
+            updated_at=criado,
+        ))
+
+    def _gerar_despesas(self, total):
+        self.progresso(f'Gerando {total} despesas...')
+        fixas = 0
+        for mes in self._meses():
+            fator = self.fatores[mes.year]
+            for descricao, categoria, mediana, dispersao, dia in DESPESAS_FIXAS:
+                vencimento = mes.replace(day=dia)
+                if fixas < total and vencimento <= self.ate:
+                    valor = (Decimal(mediana) * fator).quantize(CENTAVO) if not dispersao \
+                        else self._valor(mediana * float(fator), dispersao)
+                    self._despesa(f'{descricao} {mes:%m/%Y}', categoria, valor, vencimento, 'fixa')
+                    fixas += 1
+            anterior = mes - relativedelta(months=1)
+            imposto = (self.receitas[anterior.year, anterior.month] * ALIQUOTA_IMPOSTO).quantize(CENTAVO)
+            vencimento = mes.replace(day=20)
+            if fixas < total and imposto >= CENTAVO and vencimento <= self.ate:
+                self._despesa(f'Simples Nacional {anterior:%m/%Y}', 'Impostos', imposto, vencimento, 'fixa')
+                fixas += 1
+
+        categorias = list(DESPESAS_VARIAVEIS)
+        pesos = [DESPESAS_VARIAVEIS[categoria][3] for categoria in categorias]
+        dias = list(self._dias())
+        for dia, quantidade in zip(dias, self._distribuir(total - fixas, dias)):
+            for categoria in self.aleatorio.choices(categorias, pesos, k=quantidade):
+                descricoes, mediana, dispersao, _ = DESPESAS_VARIAVEIS[categoria]
+                self._despesa(
+                    self.aleatorio.choice(descricoes), categoria,
+                    self._valor(mediana * float(self.fatores[dia.year]), dispersao), dia, 'variavel'
+                )
+            if len(self.pendentes[Despesa]) >= self.tamanho_lote:
+                self.gravar()
+        self.gravar()
+
+    def _gerar_folhas(self, quantidade):
+        self.progresso(f'Gerando {quantidade} funcionários e as folhas de pagamento...')
+        funcionarios = []
+        for _ in range(quantidade):
+            cargo, salario_base = self.aleatorio.choice(CARGOS)
+            admissao = self.inicio - timedelta(days=self.aleatorio.randint(0, 1095)) \
+                if self.aleatorio.random() < 0.5 else \
+                self.inicio + timedelta(days=self.aleatorio.randint(0, max((self.ate - self.inicio).days - 60, 0)))
+            desligamento = None
+            if self.aleatorio.random() < 0.2 and (self.ate - admissao).days > 180:
+                desligamento = admissao + timedelta(days=self.aleatorio.randint(180, (self.ate - admissao).days))
+            salario = (Decimal(salario_base) * Decimal(self.aleatorio.uniform(0.85, 1.15))).quantize(CENTAVO)
+            criado = self._momento(admissao)
+            funcionario = Funcionario(
+                pk=self._novo_id(Funcionario),
+                nome=self._nome_pessoa(),
+                cargo=cargo,
+                salario=(salario * self.fatores[self.ate.year]).quantize(CENTAVO),
+                data_admissao=admissao,
+                status='inativo' if desligamento else 'ativo',
+                telefone=self._telefone(),
+                observacoes=f'Desligado em {desligamento:%d/%m/%Y}' if desligamento else '',
+                created_at=criado,
+                updated_at=self._momento(desligamento) if desligamento else criado,
+            )
+            self._adicionar(funcionario)
+            funcionarios.append((funcionario, salario, desligamento))
+
+        existentes = set(FolhaPagamento.objects.values_list('ano', 'mes'))
+        for mes in self._meses():
+            if (mes.year, mes.month) in existentes:
+                continue
+            fim = mes + relativedelta(months=1) - timedelta(days=1)
+            total = Decimal('0')
+            for funcionario, salario, desligamento in funcionarios:
+                if funcionario.data_admissao > fim or (desligamento and desligamento < mes):
+                    continue
+                valor = (salario * self.fatores[mes.year]).quantize(CENTAVO)
+                # Mesma descrição, data e categoria de FolhaPagamento.gerar_folha
+                self._despesa(
+                    f'Salário {funcionario.nome} - {mes.month:02d}/{mes.year}', 'Salários', valor, mes,
+                    'salario', funcionario.pk
+                )
+                total += valor
+            self._adicionar(FolhaPagamento(
+                mes=mes.month,
+                ano=mes.year,
+                data_geracao=self._momento(mes),
+                total=total,
+                processada=(mes.year, mes.month) < (self.ate.year, self.ate.month),
+            ))
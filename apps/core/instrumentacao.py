@@ -0,0 +1,220 @@
+"""
+Medição de desempenho por requisição.
+
+`InstrumentacaoMiddleware` mede, em uma amostra das requisições, o tempo
+total, a quantidade e o tempo das consultas SQL (`connection.execute_wrapper`),
+o tempo de renderização de templates e o tempo gasto em trechos marcados com
+`medir()` (ex.: a montagem dos PDFs pelo ReportLab). O resultado vai para o
+cabeçalho `Server-Timing` e para uma linha de log em JSON no logger
+`apps.core.instrumentacao`; consultas repetidas muitas vezes na mesma
+requisição (N+1) geram um aviso com a impressão digital do SQL.
+
+Configuração (settings):
+    INSTRUMENTACAO_ATIVA              liga/desliga o middleware
+    INSTRUMENTACAO_AMOSTRAGEM         fração das requisições medidas (0 a 1)
+    INSTRUMENTACAO_SERVER_TIMING      envia o cabeçalho Server-Timing
+    INSTRUMENTACAO_LIMITE_REPETICOES  repetições do mesmo SQL que geram aviso
+"""
+import contextvars
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+_medicao_atual = contextvars.ContextVar('medicao_atual', default=None)
+
+# Chamados com (trecho, duração) ao fim de cada bloco `medir()`, mesmo nas
+# requisições fora da amostra (ex.: métricas do Prometheus)
+observadores_trechos = []
+
+# Chamados com (nome do cache, acerto) por `registrar_cache()`, a cada leitura
+observadores_cache = []
+
+_RE_LISTA_IN = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_RE_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_RE_ESPACOS = re.compile(r'\s+')
+
+
+def impressao_digital(sql):
+    """SQL sem valores: literais e listas de IN viram '?', para agrupar consultas iguais."""
+    sql = _RE_LISTA_IN.sub('(?)', sql)
+    sql = _RE_LITERAL.sub('?', sql)
+    return _RE_ESPACOS.sub(' ', sql).strip()
+
+
+class Medicao:
+    """Tempos acumulados de uma requisição, em segundos."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tempo_sql = 0.0
+        self.impressoes = Counter()
+        self.trechos = Counter()
+        self.renderizando = False
+        # Chamados com (sql, params, duração) após cada consulta
+        self.observadores = []
+
+    def registrar_consulta(self, sql, params, duracao):
+        self.consultas += 1
+        self.tempo_sql += duracao
+        self.impressoes[impressao_digital(sql)] += 1
+        for observador in self.observadores:
+            observador(sql, params, duracao)
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.inicio
+
+    def repetidas(self, limite):
+        """[(impressão digital, vezes)] das consultas executadas `limite` vezes ou mais."""
+        return [(sql, vezes) for sql, vezes in self.impressoes.most_common() if vezes >= limite]
+
+
+def registrar_cache(nome, acerto):
+    """Avisa os observadores de um acerto ou falta em um cache da aplicação."""
+    for observador in observadores_cache:
+        observador(nome, acerto)
+
+
+def medicao_atual():
+    """Medição da requisição em andamento (None fora de uma requisição medida)."""
+    return _medicao_atual.get()
+
+
+@contextmanager
+def medir(trecho):
+    """Soma ao trecho `trecho` da medição atual o tempo gasto no bloco."""
+    medicao = _medicao_atual.get()
+    if medicao is None and not observadores_trechos:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        if medicao is not None:
+            medicao.trechos[trecho] += duracao
+        for observador in observadores_trechos:
+            observador(trecho, duracao)
+
+
+def _envolver_consulta(execute, sql, params, many, context):
+    medicao = _medicao_atual.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.registrar_consulta(sql, params, time.perf_counter() - inicio)
+
+
+_templates_instrumentados = False
+
+
+def _instrumentar_templates():
+    """Mede as renderizações de templates do backend do Django (uma vez por processo)."""
+    global _templates_instrumentados
+    if _templates_instrumentados:
+        return
+    from django.template.backends.django import Template
+
+    renderizar = Template.render
+
+    def render(self, context=None, request=None):
+        medicao = _medicao_atual.get()
+        # Templates renderizados dentro de outro template já estão no tempo dele
+        if medicao is None or medicao.renderizando:
+            return renderizar(self, context, request)
+        medicao.renderizando = True
+        try:
+            with medir('template'):
+                return renderizar(self, context, request)
+        finally:
+            medicao.renderizando = False
+
+    Template.render = render
+    _templates_instrumentados = True
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 1)
+
+
+class InstrumentacaoMiddleware:
+    """Mede uma amostra das requisições; ver a documentação do módulo."""
+
+    DESCRICOES = {'template': 'Templates', 'pdf': 'PDF (ReportLab)'}
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTACAO_ATIVA', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.amostragem = float(getattr(settings, 'INSTRUMENTACAO_AMOSTRAGEM', 1.0))
+        self.server_timing = getattr(settings, 'INSTRUMENTACAO_SERVER_TIMING', True)
+        self.limite_repeticoes = int(getattr(settings, 'INSTRUMENTACAO_LIMITE_REPETICOES', 5))
+        _instrumentar_templates()
+
+    def __call__(self, request):
+        if self.amostragem < 1 and random.random() >= self.amostragem:
+            return self.get_response(request)
+
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        try:
+            with ExitStack() as pilha:
+                for alias in connections:
+                    pilha.enter_context(connections[alias].execute_wrapper(_envolver_consulta))
+                response = self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+
+        request.medicao = medicao
+        self.registrar(request, response, medicao)
+        return response
+
+    def registrar(self, request, response, medicao):
+        total = medicao.total
+        trechos = dict(medicao.trechos)
+
+        if self.server_timing:
+            metricas = [
+                f'total;dur={_ms(total)}',
+                f'sql;dur={_ms(medicao.tempo_sql)};desc="{medicao.consultas} consultas"',
+            ]
+            metricas += [
+                f'{nome};dur={_ms(valor)};desc="{self.DESCRICOES.get(nome, nome)}"'
+                for nome, valor in trechos.items()
+            ]
+            response['Server-Timing'] = ', '.join(metricas)
+
+        repetidas = medicao.repetidas(self.limite_repeticoes)
+        rota = getattr(getattr(request, 'resolver_match', None), 'view_name', None) or ''
+        logger.info(json.dumps({
+            'metodo': request.method,
+            'caminho': request.path,
+            'rota': rota,
+            'status': response.status_code,
+            'total_ms': _ms(total),
+            'sql_consultas': medicao.consultas,
+            'sql_ms': _ms(medicao.tempo_sql),
+            **{f'{nome}_ms': _ms(valor) for nome, valor in trechos.items()},
+            'sql_repetidas': len(repetidas),
+        }, ensure_ascii=False))
+        for sql, vezes in repetidas:
+            logger.warning(
+                'Possível N+1 em %s %s: consulta executada %d vezes: %s',
+                request.method, request.path, vezes, sql
+            )
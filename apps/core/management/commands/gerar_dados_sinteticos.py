@@ -0,0 +1,65 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.dados_sinteticos import TAMANHO_LOTE, VOLUMES_PADRAO, GeradorDadosSinteticos
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera dados sintéticos (clientes, itens, orçamentos, vendas, despesas e folhas) '
+        'para testes de carga. A mesma semente e a mesma data final geram os mesmos dados.'
+    )
+
+    def add_arguments(self, parser):
+        for volume, padrao in VOLUMES_PADRAO.items():
+            parser.add_argument(f'--{volume}', type=int, default=padrao, help=f'Padrão: {padrao}')
+        parser.add_argument(
+            '--escala', type=float, default=1.0,
+            help='Multiplica os volumes (exceto funcionários), ex.: 0.01 para um conjunto pequeno'
+        )
+        parser.add_argument('--anos', type=int, default=5, help='Anos de movimento (padrão: 5)')
+        parser.add_argument(
+            '--ate', type=date.fromisoformat, help='Último dia do movimento, AAAA-MM-DD, antes de hoje (padrão: ontem)'
+        )
+        parser.add_argument('--semente', type=int, default=42, help='Semente do gerador (padrão: 42)')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Vendas gravadas por transação')
+        parser.add_argument(
+            '--forcar', action='store_true', help='Permite rodar com DEBUG=False (ex.: banco de homologação)'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['forcar']:
+            raise CommandError(
+                'DEBUG=False: este comando grava milhões de registros fictícios. '
+                'Use --forcar se o banco não for o de produção.'
+            )
+        if options['anos'] < 1:
+            raise CommandError('--anos deve ser pelo menos 1.')
+        if options['ate'] and options['ate'] >= timezone.localdate():
+            raise CommandError('--ate deve ser anterior a hoje.')
+        volumes = {
+            volume: options[volume] if volume == 'funcionarios' else round(options[volume] * options['escala'])
+            for volume in VOLUMES_PADRAO
+        }
+
+        inicio = time.perf_counter()
+        gerador = GeradorDadosSinteticos(
+            semente=options['semente'],
+            anos=options['anos'],
+            ate=options['ate'],
+            tamanho_lote=options['lote'],
+            progresso=self.stdout.write,
+        )
+        gravados = gerador.gerar(**volumes)
+        duracao = time.perf_counter() - inicio
+
+        for nome, quantidade in gravados.items():
+            self.stdout.write(f'  {nome}: {quantidade}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(gravados.values())} registro(s) gerado(s) de {gerador.inicio:%d/%m/%Y} '
+            f'a {gerador.ate:%d/%m/%Y} em {duracao:.1f}s.'
+        ))
@@ -0,0 +1,87 @@
+"""
+Fase de release: roda uma vez por deploy, antes de os servidores novos
+subirem (preDeployCommand do Railway, processo `release` do Procfile).
+
+Aplica as migrações e cria o usuário admin, se ele não existir. No
+PostgreSQL tudo acontece sob uma trava consultiva (pg_advisory_lock): se
+várias réplicas rodarem o release ao mesmo tempo, uma migra e as outras
+esperam e encontram tudo aplicado. O collectstatic não entra aqui, ele
+roda no build da imagem.
+"""
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Chave fixa da trava consultiva, a mesma em todas as réplicas
+CHAVE_TRAVA = 7_150_349_265
+
+ADMIN_USUARIO = 'admin'
+ADMIN_EMAIL = 'admin@tornearia.com'
+ADMIN_SENHA = 'Admin@2026'
+
+
+@contextmanager
+def trava_release(conexao, espera):
+    """Trava consultiva do PostgreSQL; nos outros bancos não trava."""
+    if conexao.vendor != 'postgresql':
+        yield False
+        return
+    limite = time.monotonic() + espera
+    with conexao.cursor() as cursor:
+        while True:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [CHAVE_TRAVA])
+            if cursor.fetchone()[0]:
+                break
+            if time.monotonic() >= limite:
+                raise CommandError(f'Outro release segurou a trava por mais de {espera} s.')
+            time.sleep(1)
+    try:
+        yield True
+    finally:
+        with conexao.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [CHAVE_TRAVA])
+
+
+def criar_admin():
+    """Cria o superusuário padrão. Devolve False se ele já existe."""
+    User = get_user_model()
+    if User.objects.filter(username=ADMIN_USUARIO).exists():
+        return False
+    User.objects.create_superuser(username=ADMIN_USUARIO, email=ADMIN_EMAIL, password=ADMIN_SENHA)
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Aplica as migrações e cria o usuário admin, uma vez por deploy (sob trava no PostgreSQL).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Banco (padrão: default)')
+        parser.add_argument(
+            '--espera', type=int, default=300,
+            help='Segundos esperando outro release terminar antes de desistir (padrão: 300)'
+        )
+
+    def handle(self, *args, **options):
+        conexao = connections[options['database']]
+        inicio = time.perf_counter()
+        with trava_release(conexao, options['espera']) as travado:
+            if travado:
+                self.stdout.write(f'Trava obtida em {time.perf_counter() - inicio:.1f} s.')
+            etapa = time.perf_counter()
+            call_command(
+                'migrate', database=options['database'], interactive=False,
+                verbosity=options['verbosity'], stdout=self.stdout,
+            )
+            self.stdout.write(f'Migrações em {time.perf_counter() - etapa:.1f} s.')
+            if criar_admin():
+                self.stdout.write(self.style.WARNING(
+                    f'Usuário "{ADMIN_USUARIO}" criado com a senha padrão; altere-a no primeiro acesso.'
+                ))
+            else:
+                self.stdout.write(f'Usuário "{ADMIN_USUARIO}" já existe.')
+        self.stdout.write(self.style.SUCCESS(f'Release concluído em {time.perf_counter() - inicio:.1f} s.'))
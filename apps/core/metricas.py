@@ -0,0 +1,189 @@
+"""
+Métricas no formato do Prometheus, publicadas em /metrics/.
+
+Com a variável de ambiente PROMETHEUS_MULTIPROC_DIR definida (o
+gunicorn.conf.py a define antes de iniciar os workers), cada worker grava
+suas métricas em arquivos nesse diretório e a view soma todos eles; sem ela
+as métricas são apenas as do processo atual (runserver, testes).
+
+Métricas publicadas:
+    tornearia_http_requisicao_segundos      histograma de latência por view
+    tornearia_http_requisicoes_total        requisições por view, método e status
+    tornearia_http_erros_total              respostas 5xx por view
+    tornearia_db_consultas_por_requisicao   histograma de consultas SQL por view
+    tornearia_cache_consultas_total         acertos e faltas dos caches da aplicação
+    tornearia_pdf_renderizacao_segundos     histograma da montagem dos PDFs
+    tornearia_email_envios_em_andamento     mensagens sendo enviadas (fila do SMTP)
+    tornearia_email_envios_total            mensagens enviadas, por resultado
+    tornearia_worker_inicio_segundos        primeira requisição de cada worker (rótulo pid)
+"""
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.mail.backends.smtp import EmailBackend
+from django.db import connections
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+
+from . import instrumentacao
+
+
+PREFIXO = 'tornearia'
+
+LATENCIA = Histogram(
+    f'{PREFIXO}_http_requisicao_segundos',
+    'Tempo de resposta por view.',
+    ['view', 'metodo'],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUISICOES = Counter(
+    f'{PREFIXO}_http_requisicoes_total',
+    'Requisições atendidas por view, método e status.',
+    ['view', 'metodo', 'status'],
+)
+ERROS = Counter(
+    f'{PREFIXO}_http_erros_total',
+    'Respostas com status 5xx por view.',
+    ['view', 'status'],
+)
+CONSULTAS = Histogram(
+    f'{PREFIXO}_db_consultas_por_requisicao',
+    'Consultas SQL executadas por requisição.',
+    ['view'],
+    buckets=(1, 5, 10, 20, 50, 100, 200, 500),
+)
+CACHE = Counter(
+    f'{PREFIXO}_cache_consultas_total',
+    'Leituras dos caches da aplicação, por resultado (acerto ou falta).',
+    ['cache', 'resultado'],
+)
+PDF = Histogram(
+    f'{PREFIXO}_pdf_renderizacao_segundos',
+    'Tempo de montagem dos PDFs pelo ReportLab.',
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+EMAILS_EM_ANDAMENTO = Gauge(
+    f'{PREFIXO}_email_envios_em_andamento',
+    'Mensagens de e-mail sendo enviadas neste momento.',
+    multiprocess_mode='livesum',
+)
+EMAILS = Counter(
+    f'{PREFIXO}_email_envios_total',
+    'Mensagens de e-mail enviadas, por resultado.',
+    ['resultado'],
+)
+# O gauge de início só é criado na primeira requisição de cada processo (ver
+# `registrar_inicio_worker`): com o preload o módulo é importado no processo
+# principal do gunicorn, que nunca atende, e em multiprocesso um gauge sem
+# rótulos criado lá já deixaria uma amostra do pid dele
+_inicio_worker = {'pid': None, 'gauge': None}
+_trava_inicio_worker = threading.Lock()
+
+# Views que não entram nas métricas de requisição
+VIEWS_IGNORADAS = {'metricas'}
+
+
+def registrar_inicio_worker():
+    """Publica o momento em que o processo atual começou a atender (uma vez por pid)."""
+    pid = os.getpid()
+    if _inicio_worker['pid'] == pid:
+        return
+    with _trava_inicio_worker:
+        if _inicio_worker['pid'] == pid:
+            return
+        gauge = _inicio_worker['gauge'] or Gauge(
+            f'{PREFIXO}_worker_inicio_segundos',
+            'Momento (epoch) em que o processo começou a atender; um por worker.',
+            multiprocess_mode='liveall',
+        )
+        gauge.set(time.time())
+        _inicio_worker.update(pid=pid, gauge=gauge)
+
+
+def _observar_cache(nome, acerto):
+    CACHE.labels(nome, 'acerto' if acerto else 'falta').inc()
+
+
+def _observar_trecho(trecho, duracao):
+    if trecho == 'pdf':
+        PDF.observe(duracao)
+
+
+instrumentacao.observadores_cache.append(_observar_cache)
+instrumentacao.observadores_trechos.append(_observar_trecho)
+
+
+class _ContadorConsultas:
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+def _nome_view(request):
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name if match else None) or 'nao_resolvida'
+
+
+class MetricasMiddleware:
+    """Alimenta as métricas de requisição (todas as requisições, sem amostragem)."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICAS_ATIVAS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        registrar_inicio_worker()
+        inicio = time.perf_counter()
+        contador = _ContadorConsultas()
+        # Exceções da view já chegam aqui convertidas em resposta 500
+        with ExitStack() as pilha:
+            for alias in connections:
+                pilha.enter_context(connections[alias].execute_wrapper(contador))
+            response = self.get_response(request)
+
+        view = _nome_view(request)
+        if view not in VIEWS_IGNORADAS:
+            LATENCIA.labels(view, request.method).observe(time.perf_counter() - inicio)
+            REQUISICOES.labels(view, request.method, response.status_code).inc()
+            CONSULTAS.labels(view).observe(contador.total)
+            if response.status_code >= 500:
+                ERROS.labels(view, response.status_code).inc()
+        return response
+
+
+class EmailBackendComMetricas(EmailBackend):
+    """Backend SMTP que publica envios em andamento e o resultado de cada envio."""
+
+    def send_messages(self, email_messages):
+        quantidade = len(email_messages or [])
+        EMAILS_EM_ANDAMENTO.inc(quantidade)
+        try:
+            enviadas = super().send_messages(email_messages)
+        except Exception:
+            EMAILS.labels('erro').inc(quantidade)
+            raise
+        finally:
+            EMAILS_EM_ANDAMENTO.dec(quantidade)
+        EMAILS.labels('enviado').inc(enviadas or 0)
+        if quantidade - (enviadas or 0) > 0:
+            EMAILS.labels('erro').inc(quantidade - (enviadas or 0))
+        return enviadas
+
+
+def exportar():
+    """Métricas no formato texto do Prometheus (somadas entre os workers, se houver)."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro)
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConsultaLenta",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "assinatura",
+                    models.CharField(
+                        db_index=True, max_length=16, verbose_name="Assinatura"
+                    ),
+                ),
+                ("impressao", models.TextField(verbose_name="SQL normalizado")),
+                ("sql", models.TextField(verbose_name="SQL")),
+                (
+                    "parametros_hash",
+                    models.CharField(max_length=16, verbose_name="Hash dos parâmetros"),
+                ),
+                (
+                    "view",
+                    models.CharField(blank=True, max_length=200, verbose_name="View"),
+                ),
+                ("duracao_ms", models.FloatField(verbose_name="Duração (ms)")),
+                (
+                    "plano",
+                    models.TextField(blank=True, verbose_name="Plano de execução"),
+                ),
+                (
+                    "criado_em",
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name="Registrada em"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Consulta Lenta",
+                "verbose_name_plural": "Consultas Lentas",
+                "ordering": ["-id"],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_consultalenta"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="configuracaoempresa",
+            name="atualizado_em",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now, verbose_name="Atualizado em"
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -1,5 +1,23 @@
+import io
+import threading
+import time
+
 from django.db import models
 
+from .instrumentacao import registrar_cache
+
+
+# Segundos entre as conferências de `atualizado_em` no banco. A configuração
+# fica em memória enquanto não muda; salvar limpa o cache do próprio processo,
+# e os demais a releem na conferência seguinte.
+VERIFICACAO_CONFIGURACAO = 5
+
+# Lado maior do logo usado nos PDFs (2,5 cm a ~300 dpi)
+LADO_LOGO_PDF = 300
+
+_cache_configuracao = {'carregada': False, 'verificar': 0.0, 'versao': None, 'config': None, 'logo_pdf': None}
+_trava_cache = threading.Lock()
+
 
 class ConfiguracaoEmpresa(models.Model):
     """Configurações da empresa para exibição em orçamentos e documentos."""
@@ -10,6 +28,7 @@ class ConfiguracaoEmpresa(models.Model):
     email = models.EmailField('E-mail', blank=True)
     logo = models.ImageField('Logo', upload_to='empresa/', blank=True, null=True)
     observacoes_padrao = models.TextField('Observações Padrão para Orçamentos', blank=True)
+    atualizado_em = models.DateTimeField('Atualizado em', auto_now=True)
     
     class Meta:
         verbose_name = 'Configuração da Empresa'
@@ -22,3 +41,84 @@ class ConfiguracaoEmpresa(models.Model):
         if not self.pk and ConfiguracaoEmpresa.objects.exists():
             return
         super().save(*args, **kwargs)
+
+    @classmethod
+    def obter(cls):
+        """
+        Configuração da empresa (None se ainda não cadastrada), guardada em
+        memória e relida quando `atualizado_em` muda no banco, conferido a
+        cada `VERIFICACAO_CONFIGURACAO` segundos. A instância devolvida é
+        compartilhada entre requisições e não deve ser alterada.
+        """
+        agora = time.monotonic()
+        if _cache_configuracao['carregada'] and _cache_configuracao['verificar'] > agora:
+            registrar_cache('configuracao_empresa', True)
+            return _cache_configuracao['config']
+        with _trava_cache:
+            if not _cache_configuracao['carregada'] or _cache_configuracao['verificar'] <= agora:
+                atual = _cache_configuracao['carregada'] and (
+                    cls.objects.order_by('pk').values_list('pk', 'atualizado_em').first()
+                    == _cache_configuracao['versao']
+                )
+                registrar_cache('configuracao_empresa', atual)
+                if not atual:
+                    config = cls.objects.order_by('pk').first()
+                    _cache_configuracao.update(
+                        carregada=True,
+                        config=config,
+                        versao=(config.pk, config.atualizado_em) if config else None,
+                        logo_pdf=_carregar_logo_pdf(config),
+                    )
+                _cache_configuracao['verificar'] = agora + VERIFICACAO_CONFIGURACAO
+        return _cache_configuracao['config']
+
+    @classmethod
+    def logo_pdf(cls):
+        """PNG do logo já reduzido para os PDFs (None se não houver logo)."""
+        cls.obter()
+        return _cache_configuracao['logo_pdf']
+
+    @classmethod
+    def limpar_cache(cls):
+        _cache_configuracao['carregada'] = False
+
+
+def _carregar_logo_pdf(config):
+    if not config or not config.logo:
+        return None
+    from PIL import Image
+
+    try:
+        with config.logo.open('rb') as arquivo, Image.open(arquivo) as imagem:
+            imagem.thumbnail((LADO_LOGO_PDF, LADO_LOGO_PDF))
+            if imagem.mode not in ('RGB', 'RGBA'):
+                imagem = imagem.convert('RGBA')
+            saida = io.BytesIO()
+            imagem.save(saida, format='PNG', optimize=True)
+    except (OSError, ValueError):
+        return None
+    return saida.getvalue()
+
+
+class ConsultaLenta(models.Model):
+    """
+    Consulta SQL que passou do limite de tempo (CONSULTAS_LENTAS_LIMITE_MS),
+    com o plano de execução. A tabela funciona como um buffer circular: só
+    as últimas CONSULTAS_LENTAS_MAXIMO linhas são mantidas.
+    """
+    assinatura = models.CharField('Assinatura', max_length=16, db_index=True)
+    impressao = models.TextField('SQL normalizado')
+    sql = models.TextField('SQL')
+    parametros_hash = models.CharField('Hash dos parâmetros', max_length=16)
+    view = models.CharField('View', max_length=200, blank=True)
+    duracao_ms = models.FloatField('Duração (ms)')
+    plano = models.TextField('Plano de execução', blank=True)
+    criado_em = models.DateTimeField('Registrada em', auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Consulta Lenta'
+        verbose_name_plural = 'Consultas Lentas'
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.duracao_ms:.0f} ms - {self.impressao[:80]}"
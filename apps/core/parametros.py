@@ -0,0 +1,17 @@
+"""Leitura de parâmetros numéricos vindos da query string ou de formulários."""
+from decimal import Decimal, InvalidOperation
+
+
+def decimal_finito(valor, padrao=None):
+    """
+    Decimal de `valor` ('1234.56' ou '1234,56'), ou `padrao` se vazio,
+    inválido ou não finito. nan, inf e snan passam pelo Decimal, mas não cabem
+    em um DecimalField nem em JSON.
+    """
+    if valor in (None, ''):
+        return padrao
+    try:
+        numero = Decimal(str(valor).strip().replace(',', '.'))
+    except InvalidOperation:
+        return padrao
+    return numero if numero.is_finite() else padrao
@@ -0,0 +1,149 @@
+"""
+Verificações de prontidão publicadas em /health/ready/.
+
+`/health/` só diz que o processo responde; `/health/ready/` diz se ele
+consegue atender: ida e volta ao banco (com limite de latência), leitura e
+escrita no cache, migrações pendentes e, em produção, o manifesto dos
+arquivos estáticos. Cada verificação roda em uma thread própria com
+PRONTIDAO_TIMEOUT_SEGUNDOS de prazo, todas em paralelo; a que não responde
+a tempo conta como falha, e enquanto ela não terminar não é iniciada outra
+igual (um banco travado não acumula threads). O resultado fica em memória
+por PRONTIDAO_CACHE_SEGUNDOS, para que as sondas do balanceador não
+multipliquem a carga.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+_cache_prontidao = {'expira': 0.0, 'resultado': None}
+_trava_cache = threading.Lock()
+# Verificações ainda rodando (as que estouraram o prazo), por nome
+_em_andamento = {}
+# Migrações aplicadas não voltam a ficar pendentes: depois da primeira
+# verificação sem pendências o processo não lê mais os arquivos de migração
+_migracoes_em_dia = False
+
+
+class FalhaVerificacao(Exception):
+    """A verificação respondeu, mas com um resultado que impede atender."""
+
+
+def verificar_banco():
+    inicio = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    ms = (time.perf_counter() - inicio) * 1000
+    if ms > settings.PRONTIDAO_LIMITE_BANCO_MS:
+        raise FalhaVerificacao(f'{ms:.0f} ms (limite {settings.PRONTIDAO_LIMITE_BANCO_MS} ms)')
+    return f'{ms:.1f} ms'
+
+
+def verificar_cache():
+    chave, valor = 'prontidao', uuid.uuid4().hex
+    cache.set(chave, valor, 30)
+    if cache.get(chave) != valor:
+        raise FalhaVerificacao('o valor gravado não foi lido de volta')
+    return 'ok'
+
+
+def verificar_migracoes():
+    global _migracoes_em_dia
+    if _migracoes_em_dia:
+        return 'nenhuma pendente'
+    executor = MigrationExecutor(connection)
+    pendentes = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if pendentes:
+        raise FalhaVerificacao(f'{len(pendentes)} pendente(s)')
+    _migracoes_em_dia = True
+    return 'nenhuma pendente'
+
+
+def verificar_estaticos():
+    if not isinstance(staticfiles_storage, ManifestFilesMixin):
+        return 'sem manifesto (DEBUG)'
+    if not staticfiles_storage.manifest_storage.exists(staticfiles_storage.manifest_name):
+        raise FalhaVerificacao(f'{staticfiles_storage.manifest_name} ausente; rode o collectstatic')
+    return 'manifesto presente'
+
+
+VERIFICACOES = {
+    'banco': verificar_banco,
+    'cache': verificar_cache,
+    'migracoes': verificar_migracoes,
+    'estaticos': verificar_estaticos,
+}
+
+
+def _executar(nome, verificacao):
+    resultado = {}
+
+    def alvo():
+        inicio = time.perf_counter()
+        try:
+            resultado.update(ok=True, detalhe=verificacao())
+        except FalhaVerificacao as erro:
+            resultado.update(ok=False, detalhe=str(erro))
+        except Exception as erro:
+            # Só o tipo do erro: a mensagem pode trazer endereço e usuário do banco
+            resultado.update(ok=False, detalhe=f'erro: {type(erro).__name__}')
+        finally:
+            resultado['ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+            connections.close_all()
+
+    thread = threading.Thread(target=alvo, name=f'prontidao-{nome}', daemon=True)
+    thread.start()
+    return thread, resultado
+
+
+def verificar():
+    """Roda as verificações em paralelo e devolve {'pronto': bool, 'verificacoes': {...}}."""
+    prazo = time.monotonic() + settings.PRONTIDAO_TIMEOUT_SEGUNDOS
+    iniciadas = {}
+    verificacoes = {}
+    for nome, verificacao in VERIFICACOES.items():
+        anterior = _em_andamento.get(nome)
+        if anterior and anterior.is_alive():
+            verificacoes[nome] = {'ok': False, 'detalhe': 'verificação anterior ainda sem resposta'}
+            continue
+        iniciadas[nome] = _executar(nome, verificacao)
+    for nome, (thread, resultado) in iniciadas.items():
+        thread.join(max(0, prazo - time.monotonic()))
+        if thread.is_alive():
+            _em_andamento[nome] = thread
+            verificacoes[nome] = {
+                'ok': False, 'detalhe': f'sem resposta em {settings.PRONTIDAO_TIMEOUT_SEGUNDOS} s',
+            }
+        else:
+            _em_andamento.pop(nome, None)
+            verificacoes[nome] = resultado
+    verificacoes = {nome: verificacoes[nome] for nome in VERIFICACOES}
+    return {
+        'pronto': all(v['ok'] for v in verificacoes.values()),
+        'verificacoes': verificacoes,
+    }
+
+
+def estado():
+    """Resultado de `verificar()`, guardado por PRONTIDAO_CACHE_SEGUNDOS."""
+    agora = time.monotonic()
+    if _cache_prontidao['expira'] > agora:
+        return _cache_prontidao['resultado']
+    with _trava_cache:
+        if _cache_prontidao['expira'] <= time.monotonic():
+            _cache_prontidao.update(
+                resultado=verificar(),
+                expira=time.monotonic() + settings.PRONTIDAO_CACHE_SEGUNDOS,
+            )
+    return _cache_prontidao['resultado']
+
+
+def limpar_cache():
+    _cache_prontidao['expira'] = 0.0
@@ -0,0 +1,18 @@
+"""
+Limpa o cache da configuração da empresa do próprio processo quando ela é
+salva ou excluída; os demais processos percebem a mudança pelo
+`atualizado_em` (ver `ConfiguracaoEmpresa.obter`).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ConfiguracaoEmpresa
+
+
+@receiver(post_save, sender=ConfiguracaoEmpresa)
+@receiver(post_delete, sender=ConfiguracaoEmpresa)
+def limpar_cache_configuracao(sender, **kwargs):
+    ConfiguracaoEmpresa.limpar_cache()
+    # Uma leitura feita antes do commit guardaria os dados antigos de novo
+    transaction.on_commit(ConfiguracaoEmpresa.limpar_cache)
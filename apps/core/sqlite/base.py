@@ -0,0 +1,50 @@
+"""
+Backend SQLite para produção numa única máquina (ENGINE 'apps.core.sqlite').
+
+Ligado por SQLITE_OTIMIZADO=True no settings. Cada conexão nova recebe os
+PRAGMAs de `PRAGMAS` (ou os de OPTIONS['pragmas']):
+
+- journal_mode=WAL: leitores não bloqueiam o escritor nem o contrário;
+- synchronous=NORMAL: com WAL, o fsync só acontece no checkpoint, e uma
+  queda de energia pode perder as últimas transações, mas não corrompe o
+  banco;
+- busy_timeout: quanto tempo esperar pela trava de escrita antes de
+  "database is locked";
+- mmap_size, cache_size e temp_store=MEMORY: menos leituras do disco.
+
+As transações de `atomic()` começam com BEGIN IMMEDIATE, que já pede a
+trava de escrita. Com o BEGIN padrão (DEFERRED), uma transação que lê e
+depois escreve pode encontrar outro escritor no meio do caminho e falhar
+na hora com "database is locked", sem esperar o busy_timeout. O custo é
+que blocos `atomic()` só de leitura também passam a esperar os
+escritores.
+"""
+from django.db.backends.sqlite3 import base
+
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Negativo: em KiB (64 MiB)
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        parametros = super().get_connection_params()
+        # Não é parâmetro do sqlite3.connect
+        self.pragmas = {**PRAGMAS, **parametros.pop('pragmas', {})}
+        return parametros
+
+    def get_new_connection(self, conn_params):
+        conexao = super().get_new_connection(conn_params)
+        for nome, valor in self.pragmas.items():
+            conexao.execute(f'PRAGMA {nome} = {valor}')
+        return conexao
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
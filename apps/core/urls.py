@@ -6,5 +6,6 @@ app_name = 'core'
 urlpatterns = [
     path('', views.DashboardView.as_view(), name='dashboard'),
     path('configuracao/', views.ConfiguracaoEmpresaView.as_view(), name='configuracao'),
+    path('consultas-lentas/', views.ConsultasLentasView.as_view(), name='consultas_lentas'),
     path('api/dashboard-data/', views.dashboard_data_api, name='dashboard_data_api'),
 ]
@@ -1,18 +1,25 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import TemplateView, UpdateView
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden
+from django.conf import settings
 from django.db.models import Sum, Count, Q
 from django.db.models.functions import TruncMonth, TruncDay
 from django.utils import timezone
 from django.core.paginator import Paginator
 from datetime import datetime, timedelta
+import hmac
 from decimal import Decimal
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from .models import ConfiguracaoEmpresa
-from apps.financeiro.models import Venda, Despesa, Parcela
-from apps.cadastros.models import Funcionario
+from . import consultas_lentas
+from .metricas import exportar as exportar_metricas
+from .prontidao import estado as estado_prontidao
+from .models import ConfiguracaoEmpresa, ConsultaLenta
+from apps.financeiro.agregados import agregar_receita
+from apps.financeiro.models import Venda, ItemVenda, Despesa, Parcela
 
 
 def healthcheck(request):
@@ -20,6 +27,56 @@ def healthcheck(request):
     return HttpResponse("OK", status=200, content_type="text/plain")
 
 
+def prontidao(request):
+    """Prontidão para receber tráfego (banco, cache, migrações, estáticos); 503 se algo falhar."""
+    estado = estado_prontidao()
+    return JsonResponse(estado, status=200 if estado['pronto'] else 503)
+
+
+def metricas(request):
+    """
+    Métricas no formato do Prometheus.
+
+    Liberadas para `Authorization: Bearer <METRICAS_TOKEN>` e para usuários da
+    equipe. Sem token configurado, só com DEBUG=True ficam abertas a todos.
+    """
+    token = settings.METRICAS_TOKEN
+    if token:
+        autorizado = hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        autorizado = settings.DEBUG
+    if not (autorizado or request.user.is_staff):
+        return HttpResponseForbidden('Token inválido.' if token else 'Defina METRICAS_TOKEN para coletar as métricas.')
+    return HttpResponse(exportar_metricas(), content_type=CONTENT_TYPE_LATEST)
+
+
+class ConsultasLentasView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """Consultas SQL lentas agrupadas, das que mais somaram tempo para as que menos (só equipe)."""
+    template_name = 'core/consultas_lentas.html'
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        grupos = list(consultas_lentas.piores())
+        # SQL e plano da ocorrência mais recente de cada grupo
+        ultimas = ConsultaLenta.objects.in_bulk([grupo['ultimo_id'] for grupo in grupos])
+        for grupo in grupos:
+            grupo['exemplo'] = ultimas.get(grupo['ultimo_id'])
+        context['grupos'] = grupos
+        context['total_registros'] = ConsultaLenta.objects.count()
+        context['limite_ms'] = settings.CONSULTAS_LENTAS_LIMITE_MS
+        context['maximo'] = settings.CONSULTAS_LENTAS_MAXIMO
+        context['ativo'] = settings.CONSULTAS_LENTAS_ATIVO
+        return context
+
+    def post(self, request, *args, **kwargs):
+        excluidas, _ = ConsultaLenta.objects.all().delete()
+        messages.success(request, f'{excluidas} registro(s) de consultas lentas excluído(s).')
+        return redirect('core:consultas_lentas')
+
+
 class DashboardView(LoginRequiredMixin, TemplateView):
     """Dashboard principal com métricas do negócio."""
     template_name = 'core/dashboard.html'
@@ -66,17 +123,19 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             data_entrada__gte=data_inicio,
             data_entrada__lte=data_fim
         ).exclude(status='cancelado')
-        total_receitas = sum(v.total for v in vendas_registradas) or Decimal('0')
+        total_receitas = agregar_receita(
+            ItemVenda.objects.filter(venda__in=vendas_registradas)
+        )['receita_liquida']
         
         despesas_periodo = Despesa.objects.filter(
             data__gte=data_inicio,
             data__lte=data_fim
         ).aggregate(total=Sum('valor'))['total'] or Decimal('0')
         
-        funcionarios_ativos = Funcionario.objects.filter(status='ativo')
-        total_salarios = funcionarios_ativos.aggregate(total=Sum('salario'))['total'] or Decimal('0')
-        
-        total_despesas = despesas_periodo + total_salarios
+        # Salários entram pelas despesas que a folha gera em cada mês, como no
+        # DRE; somar o salário mensal dos ativos contaria a folha duas vezes e
+        # o mês inteiro mesmo em períodos de um dia
+        total_despesas = despesas_periodo
         lucro_liquido = total_receitas - total_despesas
         
         servicos_andamento = Venda.objects.filter(status='em_andamento').count()
@@ -87,7 +146,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         
         # Vendas em andamento com parcelas pendentes
         vendas_em_andamento = Venda.objects.filter(status='em_andamento')
-        vendas_com_pagamento_pendente = [v for v in vendas_em_andamento if v.parcelas.filter(pago=False).exists()]
+        vendas_com_pagamento_pendente = vendas_em_andamento.filter(parcelas__pago=False).distinct().count()
         
         # Total recebido = todas as parcelas pagas (do mês atual)
         parcelas_pagas_periodo = Parcela.objects.filter(
@@ -113,13 +172,17 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         total_vencido = sum(p.valor for p in parcelas_vencidas)
 
         # Paginação de serviços em andamento
-        vendas_andamento_list = Venda.objects.filter(status='em_andamento').order_by('-data_entrada')
+        vendas_andamento_list = Venda.objects.filter(status='em_andamento').select_related(
+            'cliente', 'empresa'
+        ).prefetch_related('itens').order_by('-data_entrada')
         paginator_vendas = Paginator(vendas_andamento_list, 5)
         page_vendas = self.request.GET.get('page_vendas', 1)
         vendas_recentes = paginator_vendas.get_page(page_vendas)
         
         # Paginação de parcelas vencidas
-        parcelas_vencidas_list = parcelas_vencidas.order_by('data_vencimento')
+        parcelas_vencidas_list = parcelas_vencidas.select_related(
+            'venda__cliente', 'venda__empresa'
+        ).order_by('data_vencimento')
         paginator_parcelas = Paginator(parcelas_vencidas_list, 5)
         page_parcelas = self.request.GET.get('page_parcelas', 1)
         parcelas_vencidas_pag = paginator_parcelas.get_page(page_parcelas)
@@ -137,7 +200,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             'total_recebido': total_recebido,
             'total_pendente': total_pendente,
             'total_vencido': total_vencido,
-            'vendas_pagamento_pendente': len(vendas_com_pagamento_pendente),
+            'vendas_pagamento_pendente': vendas_com_pagamento_pendente,
             'parcelas_vencidas': parcelas_vencidas_pag,
             'total_parcelas_vencidas': parcelas_vencidas_list.count(),
         })
@@ -213,14 +276,11 @@ def dashboard_data_api(request):
     top_servicos = []
     vendas_concluidas = Venda.objects.filter(status='concluido')
     
-    from apps.financeiro.models import ItemVenda
-    from apps.servicos.models import Item
+    from apps.financeiro.models import ResumoItemMensal
     
-    itens_vendidos = ItemVenda.objects.filter(
-        venda__status='concluido'
-    ).values('item__nome').annotate(
+    itens_vendidos = ResumoItemMensal.objects.values('item__nome').annotate(
         total_vendido=Sum('quantidade'),
-        receita_total=Sum('valor_unitario')
+        receita_total=Sum('receita_liquida')
     ).order_by('-receita_total')[:5]
     
     for item in itens_vendidos:
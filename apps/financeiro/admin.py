@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Venda, ItemVenda, CategoriaDespesa, Despesa
+from .models import Venda, ItemVenda, CategoriaDespesa, Despesa, ResumoMensal, ResumoItemMensal, SaldoCliente
 
 
 class ItemVendaInline(admin.TabularInline):
@@ -30,3 +30,24 @@ class DespesaAdmin(admin.ModelAdmin):
     list_filter = ('categoria', 'tipo', 'data')
     search_fields = ('descricao',)
     date_hierarchy = 'data'
+
+
+@admin.register(ResumoMensal)
+class ResumoMensalAdmin(admin.ModelAdmin):
+    list_display = ('mes', 'ano', 'receita_bruta', 'descontos', 'total_despesas', 'calculado_em')
+    list_filter = ('ano',)
+    readonly_fields = ('calculado_em',)
+
+
+@admin.register(ResumoItemMensal)
+class ResumoItemMensalAdmin(admin.ModelAdmin):
+    list_display = ('item', 'mes', 'ano', 'quantidade', 'receita_bruta', 'receita_liquida', 'numero_vendas')
+    list_filter = ('ano', 'mes')
+    search_fields = ('item__nome',)
+
+
+@admin.register(SaldoCliente)
+class SaldoClienteAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'saldo_aberto', 'total_faturado', 'total_recebido', 'numero_compras', 'ultima_compra')
+    search_fields = ('cliente__nome', 'empresa__nome')
+    raw_id_fields = ('cliente', 'empresa')
@@ -0,0 +1,122 @@
+"""
+Expressões e agregações de valores de venda reutilizadas pelos relatórios.
+
+O total de uma venda é calculado em Python (`Venda.total`), item a item.
+Para relatórios que cobrem muitas vendas as mesmas contas são feitas no
+banco a partir de `ItemVenda`, aplicando o desconto percentual da venda.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+VALOR = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Decimal('0')
+
+# Multiplicar por 0.01 em vez de dividir por 100 evita divisão inteira no SQLite
+UM_POR_CENTO = Value(Decimal('0.01'), output_field=VALOR)
+
+
+def valor_bruto_item(prefixo=''):
+    """quantidade * valor_unitario de um ItemVenda (`prefixo` para lookups relacionados)."""
+    return ExpressionWrapper(
+        F(f'{prefixo}quantidade') * F(f'{prefixo}valor_unitario'),
+        output_field=VALOR
+    )
+
+
+def valor_desconto_item(prefixo=''):
+    """Parte do desconto percentual da venda que cabe a um ItemVenda."""
+    return ExpressionWrapper(
+        F(f'{prefixo}quantidade') * F(f'{prefixo}valor_unitario') * F(f'{prefixo}venda__desconto') * UM_POR_CENTO,
+        output_field=VALOR
+    )
+
+
+def valor_liquido_item(prefixo=''):
+    """Valor do ItemVenda já descontado."""
+    return ExpressionWrapper(
+        valor_bruto_item(prefixo) - valor_desconto_item(prefixo),
+        output_field=VALOR
+    )
+
+
+def soma(expressao):
+    """Sum() que devolve zero em vez de None."""
+    return Coalesce(Sum(expressao), ZERO, output_field=VALOR)
+
+
+def agregar_receita(itens):
+    """Receita bruta, descontos e receita líquida de um queryset de ItemVenda."""
+    totais = itens.aggregate(
+        receita_bruta=soma(valor_bruto_item()),
+        descontos=soma(valor_desconto_item()),
+    )
+    totais['receita_liquida'] = totais['receita_bruta'] - totais['descontos']
+    return totais
+
+
+def chave_destinatario(cliente_id, empresa_id):
+    """Destinatário de uma venda: ('empresa', id), ('cliente', id) ou None."""
+    if empresa_id:
+        return ('empresa', empresa_id)
+    if cliente_id:
+        return ('cliente', cliente_id)
+    return None
+
+
+def agregar_saldos(vendas, itens_venda, parcelas):
+    """
+    Métricas de `SaldoCliente` por destinatário das vendas informadas, com
+    três consultas agrupadas. `itens_venda` e `parcelas` são os managers de
+    ItemVenda e Parcela (a migração que cria os saldos passa os históricos).
+    """
+    vendas = vendas.exclude(status='cancelado')
+    metricas = {}
+
+    def metrica(linha, prefixo=''):
+        chave = chave_destinatario(linha[f'{prefixo}cliente_id'], linha[f'{prefixo}empresa_id'])
+        if chave is None:
+            return None
+        return metricas.setdefault(chave, {
+            'total_faturado': ZERO,
+            'total_recebido': ZERO,
+            'ultima_compra': None,
+            'numero_compras': 0,
+        })
+
+    for linha in vendas.values('cliente_id', 'empresa_id').annotate(
+        compras=Count('id'), ultima=Max('data_entrada')
+    ).order_by():
+        m = metrica(linha)
+        if m is None:
+            continue
+        m['numero_compras'] += linha['compras']
+        if m['ultima_compra'] is None or linha['ultima'] > m['ultima_compra']:
+            m['ultima_compra'] = linha['ultima']
+
+    for linha in itens_venda.filter(venda__in=vendas).values(
+        'venda__cliente_id', 'venda__empresa_id'
+    ).annotate(faturado=soma(valor_liquido_item())).order_by():
+        m = metrica(linha, 'venda__')
+        if m is not None:
+            m['total_faturado'] += linha['faturado']
+
+    for linha in parcelas.filter(venda__in=vendas, pago=True).values(
+        'venda__cliente_id', 'venda__empresa_id'
+    ).annotate(recebido=Sum('valor')).order_by():
+        m = metrica(linha, 'venda__')
+        if m is not None:
+            m['total_recebido'] += linha['recebido']
+
+    centavos = Decimal('0.01')
+    for m in metricas.values():
+        m['total_faturado'] = m['total_faturado'].quantize(centavos)
+        m['total_recebido'] = m['total_recebido'].quantize(centavos)
+        m['saldo_aberto'] = max(ZERO, m['total_faturado'] - m['total_recebido'])
+        m['ticket_medio'] = (
+            (m['total_faturado'] / m['numero_compras']).quantize(centavos)
+            if m['numero_compras'] else ZERO
+        )
+    return metricas
@@ -5,3 +5,6 @@ class FinanceiroConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.financeiro'
     verbose_name = 'Financeiro'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,378 @@
+"""
+Conciliação de extratos bancários (OFX) e arquivos de retorno CNAB 240/400
+com as parcelas em aberto.
+
+Os arquivos são lidos linha a linha e só os créditos viram `Lancamento`.
+As parcelas em aberto são carregadas uma vez em um índice por valor (em
+centavos); para cada lançamento os candidatos são as parcelas de mesmo
+valor (±1 centavo, por causa do arredondamento das parcelas) com
+vencimento dentro da janela de datas. O desempate usa o número da venda no
+histórico do lançamento e a semelhança entre o nome do pagador e o nome do
+cliente/empresa.
+"""
+import io
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Parcela, SaldoCliente
+
+
+Lancamento = namedtuple('Lancamento', 'linha data valor nome documento descricao')
+
+# Vencimento pode estar até JANELA_ANTES dias depois ou JANELA_DEPOIS dias antes do crédito
+JANELA_ANTES = timedelta(days=10)
+JANELA_DEPOIS = timedelta(days=60)
+
+# Diferença mínima de pontuação para o melhor candidato ser aceito automaticamente
+MARGEM_AUTOMATICA = 0.15
+
+OCORRENCIAS_LIQUIDACAO = {'06', '17'}
+
+FORMATOS = [
+    ('ofx', 'OFX'),
+    ('cnab240', 'CNAB 240'),
+    ('cnab400', 'CNAB 400'),
+]
+
+
+# ---------------------------------------------------------------------------
+# Leitura dos arquivos
+# ---------------------------------------------------------------------------
+
+def _texto(arquivo):
+    """Abre um arquivo binário como texto, em UTF-8 quando o cabeçalho declarar."""
+    inicio = arquivo.read(1024)
+    arquivo.seek(0)
+    codificacao = 'utf-8' if b'UTF-8' in inicio.upper() else 'cp1252'
+    return io.TextIOWrapper(arquivo, encoding=codificacao, errors='replace', newline='')
+
+
+def detectar_formato(arquivo, nome=''):
+    """Identifica OFX, CNAB 240 ou CNAB 400 pela extensão ou pelo conteúdo."""
+    if nome.lower().endswith('.ofx'):
+        return 'ofx'
+    inicio = arquivo.read(1024)
+    arquivo.seek(0)
+    if b'OFX' in inicio.upper():
+        return 'ofx'
+    primeira = inicio.splitlines()[0] if inicio else b''
+    if len(primeira) >= 400:
+        return 'cnab400'
+    if len(primeira) >= 240:
+        return 'cnab240'
+    return None
+
+
+def _data_ofx(valor):
+    return datetime.strptime(valor[:8], '%Y%m%d').date()
+
+
+def _decimal_ofx(valor):
+    return Decimal(valor.strip().replace(',', '.'))
+
+
+def ler_ofx(arquivo):
+    """
+    Créditos de um extrato OFX (SGML 1.x ou XML 2.x).
+
+    As tags de cada <STMTTRN> são lidas com uma expressão regular por linha,
+    o que cobre tanto um valor por linha quanto a transação inteira em uma
+    única linha.
+    """
+    tag = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+    texto = _texto(arquivo)
+    try:
+        atual = None
+        inicio = 0
+        for numero, linha in enumerate(texto, start=1):
+            for fechamento, nome, valor in tag.findall(linha):
+                nome = nome.upper()
+                if nome == 'STMTTRN':
+                    if not fechamento:
+                        atual, inicio = {}, numero
+                        continue
+                    if atual is not None:
+                        lancamento = _lancamento_ofx(atual, inicio)
+                        if lancamento:
+                            yield lancamento
+                    atual = None
+                elif atual is not None and not fechamento and valor.strip():
+                    atual[nome] = valor.strip()
+    finally:
+        texto.detach()
+
+
+def _lancamento_ofx(campos, linha):
+    try:
+        valor = _decimal_ofx(campos.get('TRNAMT', ''))
+        data = _data_ofx(campos.get('DTPOSTED', ''))
+    except (InvalidOperation, ValueError):
+        return None
+    if valor <= 0:
+        return None
+    return Lancamento(
+        linha=linha,
+        data=data,
+        valor=valor,
+        nome=campos.get('NAME') or campos.get('PAYEE') or '',
+        documento=campos.get('FITID') or campos.get('CHECKNUM') or '',
+        descricao=campos.get('MEMO', ''),
+    )
+
+
+def _data_cnab(valor):
+    valor = valor.strip()
+    if not valor or not valor.strip('0'):
+        return None
+    formato = '%d%m%Y' if len(valor) == 8 else '%d%m%y'
+    try:
+        return datetime.strptime(valor, formato).date()
+    except ValueError:
+        return None
+
+
+def _valor_cnab(valor):
+    valor = valor.strip()
+    return (Decimal(valor) / 100) if valor.isdigit() else Decimal('0')
+
+
+def ler_cnab240(arquivo):
+    """
+    Liquidações de um retorno de cobrança CNAB 240 (FEBRABAN).
+
+    O segmento T traz o número do documento e o nome do pagador; o segmento
+    U seguinte traz o valor pago e a data do crédito.
+    """
+    texto = _texto(arquivo)
+    try:
+        segmento_t = None
+        for numero, linha in enumerate(texto, start=1):
+            linha = linha.rstrip('\r\n')
+            if len(linha) < 240 or linha[7] != '3':
+                continue
+            segmento = linha[13]
+            if segmento == 'T':
+                segmento_t = linha
+            elif segmento == 'U' and segmento_t is not None:
+                if linha[15:17] in OCORRENCIAS_LIQUIDACAO:
+                    data = _data_cnab(linha[145:153]) or _data_cnab(linha[137:145])
+                    valor = _valor_cnab(linha[77:92])
+                    if data and valor > 0:
+                        yield Lancamento(
+                            linha=numero,
+                            data=data,
+                            valor=valor,
+                            nome=segmento_t[148:188].strip(),
+                            documento=segmento_t[58:73].strip(),
+                            descricao=segmento_t[37:57].strip(),
+                        )
+                segmento_t = None
+    finally:
+        texto.detach()
+
+
+def ler_cnab400(arquivo):
+    """
+    Liquidações de um retorno de cobrança CNAB 400.
+
+    Usa as posições comuns aos layouts de Bradesco e Itaú: ocorrência
+    (109-110), data da ocorrência (111-116), número do documento (117-126),
+    valor pago (254-266), data do crédito (296-301) e nome do pagador
+    (325-354, em branco nos bancos que não o informam).
+    """
+    texto = _texto(arquivo)
+    try:
+        for numero, linha in enumerate(texto, start=1):
+            linha = linha.rstrip('\r\n')
+            if len(linha) < 400 or linha[0] != '1':
+                continue
+            if linha[108:110] not in OCORRENCIAS_LIQUIDACAO:
+                continue
+            data = _data_cnab(linha[295:301]) or _data_cnab(linha[110:116])
+            valor = _valor_cnab(linha[253:266])
+            if data and valor > 0:
+                yield Lancamento(
+                    linha=numero,
+                    data=data,
+                    valor=valor,
+                    nome=linha[324:354].strip(),
+                    documento=linha[116:126].strip(),
+                    descricao=linha[37:62].strip(),
+                )
+    finally:
+        texto.detach()
+
+
+LEITORES = {
+    'ofx': ler_ofx,
+    'cnab240': ler_cnab240,
+    'cnab400': ler_cnab400,
+}
+
+
+# ---------------------------------------------------------------------------
+# Correspondência com as parcelas
+# ---------------------------------------------------------------------------
+
+def _normalizar_nome(nome):
+    nome = unicodedata.normalize('NFKD', nome or '').encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^a-z0-9 ]', ' ', nome.lower()).split())
+
+
+def _centavos(valor):
+    return int((valor * 100).quantize(Decimal('1')))
+
+
+class IndiceParcelas:
+    """Parcelas em aberto indexadas pelo valor em centavos."""
+
+    def __init__(self, parcelas):
+        self.por_valor = defaultdict(list)
+        for parcela in parcelas:
+            parcela['nome_normalizado'] = _normalizar_nome(parcela['nome'])
+            self.por_valor[_centavos(parcela['valor'])].append(parcela)
+
+    @classmethod
+    def carregar(cls):
+        parcelas = Parcela.objects.filter(pago=False).exclude(
+            venda__status='cancelado'
+        ).values(
+            'id', 'numero', 'valor', 'data_vencimento', 'venda_id',
+            'venda__numero', 'venda__cliente__nome', 'venda__empresa__nome',
+        )
+        return cls(
+            {
+                'id': p['id'],
+                'numero': p['numero'],
+                'valor': p['valor'],
+                'vencimento': p['data_vencimento'],
+                'venda_id': p['venda_id'],
+                'venda_numero': p['venda__numero'],
+                'nome': p['venda__empresa__nome'] or p['venda__cliente__nome'] or '',
+            }
+            for p in parcelas.iterator()
+        )
+
+    def candidatos(self, lancamento):
+        centavos = _centavos(lancamento.valor)
+        for chave in (centavos, centavos - 1, centavos + 1):
+            for parcela in self.por_valor.get(chave, ()):
+                if parcela['vencimento'] - JANELA_ANTES <= lancamento.data <= parcela['vencimento'] + JANELA_DEPOIS:
+                    yield parcela
+
+
+def pontuar(lancamento, parcela):
+    """Pontuação entre 0 e 2: número da venda citado, nome do pagador e proximidade do vencimento."""
+    pontos = 0.0
+    texto = f'{lancamento.documento} {lancamento.descricao}'.upper()
+    if parcela['venda_numero'] and parcela['venda_numero'] in texto:
+        pontos += 1.0
+
+    nome = _normalizar_nome(lancamento.nome)
+    if nome and parcela['nome_normalizado']:
+        pontos += 0.6 * SequenceMatcher(None, nome, parcela['nome_normalizado']).ratio()
+
+    dias = abs((lancamento.data - parcela['vencimento']).days)
+    pontos += 0.4 * max(0.0, 1 - dias / JANELA_DEPOIS.days)
+    return round(pontos, 3)
+
+
+class Correspondencia:
+    """Resultado da conciliação de um lançamento."""
+
+    def __init__(self, lancamento, parcela=None, pontuacao=0.0, candidatos=0, automatica=False):
+        self.lancamento = lancamento
+        self.parcela = parcela
+        self.pontuacao = pontuacao
+        self.candidatos = candidatos
+        self.automatica = automatica
+
+    @property
+    def situacao(self):
+        if self.parcela is None:
+            return 'sem_correspondencia'
+        return 'automatica' if self.automatica else 'revisar'
+
+
+def conciliar(lancamentos, indice=None):
+    """
+    Associa cada lançamento a no máximo uma parcela (e cada parcela a no
+    máximo um lançamento).
+
+    Lançamentos com um único candidato, ou cujo melhor candidato supera o
+    segundo por MARGEM_AUTOMATICA, são marcados como automáticos; os demais
+    ficam com a melhor sugestão para revisão.
+    """
+    indice = indice or IndiceParcelas.carregar()
+    usadas = set()
+    resultado = []
+    for lancamento in lancamentos:
+        pontuados = sorted(
+            (
+                (pontuar(lancamento, parcela), parcela)
+                for parcela in indice.candidatos(lancamento)
+                if parcela['id'] not in usadas
+            ),
+            key=lambda par: (-par[0], par[1]['vencimento'], par[1]['id'])
+        )
+        if not pontuados:
+            resultado.append(Correspondencia(lancamento))
+            continue
+
+        pontuacao, parcela = pontuados[0]
+        automatica = len(pontuados) == 1 or pontuacao - pontuados[1][0] >= MARGEM_AUTOMATICA
+        usadas.add(parcela['id'])
+        resultado.append(Correspondencia(lancamento, parcela, pontuacao, len(pontuados), automatica))
+    return resultado
+
+
+def conciliar_arquivo(arquivo, nome='', formato=None):
+    """Lê o arquivo e devolve (formato, correspondências)."""
+    formato = formato or detectar_formato(arquivo, nome)
+    if formato not in LEITORES:
+        raise ValueError('Formato de arquivo não reconhecido (esperado OFX, CNAB 240 ou CNAB 400).')
+    return formato, conciliar(LEITORES[formato](arquivo))
+
+
+def aplicar(pagamentos):
+    """
+    Marca as parcelas como pagas. `pagamentos` é uma lista de pares
+    (parcela_id, data_pagamento). Parcelas já pagas são ignoradas.
+
+    As parcelas são gravadas com um único bulk_update (sem disparar os
+    sinais), por isso os saldos dos clientes envolvidos são recalculados
+    aqui. Devolve a quantidade de parcelas baixadas.
+    """
+    datas = {int(parcela_id): data for parcela_id, data in pagamentos}
+    if not datas:
+        return 0
+
+    with transaction.atomic():
+        parcelas = list(
+            Parcela.objects.select_for_update().filter(pk__in=datas, pago=False)
+            .select_related('venda')
+        )
+        for parcela in parcelas:
+            parcela.pago = True
+            parcela.data_pagamento = datas[parcela.pk] or timezone.localdate()
+        Parcela.objects.bulk_update(parcelas, ['pago', 'data_pagamento'], batch_size=500)
+        SaldoCliente.atualizar(
+            SaldoCliente.chave(parcela.venda.cliente_id, parcela.venda.empresa_id)
+            for parcela in parcelas
+        )
+    return len(parcelas)
+
+
+def converter_data(valor):
+    """Converte 'AAAA-MM-DD' (vinda do formulário de conciliação) em date."""
+    try:
+        return date.fromisoformat(valor)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,126 @@
+"""
+Curva ABC (Pareto) de itens e clientes por receita líquida.
+
+Itens são lidos de `ResumoItemMensal`; clientes e empresas são agrupados em
+uma única consulta sobre os itens das vendas concluídas no período.
+"""
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Count, Q, Sum
+
+from .agregados import soma, valor_liquido_item
+from .models import ItemVenda, ResumoItemMensal
+
+
+# Limites de participação acumulada de cada classe
+LIMITE_A = Decimal('80')
+LIMITE_B = Decimal('95')
+
+
+def periodo_padrao(hoje):
+    """Últimos 12 meses, incluindo o corrente: (primeiro dia, primeiro dia do mês seguinte)."""
+    fim = hoje.replace(day=1) + relativedelta(months=1)
+    return fim - relativedelta(months=12), fim
+
+
+def classificar(linhas):
+    """
+    Adiciona participação, participação acumulada e classe (A, B ou C) às
+    linhas, que devem estar ordenadas pela receita em ordem decrescente.
+    """
+    total = sum((linha['receita'] for linha in linhas), Decimal('0'))
+    acumulado = Decimal('0')
+    for linha in linhas:
+        participacao = linha['receita'] / total * 100 if total else Decimal('0')
+        # A classe é definida pela participação acumulada antes do próprio
+        # item, assim o item que cruza o limite ainda fica na classe anterior
+        if acumulado < LIMITE_A:
+            linha['classe'] = 'A'
+        elif acumulado < LIMITE_B:
+            linha['classe'] = 'B'
+        else:
+            linha['classe'] = 'C'
+        acumulado += participacao
+        linha['participacao'] = participacao.quantize(Decimal('0.01'))
+        linha['acumulado'] = min(acumulado, Decimal('100')).quantize(Decimal('0.01'))
+    return linhas
+
+
+def _filtro_meses(inicio, fim):
+    """Filtro de ResumoItemMensal para os meses em [inicio, fim)."""
+    filtro = Q()
+    mes = inicio
+    while mes < fim:
+        filtro |= Q(ano=mes.year, mes=mes.month)
+        mes += relativedelta(months=1)
+    return filtro
+
+
+def curva_itens(inicio, fim):
+    """Curva ABC dos itens vendidos em [inicio, fim) a partir dos resumos mensais."""
+    linhas = ResumoItemMensal.objects.filter(_filtro_meses(inicio, fim)).values(
+        'item_id', 'item__nome', 'item__tipo'
+    ).annotate(
+        receita=Sum('receita_liquida'),
+        quantidade=Sum('quantidade'),
+        vendas=Sum('numero_vendas'),
+    ).filter(receita__gt=0).order_by('-receita', 'item__nome')
+
+    return classificar([
+        {
+            'id': linha['item_id'],
+            'nome': linha['item__nome'],
+            'tipo': linha['item__tipo'],
+            'receita': linha['receita'],
+            'quantidade': linha['quantidade'],
+            'vendas': linha['vendas'],
+        }
+        for linha in linhas
+    ])
+
+
+def curva_clientes(inicio, fim):
+    """Curva ABC de clientes e empresas com vendas concluídas em [inicio, fim)."""
+    linhas = ItemVenda.objects.filter(
+        venda__status='concluido',
+        venda__data_conclusao__gte=inicio,
+        venda__data_conclusao__lt=fim,
+    ).values(
+        'venda__cliente_id', 'venda__cliente__nome',
+        'venda__empresa_id', 'venda__empresa__nome',
+    ).annotate(
+        receita=soma(valor_liquido_item()),
+        vendas=Count('venda', distinct=True),
+    ).filter(receita__gt=0).order_by('-receita')
+
+    resultado = []
+    for linha in linhas:
+        if linha['venda__empresa_id']:
+            tipo, id_, nome = 'empresa', linha['venda__empresa_id'], linha['venda__empresa__nome']
+        elif linha['venda__cliente_id']:
+            tipo, id_, nome = 'cliente', linha['venda__cliente_id'], linha['venda__cliente__nome']
+        else:
+            tipo, id_, nome = None, None, 'Não informado'
+        resultado.append({
+            'id': id_,
+            'tipo': tipo,
+            'nome': nome,
+            'receita': linha['receita'].quantize(Decimal('0.01')),
+            'vendas': linha['vendas'],
+        })
+    return classificar(resultado)
+
+
+def resumo_classes(linhas):
+    """Quantidade de linhas e receita por classe."""
+    resumo = {classe: {'quantidade': 0, 'receita': Decimal('0')} for classe in 'ABC'}
+    for linha in linhas:
+        resumo[linha['classe']]['quantidade'] += 1
+        resumo[linha['classe']]['receita'] += linha['receita']
+    return resumo
+
+
+def periodo_do_ano(ano):
+    return date(ano, 1, 1), date(ano + 1, 1, 1)
@@ -0,0 +1,187 @@
+"""
+Demonstração do Resultado do Exercício (DRE) por mês e ano.
+
+Cada mês é resumido em `ResumoMensal`. Meses fechados (anteriores ao mês
+corrente) são calculados na primeira leitura e lidos da tabela a partir daí,
+até que uma venda, item ou despesa do mês seja alterado: os sinais em
+`signals.py` apagam o resumo e a próxima leitura o recalcula. O mês corrente
+e os futuros são sempre calculados na hora.
+"""
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Sum
+from django.utils import timezone
+
+from .agregados import agregar_receita
+from .models import Despesa, ItemVenda, ResumoMensal
+
+
+NOMES_MESES = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+               'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+SEM_CATEGORIA = 'Sem categoria'
+
+CENTAVOS = Decimal('0.01')
+
+
+def _limites_mes(ano, mes):
+    inicio = date(ano, mes, 1)
+    return inicio, inicio + relativedelta(months=1)
+
+
+def mes_fechado(ano, mes, hoje=None):
+    """Um mês está fechado quando é anterior ao mês corrente."""
+    hoje = hoje or timezone.localdate()
+    return date(ano, mes, 1) < hoje.replace(day=1)
+
+
+def calcular_mes(ano, mes):
+    """Calcula (sem gravar) o resumo de um mês a partir das vendas e despesas."""
+    inicio, fim = _limites_mes(ano, mes)
+
+    receita = agregar_receita(
+        ItemVenda.objects.filter(
+            venda__data_entrada__gte=inicio,
+            venda__data_entrada__lt=fim
+        ).exclude(venda__status='cancelado')
+    )
+
+    por_categoria = {}
+    por_tipo = {}
+    total_despesas = Decimal('0')
+    despesas = Despesa.objects.filter(
+        data__gte=inicio,
+        data__lt=fim
+    ).values('categoria__nome', 'tipo').annotate(total=Sum('valor'))
+    for linha in despesas:
+        categoria = linha['categoria__nome'] or SEM_CATEGORIA
+        por_categoria[categoria] = por_categoria.get(categoria, Decimal('0')) + linha['total']
+        por_tipo[linha['tipo']] = por_tipo.get(linha['tipo'], Decimal('0')) + linha['total']
+        total_despesas += linha['total']
+
+    return ResumoMensal(
+        ano=ano,
+        mes=mes,
+        receita_bruta=receita['receita_bruta'].quantize(CENTAVOS),
+        descontos=receita['descontos'].quantize(CENTAVOS),
+        despesas_por_categoria={k: str(v.quantize(CENTAVOS)) for k, v in por_categoria.items()},
+        despesas_por_tipo={k: str(v.quantize(CENTAVOS)) for k, v in por_tipo.items()},
+        total_despesas=total_despesas.quantize(CENTAVOS),
+    )
+
+
+def obter_resumos(periodos, hoje=None):
+    """
+    Devolve {(ano, mes): ResumoMensal} para os períodos pedidos.
+
+    Meses fechados já gravados são lidos em uma única consulta; os que
+    faltam são calculados e gravados. Meses abertos são calculados sem gravar.
+    """
+    hoje = hoje or timezone.localdate()
+    periodos = sorted(set(periodos))
+    anos = {ano for ano, _ in periodos}
+
+    resumos = {
+        (r.ano, r.mes): r
+        for r in ResumoMensal.objects.filter(ano__in=anos)
+        if (r.ano, r.mes) in periodos
+    }
+
+    novos = []
+    for ano, mes in periodos:
+        if (ano, mes) in resumos:
+            continue
+        resumo = calcular_mes(ano, mes)
+        resumos[(ano, mes)] = resumo
+        if mes_fechado(ano, mes, hoje):
+            novos.append(resumo)
+
+    if novos:
+        ResumoMensal.objects.bulk_create(novos, ignore_conflicts=True)
+
+    return resumos
+
+
+def _somar(resumos, campo):
+    return sum((getattr(r, campo) for r in resumos), Decimal('0'))
+
+
+def _somar_dict(resumos, campo, chave):
+    return sum((Decimal(getattr(r, campo).get(chave, '0')) for r in resumos), Decimal('0'))
+
+
+def _variacao(atual, anterior):
+    if not anterior:
+        return None
+    return ((atual - anterior) / abs(anterior) * 100).quantize(Decimal('0.1'))
+
+
+def _linhas(grupos):
+    """
+    Monta as linhas do DRE para uma lista de grupos de resumos (uma coluna
+    por grupo). Cada grupo é a lista de meses somados naquela coluna.
+    """
+    todos = [r for grupo in grupos for r in grupo]
+    categorias = sorted({c for r in todos for c in r.despesas_por_categoria})
+    tipos = [(valor, rotulo) for valor, rotulo in Despesa.TIPO_CHOICES
+             if any(valor in r.despesas_por_tipo for r in todos)]
+
+    def linha(rotulo, valores, estilo='item'):
+        return {'rotulo': rotulo, 'valores': valores, 'estilo': estilo}
+
+    receita_bruta = [_somar(g, 'receita_bruta') for g in grupos]
+    descontos = [_somar(g, 'descontos') for g in grupos]
+    receita_liquida = [b - d for b, d in zip(receita_bruta, descontos)]
+    total_despesas = [_somar(g, 'total_despesas') for g in grupos]
+    resultado = [r - d for r, d in zip(receita_liquida, total_despesas)]
+
+    linhas = [
+        linha('Receita Bruta', receita_bruta),
+        linha('(-) Descontos', descontos),
+        linha('Receita Líquida', receita_liquida, 'total'),
+        linha('Despesas por Tipo', None, 'grupo'),
+    ]
+    for valor, rotulo in tipos:
+        linhas.append(linha(rotulo, [_somar_dict(g, 'despesas_por_tipo', valor) for g in grupos]))
+    linhas.append(linha('Despesas por Categoria', None, 'grupo'))
+    for categoria in categorias:
+        linhas.append(linha(categoria, [_somar_dict(g, 'despesas_por_categoria', categoria) for g in grupos]))
+    linhas.append(linha('Total de Despesas', total_despesas, 'total'))
+    linhas.append(linha('Resultado', resultado, 'resultado'))
+    return linhas
+
+
+def montar_dre(ano, mes=None, hoje=None):
+    """
+    Monta o DRE de um ano (uma coluna por mês + totais) ou de um mês, sempre
+    com a comparação contra o mesmo período do ano anterior.
+    """
+    hoje = hoje or timezone.localdate()
+    meses = [mes] if mes else list(range(1, 13))
+    resumos = obter_resumos(
+        [(ano, m) for m in meses] + [(ano - 1, m) for m in meses],
+        hoje
+    )
+    atual = [resumos[(ano, m)] for m in meses]
+    anterior = [resumos[(ano - 1, m)] for m in meses]
+
+    if mes:
+        colunas = [f'{NOMES_MESES[mes - 1]}/{ano}', f'{NOMES_MESES[mes - 1]}/{ano - 1}']
+        grupos = [atual, anterior]
+    else:
+        colunas = [f'{nome}/{ano}' for nome in NOMES_MESES] + [f'Total {ano}', f'Total {ano - 1}']
+        grupos = [[r] for r in atual] + [atual, anterior]
+
+    linhas = _linhas(grupos)
+    for linha in linhas:
+        if linha['valores'] is not None:
+            linha['variacao'] = _variacao(linha['valores'][-2], linha['valores'][-1])
+
+    return {
+        'ano': ano,
+        'mes': mes,
+        'colunas': colunas,
+        'linhas': linhas,
+    }
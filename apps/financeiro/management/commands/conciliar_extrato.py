@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.financeiro import conciliacao
+
+
+class Command(BaseCommand):
+    help = 'Concilia um extrato OFX ou retorno CNAB 240/400 com as parcelas em aberto.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo')
+        parser.add_argument('--formato', choices=[f for f, _ in conciliacao.FORMATOS], help='Padrão: detectar')
+        parser.add_argument('--aplicar', action='store_true', help='Baixa as parcelas das correspondências automáticas')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                formato, correspondencias = conciliacao.conciliar_arquivo(
+                    arquivo, options['arquivo'], options['formato']
+                )
+        except OSError as erro:
+            raise CommandError(f'Não foi possível ler o arquivo: {erro}')
+        except ValueError as erro:
+            raise CommandError(str(erro))
+
+        for c in correspondencias:
+            if c.situacao == 'revisar':
+                self.stdout.write(
+                    f'  linha {c.lancamento.linha}: R$ {c.lancamento.valor} {c.lancamento.nome} -> '
+                    f'{c.parcela["venda_numero"]} #{c.parcela["numero"]} ({c.candidatos} candidatos, revisar)'
+                )
+
+        automaticas = [c for c in correspondencias if c.situacao == 'automatica']
+        baixadas = 0
+        if options['aplicar']:
+            baixadas = conciliacao.aplicar(
+                (c.parcela['id'], c.lancamento.data) for c in automaticas
+            )
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{formato.upper()}: {len(correspondencias)} crédito(s), {len(automaticas)} automática(s), '
+            f'{sum(1 for c in correspondencias if c.situacao == "revisar")} para revisar, '
+            f'{sum(1 for c in correspondencias if c.parcela is None)} sem correspondência, '
+            f'{baixadas} parcela(s) baixada(s) em {duracao:.2f}s.'
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.financeiro.dre import calcular_mes, mes_fechado
+from apps.financeiro.models import ResumoMensal
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os resumos mensais do DRE (necessário só após alterações feitas direto no banco).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ano', type=int, required=True, help='Ano a recalcular')
+        parser.add_argument('--mes', type=int, help='Mês a recalcular (padrão: todos os meses fechados do ano)')
+
+    def handle(self, *args, **options):
+        ano = options['ano']
+        mes = options['mes']
+        if mes is not None and not 1 <= mes <= 12:
+            raise CommandError('Mês deve estar entre 1 e 12.')
+
+        hoje = timezone.localdate()
+        meses = [mes] if mes else range(1, 13)
+        recalculados = 0
+        for m in meses:
+            if not mes_fechado(ano, m, hoje):
+                continue
+            resumo = calcular_mes(ano, m)
+            ResumoMensal.objects.update_or_create(
+                ano=ano,
+                mes=m,
+                defaults={
+                    'receita_bruta': resumo.receita_bruta,
+                    'descontos': resumo.descontos,
+                    'despesas_por_categoria': resumo.despesas_por_categoria,
+                    'despesas_por_tipo': resumo.despesas_por_tipo,
+                    'total_despesas': resumo.total_despesas,
+                }
+            )
+            recalculados += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{recalculados} mês(es) recalculado(s) para {ano}.'))
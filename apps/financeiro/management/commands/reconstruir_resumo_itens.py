@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.financeiro.models import ResumoItemMensal
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói os resumos mensais de vendas por item a partir das vendas concluídas.'
+
+    def handle(self, *args, **options):
+        ResumoItemMensal.reconstruir()
+        total = ResumoItemMensal.objects.count()
+        self.stdout.write(self.style.SUCCESS(f'{total} resumo(s) mensal(is) de itens gerado(s).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.financeiro.models import SaldoCliente
+
+
+class Command(BaseCommand):
+    help = 'Recalcula saldo em aberto, faturamento e demais métricas de todos os clientes e empresas.'
+
+    def handle(self, *args, **options):
+        total = SaldoCliente.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f'{total} saldo(s) de clientes/empresas recalculado(s).'))
@@ -0,0 +1,83 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:02
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financeiro", "0002_despesa_funcionario_venda_numero_parcelas_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumoMensal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("mes", models.PositiveIntegerField(verbose_name="Mês")),
+                ("ano", models.PositiveIntegerField(verbose_name="Ano")),
+                (
+                    "receita_bruta",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Receita Bruta",
+                    ),
+                ),
+                (
+                    "descontos",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Descontos",
+                    ),
+                ),
+                (
+                    "despesas_por_categoria",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="Despesas por Categoria",
+                    ),
+                ),
+                (
+                    "despesas_por_tipo",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="Despesas por Tipo",
+                    ),
+                ),
+                (
+                    "total_despesas",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Total de Despesas",
+                    ),
+                ),
+                (
+                    "calculado_em",
+                    models.DateTimeField(auto_now=True, verbose_name="Calculado em"),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumo Mensal",
+                "verbose_name_plural": "Resumos Mensais",
+                "ordering": ["-ano", "-mes"],
+                "unique_together": {("mes", "ano")},
+            },
+        ),
+    ]
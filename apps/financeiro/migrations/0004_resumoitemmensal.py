@@ -0,0 +1,130 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:03
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def popular_resumos(apps, schema_editor):
+    ItemVenda = apps.get_model("financeiro", "ItemVenda")
+    ResumoItemMensal = apps.get_model("financeiro", "ResumoItemMensal")
+    valor = DecimalField(max_digits=14, decimal_places=2)
+    bruto = ExpressionWrapper(F("quantidade") * F("valor_unitario"), output_field=valor)
+    desconto = ExpressionWrapper(
+        F("quantidade")
+        * F("valor_unitario")
+        * F("venda__desconto")
+        * Value(Decimal("0.01"), output_field=valor),
+        output_field=valor,
+    )
+    linhas = (
+        ItemVenda.objects.filter(
+            venda__status="concluido", venda__data_conclusao__isnull=False
+        )
+        .values(
+            "item_id",
+            ano=ExtractYear("venda__data_conclusao"),
+            mes=ExtractMonth("venda__data_conclusao"),
+        )
+        .annotate(
+            total_quantidade=Sum("quantidade"),
+            total_bruto=Sum(bruto),
+            total_desconto=Sum(desconto),
+            total_vendas=Count("venda", distinct=True),
+        )
+        .order_by()
+    )
+    ResumoItemMensal.objects.bulk_create(
+        (
+            ResumoItemMensal(
+                item_id=linha["item_id"],
+                ano=linha["ano"],
+                mes=linha["mes"],
+                quantidade=linha["total_quantidade"],
+                receita_bruta=linha["total_bruto"],
+                receita_liquida=linha["total_bruto"] - linha["total_desconto"],
+                numero_vendas=linha["total_vendas"],
+            )
+            for linha in linhas.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financeiro", "0003_resumomensal"),
+        ("servicos", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumoItemMensal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("mes", models.PositiveIntegerField(verbose_name="Mês")),
+                ("ano", models.PositiveIntegerField(verbose_name="Ano")),
+                (
+                    "quantidade",
+                    models.PositiveIntegerField(default=0, verbose_name="Quantidade"),
+                ),
+                (
+                    "receita_bruta",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Receita Bruta",
+                    ),
+                ),
+                (
+                    "receita_liquida",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Receita Líquida",
+                    ),
+                ),
+                (
+                    "numero_vendas",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Número de Vendas"
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumos_mensais",
+                        to="servicos.item",
+                        verbose_name="Item",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumo Mensal de Item",
+                "verbose_name_plural": "Resumos Mensais de Itens",
+                "ordering": ["-ano", "-mes"],
+                "indexes": [
+                    models.Index(
+                        fields=["ano", "mes"], name="financeiro__ano_ca7666_idx"
+                    )
+                ],
+                "unique_together": {("item", "ano", "mes")},
+            },
+        ),
+        migrations.RunPython(popular_resumos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.financeiro.agregados import agregar_saldos
+
+
+def popular_saldos(apps, schema_editor):
+    Venda = apps.get_model("financeiro", "Venda")
+    ItemVenda = apps.get_model("financeiro", "ItemVenda")
+    Parcela = apps.get_model("financeiro", "Parcela")
+    SaldoCliente = apps.get_model("financeiro", "SaldoCliente")
+    metricas = agregar_saldos(Venda.objects.all(), ItemVenda.objects, Parcela.objects)
+    SaldoCliente.objects.bulk_create(
+        (
+            SaldoCliente(**{f"{tipo}_id": id_}, **valores)
+            for (tipo, id_), valores in metricas.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cadastros", "0001_initial"),
+        ("financeiro", "0004_resumoitemmensal"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SaldoCliente",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "saldo_aberto",
+                    models.DecimalField(
+                        db_index=True,
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Saldo em Aberto",
+                    ),
+                ),
+                (
+                    "total_faturado",
+                    models.DecimalField(
+                        db_index=True,
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Total Faturado",
+                    ),
+                ),
+                (
+                    "total_recebido",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Total Recebido",
+                    ),
+                ),
+                (
+                    "ultima_compra",
+                    models.DateField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name="Última Compra",
+                    ),
+                ),
+                (
+                    "numero_compras",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Número de Compras"
+                    ),
+                ),
+                (
+                    "ticket_medio",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Ticket Médio",
+                    ),
+                ),
+                (
+                    "atualizado_em",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+                (
+                    "cliente",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saldo",
+                        to="cadastros.cliente",
+                        verbose_name="Cliente",
+                    ),
+                ),
+                (
+                    "empresa",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saldo",
+                        to="cadastros.empresa",
+                        verbose_name="Empresa",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Saldo de Cliente",
+                "verbose_name_plural": "Saldos de Clientes",
+                "ordering": ["-saldo_aberto"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="saldocliente",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(("cliente__isnull", False), ("empresa__isnull", True)),
+                    models.Q(("cliente__isnull", True), ("empresa__isnull", False)),
+                    _connector="OR",
+                ),
+                name="saldo_cliente_ou_empresa",
+            ),
+        ),
+        migrations.RunPython(popular_saldos, migrations.RunPython.noop),
+    ]
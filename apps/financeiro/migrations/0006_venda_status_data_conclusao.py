@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financeiro", "0005_saldocliente"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="venda",
+            index=models.Index(
+                fields=["status", "data_conclusao"],
+                name="financeiro__status_1097b9_idx",
+            ),
+        ),
+    ]
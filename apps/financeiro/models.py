@@ -1,11 +1,17 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
 from django.core.validators import MinValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
+from datetime import date
 from decimal import Decimal
 from django.utils import timezone
 from apps.cadastros.models import Cliente, Empresa, Funcionario
-from apps.servicos.models import Item
+from apps.servicos.models import Item, MovimentoEstoque
 from apps.orcamentos.models import Orcamento
 
+from .agregados import agregar_saldos, chave_destinatario, soma, valor_bruto_item, valor_liquido_item
+
 
 class Venda(models.Model):
     """Model para registro de vendas/serviços executados."""
@@ -86,6 +92,7 @@ class Venda(models.Model):
         verbose_name = 'Venda/Serviço'
         verbose_name_plural = 'Vendas/Serviços'
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'data_conclusao'])]
 
     def __str__(self):
         destinatario = self.empresa or self.cliente
@@ -129,16 +136,94 @@ class Venda(models.Model):
         """Conclui a venda, atualiza estoque e marca todas as parcelas como pagas."""
         self.status = 'concluido'
         self.data_conclusao = timezone.localdate()
-        for item_venda in self.itens.all():
-            if item_venda.item.tipo == 'produto':
-                item_venda.item.atualizar_estoque(item_venda.quantidade, 'saida')
+        MovimentoEstoque.registrar(
+            MovimentoEstoque(
+                item_id=item_venda.item_id,
+                tipo='saida',
+                quantidade=item_venda.quantidade,
+                item_venda=item_venda,
+                observacao=f'Venda #{self.numero}'
+            )
+            for item_venda in self.itens.filter(item__tipo='produto')
+        )
         self.save()
         
-        # Marcar todas as parcelas como pagas automaticamente
-        for parcela in self.parcelas.filter(pago=False):
-            parcela.pago = True
-            parcela.data_pagamento = timezone.localdate()
-            parcela.save()
+        # Marcar todas as parcelas como pagas automaticamente; o save() da
+        # venda acima já agenda o recálculo do saldo do destinatário
+        self.parcelas.filter(pago=False).update(pago=True, data_pagamento=self.data_conclusao)
+
+        ResumoItemMensal.registrar_vendas([self.pk])
+
+    @classmethod
+    def concluir_em_lote(cls, ids):
+        """
+        Conclui de uma vez as vendas em andamento entre `ids`, com as mesmas
+        regras de `concluir()`: baixa o estoque dos produtos (sem ficar
+        negativo), quita as parcelas em aberto e atualiza os resumos.
+
+        Devolve {'concluidas': [números], 'ignoradas': [números]}.
+        """
+        hoje = timezone.localdate()
+        with transaction.atomic():
+            vendas = list(
+                cls.objects.select_for_update().filter(pk__in=ids)
+                .values('pk', 'numero', 'status', 'cliente_id', 'empresa_id')
+            )
+            concluir = [v for v in vendas if v['status'] == 'em_andamento']
+            venda_ids = [v['pk'] for v in concluir]
+            if venda_ids:
+                numeros = {v['pk']: v['numero'] for v in concluir}
+                MovimentoEstoque.registrar(
+                    MovimentoEstoque(
+                        item_id=item_id,
+                        tipo='saida',
+                        quantidade=quantidade,
+                        item_venda_id=item_venda_id,
+                        observacao=f'Venda #{numeros[venda_id]}'
+                    )
+                    for item_venda_id, venda_id, item_id, quantidade in ItemVenda.objects.filter(
+                        venda_id__in=venda_ids, item__tipo='produto'
+                    ).order_by('venda_id', 'pk').values_list('pk', 'venda_id', 'item_id', 'quantidade')
+                )
+
+                cls.objects.filter(pk__in=venda_ids).update(
+                    status='concluido', data_conclusao=hoje, updated_at=timezone.now()
+                )
+                Parcela.objects.filter(venda_id__in=venda_ids, pago=False).update(
+                    pago=True, data_pagamento=hoje
+                )
+                ResumoItemMensal.registrar_vendas(venda_ids)
+                SaldoCliente.atualizar(SaldoCliente.chave(v['cliente_id'], v['empresa_id']) for v in concluir)
+
+        return {
+            'concluidas': [v['numero'] for v in concluir],
+            'ignoradas': [v['numero'] for v in vendas if v['status'] != 'em_andamento'],
+        }
+
+    @classmethod
+    def cancelar_em_lote(cls, ids):
+        """
+        Cancela as vendas entre `ids` que ainda não foram concluídas.
+        Devolve {'canceladas': [números], 'ignoradas': [números]}.
+        """
+        with transaction.atomic():
+            vendas = list(
+                cls.objects.select_for_update().filter(pk__in=ids)
+                .values('pk', 'numero', 'status', 'cliente_id', 'empresa_id', 'data_entrada')
+            )
+            cancelar = [v for v in vendas if v['status'] == 'em_andamento']
+            if cancelar:
+                cls.objects.filter(pk__in=[v['pk'] for v in cancelar]).update(
+                    status='cancelado', updated_at=timezone.now()
+                )
+                # O update não dispara os sinais que invalidam o DRE
+                ResumoMensal.invalidar((v['data_entrada'].year, v['data_entrada'].month) for v in cancelar)
+                SaldoCliente.atualizar(SaldoCliente.chave(v['cliente_id'], v['empresa_id']) for v in cancelar)
+
+        return {
+            'canceladas': [v['numero'] for v in cancelar],
+            'ignoradas': [v['numero'] for v in vendas if v['status'] != 'em_andamento'],
+        }
 
     def gerar_parcelas(self):
         """Gera as parcelas da venda se for parcelado."""
@@ -279,6 +364,23 @@ class Parcela(models.Model):
             self.data_pagamento = None
         super().save(*args, **kwargs)
 
+    @classmethod
+    def marcar_pagas_em_lote(cls, ids):
+        """Marca como pagas, hoje, as parcelas em aberto entre `ids`. Devolve quantas foram baixadas."""
+        with transaction.atomic():
+            parcelas = list(
+                cls.objects.select_for_update().filter(pk__in=ids, pago=False)
+                .values('pk', 'venda__cliente_id', 'venda__empresa_id')
+            )
+            if parcelas:
+                cls.objects.filter(pk__in=[p['pk'] for p in parcelas]).update(
+                    pago=True, data_pagamento=timezone.localdate()
+                )
+                SaldoCliente.atualizar(
+                    SaldoCliente.chave(p['venda__cliente_id'], p['venda__empresa_id']) for p in parcelas
+                )
+        return len(parcelas)
+
     def marcar_como_pago(self):
         """Marca a parcela como paga."""
         self.pago = True
@@ -376,33 +478,304 @@ class FolhaPagamento(models.Model):
             defaults={'cor': '#4CAF50', 'descricao': 'Pagamento de salários dos funcionários'}
         )
         
+        from datetime import date
+        ja_pagos = set(Despesa.objects.filter(
+            tipo='salario',
+            data__month=mes,
+            data__year=ano,
+            funcionario__isnull=False
+        ).values_list('funcionario_id', flat=True))
+
+        funcionarios = list(funcionarios_ativos)
         total = Decimal('0')
-        for func in funcionarios_ativos:
-            despesa_existente = Despesa.objects.filter(
-                funcionario=func,
-                tipo='salario',
-                data__month=mes,
-                data__year=ano
-            ).first()
-            
-            if not despesa_existente:
-                from datetime import date
-                Despesa.objects.create(
+        novas = []
+        for func in funcionarios:
+            if func.pk not in ja_pagos:
+                novas.append(Despesa(
                     descricao=f"Salário {func.nome} - {mes:02d}/{ano}",
                     categoria=categoria_salario,
                     valor=func.salario,
                     data=date(ano, mes, 1),
                     tipo='salario',
                     funcionario=func
-                )
+                ))
             total += func.salario
+        Despesa.objects.bulk_create(novas)
+        if novas:
+            # bulk_create não dispara os sinais que invalidam o DRE
+            ResumoMensal.invalidar([(ano, mes)])
         
         folha.total = total
         folha.save()
         
-        return folha, True, f"Folha gerada com {funcionarios_ativos.count()} funcionário(s)"
+        return folha, True, f"Folha gerada com {len(funcionarios)} funcionário(s)"
 
     def processar(self):
         """Marca a folha como processada (paga)."""
         self.processada = True
         self.save()
+
+
+class ResumoMensal(models.Model):
+    """Agregados financeiros de um mês fechado, usados pelo DRE."""
+    mes = models.PositiveIntegerField('Mês')
+    ano = models.PositiveIntegerField('Ano')
+    receita_bruta = models.DecimalField('Receita Bruta', max_digits=14, decimal_places=2, default=0)
+    descontos = models.DecimalField('Descontos', max_digits=14, decimal_places=2, default=0)
+    despesas_por_categoria = models.JSONField(
+        'Despesas por Categoria',
+        default=dict,
+        encoder=DjangoJSONEncoder
+    )
+    despesas_por_tipo = models.JSONField(
+        'Despesas por Tipo',
+        default=dict,
+        encoder=DjangoJSONEncoder
+    )
+    total_despesas = models.DecimalField('Total de Despesas', max_digits=14, decimal_places=2, default=0)
+    calculado_em = models.DateTimeField('Calculado em', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Resumo Mensal'
+        verbose_name_plural = 'Resumos Mensais'
+        ordering = ['-ano', '-mes']
+        unique_together = ['mes', 'ano']
+
+    def __str__(self):
+        return f"Resumo {self.mes:02d}/{self.ano}"
+
+    @property
+    def receita_liquida(self):
+        """Receita bruta menos descontos."""
+        return self.receita_bruta - self.descontos
+
+    @property
+    def resultado(self):
+        """Receita líquida menos despesas."""
+        return self.receita_liquida - self.total_despesas
+
+    @classmethod
+    def invalidar(cls, meses, hoje=None):
+        """
+        Apaga os resumos dos meses (ano, mes) informados, para que o DRE os
+        recalcule na próxima leitura. Meses abertos nunca são gravados e são
+        ignorados sem consulta.
+        """
+        atual = (hoje or timezone.localdate()).replace(day=1)
+        filtro = Q()
+        for ano, mes in set(meses):
+            if date(ano, mes, 1) < atual:
+                filtro |= Q(ano=ano, mes=mes)
+        if filtro:
+            cls.objects.filter(filtro).delete()
+
+
+class ResumoItemMensal(models.Model):
+    """Vendas concluídas de um item agregadas pelo mês de conclusão."""
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        verbose_name='Item',
+        related_name='resumos_mensais'
+    )
+    mes = models.PositiveIntegerField('Mês')
+    ano = models.PositiveIntegerField('Ano')
+    quantidade = models.PositiveIntegerField('Quantidade', default=0)
+    receita_bruta = models.DecimalField('Receita Bruta', max_digits=14, decimal_places=2, default=0)
+    receita_liquida = models.DecimalField('Receita Líquida', max_digits=14, decimal_places=2, default=0)
+    numero_vendas = models.PositiveIntegerField('Número de Vendas', default=0)
+
+    class Meta:
+        verbose_name = 'Resumo Mensal de Item'
+        verbose_name_plural = 'Resumos Mensais de Itens'
+        ordering = ['-ano', '-mes']
+        unique_together = ['item', 'ano', 'mes']
+        indexes = [models.Index(fields=['ano', 'mes'])]
+
+    def __str__(self):
+        return f"{self.item.nome} - {self.mes:02d}/{self.ano}"
+
+    @staticmethod
+    def _agregar(itens_venda):
+        """Agrupa itens de vendas concluídas por item e mês de conclusão."""
+        return itens_venda.filter(venda__data_conclusao__isnull=False).values(
+            'item_id',
+            ano=ExtractYear('venda__data_conclusao'),
+            mes=ExtractMonth('venda__data_conclusao'),
+        ).annotate(
+            total_quantidade=Sum('quantidade'),
+            total_bruto=soma(valor_bruto_item()),
+            total_liquido=soma(valor_liquido_item()),
+            total_vendas=Count('venda', distinct=True),
+        ).order_by()
+
+    @classmethod
+    def registrar_vendas(cls, venda_ids, sinal=1):
+        """
+        Soma (ou subtrai, com sinal=-1) os itens das vendas concluídas
+        informadas aos resumos mensais.
+        """
+        linhas = list(cls._agregar(ItemVenda.objects.filter(venda_id__in=venda_ids)))
+        if not linhas:
+            return
+
+        with transaction.atomic():
+            if sinal > 0:
+                # Cria os resumos que faltam antes de travar: o select_for_update só
+                # trava linhas que existem, e outra venda concluída ao mesmo tempo
+                # pode estar criando o mesmo resumo (o conflito é ignorado)
+                cls.objects.bulk_create(
+                    [cls(item_id=l['item_id'], ano=l['ano'], mes=l['mes']) for l in linhas],
+                    ignore_conflicts=True
+                )
+            existentes = {
+                (r.item_id, r.ano, r.mes): r
+                for r in cls.objects.select_for_update().filter(
+                    item_id__in={l['item_id'] for l in linhas},
+                    ano__in={l['ano'] for l in linhas},
+                    mes__in={l['mes'] for l in linhas},
+                )
+            }
+            alterados = []
+            for linha in linhas:
+                resumo = existentes.get((linha['item_id'], linha['ano'], linha['mes']))
+                if resumo is None:
+                    continue
+                resumo.quantidade = max(0, resumo.quantidade + sinal * linha['total_quantidade'])
+                resumo.receita_bruta += sinal * linha['total_bruto']
+                resumo.receita_liquida += sinal * linha['total_liquido']
+                resumo.numero_vendas = max(0, resumo.numero_vendas + sinal * linha['total_vendas'])
+                alterados.append(resumo)
+
+            cls.objects.bulk_update(
+                alterados,
+                ['quantidade', 'receita_bruta', 'receita_liquida', 'numero_vendas']
+            )
+
+    @classmethod
+    def reconstruir(cls):
+        """Recalcula todos os resumos a partir das vendas concluídas."""
+        linhas = cls._agregar(ItemVenda.objects.filter(venda__status='concluido'))
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                (
+                    cls(
+                        item_id=linha['item_id'],
+                        ano=linha['ano'],
+                        mes=linha['mes'],
+                        quantidade=linha['total_quantidade'],
+                        receita_bruta=linha['total_bruto'],
+                        receita_liquida=linha['total_liquido'],
+                        numero_vendas=linha['total_vendas'],
+                    )
+                    for linha in linhas.iterator()
+                ),
+                batch_size=1000
+            )
+
+
+class SaldoCliente(models.Model):
+    """
+    Métricas financeiras de um cliente ou empresa, mantidas pelos sinais de
+    Venda, ItemVenda e Parcela (ver `signals.py`).
+
+    Cada venda é atribuída ao seu destinatário: a empresa, quando houver,
+    senão o cliente. Vendas canceladas não entram nas métricas.
+    """
+    cliente = models.OneToOneField(
+        Cliente,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name='Cliente',
+        related_name='saldo'
+    )
+    empresa = models.OneToOneField(
+        Empresa,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name='Empresa',
+        related_name='saldo'
+    )
+    saldo_aberto = models.DecimalField('Saldo em Aberto', max_digits=14, decimal_places=2, default=0, db_index=True)
+    total_faturado = models.DecimalField('Total Faturado', max_digits=14, decimal_places=2, default=0, db_index=True)
+    total_recebido = models.DecimalField('Total Recebido', max_digits=14, decimal_places=2, default=0)
+    ultima_compra = models.DateField('Última Compra', null=True, blank=True, db_index=True)
+    numero_compras = models.PositiveIntegerField('Número de Compras', default=0)
+    ticket_medio = models.DecimalField('Ticket Médio', max_digits=14, decimal_places=2, default=0)
+    atualizado_em = models.DateTimeField('Atualizado em', auto_now=True)
+
+    CAMPOS_METRICAS = [
+        'saldo_aberto', 'total_faturado', 'total_recebido',
+        'ultima_compra', 'numero_compras', 'ticket_medio',
+    ]
+
+    class Meta:
+        verbose_name = 'Saldo de Cliente'
+        verbose_name_plural = 'Saldos de Clientes'
+        ordering = ['-saldo_aberto']
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    models.Q(cliente__isnull=False, empresa__isnull=True) |
+                    models.Q(cliente__isnull=True, empresa__isnull=False)
+                ),
+                name='saldo_cliente_ou_empresa'
+            )
+        ]
+
+    def __str__(self):
+        return f"Saldo {self.destinatario} - R$ {self.saldo_aberto}"
+
+    @property
+    def destinatario(self):
+        return self.empresa or self.cliente
+
+    @staticmethod
+    def chave(cliente_id, empresa_id):
+        """Chave do destinatário de uma venda: ('empresa', id), ('cliente', id) ou None."""
+        return chave_destinatario(cliente_id, empresa_id)
+
+    @classmethod
+    def atualizar(cls, chaves):
+        """Recalcula os saldos dos destinatários informados (chaves de `chave()`)."""
+        chaves = {c for c in chaves if c is not None}
+        if not chaves:
+            return
+        clientes = [id_ for tipo, id_ in chaves if tipo == 'cliente']
+        empresas = [id_ for tipo, id_ in chaves if tipo == 'empresa']
+        metricas = agregar_saldos(Venda.objects.filter(
+            models.Q(empresa_id__in=empresas) |
+            models.Q(cliente_id__in=clientes, empresa__isnull=True)
+        ), ItemVenda.objects, Parcela.objects)
+
+        zerado = {
+            'saldo_aberto': Decimal('0'), 'total_faturado': Decimal('0'),
+            'total_recebido': Decimal('0'), 'ultima_compra': None,
+            'numero_compras': 0, 'ticket_medio': Decimal('0'),
+        }
+        # Um upsert por tipo de destinatário (INSERT ... ON CONFLICT DO UPDATE)
+        with transaction.atomic():
+            for tipo, ids in (('cliente', clientes), ('empresa', empresas)):
+                if ids:
+                    cls.objects.bulk_create(
+                        [cls(**{f'{tipo}_id': id_}, **metricas.get((tipo, id_), zerado)) for id_ in ids],
+                        update_conflicts=True,
+                        unique_fields=[tipo],
+                        update_fields=cls.CAMPOS_METRICAS + ['atualizado_em'],
+                        batch_size=1000
+                    )
+
+    @classmethod
+    def reconstruir(cls):
+        """Recalcula os saldos de todos os clientes e empresas com vendas."""
+        metricas = agregar_saldos(Venda.objects.all(), ItemVenda.objects, Parcela.objects)
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                (cls(**{f'{tipo}_id': id_}, **valores) for (tipo, id_), valores in metricas.items()),
+                batch_size=1000
+            )
+        return len(metricas)
@@ -0,0 +1,435 @@
+"""
+Comprovante da venda em PDF (ReportLab).
+
+Importado só dentro das views que geram o PDF: o ReportLab leva mais de
+100 ms para importar e não entra na subida dos workers nem nas outras
+páginas.
+"""
+from io import BytesIO
+
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import HRFlowable, Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from apps.core.instrumentacao import medir
+from apps.core.models import ConfiguracaoEmpresa
+
+
+def montar_pdf_venda(venda):
+    """Comprovante da venda em PDF, num buffer já posicionado no início."""
+    config = ConfiguracaoEmpresa.obter()
+    
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=1.5*cm,
+        leftMargin=1.5*cm,
+        topMargin=1*cm,
+        bottomMargin=1.5*cm
+    )
+    
+    elements = []
+    styles = getSampleStyleSheet()
+    
+    # Cores do tema
+    COR_PRIMARIA = colors.HexColor('#1e3a5f')
+    COR_SECUNDARIA = colors.HexColor('#2c5282')
+    COR_ACCENT = colors.HexColor('#3182ce')
+    COR_TEXTO = colors.HexColor('#2d3748')
+    COR_TEXTO_CLARO = colors.HexColor('#718096')
+    COR_FUNDO = colors.HexColor('#f7fafc')
+    COR_BORDA = colors.HexColor('#e2e8f0')
+    
+    # Estilos customizados
+    style_empresa_nome = ParagraphStyle(
+        'EmpresaNome',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=COR_PRIMARIA,
+        alignment=TA_LEFT,
+        spaceAfter=2,
+        fontName='Helvetica-Bold'
+    )
+    
+    style_empresa_info = ParagraphStyle(
+        'EmpresaInfo',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=COR_TEXTO_CLARO,
+        alignment=TA_LEFT,
+        leading=12
+    )
+    
+    style_doc_tipo = ParagraphStyle(
+        'DocTipo',
+        parent=styles['Normal'],
+        fontSize=14,
+        textColor=colors.white,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    
+    style_doc_numero = ParagraphStyle(
+        'DocNumero',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.white,
+        alignment=TA_CENTER
+    )
+    
+    style_secao_titulo = ParagraphStyle(
+        'SecaoTitulo',
+        parent=styles['Heading2'],
+        fontSize=11,
+        textColor=COR_PRIMARIA,
+        spaceBefore=12,
+        spaceAfter=8,
+        fontName='Helvetica-Bold',
+        leftIndent=0
+    )
+    
+    style_label = ParagraphStyle(
+        'Label',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=COR_TEXTO_CLARO,
+        leading=10
+    )
+    
+    style_valor = ParagraphStyle(
+        'Valor',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=COR_TEXTO,
+        fontName='Helvetica-Bold',
+        leading=12
+    )
+    
+    style_info = ParagraphStyle(
+        'Info',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=COR_TEXTO,
+        leading=12
+    )
+    
+    style_total_label = ParagraphStyle(
+        'TotalLabel',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=COR_TEXTO,
+        fontName='Helvetica-Bold',
+        alignment=TA_RIGHT
+    )
+    
+    style_total_valor = ParagraphStyle(
+        'TotalValor',
+        parent=styles['Normal'],
+        fontSize=16,
+        textColor=COR_PRIMARIA,
+        fontName='Helvetica-Bold',
+        alignment=TA_RIGHT
+    )
+    
+    style_rodape = ParagraphStyle(
+        'Rodape',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=COR_TEXTO_CLARO,
+        alignment=TA_CENTER,
+        leading=11
+    )
+    
+    style_agradecimento = ParagraphStyle(
+        'Agradecimento',
+        parent=styles['Normal'],
+        fontSize=11,
+        textColor=COR_PRIMARIA,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    
+    # ===== CABEÇALHO COM LOGO E DADOS DA EMPRESA =====
+    nome_empresa = config.nome if config else 'Tornearia Jair'
+    
+    # Dados da empresa
+    empresa_info_lines = []
+    if config:
+        if config.cnpj:
+            empresa_info_lines.append(f"<b>CNPJ:</b> {config.cnpj}")
+        if config.endereco:
+            empresa_info_lines.append(f"<b>Endereço:</b> {config.endereco}")
+        if config.telefone:
+            empresa_info_lines.append(f"<b>Telefone:</b> {config.telefone}")
+        if config.email:
+            empresa_info_lines.append(f"<b>E-mail:</b> {config.email}")
+    
+    empresa_info_text = "<br/>".join(empresa_info_lines) if empresa_info_lines else ""
+    
+    # Verificar se existe logo
+    logo_element = None
+    logo_pdf = ConfiguracaoEmpresa.logo_pdf()
+    if logo_pdf:
+        logo_element = Image(BytesIO(logo_pdf), width=2.5*cm, height=2.5*cm)
+        logo_element.hAlign = 'LEFT'
+    
+    # Construir cabeçalho
+    if logo_element:
+        header_data = [[
+            logo_element,
+            [Paragraph(nome_empresa.upper(), style_empresa_nome),
+             Paragraph(empresa_info_text, style_empresa_info)]
+        ]]
+        header_table = Table(header_data, colWidths=[3*cm, 14.5*cm])
+        header_table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ]))
+    else:
+        header_data = [[
+            [Paragraph(nome_empresa.upper(), style_empresa_nome),
+             Paragraph(empresa_info_text, style_empresa_info)]
+        ]]
+        header_table = Table(header_data, colWidths=[17.5*cm])
+        header_table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ]))
+    
+    elements.append(header_table)
+    elements.append(Spacer(1, 15))
+    
+    # ===== FAIXA DO TIPO DE DOCUMENTO =====
+    if venda.status == 'concluido':
+        tipo_doc = "COMPROVANTE DE SERVIÇO"
+    elif venda.status == 'em_andamento':
+        tipo_doc = "ORDEM DE SERVIÇO"
+    else:
+        tipo_doc = "REGISTRO DE SERVIÇO"
+    
+    data_emissao = timezone.now().strftime('%d/%m/%Y às %H:%M')
+    
+    doc_header = Table(
+        [[Paragraph(tipo_doc, style_doc_tipo)],
+         [Paragraph(f"Nº {venda.numero} • Emitido em {data_emissao}", style_doc_numero)]],
+        colWidths=[17.5*cm]
+    )
+    doc_header.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), COR_PRIMARIA),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 4),
+        ('TOPPADDING', (0, 1), (-1, 1), 2),
+        ('BOTTOMPADDING', (0, 1), (-1, 1), 10),
+        ('ROUNDEDCORNERS', [5, 5, 5, 5]),
+    ]))
+    elements.append(doc_header)
+    elements.append(Spacer(1, 20))
+    
+    # ===== INFORMAÇÕES DO SERVIÇO E CLIENTE =====
+    # Info cards lado a lado
+    
+    # Dados do cliente
+    cliente_nome = venda.destinatario_nome
+    cliente_doc = ""
+    cliente_telefone = ""
+    cliente_email = ""
+    
+    if venda.cliente:
+        cliente_doc = venda.cliente.cpf or ""
+        cliente_telefone = venda.cliente.telefone or ""
+        cliente_email = venda.cliente.email or ""
+    elif venda.empresa:
+        cliente_doc = venda.empresa.cnpj or ""
+        cliente_telefone = venda.empresa.telefone or ""
+        cliente_email = venda.empresa.email or ""
+    
+    # Criar tabela com 2 colunas de informações
+    info_data = []
+    
+    # Linha 1: Data de Entrada | Cliente
+    info_data.append([
+        Paragraph("<b>Data de Entrada:</b>", style_label),
+        Paragraph(venda.data_entrada.strftime('%d/%m/%Y'), style_valor),
+        Paragraph("<b>Cliente:</b>", style_label),
+        Paragraph(cliente_nome, style_valor)
+    ])
+    
+    # Linha 2: Status | Documento
+    tipo_doc_cliente = "CPF" if venda.cliente else "CNPJ"
+    info_data.append([
+        Paragraph("<b>Status:</b>", style_label),
+        Paragraph(venda.get_status_display(), style_valor),
+        Paragraph(f"<b>{tipo_doc_cliente}:</b>", style_label),
+        Paragraph(cliente_doc or "-", style_valor)
+    ])
+    
+    # Linha 3: Forma de Pagamento | Telefone
+    info_data.append([
+        Paragraph("<b>Forma de Pagamento:</b>", style_label),
+        Paragraph(venda.get_forma_pagamento_display() if venda.forma_pagamento else "-", style_valor),
+        Paragraph("<b>Telefone:</b>", style_label),
+        Paragraph(cliente_telefone or "-", style_valor)
+    ])
+    
+    # Linha 4: Conclusão | Email (se houver)
+    if venda.data_conclusao or cliente_email:
+        info_data.append([
+            Paragraph("<b>Data de Conclusão:</b>", style_label),
+            Paragraph(venda.data_conclusao.strftime('%d/%m/%Y') if venda.data_conclusao else "-", style_valor),
+            Paragraph("<b>E-mail:</b>", style_label),
+            Paragraph(cliente_email or "-", style_valor)
+        ])
+    
+    # Tabela de informações estruturada
+    info_table = Table(info_data, colWidths=[3.5*cm, 5*cm, 3*cm, 6*cm])
+    info_table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('BACKGROUND', (0, 0), (-1, -1), COR_FUNDO),
+        ('BOX', (0, 0), (-1, -1), 0.5, COR_BORDA),
+        ('LINEBELOW', (0, 0), (-1, -2), 0.5, COR_BORDA),
+        ('LINEBEFORE', (2, 0), (2, -1), 0.5, COR_BORDA),
+    ]))
+    elements.append(info_table)
+    elements.append(Spacer(1, 15))
+    
+    # ===== TABELA DE ITENS =====
+    elements.append(Paragraph("SERVIÇOS E PRODUTOS", style_secao_titulo))
+    
+    # Cabeçalho da tabela
+    dados_itens = [
+        [Paragraph("<b>#</b>", style_info),
+         Paragraph("<b>DESCRIÇÃO</b>", style_info),
+         Paragraph("<b>QTD</b>", style_info),
+         Paragraph("<b>VALOR UNIT.</b>", style_info),
+         Paragraph("<b>TOTAL</b>", style_info)]
+    ]
+    
+    for idx, item in enumerate(venda.itens.all(), 1):
+        tipo_badge = "[SERVIÇO]" if item.item.tipo == 'servico' else "[PRODUTO]"
+        nome_item = item.item.nome
+        descricao_item = item.item.descricao
+        descricao_adicional = item.descricao_adicional
+        
+        conteudo_descricao = f"<font size='7' color='#718096'>{tipo_badge}</font> <b>{nome_item}</b>"
+        if descricao_item:
+            conteudo_descricao += f"<br/><font size='8' color='#4a5568'><i>{descricao_item}</i></font>"
+        if descricao_adicional:
+            conteudo_descricao += f"<br/><font size='8' color='#2b6cb0'>Obs: {descricao_adicional}</font>"
+        
+        dados_itens.append([
+            Paragraph(str(idx), style_info),
+            Paragraph(conteudo_descricao, style_info),
+            Paragraph(str(item.quantidade), style_info),
+            Paragraph(f"R$ {item.valor_unitario:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), style_info),
+            Paragraph(f"R$ {item.total:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), style_info)
+        ])
+    
+    tabela_itens = Table(dados_itens, colWidths=[1*cm, 9*cm, 1.5*cm, 3*cm, 3*cm])
+    tabela_itens.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), COR_SECUNDARIA),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+        ('ALIGN', (2, 1), (2, -1), 'CENTER'),
+        ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('TOPPADDING', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, COR_FUNDO]),
+        ('GRID', (0, 0), (-1, -1), 0.5, COR_BORDA),
+        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+    ]))
+    elements.append(tabela_itens)
+    elements.append(Spacer(1, 15))
+    
+    # ===== RESUMO FINANCEIRO =====
+    subtotal = venda.subtotal
+    desconto_valor = venda.valor_desconto
+    total = venda.total
+    
+    resumo_data = []
+    resumo_data.append(['', '', Paragraph("Subtotal:", style_info), 
+                        Paragraph(f"R$ {subtotal:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), style_info)])
+    
+    if venda.desconto > 0:
+        resumo_data.append(['', '', Paragraph(f"Desconto ({venda.desconto}%):", style_info),
+                          Paragraph(f"- R$ {desconto_valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), 
+                                   ParagraphStyle('Desc', parent=style_info, textColor=colors.HexColor('#e53e3e')))])
+    
+    tabela_resumo = Table(resumo_data, colWidths=[8*cm, 3*cm, 3.5*cm, 3*cm])
+    tabela_resumo.setStyle(TableStyle([
+        ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
+        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ]))
+    elements.append(tabela_resumo)
+    
+    # Total em destaque
+    elements.append(Spacer(1, 5))
+    total_box = Table(
+        [['', Paragraph("VALOR TOTAL", style_total_label),
+          Paragraph(f"R$ {total:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), style_total_valor)]],
+        colWidths=[8*cm, 5*cm, 4.5*cm]
+    )
+    total_box.setStyle(TableStyle([
+        ('BACKGROUND', (1, 0), (-1, 0), COR_FUNDO),
+        ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+        ('ALIGN', (2, 0), (2, 0), 'RIGHT'),
+        ('TOPPADDING', (1, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (1, 0), (-1, 0), 12),
+        ('LEFTPADDING', (1, 0), (-1, 0), 15),
+        ('RIGHTPADDING', (1, 0), (-1, 0), 15),
+        ('BOX', (1, 0), (-1, 0), 1.5, COR_PRIMARIA),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    elements.append(total_box)
+    
+    # ===== OBSERVAÇÕES =====
+    if venda.observacoes:
+        elements.append(Spacer(1, 20))
+        elements.append(Paragraph("OBSERVAÇÕES", style_secao_titulo))
+        obs_box = Table(
+            [[Paragraph(venda.observacoes.replace('\n', '<br/>'), style_info)]],
+            colWidths=[17.5*cm]
+        )
+        obs_box.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), COR_FUNDO),
+            ('BOX', (0, 0), (-1, -1), 0.5, COR_BORDA),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+        ]))
+        elements.append(obs_box)
+    
+    # ===== MENSAGEM DE AGRADECIMENTO =====
+    elements.append(Spacer(1, 30))
+    elements.append(Paragraph("Obrigado pela preferência!", style_agradecimento))
+    
+    # ===== RODAPÉ =====
+    elements.append(Spacer(1, 20))
+    elements.append(HRFlowable(width="100%", thickness=1, color=COR_BORDA, spaceAfter=10))
+    
+    with medir('pdf'):
+        doc.build(elements)
+    
+    buffer.seek(0)
+    return buffer
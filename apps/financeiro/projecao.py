@@ -0,0 +1,269 @@
+"""
+Projeção de fluxo de caixa a partir das parcelas em aberto, despesas e folha.
+
+Os lançamentos são carregados como arrays (data, valor) e agregados por dia
+com NumPy; semanas e meses são obtidos somando os dias de cada bloco.
+"""
+from datetime import timedelta
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Parcela, Despesa, FolhaPagamento
+from apps.cadastros.models import Funcionario
+
+
+HORIZONTE_MINIMO = 1
+HORIZONTE_MAXIMO = 60
+
+AGRUPAMENTOS = ('dia', 'semana', 'mes')
+
+# Probabilidade de inadimplência por faixa de atraso: (até N dias, probabilidade).
+# A última faixa (None) vale para qualquer atraso maior.
+HAIRCUT_PADRAO = (
+    (30, 0.05),
+    (60, 0.15),
+    (90, 0.35),
+    (None, 0.60),
+)
+
+
+def _datas_para_array(datas):
+    return np.array(datas, dtype='datetime64[D]')
+
+
+def _valores_para_array(valores):
+    return np.array(valores, dtype=np.float64)
+
+
+def _carregar_parcelas(fim):
+    """Parcelas não pagas de vendas em andamento com vencimento até o fim."""
+    linhas = list(
+        Parcela.objects.filter(
+            pago=False,
+            venda__status='em_andamento',
+            data_vencimento__lte=fim
+        ).values_list('data_vencimento', 'valor')
+    )
+    if not linhas:
+        return _datas_para_array([]), _valores_para_array([])
+    datas, valores = zip(*linhas)
+    return _datas_para_array(datas), _valores_para_array(valores)
+
+
+def _aplicar_haircut(datas, valores, hoje, haircut):
+    """Desconta a probabilidade de inadimplência das parcelas vencidas."""
+    atraso = (np.datetime64(hoje, 'D') - datas).astype(np.int64)
+    vencidas = atraso > 0
+    if not vencidas.any():
+        return valores
+
+    limites = np.array([limite for limite, _ in haircut if limite is not None])
+    probabilidades = np.array([prob for _, prob in haircut], dtype=np.float64)
+    faixa = np.searchsorted(limites, atraso[vencidas], side='left')
+    faixa = np.minimum(faixa, len(probabilidades) - 1)
+
+    valores = valores.copy()
+    valores[vencidas] *= 1 - probabilidades[faixa]
+    return valores
+
+
+def _chave_despesa_fixa(descricao, categoria_id):
+    return (descricao.strip().casefold(), categoria_id)
+
+
+def _carregar_despesas_futuras(hoje, fim):
+    """
+    Despesas já lançadas com data dentro do horizonte, mais o conjunto
+    (descrição, categoria, mês) das fixas entre elas, para a projeção das
+    fixas não repetir o que já foi lançado.
+    """
+    linhas = list(
+        Despesa.objects.filter(data__gte=hoje, data__lte=fim).values_list(
+            'data', 'valor', 'tipo', 'descricao', 'categoria_id'
+        )
+    )
+    fixas_lancadas = {
+        (*_chave_despesa_fixa(descricao, categoria_id), str(np.datetime64(data, 'M')))
+        for data, _, tipo, descricao, categoria_id in linhas
+        if tipo == 'fixa'
+    }
+    if not linhas:
+        return _datas_para_array([]), _valores_para_array([]), fixas_lancadas
+    datas, valores = zip(*((data, valor) for data, valor, *_ in linhas))
+    return _datas_para_array(datas), _valores_para_array(valores), fixas_lancadas
+
+
+def _meses(inicio, fim):
+    """Array com o primeiro dia de cada mês entre inicio e fim (inclusive)."""
+    return np.arange(
+        np.datetime64(inicio, 'M'),
+        np.datetime64(fim, 'M') + 1,
+        dtype='datetime64[M]'
+    )
+
+
+def _projetar_despesas_fixas(hoje, fim, fixas_lancadas=frozenset()):
+    """
+    Repete mensalmente as despesas fixas lançadas no último mês.
+
+    Cada despesa fixa se repete no mesmo dia dos meses seguintes (limitado ao
+    último dia do mês) até o fim do horizonte, exceto nos meses em que uma
+    fixa com a mesma descrição e categoria já foi lançada (`fixas_lancadas`,
+    de `_carregar_despesas_futuras`).
+    """
+    base_inicio = hoje - relativedelta(months=1)
+    linhas = list(
+        Despesa.objects.filter(
+            tipo='fixa',
+            data__gte=base_inicio,
+            data__lt=hoje
+        ).values_list('data', 'valor', 'descricao', 'categoria_id')
+    )
+    if not linhas:
+        return _datas_para_array([]), _valores_para_array([])
+
+    datas_base, valores_base, descricoes, categorias = zip(*linhas)
+    datas_base = _datas_para_array(datas_base)
+    valores_base = _valores_para_array(valores_base)
+
+    meses = _meses(hoje, fim)
+    inicio_meses = meses.astype('datetime64[D]')
+    dias_no_mes = ((meses + 1).astype('datetime64[D]') - inicio_meses).astype(np.int64)
+    dia_base = (datas_base - datas_base.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64)
+
+    # Matriz despesas x meses com a data de cada ocorrência
+    deslocamento = np.minimum(dia_base[:, None], dias_no_mes[None, :] - 1)
+    ocorrencias = inicio_meses[None, :] + deslocamento
+    posteriores = meses[None, :] > datas_base.astype('datetime64[M]')[:, None]
+    no_horizonte = (ocorrencias >= np.datetime64(hoje, 'D')) & (ocorrencias <= np.datetime64(fim, 'D'))
+    mascara = posteriores & no_horizonte
+    if fixas_lancadas:
+        rotulos_meses = [str(mes) for mes in meses]
+        mascara &= ~np.array([
+            [(*_chave_despesa_fixa(descricao, categoria), mes) in fixas_lancadas for mes in rotulos_meses]
+            for descricao, categoria in zip(descricoes, categorias)
+        ], dtype=bool).reshape(mascara.shape)
+
+    valores = np.broadcast_to(valores_base[:, None], ocorrencias.shape)
+    return ocorrencias[mascara], valores[mascara]
+
+
+def _projetar_salarios(hoje, fim):
+    """
+    Salários dos funcionários ativos no dia 1 de cada mês sem folha gerada.
+
+    Se a folha do mês corrente ainda não foi gerada, o valor entra hoje.
+    """
+    total_salarios = Funcionario.objects.filter(status='ativo').aggregate(
+        total=Sum('salario')
+    )['total']
+    if not total_salarios:
+        return _datas_para_array([]), _valores_para_array([])
+
+    meses = _meses(hoje, fim)
+    geradas = {
+        np.datetime64(f'{ano:04d}-{mes:02d}', 'M')
+        for mes, ano in FolhaPagamento.objects.filter(
+            ano__gte=hoje.year,
+            ano__lte=fim.year
+        ).values_list('mes', 'ano')
+    }
+    if geradas:
+        meses = meses[~np.isin(meses, np.array(sorted(geradas), dtype='datetime64[M]'))]
+
+    datas = np.maximum(meses.astype('datetime64[D]'), np.datetime64(hoje, 'D'))
+    valores = np.full(len(datas), float(total_salarios))
+    return datas, valores
+
+
+def _somar_por_dia(datas, valores, hoje, n_dias):
+    """Soma os valores em um array diário iniciando em hoje."""
+    if len(datas) == 0:
+        return np.zeros(n_dias)
+    indices = (datas - np.datetime64(hoje, 'D')).astype(np.int64)
+    indices = np.clip(indices, 0, n_dias - 1)
+    return np.bincount(indices, weights=valores, minlength=n_dias)
+
+
+def _inicios_blocos(hoje, fim, agrupamento):
+    """Índices (em dias a partir de hoje) onde começa cada bloco e seus rótulos."""
+    inicio = np.datetime64(hoje, 'D')
+    n_dias = (fim - hoje).days + 1
+
+    if agrupamento == 'dia':
+        dias = inicio + np.arange(n_dias)
+        rotulos = [d.strftime('%d/%m/%Y') for d in dias.astype(object)]
+        return np.arange(n_dias), rotulos
+
+    if agrupamento == 'semana':
+        # Semanas iniciando na segunda-feira; a primeira pode ser parcial
+        proxima_segunda = 7 - hoje.weekday() if hoje.weekday() else 0
+        inicios = np.unique(np.concatenate(([0], np.arange(proxima_segunda, n_dias, 7))))
+        rotulos = [
+            (hoje + timedelta(days=int(i))).strftime('%d/%m/%Y') for i in inicios
+        ]
+        return inicios, rotulos
+
+    meses = _meses(hoje, fim)
+    inicios = np.maximum((meses.astype('datetime64[D]') - inicio).astype(np.int64), 0)
+    rotulos = [m.strftime('%m/%Y') for m in meses.astype(object)]
+    return inicios, rotulos
+
+
+def projetar_fluxo_caixa(meses=12, agrupamento='mes', saldo_inicial=0, haircut=None, hoje=None):
+    """
+    Projeta entradas, saídas e saldo acumulado para os próximos `meses`.
+
+    Entradas: parcelas não pagas de vendas em andamento (as vencidas entram
+    hoje, opcionalmente descontadas pelo `haircut` por faixa de atraso).
+    Saídas: despesas já lançadas no horizonte, repetição mensal das despesas
+    fixas (nos meses em que ainda não foram lançadas) e salários dos funcionários ativos nos meses sem folha gerada.
+    """
+    hoje = hoje or timezone.localdate()
+    meses = max(HORIZONTE_MINIMO, min(int(meses), HORIZONTE_MAXIMO))
+    if agrupamento not in AGRUPAMENTOS:
+        agrupamento = 'mes'
+
+    fim = hoje + relativedelta(months=meses) - timedelta(days=1)
+    n_dias = (fim - hoje).days + 1
+
+    datas_parcelas, valores_parcelas = _carregar_parcelas(fim)
+    if haircut:
+        valores_parcelas = _aplicar_haircut(datas_parcelas, valores_parcelas, hoje, haircut)
+
+    datas_despesas, valores_despesas, fixas_lancadas = _carregar_despesas_futuras(hoje, fim)
+    saidas_dia = np.zeros(n_dias)
+    for datas, valores in (
+        (datas_despesas, valores_despesas),
+        _projetar_despesas_fixas(hoje, fim, fixas_lancadas),
+        _projetar_salarios(hoje, fim),
+    ):
+        saidas_dia += _somar_por_dia(datas, valores, hoje, n_dias)
+    entradas_dia = _somar_por_dia(datas_parcelas, valores_parcelas, hoje, n_dias)
+
+    inicios, rotulos = _inicios_blocos(hoje, fim, agrupamento)
+    entradas = np.add.reduceat(entradas_dia, inicios)
+    saidas = np.add.reduceat(saidas_dia, inicios)
+    saldo = float(saldo_inicial) + np.cumsum(entradas - saidas)
+
+    indice_menor = int(np.argmin(saldo))
+    return {
+        'data_inicio': hoje.isoformat(),
+        'data_fim': fim.isoformat(),
+        'agrupamento': agrupamento,
+        'labels': rotulos,
+        'entradas': np.round(entradas, 2).tolist(),
+        'saidas': np.round(saidas, 2).tolist(),
+        'saldo': np.round(saldo, 2).tolist(),
+        'resumo': {
+            'saldo_inicial': round(float(saldo_inicial), 2),
+            'total_entradas': round(float(entradas.sum()), 2),
+            'total_saidas': round(float(saidas.sum()), 2),
+            'saldo_final': round(float(saldo[-1]), 2),
+            'menor_saldo': round(float(saldo[indice_menor]), 2),
+            'menor_saldo_em': rotulos[indice_menor],
+        },
+    }
@@ -0,0 +1,125 @@
+"""
+Sugestão de reposição de produtos pela velocidade de consumo.
+
+O consumo diário de cada produto vem das vendas concluídas em janelas
+móveis de 30, 90 e 180 dias (terminando ontem), somadas em uma única
+consulta agrupada sobre `ItemVenda`. Como as janelas não incluem o dia
+corrente, o consumo só muda uma vez por dia e fica em cache até a virada;
+o estoque atual é lido a cada consulta.
+"""
+import csv
+import math
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Q, Sum
+
+from apps.core.instrumentacao import registrar_cache
+from apps.servicos.models import Item
+from .models import ItemVenda
+
+
+# (dias da janela, peso na taxa de consumo)
+JANELAS = [(30, Decimal('0.5')), (90, Decimal('0.3')), (180, Decimal('0.2'))]
+
+PRAZO_REPOSICAO_PADRAO = 15
+COBERTURA_PADRAO = 30
+
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _chave_cache(hoje):
+    return f'reposicao:consumo:{hoje.isoformat()}'
+
+
+def consumo_por_produto(hoje):
+    """
+    {item_id: {dias: quantidade vendida na janela}} das vendas concluídas
+    nas janelas que terminam ontem. Guardado em cache durante o dia.
+    """
+    chave = _chave_cache(hoje)
+    consumo = cache.get(chave)
+    registrar_cache('reposicao_consumo', consumo is not None)
+    if consumo is not None:
+        return consumo
+
+    maior = max(dias for dias, _ in JANELAS)
+    linhas = ItemVenda.objects.filter(
+        item__tipo='produto',
+        venda__status='concluido',
+        venda__data_conclusao__gte=hoje - timedelta(days=maior),
+        venda__data_conclusao__lt=hoje,
+    ).values('item_id').annotate(**{
+        f'q{dias}': Sum('quantidade', filter=Q(venda__data_conclusao__gte=hoje - timedelta(days=dias)))
+        for dias, _ in JANELAS
+    }).order_by()
+
+    consumo = {
+        linha['item_id']: {dias: linha[f'q{dias}'] or 0 for dias, _ in JANELAS}
+        for linha in linhas
+    }
+    cache.set(chave, consumo, CACHE_TIMEOUT)
+    return consumo
+
+
+def taxa_consumo(quantidades):
+    """Consumo diário ponderado: janelas mais recentes pesam mais."""
+    return sum(
+        (Decimal(quantidades.get(dias, 0)) / dias * peso for dias, peso in JANELAS),
+        Decimal('0')
+    )
+
+
+def sugestoes(hoje, prazo=PRAZO_REPOSICAO_PADRAO, cobertura=COBERTURA_PADRAO, somente_repor=True):
+    """
+    Linhas do relatório de reposição, ordenadas pelos dias de estoque restantes.
+
+    Um produto precisa de reposição quando o estoque não cobre o consumo
+    até a chegada do pedido (`prazo` dias) mais o estoque mínimo; a
+    quantidade sugerida leva o estoque a cobrir `prazo + cobertura` dias
+    acima do mínimo.
+    """
+    consumo = consumo_por_produto(hoje)
+    linhas = []
+    for item_id, nome, estoque, minimo in Item.objects.filter(
+        tipo='produto', ativo=True
+    ).values_list('pk', 'nome', 'quantidade_estoque', 'estoque_minimo').order_by('nome'):
+        quantidades = consumo.get(item_id, {})
+        taxa = taxa_consumo(quantidades)
+        dias_restantes = int(estoque / taxa) if taxa else None
+        ponto_pedido = taxa * prazo + minimo
+        repor = estoque <= ponto_pedido and (taxa > 0 or estoque <= minimo)
+        sugestao = max(0, math.ceil(taxa * (prazo + cobertura) + minimo - estoque)) if repor else 0
+        if somente_repor and not sugestao:
+            continue
+        linhas.append({
+            'id': item_id,
+            'nome': nome,
+            'estoque': estoque,
+            'estoque_minimo': minimo,
+            'consumo': [quantidades.get(dias, 0) for dias, _ in JANELAS],
+            'taxa': taxa.quantize(Decimal('0.01')),
+            'dias_restantes': dias_restantes,
+            'ponto_pedido': math.ceil(ponto_pedido),
+            'sugestao': sugestao,
+        })
+    linhas.sort(key=lambda linha: (linha['dias_restantes'] is None, linha['dias_restantes'] or 0, linha['nome']))
+    return linhas
+
+
+def escrever_csv(linhas, destino):
+    """Escreve o relatório em CSV (separado por ';') no arquivo texto `destino`."""
+    escritor = csv.writer(destino, delimiter=';')
+    escritor.writerow(
+        ['id', 'produto', 'estoque', 'estoque_minimo']
+        + [f'vendido_{dias}d' for dias, _ in JANELAS]
+        + ['consumo_diario', 'dias_restantes', 'ponto_pedido', 'sugestao']
+    )
+    for linha in linhas:
+        escritor.writerow(
+            [linha['id'], linha['nome'], linha['estoque'], linha['estoque_minimo']]
+            + linha['consumo']
+            + [str(linha['taxa']).replace('.', ','), linha['dias_restantes'] if linha['dias_restantes'] is not None else '',
+               linha['ponto_pedido'], linha['sugestao']]
+        )
@@ -0,0 +1,117 @@
+"""
+Mantém `SaldoCliente` atualizado quando vendas, itens e parcelas mudam,
+retira dos resumos mensais de itens as vendas concluídas que são excluídas e
+descarta os resumos do DRE (`ResumoMensal`) dos meses fechados alcançados
+por vendas, itens e despesas alterados.
+
+O recálculo é agendado para depois do commit e agrupado por destinatário (ou
+mês): salvar uma venda com vários itens e parcelas dentro da mesma transação
+recalcula o saldo do cliente uma única vez.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models import DateField
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Despesa, ItemVenda, Parcela, ResumoItemMensal, ResumoMensal, SaldoCliente, Venda
+
+
+def _agendar_uma_vez(atributo, chave, funcao):
+    conexao = transaction.get_connection()
+    # Os callbacks pendentes são descartados em rollback, por isso a própria
+    # fila do Django é usada para saber se a chave já está agendada
+    for _, agendada, *_ in conexao.run_on_commit:
+        if getattr(agendada, atributo, None) == chave:
+            return
+    callback = partial(funcao, [chave])
+    setattr(callback, atributo, chave)
+    transaction.on_commit(callback)
+
+
+def agendar_atualizacao(chave):
+    """Agenda o recálculo do saldo de um destinatário para o fim da transação."""
+    if chave is not None:
+        _agendar_uma_vez('chave_saldo', chave, SaldoCliente.atualizar)
+
+
+def agendar_invalidacao_resumo(data):
+    """Agenda o descarte do resumo do DRE do mês de `data`, se o mês já estiver fechado."""
+    # A data pode ter sido atribuída como texto ('2026-01-31') antes do save
+    data = DateField().to_python(data)
+    # Meses abertos não têm resumo gravado; nem vale agendar
+    if data is None or data >= timezone.localdate().replace(day=1):
+        return
+    _agendar_uma_vez('mes_resumo', (data.year, data.month), ResumoMensal.invalidar)
+
+
+def _agendar_pela_venda(instance, dre=False):
+    if type(instance).venda.is_cached(instance):
+        venda = instance.venda
+        valores = (venda.cliente_id, venda.empresa_id, venda.data_entrada)
+    else:
+        valores = Venda.objects.filter(pk=instance.venda_id).values_list(
+            'cliente_id', 'empresa_id', 'data_entrada'
+        ).first()
+    if valores is None:
+        return
+    agendar_atualizacao(SaldoCliente.chave(valores[0], valores[1]))
+    if dre:
+        agendar_invalidacao_resumo(valores[2])
+
+
+@receiver(post_init, sender=Venda)
+def guardar_destinatario_original(sender, instance, **kwargs):
+    # Lido de __dict__ para não disparar consultas em instâncias com campos adiados
+    instance._chave_saldo_original = SaldoCliente.chave(
+        instance.__dict__.get('cliente_id'), instance.__dict__.get('empresa_id')
+    )
+    instance._data_original = instance.__dict__.get('data_entrada')
+
+
+@receiver(post_save, sender=Venda)
+@receiver(post_delete, sender=Venda)
+def venda_alterada(sender, instance, **kwargs):
+    chave = SaldoCliente.chave(instance.cliente_id, instance.empresa_id)
+    agendar_atualizacao(chave)
+    original = getattr(instance, '_chave_saldo_original', None)
+    if original != chave:
+        agendar_atualizacao(original)
+    instance._chave_saldo_original = chave
+
+    # Status, descontos e data de entrada entram no DRE do mês da venda
+    agendar_invalidacao_resumo(instance.data_entrada)
+    if getattr(instance, '_data_original', None) != instance.data_entrada:
+        agendar_invalidacao_resumo(instance._data_original)
+    instance._data_original = instance.data_entrada
+
+
+@receiver(post_init, sender=Despesa)
+def guardar_data_original(sender, instance, **kwargs):
+    instance._data_original = instance.__dict__.get('data')
+
+
+@receiver(post_save, sender=Despesa)
+@receiver(post_delete, sender=Despesa)
+def despesa_alterada(sender, instance, **kwargs):
+    agendar_invalidacao_resumo(instance.data)
+    if getattr(instance, '_data_original', None) != instance.data:
+        agendar_invalidacao_resumo(instance._data_original)
+    instance._data_original = instance.data
+
+
+@receiver(pre_delete, sender=Venda)
+def retirar_venda_dos_resumos(sender, instance, **kwargs):
+    # Os itens ainda existem aqui; depois do delete não haveria o que subtrair
+    if instance.status == 'concluido':
+        ResumoItemMensal.registrar_vendas([instance.pk], sinal=-1)
+
+
+@receiver(post_save, sender=ItemVenda)
+@receiver(post_delete, sender=ItemVenda)
+@receiver(post_save, sender=Parcela)
+@receiver(post_delete, sender=Parcela)
+def item_ou_parcela_alterado(sender, instance, **kwargs):
+    _agendar_pela_venda(instance, dre=sender is ItemVenda)
@@ -7,6 +7,7 @@ urlpatterns = [
     # Vendas
     path('vendas/', views.VendaListView.as_view(), name='venda_list'),
     path('vendas/nova/', views.VendaCreateView.as_view(), name='venda_create'),
+    path('vendas/lote/', views.acao_vendas_em_lote, name='venda_acao_lote'),
     path('vendas/<int:pk>/', views.VendaDetailView.as_view(), name='venda_detail'),
     path('vendas/<int:pk>/editar/', views.VendaUpdateView.as_view(), name='venda_update'),
     path('vendas/<int:pk>/excluir/', views.VendaDeleteView.as_view(), name='venda_delete'),
@@ -18,12 +19,28 @@ urlpatterns = [
     
     # Parcelas
     path('parcelas/<int:pk>/pagar/', views.marcar_parcela_paga, name='parcela_pagar'),
+    path('parcelas/pagar/', views.pagar_parcelas_em_lote, name='parcela_pagar_lote'),
+    path('conciliacao/', views.conciliacao_bancaria, name='conciliacao'),
     
     # Folha de Pagamento
     path('folha-pagamento/', views.FolhaPagamentoListView.as_view(), name='folha_list'),
     path('folha-pagamento/gerar/', views.gerar_folha_pagamento, name='folha_gerar'),
     path('folha-pagamento/<int:pk>/processar/', views.processar_folha_pagamento, name='folha_processar'),
     
+    # Fluxo de Caixa
+    path('fluxo-caixa/', views.FluxoCaixaView.as_view(), name='fluxo_caixa'),
+    path('api/fluxo-caixa/', views.fluxo_caixa_api, name='fluxo_caixa_api'),
+    
+    # DRE
+    path('dre/', views.DREView.as_view(), name='dre'),
+    
+    # Saldos de clientes
+    path('saldos/', views.SaldoClienteListView.as_view(), name='saldo_cliente_list'),
+    
+    # Curva ABC
+    path('curva-abc/', views.CurvaABCView.as_view(), name='curva_abc'),
+    path('reposicao/', views.ReposicaoView.as_view(), name='reposicao'),
+    
     # Despesas
     path('despesas/', views.DespesaListView.as_view(), name='despesa_list'),
     path('despesas/nova/', views.DespesaCreateView.as_view(), name='despesa_create'),
@@ -1,27 +1,27 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.urls import reverse_lazy, reverse
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Q
 from django.utils import timezone
-from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm, mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, HRFlowable
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+from django.utils.http import url_has_allowed_host_and_scheme
+from datetime import timedelta
+from decimal import Decimal
 
 from django.core.mail import EmailMessage
 from django.conf import settings
 
-from .models import Venda, ItemVenda, Despesa, CategoriaDespesa, Parcela, FolhaPagamento
+from .models import Venda, ItemVenda, Despesa, CategoriaDespesa, Parcela, FolhaPagamento, SaldoCliente
+from .projecao import projetar_fluxo_caixa, HAIRCUT_PADRAO
+from .dre import montar_dre, NOMES_MESES
+from . import conciliacao, curva_abc, reposicao
 from apps.cadastros.models import Cliente, Empresa, Funcionario
+from apps.core.parametros import decimal_finito
 from apps.servicos.models import Item
-from apps.core.models import ConfiguracaoEmpresa
 
 
 class VendaListView(LoginRequiredMixin, ListView):
@@ -31,7 +31,7 @@ class VendaListView(LoginRequiredMixin, ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('cliente', 'empresa').prefetch_related('itens')
         busca = self.request.GET.get('busca')
         status = self.request.GET.get('status')
         
@@ -56,6 +56,11 @@ class VendaDetailView(LoginRequiredMixin, DetailView):
     model = Venda
     template_name = 'financeiro/venda_detail.html'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('cliente', 'empresa', 'orcamento').prefetch_related(
+            'itens__item', 'parcelas'
+        )
+
 
 class VendaCreateView(LoginRequiredMixin, CreateView):
     model = Venda
@@ -205,6 +210,108 @@ def marcar_parcela_paga(request, pk):
     return redirect('financeiro:venda_detail', pk=parcela.venda.pk)
 
 
+def _ids_selecionados(request):
+    return [int(valor) for valor in request.POST.getlist('ids') if valor.isdigit()]
+
+
+def _responder_lote(request, resumo, destino):
+    """Devolve o resumo em JSON para chamadas via fetch, senão redireciona."""
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse(resumo)
+    proximo = request.POST.get('next')
+    if proximo and url_has_allowed_host_and_scheme(proximo, allowed_hosts={request.get_host()}):
+        return redirect(proximo)
+    return redirect(destino)
+
+
+@login_required
+@require_POST
+def acao_vendas_em_lote(request):
+    """Conclui ou cancela várias vendas selecionadas na listagem."""
+    ids = _ids_selecionados(request)
+    acao = request.POST.get('acao')
+    if not ids or acao not in ('concluir', 'cancelar'):
+        messages.warning(request, 'Selecione ao menos um serviço e uma ação.')
+        return _responder_lote(request, {'erro': 'selecao_invalida'}, 'financeiro:venda_list')
+
+    if acao == 'concluir':
+        resumo = Venda.concluir_em_lote(ids)
+        if resumo['concluidas']:
+            messages.success(request, f'{len(resumo["concluidas"])} serviço(s) concluído(s)! Estoque atualizado.')
+    else:
+        resumo = Venda.cancelar_em_lote(ids)
+        if resumo['canceladas']:
+            messages.success(request, f'{len(resumo["canceladas"])} serviço(s) cancelado(s).')
+    if resumo['ignoradas']:
+        messages.warning(
+            request,
+            f'Ignorados por já estarem concluídos ou cancelados: {", ".join(resumo["ignoradas"])}.'
+        )
+    return _responder_lote(request, resumo, 'financeiro:venda_list')
+
+
+@login_required
+@require_POST
+def pagar_parcelas_em_lote(request):
+    """Marca como pagas as parcelas selecionadas."""
+    ids = _ids_selecionados(request)
+    baixadas = Parcela.marcar_pagas_em_lote(ids) if ids else 0
+    if baixadas:
+        messages.success(request, f'{baixadas} parcela(s) marcada(s) como paga(s)!')
+    else:
+        messages.warning(request, 'Nenhuma parcela em aberto selecionada.')
+    return _responder_lote(
+        request,
+        {'baixadas': baixadas, 'ignoradas': len(ids) - baixadas},
+        'financeiro:venda_list'
+    )
+
+
+@login_required
+def conciliacao_bancaria(request):
+    """
+    Conciliação de extrato OFX ou retorno CNAB: o upload mostra as
+    correspondências sugeridas e a confirmação baixa as parcelas marcadas.
+    """
+    context = {'formatos': conciliacao.FORMATOS}
+
+    if request.method == 'POST' and request.POST.get('acao') == 'aplicar':
+        pagamentos = []
+        for valor in request.POST.getlist('conciliar'):
+            parcela_id, _, data = valor.partition('|')
+            if parcela_id.isdigit():
+                pagamentos.append((parcela_id, conciliacao.converter_data(data)))
+        baixadas = conciliacao.aplicar(pagamentos)
+        if baixadas:
+            messages.success(request, f'{baixadas} parcela(s) marcada(s) como paga(s)!')
+        else:
+            messages.warning(request, 'Nenhuma parcela foi baixada.')
+        return redirect('financeiro:conciliacao')
+
+    if request.method == 'POST':
+        arquivo = request.FILES.get('arquivo')
+        if not arquivo:
+            messages.error(request, 'Selecione um arquivo OFX ou CNAB.')
+            return render(request, 'financeiro/conciliacao.html', context)
+        formato = request.POST.get('formato') or None
+        try:
+            formato, correspondencias = conciliacao.conciliar_arquivo(arquivo.file, arquivo.name, formato)
+        except ValueError as erro:
+            messages.error(request, str(erro))
+            return render(request, 'financeiro/conciliacao.html', context)
+
+        context.update({
+            'arquivo_nome': arquivo.name,
+            'formato': formato,
+            'correspondencias': correspondencias,
+            'total_automaticas': sum(1 for c in correspondencias if c.situacao == 'automatica'),
+            'total_revisar': sum(1 for c in correspondencias if c.situacao == 'revisar'),
+            'total_sem_correspondencia': sum(1 for c in correspondencias if c.parcela is None),
+        })
+
+    return render(request, 'financeiro/conciliacao.html', context)
+
+
 @login_required
 def gerar_parcelas_venda(request, pk):
     """Gera ou regenera as parcelas de uma venda."""
@@ -278,6 +385,181 @@ def processar_folha_pagamento(request, pk):
     return redirect('financeiro:folha_list')
 
 
+def _parametros_fluxo_caixa(params):
+    """Lê os parâmetros da projeção de fluxo de caixa a partir da query string."""
+    try:
+        meses = int(params.get('meses', 12))
+    except ValueError:
+        meses = 12
+    return {
+        'meses': meses,
+        'agrupamento': params.get('agrupamento', 'mes'),
+        'saldo_inicial': decimal_finito(params.get('saldo_inicial'), Decimal('0')),
+        'haircut': HAIRCUT_PADRAO if params.get('haircut') == '1' else None,
+    }
+
+
+class FluxoCaixaView(LoginRequiredMixin, TemplateView):
+    """Projeção de fluxo de caixa com gráfico de entradas, saídas e saldo."""
+    template_name = 'financeiro/fluxo_caixa.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        parametros = _parametros_fluxo_caixa(self.request.GET)
+        projecao = projetar_fluxo_caixa(**parametros)
+        context['projecao'] = projecao
+        context['linhas'] = zip(
+            projecao['labels'], projecao['entradas'], projecao['saidas'], projecao['saldo']
+        )
+        context['parametros'] = parametros
+        context['haircut_padrao'] = HAIRCUT_PADRAO
+        context['query_string'] = self.request.GET.urlencode()
+        return context
+
+
+@login_required
+def fluxo_caixa_api(request):
+    """API com a projeção de fluxo de caixa (entradas, saídas e saldo)."""
+    parametros = _parametros_fluxo_caixa(request.GET)
+    return JsonResponse(projetar_fluxo_caixa(**parametros))
+
+
+class DREView(LoginRequiredMixin, TemplateView):
+    """Demonstração do resultado por mês ou ano, comparada ao ano anterior."""
+    template_name = 'financeiro/dre.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        hoje = timezone.localdate()
+        try:
+            ano = int(self.request.GET.get('ano', hoje.year))
+        except ValueError:
+            ano = hoje.year
+        # O DRE compara com o ano anterior: date() só aceita anos de 1 a 9999
+        ano = ano if 2 <= ano <= 9998 else hoje.year
+        try:
+            mes = int(self.request.GET.get('mes') or 0)
+        except ValueError:
+            mes = 0
+        mes = mes if 1 <= mes <= 12 else None
+
+        context['dre'] = montar_dre(ano, mes)
+        context['ano_selecionado'] = ano
+        context['mes_selecionado'] = mes
+        context['anos'] = range(hoje.year - 5, hoje.year + 1)
+        context['meses'] = list(enumerate(NOMES_MESES, 1))
+        return context
+
+
+class CurvaABCView(LoginRequiredMixin, TemplateView):
+    """Classificação ABC (Pareto) de itens ou clientes pela receita líquida."""
+    template_name = 'financeiro/curva_abc.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        hoje = timezone.localdate()
+        tipo = self.request.GET.get('tipo', 'itens')
+        if tipo not in ('itens', 'clientes'):
+            tipo = 'itens'
+        try:
+            ano = int(self.request.GET.get('ano') or 0)
+        except ValueError:
+            ano = 0
+        # periodo_do_ano vai até 1º de janeiro do ano seguinte; date() aceita até 9999
+        ano = ano if 1 <= ano <= 9998 else 0
+
+        if ano:
+            inicio, fim = curva_abc.periodo_do_ano(ano)
+        else:
+            inicio, fim = curva_abc.periodo_padrao(hoje)
+
+        if tipo == 'clientes':
+            linhas = curva_abc.curva_clientes(inicio, fim)
+        else:
+            linhas = curva_abc.curva_itens(inicio, fim)
+
+        context.update({
+            'tipo': tipo,
+            'ano_selecionado': ano,
+            'anos': range(hoje.year - 5, hoje.year + 1),
+            'data_inicio': inicio,
+            'data_fim': fim,
+            'linhas': linhas,
+            'resumo_classes': curva_abc.resumo_classes(linhas),
+        })
+        return context
+
+
+class ReposicaoView(LoginRequiredMixin, TemplateView):
+    """Sugestão de reposição de produtos pela velocidade de consumo (página ou CSV)."""
+    template_name = 'financeiro/reposicao.html'
+
+    def _inteiro(self, nome, padrao):
+        try:
+            return max(0, int(self.request.GET.get(nome) or padrao))
+        except ValueError:
+            return padrao
+
+    def get(self, request, *args, **kwargs):
+        self.hoje = timezone.localdate()
+        self.prazo = self._inteiro('prazo', reposicao.PRAZO_REPOSICAO_PADRAO)
+        self.cobertura = self._inteiro('cobertura', reposicao.COBERTURA_PADRAO)
+        self.todos = request.GET.get('todos') == '1'
+        self.linhas = reposicao.sugestoes(self.hoje, self.prazo, self.cobertura, somente_repor=not self.todos)
+
+        if request.GET.get('formato') == 'csv':
+            response = HttpResponse(content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="reposicao_{self.hoje:%Y%m%d}.csv"'
+            response.write('\ufeff')
+            reposicao.escrever_csv(self.linhas, response)
+            return response
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'linhas': self.linhas,
+            'prazo': self.prazo,
+            'cobertura': self.cobertura,
+            'todos': self.todos,
+            'janelas': [dias for dias, _ in reposicao.JANELAS],
+            'total_sugerido': sum(linha['sugestao'] for linha in self.linhas),
+        })
+        return context
+
+
+class SaldoClienteListView(LoginRequiredMixin, ListView):
+    """Maiores devedores ou clientes sem compras há mais de N dias."""
+    model = SaldoCliente
+    template_name = 'financeiro/saldo_cliente_list.html'
+    context_object_name = 'saldos'
+    paginate_by = 20
+
+    def get_lista(self):
+        lista = self.request.GET.get('lista', 'devedores')
+        return lista if lista in ('devedores', 'inativos') else 'devedores'
+
+    def get_dias(self):
+        # Até 10 anos: muito mais que isso sai do intervalo de datas
+        try:
+            return min(max(1, int(self.request.GET.get('dias') or 90)), 3650)
+        except ValueError:
+            return 90
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related('cliente', 'empresa')
+        if self.get_lista() == 'inativos':
+            limite = timezone.localdate() - timedelta(days=self.get_dias())
+            return queryset.filter(ultima_compra__lt=limite).order_by('ultima_compra')
+        return queryset.filter(saldo_aberto__gt=0).order_by('-saldo_aberto')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['lista'] = self.get_lista()
+        context['dias'] = self.get_dias()
+        return context
+
+
 class DespesaListView(LoginRequiredMixin, ListView):
     model = Despesa
     template_name = 'financeiro/despesa_list.html'
@@ -285,7 +567,7 @@ class DespesaListView(LoginRequiredMixin, ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('categoria')
         busca = self.request.GET.get('busca')
         categoria = self.request.GET.get('categoria')
         
@@ -390,15 +672,20 @@ class CategoriaDeleteView(LoginRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
+def _vendas_para_pdf():
+    """Vendas com destinatário e itens já carregados para montar o comprovante."""
+    return Venda.objects.select_related('cliente', 'empresa').prefetch_related('itens__item')
+
+
 @login_required
 def gerar_comprovante_venda(request, pk):
     """Gera um comprovante PDF elegante e profissional da venda/serviço."""
-    import os
-    from django.conf import settings
-    
-    venda = get_object_or_404(Venda, pk=pk)
+    # O ReportLab só é importado por quem gera PDF (veja pdf.py)
+    from .pdf import montar_pdf_venda
+
+    venda = get_object_or_404(_vendas_para_pdf(), pk=pk)
     
-    buffer = _gerar_pdf_bytes_venda(venda)
+    buffer = montar_pdf_venda(venda)
     
     response = HttpResponse(buffer, content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="comprovante_{venda.numero}.pdf"'
@@ -408,7 +695,7 @@ def gerar_comprovante_venda(request, pk):
 @login_required
 def enviar_email_venda(request, pk):
     """Envia o comprovante da venda/serviço por e-mail com PDF anexo."""
-    venda = get_object_or_404(Venda, pk=pk)
+    venda = get_object_or_404(_vendas_para_pdf(), pk=pk)
     
     destinatario_email = None
     destinatario_nome = "Cliente"
@@ -426,7 +713,9 @@ def enviar_email_venda(request, pk):
         
     try:
         # Gerar PDF
-        pdf_buffer = _gerar_pdf_bytes_venda(venda)
+        from .pdf import montar_pdf_venda
+
+        pdf_buffer = montar_pdf_venda(venda)
         pdf_content = pdf_buffer.getvalue()
         
         assunto = f"Comprovante de Venda/Serviço {venda.numero} - Tornearia Jair"
@@ -453,448 +742,3 @@ Tornearia Jair
         messages.error(request, f'Erro ao enviar e-mail: {str(e)}')
         
     return redirect('financeiro:venda_detail', pk=pk)
-
-
-def _gerar_pdf_bytes_venda(venda):
-    """Função auxiliar para gerar o PDF da venda e retornar o buffer."""
-    import os
-    from django.conf import settings
-    
-    config = ConfiguracaoEmpresa.objects.first()
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=1.5*cm,
-        leftMargin=1.5*cm,
-        topMargin=1*cm,
-        bottomMargin=1.5*cm
-    )
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Cores do tema
-    COR_PRIMARIA = colors.HexColor('#1e3a5f')
-    COR_SECUNDARIA = colors.HexColor('#2c5282')
-    COR_ACCENT = colors.HexColor('#3182ce')
-    COR_TEXTO = colors.HexColor('#2d3748')
-    COR_TEXTO_CLARO = colors.HexColor('#718096')
-    COR_FUNDO = colors.HexColor('#f7fafc')
-    COR_BORDA = colors.HexColor('#e2e8f0')
-    
-    # Estilos customizados
-    style_empresa_nome = ParagraphStyle(
-        'EmpresaNome',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=COR_PRIMARIA,
-        alignment=TA_LEFT,
-        spaceAfter=2,
-        fontName='Helvetica-Bold'
-    )
-    
-    style_empresa_info = ParagraphStyle(
-        'EmpresaInfo',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=COR_TEXTO_CLARO,
-        alignment=TA_LEFT,
-        leading=12
-    )
-    
-    style_doc_tipo = ParagraphStyle(
-        'DocTipo',
-        parent=styles['Normal'],
-        fontSize=14,
-        textColor=colors.white,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    style_doc_numero = ParagraphStyle(
-        'DocNumero',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.white,
-        alignment=TA_CENTER
-    )
-    
-    style_secao_titulo = ParagraphStyle(
-        'SecaoTitulo',
-        parent=styles['Heading2'],
-        fontSize=11,
-        textColor=COR_PRIMARIA,
-        spaceBefore=12,
-        spaceAfter=8,
-        fontName='Helvetica-Bold',
-        leftIndent=0
-    )
-    
-    style_label = ParagraphStyle(
-        'Label',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=COR_TEXTO_CLARO,
-        leading=10
-    )
-    
-    style_valor = ParagraphStyle(
-        'Valor',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=COR_TEXTO,
-        fontName='Helvetica-Bold',
-        leading=12
-    )
-    
-    style_info = ParagraphStyle(
-        'Info',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=COR_TEXTO,
-        leading=12
-    )
-    
-    style_total_label = ParagraphStyle(
-        'TotalLabel',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=COR_TEXTO,
-        fontName='Helvetica-Bold',
-        alignment=TA_RIGHT
-    )
-    
-    style_total_valor = ParagraphStyle(
-        'TotalValor',
-        parent=styles['Normal'],
-        fontSize=16,
-        textColor=COR_PRIMARIA,
-        fontName='Helvetica-Bold',
-        alignment=TA_RIGHT
-    )
-    
-    style_rodape = ParagraphStyle(
-        'Rodape',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=COR_TEXTO_CLARO,
-        alignment=TA_CENTER,
-        leading=11
-    )
-    
-    style_agradecimento = ParagraphStyle(
-        'Agradecimento',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=COR_PRIMARIA,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    # ===== CABEÇALHO COM LOGO E DADOS DA EMPRESA =====
-    nome_empresa = config.nome if config else 'Tornearia Jair'
-    
-    # Dados da empresa
-    empresa_info_lines = []
-    if config:
-        if config.cnpj:
-            empresa_info_lines.append(f"<b>CNPJ:</b> {config.cnpj}")
-        if config.endereco:
-            empresa_info_lines.append(f"<b>Endereço:</b> {config.endereco}")
-        if config.telefone:
-            empresa_info_lines.append(f"<b>Telefone:</b> {config.telefone}")
-        if config.email:
-            empresa_info_lines.append(f"<b>E-mail:</b> {config.email}")
-    
-    empresa_info_text = "<br/>".join(empresa_info_lines) if empresa_info_lines else ""
-    
-    # Verificar se existe logo
-    logo_element = None
-    if config and config.logo:
-        logo_path = os.path.join(settings.MEDIA_ROOT, str(config.logo))
-        if os.path.exists(logo_path):
-            try:
-                logo_element = Image(logo_path, width=2.5*cm, height=2.5*cm)
-                logo_element.hAlign = 'LEFT'
-            except:
-                logo_element = None
-    
-    # Construir cabeçalho
-    if logo_element:
-        header_data = [[
-            logo_element,
-            [Paragraph(nome_empresa.upper(), style_empresa_nome),
-             Paragraph(empresa_info_text, style_empresa_info)]
-        ]]
-        header_table = Table(header_data, colWidths=[3*cm, 14.5*cm])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ]))
-    else:
-        header_data = [[
-            [Paragraph(nome_empresa.upper(), style_empresa_nome),
-             Paragraph(empresa_info_text, style_empresa_info)]
-        ]]
-        header_table = Table(header_data, colWidths=[17.5*cm])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-        ]))
-    
-    elements.append(header_table)
-    elements.append(Spacer(1, 15))
-    
-    # ===== FAIXA DO TIPO DE DOCUMENTO =====
-    if venda.status == 'concluido':
-        tipo_doc = "COMPROVANTE DE SERVIÇO"
-    elif venda.status == 'em_andamento':
-        tipo_doc = "ORDEM DE SERVIÇO"
-    else:
-        tipo_doc = "REGISTRO DE SERVIÇO"
-    
-    data_emissao = timezone.now().strftime('%d/%m/%Y às %H:%M')
-    
-    doc_header = Table(
-        [[Paragraph(tipo_doc, style_doc_tipo)],
-         [Paragraph(f"Nº {venda.numero} • Emitido em {data_emissao}", style_doc_numero)]],
-        colWidths=[17.5*cm]
-    )
-    doc_header.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), COR_PRIMARIA),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 4),
-        ('TOPPADDING', (0, 1), (-1, 1), 2),
-        ('BOTTOMPADDING', (0, 1), (-1, 1), 10),
-        ('ROUNDEDCORNERS', [5, 5, 5, 5]),
-    ]))
-    elements.append(doc_header)
-    elements.append(Spacer(1, 20))
-    
-    # ===== INFORMAÇÕES DO SERVIÇO E CLIENTE =====
-    # Info cards lado a lado
-    
-    # Dados do cliente
-    cliente_nome = venda.destinatario_nome
-    cliente_doc = ""
-    cliente_telefone = ""
-    cliente_email = ""
-    
-    if venda.cliente:
-        cliente_doc = venda.cliente.cpf or ""
-        cliente_telefone = venda.cliente.telefone or ""
-        cliente_email = venda.cliente.email or ""
-    elif venda.empresa:
-        cliente_doc = venda.empresa.cnpj or ""
-        cliente_telefone = venda.empresa.telefone or ""
-        cliente_email = venda.empresa.email or ""
-    
-    # Criar tabela com 2 colunas de informações
-    info_data = []
-    
-    # Linha 1: Data de Entrada | Cliente
-    info_data.append([
-        Paragraph("<b>Data de Entrada:</b>", style_label),
-        Paragraph(venda.data_entrada.strftime('%d/%m/%Y'), style_valor),
-        Paragraph("<b>Cliente:</b>", style_label),
-        Paragraph(cliente_nome, style_valor)
-    ])
-    
-    # Linha 2: Status | Documento
-    tipo_doc_cliente = "CPF" if venda.cliente else "CNPJ"
-    info_data.append([
-        Paragraph("<b>Status:</b>", style_label),
-        Paragraph(venda.get_status_display(), style_valor),
-        Paragraph(f"<b>{tipo_doc_cliente}:</b>", style_label),
-        Paragraph(cliente_doc or "-", style_valor)
-    ])
-    
-    # Linha 3: Forma de Pagamento | Telefone
-    info_data.append([
-        Paragraph("<b>Forma de Pagamento:</b>", style_label),
-        Paragraph(venda.get_forma_pagamento_display() if venda.forma_pagamento else "-", style_valor),
-        Paragraph("<b>Telefone:</b>", style_label),
-        Paragraph(cliente_telefone or "-", style_valor)
-    ])
-    
-    # Linha 4: Conclusão | Email (se houver)
-    if venda.data_conclusao or cliente_email:
-        info_data.append([
-            Paragraph("<b>Data de Conclusão:</b>", style_label),
-            Paragraph(venda.data_conclusao.strftime('%d/%m/%Y') if venda.data_conclusao else "-", style_valor),
-            Paragraph("<b>E-mail:</b>", style_label),
-            Paragraph(cliente_email or "-", style_valor)
-        ])
-    
-    # Tabela de informações estruturada
-    info_table = Table(info_data, colWidths=[3.5*cm, 5*cm, 3*cm, 6*cm])
-    info_table.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('BACKGROUND', (0, 0), (-1, -1), COR_FUNDO),
-        ('BOX', (0, 0), (-1, -1), 0.5, COR_BORDA),
-        ('LINEBELOW', (0, 0), (-1, -2), 0.5, COR_BORDA),
-        ('LINEBEFORE', (2, 0), (2, -1), 0.5, COR_BORDA),
-    ]))
-    elements.append(info_table)
-    elements.append(Spacer(1, 15))
-    
-    # ===== TABELA DE ITENS =====
-    elements.append(Paragraph("SERVIÇOS E PRODUTOS", style_secao_titulo))
-    
-    # Cabeçalho da tabela
-    dados_itens = [
-        [Paragraph("<b>#</b>", style_info),
-         Paragraph("<b>DESCRIÇÃO</b>", style_info),
-         Paragraph("<b>QTD</b>", style_info),
-         Paragraph("<b>VALOR UNIT.</b>", style_info),
-         Paragraph("<b>TOTAL</b>", style_info)]
-    ]
-    
-    for idx, item in enumerate(venda.itens.all(), 1):
-        tipo_badge = "[SERVIÇO]" if item.item.tipo == 'servico' else "[PRODUTO]"
-        nome_item = item.item.nome
-        descricao_item = item.item.descricao
-        descricao_adicional = item.descricao_adicional
-        
-        conteudo_descricao = f"<font size='7' color='#718096'>{tipo_badge}</font> <b>{nome_item}</b>"
-        if descricao_item:
-            conteudo_descricao += f"<br/><font size='8' color='#4a5568'><i>{descricao_item}</i></font>"
-        if descricao_adicional:
-            conteudo_descricao += f"<br/><font size='8' color='#2b6cb0'>Obs: {descricao_adicional}</font>"
-        
-        dados_itens.append([
-            Paragraph(str(idx), style_info),
-            Paragraph(conteudo_descricao, style_info),
-            Paragraph(str(item.quantidade), style_info),
-            Paragraph(f"R$ {item.valor_unitario:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), style_info),
-            Paragraph(f"R$ {item.total:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), style_info)
-        ])
-    
-    tabela_itens = Table(dados_itens, colWidths=[1*cm, 9*cm, 1.5*cm, 3*cm, 3*cm])
-    tabela_itens.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), COR_SECUNDARIA),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-        ('ALIGN', (2, 1), (2, -1), 'CENTER'),
-        ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('TOPPADDING', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-        ('TOPPADDING', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, COR_FUNDO]),
-        ('GRID', (0, 0), (-1, -1), 0.5, COR_BORDA),
-        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
-    ]))
-    elements.append(tabela_itens)
-    elements.append(Spacer(1, 15))
-    
-    # ===== RESUMO FINANCEIRO =====
-    subtotal = venda.subtotal
-    desconto_valor = venda.valor_desconto
-    total = venda.total
-    
-    resumo_data = []
-    resumo_data.append(['', '', Paragraph("Subtotal:", style_info), 
-                        Paragraph(f"R$ {subtotal:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), style_info)])
-    
-    if venda.desconto > 0:
-        resumo_data.append(['', '', Paragraph(f"Desconto ({venda.desconto}%):", style_info),
-                          Paragraph(f"- R$ {desconto_valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), 
-                                   ParagraphStyle('Desc', parent=style_info, textColor=colors.HexColor('#e53e3e')))])
-    
-    tabela_resumo = Table(resumo_data, colWidths=[8*cm, 3*cm, 3.5*cm, 3*cm])
-    tabela_resumo.setStyle(TableStyle([
-        ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
-        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
-    elements.append(tabela_resumo)
-    
-    # Total em destaque
-    elements.append(Spacer(1, 5))
-    total_box = Table(
-        [['', Paragraph("VALOR TOTAL", style_total_label),
-          Paragraph(f"R$ {total:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), style_total_valor)]],
-        colWidths=[8*cm, 5*cm, 4.5*cm]
-    )
-    total_box.setStyle(TableStyle([
-        ('BACKGROUND', (1, 0), (-1, 0), COR_FUNDO),
-        ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-        ('ALIGN', (2, 0), (2, 0), 'RIGHT'),
-        ('TOPPADDING', (1, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (1, 0), (-1, 0), 12),
-        ('LEFTPADDING', (1, 0), (-1, 0), 15),
-        ('RIGHTPADDING', (1, 0), (-1, 0), 15),
-        ('BOX', (1, 0), (-1, 0), 1.5, COR_PRIMARIA),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    elements.append(total_box)
-    
-    # ===== OBSERVAÇÕES =====
-    if venda.observacoes:
-        elements.append(Spacer(1, 20))
-        elements.append(Paragraph("OBSERVAÇÕES", style_secao_titulo))
-        obs_box = Table(
-            [[Paragraph(venda.observacoes.replace('\n', '<br/>'), style_info)]],
-            colWidths=[17.5*cm]
-        )
-        obs_box.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), COR_FUNDO),
-            ('BOX', (0, 0), (-1, -1), 0.5, COR_BORDA),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-        ]))
-        elements.append(obs_box)
-    
-    # ===== MENSAGEM DE AGRADECIMENTO =====
-    elements.append(Spacer(1, 30))
-    elements.append(Paragraph("Obrigado pela preferência!", style_agradecimento))
-    
-    # ===== RODAPÉ =====
-    elements.append(Spacer(1, 20))
-    elements.append(HRFlowable(width="100%", thickness=1, color=COR_BORDA, spaceAfter=10))
-    
-    doc.build(elements)
-    
-    buffer.seek(0)
-    return buffer
-    
-    rodape_texto = f"{nome_empresa}"
-    if config:
-        partes_rodape = []
-        if config.endereco:
-            partes_rodape.append(config.endereco)
-        if config.telefone:
-            partes_rodape.append(f"Tel: {config.telefone}")
-        if config.email:
-            partes_rodape.append(config.email)
-        if partes_rodape:
-            rodape_texto += "<br/>" + " • ".join(partes_rodape)
-    
-    elements.append(Paragraph(rodape_texto, style_rodape))
-    
-    # Gerar PDF
-    doc.build(elements)
-    
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'inline; filename="Comprovante_{venda.numero}.pdf"'
-    
-    return response
@@ -0,0 +1,142 @@
+"""
+PDF do orçamento (ReportLab).
+
+Importado só dentro das views que geram o PDF: o ReportLab leva mais de
+100 ms para importar e não entra na subida dos workers nem nas outras
+páginas.
+"""
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from apps.core.instrumentacao import medir
+from apps.core.models import ConfiguracaoEmpresa
+
+
+def montar_pdf_orcamento(orcamento):
+    """PDF do orçamento, num buffer já posicionado no início."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
+    
+    elements = []
+    styles = getSampleStyleSheet()
+    
+    titulo_style = ParagraphStyle(
+        'TituloStyle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        alignment=TA_CENTER,
+        spaceAfter=20
+    )
+    
+    normal_style = ParagraphStyle(
+        'NormalStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6
+    )
+    
+    item_cell_style = ParagraphStyle(
+        'ItemCellStyle',
+        parent=styles['Normal'],
+        fontSize=9,
+        leading=12
+    )
+    
+    config = ConfiguracaoEmpresa.obter()
+    if config:
+        empresa_nome = config.nome
+        empresa_info = f"{config.endereco}\nTel: {config.telefone}\nEmail: {config.email}"
+        if config.cnpj:
+            empresa_info += f"\nCNPJ: {config.cnpj}"
+    else:
+        empresa_nome = "Tornearia Jair"
+        empresa_info = ""
+    
+    elements.append(Paragraph(empresa_nome, titulo_style))
+    if empresa_info:
+        elements.append(Paragraph(empresa_info.replace('\n', '<br/>'), normal_style))
+    elements.append(Spacer(1, 20))
+    
+    elements.append(Paragraph(f"<b>ORÇAMENTO {orcamento.numero}</b>", titulo_style))
+    elements.append(Spacer(1, 10))
+    
+    info_style = ParagraphStyle('InfoStyle', parent=styles['Normal'], fontSize=10)
+    
+    destinatario = orcamento.empresa or orcamento.cliente
+    elements.append(Paragraph(f"<b>Cliente:</b> {destinatario.nome if destinatario else 'Não informado'}", info_style))
+    
+    if orcamento.empresa and orcamento.empresa.cnpj:
+        elements.append(Paragraph(f"<b>CNPJ:</b> {orcamento.empresa.cnpj}", info_style))
+    elif orcamento.cliente and orcamento.cliente.cpf:
+        elements.append(Paragraph(f"<b>CPF:</b> {orcamento.cliente.cpf}", info_style))
+    
+    elements.append(Paragraph(f"<b>Data de Emissão:</b> {orcamento.data_emissao.strftime('%d/%m/%Y')}", info_style))
+    elements.append(Paragraph(f"<b>Validade:</b> {orcamento.validade.strftime('%d/%m/%Y')}", info_style))
+    elements.append(Spacer(1, 20))
+    
+    data = [['Item / Descrição', 'Qtd', 'Valor Unit.', 'Total']]
+    for item in orcamento.itens.all():
+        nome_item = item.item.nome
+        descricao_item = item.item.descricao
+        descricao_adicional = item.descricao_adicional
+        
+        item_content = f"<b>{nome_item}</b>"
+        if descricao_item:
+            item_content += f"<br/><i><font size='8' color='#4b5563'>{descricao_item}</font></i>"
+        if descricao_adicional:
+            item_content += f"<br/><font size='8' color='#059669'>Obs: {descricao_adicional}</font>"
+        
+        data.append([
+            Paragraph(item_content, item_cell_style),
+            str(item.quantidade),
+            f"R$ {item.valor_unitario:.2f}",
+            f"R$ {item.total:.2f}"
+        ])
+    
+    table = Table(data, colWidths=[9*cm, 1.5*cm, 3*cm, 3*cm])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+        ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f9fafb')),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('TOPPADDING', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
+    ]))
+    elements.append(table)
+    elements.append(Spacer(1, 20))
+    
+    totais_style = ParagraphStyle('TotaisStyle', parent=styles['Normal'], fontSize=11, alignment=TA_RIGHT)
+    elements.append(Paragraph(f"<b>Subtotal:</b> R$ {orcamento.subtotal:.2f}", totais_style))
+    if orcamento.desconto > 0:
+        elements.append(Paragraph(f"<b>Desconto ({orcamento.desconto}%):</b> - R$ {orcamento.valor_desconto:.2f}", totais_style))
+    elements.append(Paragraph(f"<b>TOTAL:</b> R$ {orcamento.total:.2f}", totais_style))
+    elements.append(Spacer(1, 30))
+    
+    if orcamento.condicoes_pagamento:
+        elements.append(Paragraph("<b>Condições de Pagamento:</b>", info_style))
+        elements.append(Paragraph(orcamento.condicoes_pagamento, normal_style))
+        elements.append(Spacer(1, 10))
+    
+    if orcamento.observacoes:
+        elements.append(Paragraph("<b>Observações:</b>", info_style))
+        elements.append(Paragraph(orcamento.observacoes, normal_style))
+    
+    with medir('pdf'):
+        doc.build(elements)
+    
+    buffer.seek(0)
+    return buffer
@@ -11,20 +11,15 @@ from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-
 from .models import Orcamento, ItemOrcamento
 from apps.cadastros.models import Cliente, Empresa
 from apps.servicos.models import Item
 from apps.financeiro.models import Venda, ItemVenda
-from apps.core.models import ConfiguracaoEmpresa
 
-from io import BytesIO
+
+def _orcamentos_para_pdf():
+    """Orçamentos com destinatário e itens já carregados para montar o PDF."""
+    return Orcamento.objects.select_related('cliente', 'empresa').prefetch_related('itens__item')
 
 
 class OrcamentoListView(LoginRequiredMixin, ListView):
@@ -34,7 +29,7 @@ class OrcamentoListView(LoginRequiredMixin, ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('cliente', 'empresa').prefetch_related('itens')
         busca = self.request.GET.get('busca')
         status = self.request.GET.get('status')
         
@@ -59,6 +54,9 @@ class OrcamentoDetailView(LoginRequiredMixin, DetailView):
     model = Orcamento
     template_name = 'orcamentos/orcamento_detail.html'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('cliente', 'empresa').prefetch_related('itens__item')
+
 
 class OrcamentoCreateView(LoginRequiredMixin, CreateView):
     model = Orcamento
@@ -216,117 +214,12 @@ def converter_orcamento_venda(request, pk):
 @login_required
 def gerar_pdf_orcamento(request, pk):
     """Gera PDF do orçamento."""
-    orcamento = get_object_or_404(Orcamento, pk=pk)
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
-    
-    elements = []
-    styles = getSampleStyleSheet()
+    # O ReportLab só é importado por quem gera PDF (veja pdf.py)
+    from .pdf import montar_pdf_orcamento
 
+    orcamento = get_object_or_404(_orcamentos_para_pdf(), pk=pk)
     
-    titulo_style = ParagraphStyle(
-        'TituloStyle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        alignment=TA_CENTER,
-        spaceAfter=20
-    )
-    
-    normal_style = ParagraphStyle(
-        'NormalStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=6
-    )
-    
-    try:
-        config = ConfiguracaoEmpresa.objects.get(pk=1)
-        empresa_nome = config.nome
-        empresa_info = f"{config.endereco}\nTel: {config.telefone}\nEmail: {config.email}"
-        if config.cnpj:
-            empresa_info += f"\nCNPJ: {config.cnpj}"
-    except ConfiguracaoEmpresa.DoesNotExist:
-        empresa_nome = "Tornearia Jair"
-        empresa_info = ""
-    
-    elements.append(Paragraph(empresa_nome, titulo_style))
-    if empresa_info:
-        elements.append(Paragraph(empresa_info.replace('\n', '<br/>'), normal_style))
-    elements.append(Spacer(1, 20))
-    
-    elements.append(Paragraph(f"<b>ORÇAMENTO {orcamento.numero}</b>", titulo_style))
-    elements.append(Spacer(1, 10))
-    
-    info_style = ParagraphStyle('InfoStyle', parent=styles['Normal'], fontSize=10)
-    
-    destinatario = orcamento.empresa or orcamento.cliente
-    elements.append(Paragraph(f"<b>Cliente:</b> {destinatario.nome if destinatario else 'Não informado'}", info_style))
-    
-    if orcamento.empresa and orcamento.empresa.cnpj:
-        elements.append(Paragraph(f"<b>CNPJ:</b> {orcamento.empresa.cnpj}", info_style))
-    elif orcamento.cliente and orcamento.cliente.cpf:
-        elements.append(Paragraph(f"<b>CPF:</b> {orcamento.cliente.cpf}", info_style))
-    
-    elements.append(Paragraph(f"<b>Data de Emissão:</b> {orcamento.data_emissao.strftime('%d/%m/%Y')}", info_style))
-    elements.append(Paragraph(f"<b>Validade:</b> {orcamento.validade.strftime('%d/%m/%Y')}", info_style))
-    elements.append(Spacer(1, 20))
-    
-    data = [['Item', 'Descrição', 'Qtd', 'Valor Unit.', 'Total']]
-    for item in orcamento.itens.all():
-        data.append([
-            item.item.nome,
-            item.descricao_adicional or item.item.descricao or '-',
-            str(item.quantidade),
-            f"R$ {item.valor_unitario:.2f}",
-            f"R$ {item.total:.2f}"
-        ])
-    
-    table = Table(data, colWidths=[4*cm, 6*cm, 1.5*cm, 2.5*cm, 2.5*cm])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (1, 1), (1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f9fafb')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('TOPPADDING', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-    
-    totais_style = ParagraphStyle('TotaisStyle', parent=styles['Normal'], fontSize=11, alignment=TA_RIGHT)
-    elements.append(Paragraph(f"<b>Subtotal:</b> R$ {orcamento.subtotal:.2f}", totais_style))
-    if orcamento.desconto > 0:
-        elements.append(Paragraph(f"<b>Desconto ({orcamento.desconto}%):</b> - R$ {orcamento.valor_desconto:.2f}", totais_style))
-    elements.append(Paragraph(f"<b>TOTAL:</b> R$ {orcamento.total:.2f}", totais_style))
-    elements.append(Spacer(1, 30))
-    
-    if orcamento.condicoes_pagamento:
-        elements.append(Paragraph("<b>Condições de Pagamento:</b>", info_style))
-        elements.append(Paragraph(orcamento.condicoes_pagamento, normal_style))
-        elements.append(Spacer(1, 10))
-    
-    if orcamento.observacoes:
-        elements.append(Paragraph("<b>Observações:</b>", info_style))
-        elements.append(Paragraph(orcamento.observacoes, normal_style))
-    
-    doc.build(elements)
-    
-    buffer.seek(0)
-    return buffer
-
-@login_required
-def gerar_pdf_orcamento(request, pk):
-    """Gera PDF do orçamento."""
-    orcamento = get_object_or_404(Orcamento, pk=pk)
-    
-    buffer = _gerar_pdf_bytes(orcamento)
+    buffer = montar_pdf_orcamento(orcamento)
     response = HttpResponse(buffer, content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="orcamento_{orcamento.numero}.pdf"'
     return response
@@ -334,7 +227,7 @@ def gerar_pdf_orcamento(request, pk):
 @login_required
 def enviar_email_orcamento(request, pk):
     """Envia o orçamento por e-mail com PDF anexo."""
-    orcamento = get_object_or_404(Orcamento, pk=pk)
+    orcamento = get_object_or_404(_orcamentos_para_pdf(), pk=pk)
     
     destinatario_email = None
     destinatario_nome = "Cliente"
@@ -352,7 +245,9 @@ def enviar_email_orcamento(request, pk):
         
     try:
         # Gerar PDF
-        pdf_buffer = _gerar_pdf_bytes(orcamento)
+        from .pdf import montar_pdf_orcamento
+
+        pdf_buffer = montar_pdf_orcamento(orcamento)
         pdf_content = pdf_buffer.getvalue()
         
         assunto = f"Orçamento {orcamento.numero} - Tornearia Jair"
@@ -379,125 +274,3 @@ Tornearia Jair
         messages.error(request, f'Erro ao enviar e-mail: {str(e)}')
         
     return redirect('orcamentos:orcamento_detail', pk=pk)
-
-def _gerar_pdf_bytes(orcamento):
-    """Função auxiliar para gerar o PDF do orçamento e retornar o buffer."""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    titulo_style = ParagraphStyle(
-        'TituloStyle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        alignment=TA_CENTER,
-        spaceAfter=20
-    )
-    
-    normal_style = ParagraphStyle(
-        'NormalStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=6
-    )
-    
-    item_cell_style = ParagraphStyle(
-        'ItemCellStyle',
-        parent=styles['Normal'],
-        fontSize=9,
-        leading=12
-    )
-    
-    try:
-        config = ConfiguracaoEmpresa.objects.get(pk=1)
-        empresa_nome = config.nome
-        empresa_info = f"{config.endereco}\nTel: {config.telefone}\nEmail: {config.email}"
-        if config.cnpj:
-            empresa_info += f"\nCNPJ: {config.cnpj}"
-    except ConfiguracaoEmpresa.DoesNotExist:
-        empresa_nome = "Tornearia Jair"
-        empresa_info = ""
-    
-    elements.append(Paragraph(empresa_nome, titulo_style))
-    if empresa_info:
-        elements.append(Paragraph(empresa_info.replace('\n', '<br/>'), normal_style))
-    elements.append(Spacer(1, 20))
-    
-    elements.append(Paragraph(f"<b>ORÇAMENTO {orcamento.numero}</b>", titulo_style))
-    elements.append(Spacer(1, 10))
-    
-    info_style = ParagraphStyle('InfoStyle', parent=styles['Normal'], fontSize=10)
-    
-    destinatario = orcamento.empresa or orcamento.cliente
-    elements.append(Paragraph(f"<b>Cliente:</b> {destinatario.nome if destinatario else 'Não informado'}", info_style))
-    
-    if orcamento.empresa and orcamento.empresa.cnpj:
-        elements.append(Paragraph(f"<b>CNPJ:</b> {orcamento.empresa.cnpj}", info_style))
-    elif orcamento.cliente and orcamento.cliente.cpf:
-        elements.append(Paragraph(f"<b>CPF:</b> {orcamento.cliente.cpf}", info_style))
-    
-    elements.append(Paragraph(f"<b>Data de Emissão:</b> {orcamento.data_emissao.strftime('%d/%m/%Y')}", info_style))
-    elements.append(Paragraph(f"<b>Validade:</b> {orcamento.validade.strftime('%d/%m/%Y')}", info_style))
-    elements.append(Spacer(1, 20))
-    
-    data = [['Item / Descrição', 'Qtd', 'Valor Unit.', 'Total']]
-    for item in orcamento.itens.all():
-        nome_item = item.item.nome
-        descricao_item = item.item.descricao
-        descricao_adicional = item.descricao_adicional
-        
-        item_content = f"<b>{nome_item}</b>"
-        if descricao_item:
-            item_content += f"<br/><i><font size='8' color='#4b5563'>{descricao_item}</font></i>"
-        if descricao_adicional:
-            item_content += f"<br/><font size='8' color='#059669'>Obs: {descricao_adicional}</font>"
-        
-        data.append([
-            Paragraph(item_content, item_cell_style),
-            str(item.quantidade),
-            f"R$ {item.valor_unitario:.2f}",
-            f"R$ {item.total:.2f}"
-        ])
-    
-    table = Table(data, colWidths=[9*cm, 1.5*cm, 3*cm, 3*cm])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f9fafb')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('TOPPADDING', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-    
-    totais_style = ParagraphStyle('TotaisStyle', parent=styles['Normal'], fontSize=11, alignment=TA_RIGHT)
-    elements.append(Paragraph(f"<b>Subtotal:</b> R$ {orcamento.subtotal:.2f}", totais_style))
-    if orcamento.desconto > 0:
-        elements.append(Paragraph(f"<b>Desconto ({orcamento.desconto}%):</b> - R$ {orcamento.valor_desconto:.2f}", totais_style))
-    elements.append(Paragraph(f"<b>TOTAL:</b> R$ {orcamento.total:.2f}", totais_style))
-    elements.append(Spacer(1, 30))
-    
-    if orcamento.condicoes_pagamento:
-        elements.append(Paragraph("<b>Condições de Pagamento:</b>", info_style))
-        elements.append(Paragraph(orcamento.condicoes_pagamento, normal_style))
-        elements.append(Spacer(1, 10))
-    
-    if orcamento.observacoes:
-        elements.append(Paragraph("<b>Observações:</b>", info_style))
-        elements.append(Paragraph(orcamento.observacoes, normal_style))
-    
-    doc.build(elements)
-    
-    buffer.seek(0)
-    return buffer
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Item
+from .models import Item, HistoricoPreco, MovimentoEstoque, PosicaoEstoque
 
 
 @admin.register(Item)
@@ -13,3 +13,36 @@ class ItemAdmin(admin.ModelAdmin):
         return obj.estoque_baixo
     estoque_baixo.boolean = True
     estoque_baixo.short_description = 'Estoque Baixo'
+
+
+@admin.register(HistoricoPreco)
+class HistoricoPrecoAdmin(admin.ModelAdmin):
+    list_display = ('item', 'preco', 'vigente_desde', 'origem', 'descricao')
+    list_filter = ('origem',)
+    search_fields = ('item__nome',)
+    date_hierarchy = 'vigente_desde'
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MovimentoEstoque)
+class MovimentoEstoqueAdmin(admin.ModelAdmin):
+    list_display = ('item', 'tipo', 'quantidade', 'data', 'item_venda', 'observacao')
+    list_filter = ('tipo',)
+    search_fields = ('item__nome', 'observacao')
+    date_hierarchy = 'data'
+    raw_id_fields = ('item', 'item_venda')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PosicaoEstoque)
+class PosicaoEstoqueAdmin(admin.ModelAdmin):
+    list_display = ('item', 'data', 'quantidade')
+    search_fields = ('item__nome',)
+    date_hierarchy = 'data'
+
+    def has_change_permission(self, request, obj=None):
+        return False
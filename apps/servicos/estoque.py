@@ -0,0 +1,78 @@
+"""
+Posições periódicas e conciliação do livro de estoque.
+
+O estoque de um item em uma data é a última posição registrada até a data
+mais os movimentos posteriores (`MovimentoEstoque.quantidades_em`). As
+posições são gravadas periodicamente pelo comando `registrar_posicao_estoque`
+e a conciliação compara o saldo do livro com `Item.quantidade_estoque`.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Item, MovimentoEstoque, PosicaoEstoque
+
+
+# Itens calculados por consulta
+LOTE = 500
+
+
+def quantidades_em(momento, itens=None):
+    """{item_id: quantidade no momento} para os itens do queryset (todos por padrão)."""
+    ids = list((itens if itens is not None else Item.objects.all()).values_list('pk', flat=True))
+    quantidades = {}
+    for inicio in range(0, len(ids), LOTE):
+        quantidades.update(MovimentoEstoque.quantidades_em(ids[inicio:inicio + LOTE], momento))
+    return quantidades
+
+
+def registrar_posicoes(momento=None, itens=None):
+    """Grava a posição de estoque de cada item no momento. Devolve quantas foram gravadas."""
+    momento = momento or timezone.now()
+    posicoes = [
+        PosicaoEstoque(item_id=item_id, data=momento, quantidade=quantidade)
+        for item_id, quantidade in quantidades_em(momento, itens).items()
+    ]
+    PosicaoEstoque.objects.bulk_create(posicoes, batch_size=1000, ignore_conflicts=True)
+    return len(posicoes)
+
+
+def divergencias(itens=None):
+    """
+    Produtos cujo estoque cadastrado difere do saldo do livro de estoque, como
+    dicionários com item_id, nome, cadastrado, livro e diferenca. Serviços
+    não têm livro de estoque e ficam de fora.
+    """
+    itens = (itens if itens is not None else Item.objects.all()).filter(tipo='produto')
+    livro = quantidades_em(timezone.now(), itens)
+    resultado = []
+    for item_id, nome, cadastrado in itens.values_list('pk', 'nome', 'quantidade_estoque').order_by('nome'):
+        saldo = livro.get(item_id, 0)
+        if saldo != cadastrado:
+            resultado.append({
+                'item_id': item_id,
+                'nome': nome,
+                'cadastrado': cadastrado,
+                'livro': saldo,
+                'diferenca': cadastrado - saldo,
+            })
+    return resultado
+
+
+def corrigir(divergentes):
+    """Registra ajustes que levam o livro ao estoque cadastrado. Devolve quantos foram gravados."""
+    agora = timezone.now()
+    with transaction.atomic():
+        MovimentoEstoque.objects.bulk_create(
+            [
+                MovimentoEstoque(
+                    item_id=d['item_id'],
+                    tipo='ajuste',
+                    quantidade=d['diferenca'],
+                    observacao='Conciliação do livro de estoque',
+                    data=agora,
+                )
+                for d in divergentes
+            ],
+            batch_size=1000,
+        )
+    return len(divergentes)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.servicos.estoque import corrigir, divergencias
+
+
+class Command(BaseCommand):
+    help = 'Compara o estoque cadastrado de cada item com o saldo do livro de estoque.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--corrigir', action='store_true',
+            help='Registra ajustes no livro para igualá-lo ao estoque cadastrado.'
+        )
+
+    def handle(self, *args, **options):
+        divergentes = divergencias()
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS('Livro de estoque conciliado: nenhuma divergência.'))
+            return
+
+        for d in divergentes:
+            self.stdout.write(
+                f"#{d['item_id']} {d['nome']}: cadastrado {d['cadastrado']}, "
+                f"livro {d['livro']} (diferença {d['diferenca']:+d})"
+            )
+        if options['corrigir']:
+            total = corrigir(divergentes)
+            self.stdout.write(self.style.SUCCESS(f'{total} ajuste(s) registrado(s) no livro de estoque.'))
+        else:
+            # CommandError sai com código 1 para uso em rotinas agendadas
+            raise CommandError(
+                f'{len(divergentes)} item(ns) com divergência. Use --corrigir para registrar os ajustes.'
+            )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.servicos.estoque import registrar_posicoes
+
+
+class Command(BaseCommand):
+    help = (
+        'Grava a posição atual do estoque de cada item, calculada pelo livro de estoque. '
+        'Deve rodar periodicamente (ex.: diariamente) para que o estoque em uma data '
+        'seja calculado a partir da última posição.'
+    )
+
+    def handle(self, *args, **options):
+        total = registrar_posicoes()
+        self.stdout.write(self.style.SUCCESS(f'{total} posição(ões) de estoque registrada(s).'))
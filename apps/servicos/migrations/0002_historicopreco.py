@@ -0,0 +1,100 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def registrar_precos_atuais(apps, schema_editor):
+    Item = apps.get_model("servicos", "Item")
+    HistoricoPreco = apps.get_model("servicos", "HistoricoPreco")
+    HistoricoPreco.objects.bulk_create(
+        (
+            HistoricoPreco(
+                item_id=item_id,
+                preco=preco,
+                vigente_desde=criado_em,
+                origem="cadastro",
+            )
+            for item_id, preco, criado_em in Item.objects.values_list(
+                "pk", "preco", "created_at"
+            ).iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("servicos", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HistoricoPreco",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "preco",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Preço"
+                    ),
+                ),
+                (
+                    "vigente_desde",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Vigente desde"
+                    ),
+                ),
+                (
+                    "origem",
+                    models.CharField(
+                        choices=[
+                            ("cadastro", "Cadastro"),
+                            ("edicao", "Edição"),
+                            ("reajuste", "Reajuste em lote"),
+                            ("importacao", "Importação"),
+                        ],
+                        max_length=15,
+                        verbose_name="Origem",
+                    ),
+                ),
+                (
+                    "descricao",
+                    models.CharField(
+                        blank=True, max_length=200, verbose_name="Descrição"
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="historico_precos",
+                        to="servicos.item",
+                        verbose_name="Item",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Histórico de Preço",
+                "verbose_name_plural": "Histórico de Preços",
+                "ordering": ["-vigente_desde", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["item", "-vigente_desde"],
+                        name="servicos_hi_item_id_2d30b6_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(registrar_precos_atuais, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,144 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def registrar_saldos_iniciais(apps, schema_editor):
+    Item = apps.get_model("servicos", "Item")
+    MovimentoEstoque = apps.get_model("servicos", "MovimentoEstoque")
+    agora = django.utils.timezone.now()
+    MovimentoEstoque.objects.bulk_create(
+        (
+            MovimentoEstoque(
+                item_id=item_id,
+                tipo="ajuste",
+                quantidade=quantidade,
+                observacao="Saldo inicial do livro de estoque",
+                data=agora,
+            )
+            for item_id, quantidade in Item.objects.filter(tipo="produto")
+            .exclude(quantidade_estoque=0)
+            .values_list("pk", "quantidade_estoque")
+            .iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financeiro", "0005_saldocliente"),
+        ("servicos", "0002_historicopreco"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PosicaoEstoque",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data", models.DateTimeField(verbose_name="Data")),
+                ("quantidade", models.IntegerField(verbose_name="Quantidade")),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="posicoes_estoque",
+                        to="servicos.item",
+                        verbose_name="Item",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Posição de Estoque",
+                "verbose_name_plural": "Posições de Estoque",
+                "ordering": ["-data"],
+            },
+        ),
+        migrations.CreateModel(
+            name="MovimentoEstoque",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("entrada", "Entrada"),
+                            ("saida", "Saída"),
+                            ("ajuste", "Ajuste"),
+                        ],
+                        max_length=10,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                ("quantidade", models.IntegerField(verbose_name="Quantidade")),
+                (
+                    "observacao",
+                    models.CharField(
+                        blank=True, max_length=200, verbose_name="Observação"
+                    ),
+                ),
+                (
+                    "data",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Data"
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="movimentos_estoque",
+                        to="servicos.item",
+                        verbose_name="Item",
+                    ),
+                ),
+                (
+                    "item_venda",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="movimentos_estoque",
+                        to="financeiro.itemvenda",
+                        verbose_name="Item da venda",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Movimento de Estoque",
+                "verbose_name_plural": "Movimentos de Estoque",
+                "ordering": ["-data", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["item", "data"], name="servicos_mo_item_id_610e4b_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="posicaoestoque",
+            constraint=models.UniqueConstraint(
+                fields=("item", "data"), name="posicao_estoque_unica"
+            ),
+        ),
+        migrations.RunPython(registrar_saldos_iniciais, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,16 @@
-from django.db import models
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from decimal import Decimal
 
 
+# Data anterior a qualquer movimento, usada quando o item ainda não tem posição
+INICIO_LIVRO = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
 class Item(models.Model):
     """Model unificado para serviços e produtos em estoque."""
     TIPO_CHOICES = [
@@ -42,6 +50,49 @@ class Item(models.Model):
         tipo_display = 'Serviço' if self.tipo == 'servico' else 'Produto'
         return f"[{tipo_display}] {self.nome}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._preco_original = instance.__dict__.get('preco')
+        instance._quantidade_original = instance.__dict__.get('quantidade_estoque')
+        instance._tipo_original = instance.__dict__.get('tipo')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Registra no histórico o preço de itens novos e as alterações de preço,
+        e no livro de estoque o estoque inicial e as alterações manuais dos
+        produtos (serviços não têm livro, como em `MovimentoEstoque.registrar`).
+        """
+        novo = self._state.adding
+        super().save(*args, **kwargs)
+        if novo or self.preco != getattr(self, '_preco_original', self.preco):
+            HistoricoPreco.objects.create(
+                item=self,
+                preco=self.preco,
+                origem='cadastro' if novo else 'edicao'
+            )
+        self._preco_original = self.preco
+
+        # Um serviço que vira produto começa o livro do zero
+        if novo or getattr(self, '_tipo_original', self.tipo) != 'produto':
+            anterior = 0
+        else:
+            anterior = getattr(self, '_quantidade_original', self.quantidade_estoque)
+        if self.tipo == 'produto' and anterior is not None and self.quantidade_estoque != anterior:
+            MovimentoEstoque.objects.create(
+                item=self,
+                tipo='entrada' if novo else 'ajuste',
+                quantidade=self.quantidade_estoque - anterior,
+                observacao='Estoque inicial' if novo else 'Alteração no cadastro do item'
+            )
+        self._quantidade_original = self.quantidade_estoque
+        self._tipo_original = self.tipo
+
+    def preco_em(self, momento):
+        """Preço vigente do item no momento informado."""
+        return HistoricoPreco.preco_em(self.pk, momento)
+
     @property
     def estoque_baixo(self):
         """Verifica se o estoque está abaixo do mínimo."""
@@ -49,13 +100,237 @@ class Item(models.Model):
             return self.quantidade_estoque <= self.estoque_minimo
         return False
 
-    def atualizar_estoque(self, quantidade, operacao='saida'):
-        """Atualiza o estoque do produto."""
+    def atualizar_estoque(self, quantidade, operacao='saida', item_venda=None, observacao=''):
+        """Atualiza o estoque do produto, registrando o movimento no livro de estoque."""
         if self.tipo != 'produto':
             return
-        
-        if operacao == 'saida':
-            self.quantidade_estoque = max(0, self.quantidade_estoque - quantidade)
-        else:
-            self.quantidade_estoque += quantidade
-        self.save()
+
+        saldos = MovimentoEstoque.registrar([MovimentoEstoque(
+            item_id=self.pk,
+            tipo=operacao if operacao in ('saida', 'ajuste') else 'entrada',
+            quantidade=quantidade,
+            item_venda=item_venda,
+            observacao=observacao
+        )])
+        self.quantidade_estoque = self._quantidade_original = saldos.get(self.pk, self.quantidade_estoque)
+
+    def quantidade_em(self, momento):
+        """Quantidade em estoque no momento informado, segundo o livro de estoque."""
+        return MovimentoEstoque.quantidades_em([self.pk], momento).get(self.pk, 0)
+
+
+class HistoricoPreco(models.Model):
+    """
+    Histórico de preços dos itens. Só recebe inserções: cada alteração de
+    preço gera uma nova linha vigente a partir de `vigente_desde`.
+    """
+    ORIGEM_CHOICES = [
+        ('cadastro', 'Cadastro'),
+        ('edicao', 'Edição'),
+        ('reajuste', 'Reajuste em lote'),
+        ('importacao', 'Importação'),
+    ]
+
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        verbose_name='Item',
+        related_name='historico_precos'
+    )
+    preco = models.DecimalField('Preço', max_digits=10, decimal_places=2)
+    vigente_desde = models.DateTimeField('Vigente desde', default=timezone.now)
+    origem = models.CharField('Origem', max_length=15, choices=ORIGEM_CHOICES)
+    descricao = models.CharField('Descrição', max_length=200, blank=True)
+
+    class Meta:
+        verbose_name = 'Histórico de Preço'
+        verbose_name_plural = 'Histórico de Preços'
+        ordering = ['-vigente_desde', '-id']
+        indexes = [models.Index(fields=['item', '-vigente_desde'])]
+
+    def __str__(self):
+        return f"{self.item.nome} - R$ {self.preco} desde {self.vigente_desde:%d/%m/%Y %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('O histórico de preços não pode ser alterado.')
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def preco_em(cls, item_id, momento):
+        """Preço vigente de um item no momento informado (None se ainda não existia)."""
+        return cls.objects.filter(
+            item_id=item_id, vigente_desde__lte=momento
+        ).order_by('-vigente_desde', '-id').values_list('preco', flat=True).first()
+
+    @classmethod
+    def precos_em(cls, item_ids, momento):
+        """{item_id: preço vigente no momento} para vários itens, em uma consulta."""
+        vigente = cls.objects.filter(
+            item_id=models.OuterRef('pk'), vigente_desde__lte=momento
+        ).order_by('-vigente_desde', '-id').values('preco')[:1]
+        return dict(
+            Item.objects.filter(pk__in=item_ids).annotate(
+                preco_vigente=models.Subquery(vigente)
+            ).values_list('pk', 'preco_vigente')
+        )
+
+
+class MovimentoEstoque(models.Model):
+    """
+    Livro de estoque. Só recebe inserções: a soma das quantidades de um item
+    é o seu estoque. Saídas têm quantidade negativa; quando uma saída é maior
+    que o estoque, o saldo é limitado a zero e a diferença fica registrada em
+    um ajuste logo em seguida.
+    """
+    TIPO_CHOICES = [
+        ('entrada', 'Entrada'),
+        ('saida', 'Saída'),
+        ('ajuste', 'Ajuste'),
+    ]
+
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        verbose_name='Item',
+        related_name='movimentos_estoque'
+    )
+    tipo = models.CharField('Tipo', max_length=10, choices=TIPO_CHOICES)
+    quantidade = models.IntegerField('Quantidade')
+    item_venda = models.ForeignKey(
+        'financeiro.ItemVenda',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Item da venda',
+        related_name='movimentos_estoque'
+    )
+    observacao = models.CharField('Observação', max_length=200, blank=True)
+    data = models.DateTimeField('Data', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Movimento de Estoque'
+        verbose_name_plural = 'Movimentos de Estoque'
+        ordering = ['-data', '-id']
+        indexes = [models.Index(fields=['item', 'data'])]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.quantidade:+d} - {self.item.nome}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Movimentos de estoque não podem ser alterados.')
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def registrar(cls, movimentos):
+        """
+        Aplica ao estoque e grava uma lista de movimentos ainda não salvos.
+
+        Em `movimentos`, entradas e saídas trazem a quantidade positiva e
+        ajustes trazem a diferença com sinal. Só produtos têm estoque; os
+        demais itens são ignorados. Os produtos envolvidos são travados, os
+        novos saldos gravados com um único UPDATE e os movimentos com
+        bulk_create. Devolve {item_id: novo saldo}.
+        """
+        movimentos = list(movimentos)
+        if not movimentos:
+            return {}
+        agora = timezone.now()
+        with transaction.atomic():
+            saldos = dict(
+                Item.objects.select_for_update().filter(
+                    pk__in={m.item_id for m in movimentos}, tipo='produto'
+                ).values_list('pk', 'quantidade_estoque')
+            )
+            originais = dict(saldos)
+            registros = []
+            for movimento in movimentos:
+                if movimento.item_id not in saldos:
+                    continue
+                if movimento.tipo == 'saida':
+                    movimento.quantidade = -abs(movimento.quantidade)
+                elif movimento.tipo == 'entrada':
+                    movimento.quantidade = abs(movimento.quantidade)
+                movimento.data = agora
+                registros.append(movimento)
+
+                saldo = saldos[movimento.item_id] + movimento.quantidade
+                if saldo < 0:
+                    registros.append(cls(
+                        item_id=movimento.item_id,
+                        tipo='ajuste',
+                        quantidade=-saldo,
+                        item_venda_id=movimento.item_venda_id,
+                        observacao='Saída maior que o estoque; saldo limitado a zero',
+                        data=agora
+                    ))
+                    saldo = 0
+                saldos[movimento.item_id] = saldo
+
+            alterados = {pk: saldo for pk, saldo in saldos.items() if saldo != originais[pk]}
+            if alterados:
+                Item.objects.filter(pk__in=alterados).update(
+                    quantidade_estoque=models.Case(
+                        *[models.When(pk=pk, then=models.Value(saldo)) for pk, saldo in alterados.items()],
+                        default=models.F('quantidade_estoque'),
+                        output_field=models.PositiveIntegerField()
+                    ),
+                    updated_at=agora
+                )
+            cls.objects.bulk_create(registros, batch_size=1000)
+        return saldos
+
+    @classmethod
+    def quantidades_em(cls, item_ids, momento):
+        """
+        {item_id: quantidade em estoque no momento} para vários itens, em uma
+        consulta: a última posição registrada até o momento mais os
+        movimentos posteriores a ela.
+        """
+        posicao = PosicaoEstoque.objects.filter(
+            item_id=models.OuterRef('pk'), data__lte=momento
+        ).order_by('-data')
+        movimentos = cls.objects.filter(
+            item_id=models.OuterRef('pk'),
+            data__gt=models.OuterRef('data_posicao'),
+            data__lte=momento
+        ).values('item_id').annotate(total=models.Sum('quantidade')).values('total')
+        return {
+            pk: quantidade + movimentado
+            for pk, quantidade, movimentado in Item.objects.filter(pk__in=item_ids).annotate(
+                data_posicao=Coalesce(
+                    models.Subquery(posicao.values('data')[:1]),
+                    models.Value(INICIO_LIVRO, output_field=models.DateTimeField())
+                ),
+                quantidade_posicao=Coalesce(models.Subquery(posicao.values('quantidade')[:1]), 0),
+                movimentado=Coalesce(models.Subquery(movimentos), 0),
+            ).values_list('pk', 'quantidade_posicao', 'movimentado')
+        }
+
+
+class PosicaoEstoque(models.Model):
+    """
+    Fotografia periódica do estoque de um item, calculada pelo livro de
+    estoque. Evita somar todos os movimentos do item para saber o estoque
+    em uma data.
+    """
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        verbose_name='Item',
+        related_name='posicoes_estoque'
+    )
+    data = models.DateTimeField('Data')
+    quantidade = models.IntegerField('Quantidade')
+
+    class Meta:
+        verbose_name = 'Posição de Estoque'
+        verbose_name_plural = 'Posições de Estoque'
+        ordering = ['-data']
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'data'], name='posicao_estoque_unica')
+        ]
+
+    def __str__(self):
+        return f"{self.item.nome}: {self.quantidade} em {self.data:%d/%m/%Y %H:%M}"
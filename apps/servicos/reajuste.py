@@ -0,0 +1,125 @@
+"""
+Reajuste de preços em lote.
+
+O novo preço é uma expressão sobre F('preco') aplicada com um único UPDATE;
+a mesma expressão é usada na prévia, então o que aparece na tela é
+exatamente o que será gravado. Cada item reajustado ganha uma linha em
+`HistoricoPreco`, gravadas com bulk_create.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Value
+from django.db.models.functions import Ceil, Greatest, Round
+from django.utils import timezone
+
+from .models import HistoricoPreco, Item
+
+
+PRECO = DecimalField(max_digits=10, decimal_places=2)
+
+PRECO_MINIMO = Decimal('0.01')
+# Maior preço que cabe na coluna (max_digits=10, decimal_places=2)
+PRECO_MAXIMO = Decimal('99999999.99')
+
+MODOS = [
+    ('percentual', 'Percentual (%)'),
+    ('valor', 'Valor fixo (R$)'),
+]
+
+ARREDONDAMENTOS = [
+    ('centavos', 'Centavos (0,01)'),
+    ('inteiro', 'Real inteiro (1,00)'),
+    ('cinquenta', 'Múltiplo de 0,50'),
+    ('noventa', 'Terminar em ,90'),
+]
+
+# Itens lidos por consulta ao gravar o histórico
+LOTE_HISTORICO = 500
+
+
+def _valor(numero):
+    return Value(Decimal(numero), output_field=PRECO)
+
+
+def filtrar_itens(tipo='', nome='', preco_min=None, preco_max=None, somente_ativos=True):
+    """Itens alcançados pelo reajuste."""
+    itens = Item.objects.all()
+    if somente_ativos:
+        itens = itens.filter(ativo=True)
+    if tipo:
+        itens = itens.filter(tipo=tipo)
+    if nome:
+        itens = itens.filter(nome__icontains=nome)
+    if preco_min is not None:
+        itens = itens.filter(preco__gte=preco_min)
+    if preco_max is not None:
+        itens = itens.filter(preco__lte=preco_max)
+    return itens
+
+
+def expressao_preco(modo, valor, arredondamento='centavos'):
+    """Expressão do novo preço a partir de F('preco'), já arredondada e nunca abaixo de 0,01."""
+    if modo == 'percentual':
+        novo = F('preco') * _valor(1 + Decimal(valor) / 100)
+    elif modo == 'valor':
+        novo = F('preco') + _valor(valor)
+    else:
+        raise ValueError(f'Modo de reajuste inválido: {modo}')
+
+    if arredondamento == 'inteiro':
+        novo = Round(novo)
+    elif arredondamento == 'cinquenta':
+        novo = Round(novo * _valor(2)) / _valor(2)
+    elif arredondamento == 'noventa':
+        # Próximo valor terminado em ,90 (10,00 -> 10,90; 10,95 -> 11,90)
+        novo = Ceil(novo + _valor('0.10')) - _valor('0.10')
+    elif arredondamento == 'centavos':
+        novo = Round(novo, 2)
+    else:
+        raise ValueError(f'Arredondamento inválido: {arredondamento}')
+
+    return ExpressionWrapper(Greatest(novo, _valor(PRECO_MINIMO)), output_field=PRECO)
+
+
+def previa(itens, modo, valor, arredondamento, limite=50):
+    """(total de itens, primeiros itens com `preco_novo` anotado)."""
+    anotados = itens.annotate(preco_novo=expressao_preco(modo, valor, arredondamento)).order_by('tipo', 'nome')
+    return itens.count(), list(anotados[:limite])
+
+
+def excede_preco_maximo(itens, modo, valor, arredondamento):
+    """Se algum item ficaria com preço maior do que a coluna comporta."""
+    maior = itens.aggregate(maior=Max(expressao_preco(modo, valor, arredondamento)))['maior']
+    return maior is not None and Decimal(maior) > PRECO_MAXIMO
+
+
+def aplicar(itens, modo, valor, arredondamento, descricao=''):
+    """
+    Aplica o reajuste aos itens do queryset e registra o histórico.
+    Devolve a quantidade de itens reajustados.
+    """
+    agora = timezone.now()
+    with transaction.atomic():
+        ids = list(itens.select_for_update().values_list('pk', flat=True))
+        if not ids:
+            return 0
+        # Só as linhas travadas são reajustadas: repetir o filtro alcançaria
+        # também itens inseridos ou alterados por outra transação depois da trava
+        historico = []
+        for inicio in range(0, len(ids), LOTE_HISTORICO):
+            lote = Item.objects.filter(pk__in=ids[inicio:inicio + LOTE_HISTORICO])
+            lote.update(
+                preco=expressao_preco(modo, valor, arredondamento),
+                updated_at=agora
+            )
+            for item_id, preco in lote.values_list('pk', 'preco'):
+                historico.append(HistoricoPreco(
+                    item_id=item_id,
+                    preco=Decimal(preco).quantize(Decimal('0.01')),
+                    vigente_desde=agora,
+                    origem='reajuste',
+                    descricao=descricao[:200],
+                ))
+        HistoricoPreco.objects.bulk_create(historico, batch_size=1000)
+    return len(ids)
@@ -6,8 +6,10 @@ app_name = 'servicos'
 urlpatterns = [
     path('', views.ItemListView.as_view(), name='item_list'),
     path('novo/', views.ItemCreateView.as_view(), name='item_create'),
+    path('reajuste/', views.reajuste_precos, name='reajuste_precos'),
     path('<int:pk>/', views.ItemDetailView.as_view(), name='item_detail'),
     path('<int:pk>/editar/', views.ItemUpdateView.as_view(), name='item_update'),
+    path('<int:pk>/estoque/', views.movimentar_estoque, name='movimentar_estoque'),
     path('<int:pk>/excluir/', views.ItemDeleteView.as_view(), name='item_delete'),
     
     # APIs
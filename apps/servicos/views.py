@@ -2,12 +2,18 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.http import JsonResponse
 from django.db.models import Q
+from django.utils import timezone
+from dateutil.relativedelta import relativedelta
 
-from .models import Item
+from apps.core.parametros import decimal_finito
+
+from .models import Item, MovimentoEstoque
+from . import reajuste
 
 
 class ItemListView(LoginRequiredMixin, ListView):
@@ -45,6 +51,24 @@ class ItemDetailView(LoginRequiredMixin, DetailView):
     model = Item
     template_name = 'servicos/item_detail.html'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Histórico de vendas dos últimos 12 meses (o corrente e os 11
+        # anteriores), lido dos resumos mensais; meses sem venda não têm linha
+        inicio = timezone.localdate().replace(day=1) - relativedelta(months=11)
+        historico = list(self.object.resumos_mensais.filter(
+            Q(ano__gt=inicio.year) | Q(ano=inicio.year, mes__gte=inicio.month)
+        ).order_by('-ano', '-mes'))
+        context['historico_vendas'] = historico
+        context['total_vendido'] = sum(r.quantidade for r in historico)
+        context['receita_historico'] = sum((r.receita_liquida for r in historico), 0)
+        context['historico_precos'] = self.object.historico_precos.all()[:10]
+        context['movimentos_estoque'] = self.object.movimentos_estoque.select_related(
+            'item_venda__venda'
+        )[:15]
+        context['tipos_movimento'] = MovimentoEstoque.TIPO_CHOICES
+        return context
+
 
 class ItemCreateView(LoginRequiredMixin, CreateView):
     model = Item
@@ -125,4 +149,82 @@ def obter_preco_item(request, pk):
     })
 
 
+# Maior valor de uma coluna integer no PostgreSQL
+QUANTIDADE_MAXIMA = 2 ** 31 - 1
+
+
+@login_required
+@require_POST
+def movimentar_estoque(request, pk):
+    """Entrada, saída ou ajuste manual de estoque de um produto."""
+    item = get_object_or_404(Item, pk=pk, tipo='produto')
+    tipo = request.POST.get('tipo')
+    try:
+        quantidade = int(request.POST.get('quantidade', ''))
+    except ValueError:
+        quantidade = 0
+    # Entradas e saídas usam quantidade positiva; ajustes aceitam sinal. O
+    # saldo resultante precisa caber na coluna inteira do banco.
+    if (
+        tipo not in dict(MovimentoEstoque.TIPO_CHOICES)
+        or not quantidade
+        or (tipo != 'ajuste' and quantidade < 0)
+        or abs(quantidade) > QUANTIDADE_MAXIMA - item.quantidade_estoque
+    ):
+        messages.error(request, 'Informe o tipo de movimento e uma quantidade válida.')
+        return redirect('servicos:item_detail', pk=pk)
+
+    item.atualizar_estoque(quantidade, tipo, observacao=request.POST.get('observacao', '').strip()[:200])
+    messages.success(request, f'Estoque atualizado: {item.quantidade_estoque} un.')
+    return redirect('servicos:item_detail', pk=pk)
+
+
 from django.db import models
+
+
+@login_required
+def reajuste_precos(request):
+    """Reajuste de preços em lote: o GET mostra a prévia e o POST aplica."""
+    dados = request.POST if request.method == 'POST' else request.GET
+    filtros = {
+        'tipo': dados.get('tipo', ''),
+        'nome': dados.get('nome', '').strip(),
+        'preco_min': decimal_finito(dados.get('preco_min', '')),
+        'preco_max': decimal_finito(dados.get('preco_max', '')),
+    }
+    modo = dados.get('modo', 'percentual')
+    arredondamento = dados.get('arredondamento', 'centavos')
+    valor = decimal_finito(dados.get('valor', ''))
+
+    context = {
+        'filtros': filtros,
+        'modo': modo,
+        'arredondamento': arredondamento,
+        'valor': dados.get('valor', ''),
+        'modos': reajuste.MODOS,
+        'arredondamentos': reajuste.ARREDONDAMENTOS,
+        'tipos': Item.TIPO_CHOICES,
+    }
+
+    parametros_validos = (
+        valor is not None
+        and modo in dict(reajuste.MODOS)
+        and arredondamento in dict(reajuste.ARREDONDAMENTOS)
+    )
+    if not parametros_validos:
+        if dados.get('valor'):
+            messages.error(request, 'Informe um valor de reajuste válido.')
+        return render(request, 'servicos/reajuste_precos.html', context)
+
+    itens = reajuste.filtrar_itens(**filtros)
+    if reajuste.excede_preco_maximo(itens, modo, valor, arredondamento):
+        messages.error(request, f'O reajuste deixaria preços acima de R$ {reajuste.PRECO_MAXIMO}.')
+        return render(request, 'servicos/reajuste_precos.html', context)
+    if request.method == 'POST':
+        descricao = f"{'%' if modo == 'percentual' else 'R$'} {valor} ({arredondamento})"
+        total = reajuste.aplicar(itens, modo, valor, arredondamento, descricao)
+        messages.success(request, f'{total} item(ns) reajustado(s) com sucesso!')
+        return redirect('servicos:item_list')
+
+    context['total'], context['previa'] = reajuste.previa(itens, modo, valor, arredondamento)
+    return render(request, 'servicos/reajuste_precos.html', context)
@@ -0,0 +1,38 @@
+// Copia os arquivos de terceiros instalados pelo npm para static/vendor,
+// com as versões fixadas no package.json. Rodar com `npm run vendor`.
+const fs = require('fs');
+const path = require('path');
+
+const raiz = path.resolve(__dirname, '..');
+const modulos = path.join(raiz, 'node_modules');
+const destino = path.join(raiz, 'static', 'vendor');
+
+const PESOS_INTER = [400, 500, 600, 700];
+
+function copiar(origem, alvo) {
+  const de = path.join(modulos, origem);
+  const para = path.join(destino, alvo);
+  fs.mkdirSync(path.dirname(para), { recursive: true });
+  fs.copyFileSync(de, para);
+  console.log(`${origem} -> static/vendor/${alvo}`);
+}
+
+fs.rmSync(destino, { recursive: true, force: true });
+
+copiar('chart.js/dist/chart.umd.js', 'chart.umd.min.js');
+copiar('alpinejs/dist/cdn.min.js', 'alpine.min.js');
+
+// Só o subconjunto latino da Inter, como no Google Fonts com display=swap
+const regras = PESOS_INTER.map((peso) => {
+  const arquivo = `inter-latin-${peso}-normal.woff2`;
+  copiar(`@fontsource/inter/files/${arquivo}`, `inter/${arquivo}`);
+  return `@font-face {
+  font-family: 'Inter';
+  font-style: normal;
+  font-display: swap;
+  font-weight: ${peso};
+  src: url('${arquivo}') format('woff2');
+}`;
+});
+fs.writeFileSync(path.join(destino, 'inter', 'inter.css'), regras.join('\n') + '\n');
+console.log('static/vendor/inter/inter.css gerado');
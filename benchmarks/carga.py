@@ -0,0 +1,753 @@
+"""
+Teste de carga HTTP com as jornadas de uso do sistema.
+
+Sobe um gunicorn local (ou usa um servidor já no ar com --url) e simula
+`--concorrencia` usuários que fazem login e repetem jornadas sorteadas
+pelo peso de cada uma: dashboard, listagens com filtros, autocomplete
+letra a letra, download de PDFs, nova venda com itens seguida de
+conclusão e comprovante, e logout/login. Cada usuário sorteia as jornadas
+com a própria semente, então duas execuções com os mesmos parâmetros e os
+mesmos dados fazem as mesmas requisições.
+
+Ao final grava um relatório JSON e um HTML com latência p50/p95/p99,
+vazão e taxa de erros por endpoint (nome da URL no Django). Com
+--comparar, o relatório mostra a variação em relação a uma execução
+anterior e o comando termina com código 1 se o p95 ou a taxa de erros de
+algum endpoint piorou além da tolerância.
+
+    DATABASE_URL=sqlite:////tmp/carga.db python manage.py gerar_dados_sinteticos --escala 0.1
+    DATABASE_URL=sqlite:////tmp/carga.db DEBUG=False python manage.py collectstatic --noinput
+    DATABASE_URL=sqlite:////tmp/carga.db DEBUG=False python -m benchmarks.carga --concorrencia 8 --duracao 60
+
+A jornada de nova venda grava vendas no banco: use um banco descartável.
+"""
+import argparse
+import html
+import http.client
+import json
+import os
+import random
+import re
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from .comum import RAIZ, RESULTADOS, ambiente, configurar_django, percentil, variacao, volumes_dos_dados
+
+
+JORNADAS_PADRAO = {
+    'painel': 25,
+    'listagens': 30,
+    'autocomplete': 20,
+    'pdf': 10,
+    'nova_venda': 10,
+    'login': 5,
+}
+CSRF_NO_FORMULARIO = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+# Diferenças de latência menores que isso são ruído, mesmo acima da tolerância
+VARIACAO_MINIMA_MS = 5
+# Endpoints com menos requisições que isso (em qualquer das execuções) não são comparados
+AMOSTRAS_MINIMAS = 20
+# Diferença relativa no volume de dados que ainda permite comparar (a jornada
+# de nova venda acrescenta vendas a cada execução)
+DIFERENCA_DADOS = 0.01
+
+
+class Sessao:
+    """
+    Um usuário virtual: guarda os próprios cookies e registra cada
+    requisição com o nome do endpoint. Os cookies são mantidos à mão (e não
+    com http.cookiejar) porque com DEBUG=False eles são marcados como
+    Secure e o teste fala HTTP com o gunicorn, informando HTTPS pelo
+    cabeçalho X-Forwarded-Proto como o proxy de produção.
+    """
+
+    def __init__(self, url, https, timeout, registrar):
+        partes = urlsplit(url)
+        self.host = partes.hostname
+        self.porta = partes.port or 80
+        self.origem = f"{'https' if https else 'http'}://{partes.netloc}"
+        self.cabecalhos = {'Host': partes.netloc, 'User-Agent': 'benchmarks.carga'}
+        if https:
+            self.cabecalhos['X-Forwarded-Proto'] = 'https'
+        self.timeout = timeout
+        self.registrar = registrar
+        self.cookies = {}
+        self.caminho_login = None
+
+    def requisitar(self, endpoint, metodo, caminho, dados=None):
+        """Faz a requisição e devolve (status, cabeçalhos, corpo); status 0 em falha de conexão."""
+        cabecalhos = dict(self.cabecalhos)
+        if self.cookies:
+            cabecalhos['Cookie'] = '; '.join(f'{nome}={valor}' for nome, valor in self.cookies.items())
+        corpo = None
+        if dados is not None:
+            corpo = urlencode(dados, doseq=True)
+            cabecalhos['Content-Type'] = 'application/x-www-form-urlencoded'
+            cabecalhos['Origin'] = self.origem
+            cabecalhos['Referer'] = self.origem + caminho
+
+        momento = time.monotonic()
+        inicio = time.perf_counter()
+        status, resposta_cabecalhos, conteudo = 0, {}, b''
+        conexao = http.client.HTTPConnection(self.host, self.porta, timeout=self.timeout)
+        try:
+            conexao.request(metodo, caminho, body=corpo, headers=cabecalhos)
+            resposta = conexao.getresponse()
+            conteudo = resposta.read()
+            status = resposta.status
+            for nome, valor in resposta.getheaders():
+                if nome.lower() == 'set-cookie':
+                    self._guardar_cookie(valor)
+                else:
+                    resposta_cabecalhos[nome.lower()] = valor
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conexao.close()
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+
+        # Voltar para o login no meio de uma jornada é sessão perdida
+        destino = resposta_cabecalhos.get('location', '')
+        perdeu_sessao = (
+            self.caminho_login and endpoint not in ('login', 'logout')
+            and status == 302 and urlsplit(destino).path == self.caminho_login
+        )
+        # GET e POST da mesma URL têm custos diferentes e são medidos separadamente
+        self.registrar(
+            endpoint if metodo == 'GET' else f'{endpoint} {metodo}',
+            momento, duracao_ms, status, status == 0 or status >= 400 or perdeu_sessao,
+        )
+        return status, resposta_cabecalhos, conteudo
+
+    def get(self, endpoint, caminho):
+        return self.requisitar(endpoint, 'GET', caminho)
+
+    def post(self, endpoint, caminho, dados):
+        return self.requisitar(endpoint, 'POST', caminho, dados)
+
+    def _guardar_cookie(self, valor):
+        cookie = SimpleCookie()
+        cookie.load(valor)
+        for nome, morsel in cookie.items():
+            if morsel['max-age'] == '0' or not morsel.value:
+                self.cookies.pop(nome, None)
+            else:
+                self.cookies[nome] = morsel.value
+
+
+def _csrf(conteudo):
+    encontrado = CSRF_NO_FORMULARIO.search(conteudo.decode('utf-8', 'replace'))
+    return encontrado.group(1) if encontrado else ''
+
+
+def _amostrar_ids(queryset, aleatorio, quantidade):
+    """Até `quantidade` pks do queryset sorteados sem carregar a tabela inteira."""
+    from django.db.models import Max, Min
+
+    limites = queryset.aggregate(menor=Min('pk'), maior=Max('pk'))
+    if limites['menor'] is None:
+        return []
+    candidatos = {aleatorio.randint(limites['menor'], limites['maior']) for _ in range(quantidade * 4)}
+    ids = sorted(queryset.filter(pk__in=candidatos).values_list('pk', flat=True))
+    return ids[:quantidade] or list(queryset.order_by('pk').values_list('pk', flat=True)[:quantidade])
+
+
+class Amostra:
+    """Registros do banco usados pelas jornadas, sorteados com a semente da execução."""
+
+    def __init__(self, aleatorio, quantidade=200):
+        from apps.cadastros.models import Cliente
+        from apps.financeiro.models import CategoriaDespesa, Venda
+        from apps.orcamentos.models import Orcamento
+        from apps.servicos.models import Item
+
+        itens = list(Item.objects.filter(ativo=True).order_by('pk').values_list('pk', 'nome', 'preco'))
+        clientes = list(Cliente.objects.filter(ativo=True).order_by('pk').values_list('pk', 'nome'))
+        if not itens or not clientes:
+            raise SystemExit(
+                'O banco precisa de itens e clientes ativos; gere dados com '
+                '`python manage.py gerar_dados_sinteticos`.'
+            )
+        self.itens = aleatorio.sample(itens, min(quantidade, len(itens)))
+        self.clientes = aleatorio.sample(clientes, min(quantidade, len(clientes)))
+        self.vendas_concluidas = _amostrar_ids(Venda.objects.filter(status='concluido'), aleatorio, quantidade)
+        self.orcamentos = _amostrar_ids(Orcamento.objects.all(), aleatorio, quantidade)
+        self.categorias = list(CategoriaDespesa.objects.order_by('pk').values_list('pk', flat=True))
+        self.paginas_vendas = max(1, min(Venda.objects.count() // 20, 50))
+
+
+class Jornadas:
+    """Jornadas de uso; cada método recebe a sessão e o sorteador do usuário virtual."""
+
+    def __init__(self, amostra, usuario, senha):
+        from django.urls import reverse
+
+        self.url = reverse
+        self.amostra = amostra
+        self.usuario = usuario
+        self.senha = senha
+
+    def entrar(self, sessao, aleatorio=None):
+        caminho = self.url('login')
+        sessao.caminho_login = caminho
+        _, _, pagina = sessao.get('login', caminho)
+        status, _, _ = sessao.post('login', caminho, {
+            'csrfmiddlewaretoken': _csrf(pagina),
+            'username': self.usuario,
+            'password': self.senha,
+        })
+        return status == 302
+
+    def login(self, sessao, aleatorio):
+        sessao.post('logout', self.url('logout'), {'csrfmiddlewaretoken': sessao.cookies.get('csrftoken', '')})
+        self.entrar(sessao)
+
+    def painel(self, sessao, aleatorio):
+        sessao.get('core:dashboard', self.url('core:dashboard'))
+        periodo = aleatorio.choice(['dia', 'semana', 'mes', 'ano'])
+        sessao.get('core:dashboard_data_api', f"{self.url('core:dashboard_data_api')}?periodo={periodo}")
+
+    def listagens(self, sessao, aleatorio):
+        amostra = self.amostra
+        termo = aleatorio.choice(amostra.clientes)[1].split()[0]
+        opcoes = [
+            ('financeiro:venda_list', {'status': aleatorio.choice(['concluido', 'em_andamento', 'cancelado'])}),
+            ('financeiro:venda_list', {'page': aleatorio.randint(1, amostra.paginas_vendas)}),
+            ('financeiro:venda_list', {'busca': termo}),
+            ('orcamentos:orcamento_list', {'status': aleatorio.choice(['pendente', 'aprovado', 'convertido'])}),
+            ('cadastros:cliente_list', {'busca': termo}),
+            ('servicos:item_list', {'busca': aleatorio.choice(amostra.itens)[1].split()[0], 'tipo': 'produto'}),
+        ]
+        if amostra.categorias:
+            opcoes.append(('financeiro:despesa_list', {'categoria': aleatorio.choice(amostra.categorias)}))
+        endpoint, filtros = aleatorio.choice(opcoes)
+        sessao.get(endpoint, f'{self.url(endpoint)}?{urlencode(filtros)}')
+
+    def autocomplete(self, sessao, aleatorio):
+        # Uma requisição por letra digitada, a partir da segunda
+        if aleatorio.random() < 0.5:
+            endpoint, nome = 'servicos:buscar_itens', aleatorio.choice(self.amostra.itens)[1]
+        else:
+            endpoint, nome = 'cadastros:buscar_cliente_empresa', aleatorio.choice(self.amostra.clientes)[1]
+        palavra = nome.split()[0]
+        for tamanho in range(2, min(len(palavra), 6) + 1):
+            sessao.get(endpoint, f'{self.url(endpoint)}?{urlencode({"q": palavra[:tamanho]})}')
+
+    def pdf(self, sessao, aleatorio):
+        if self.amostra.orcamentos and (not self.amostra.vendas_concluidas or aleatorio.random() < 0.5):
+            pk = aleatorio.choice(self.amostra.orcamentos)
+            sessao.get('orcamentos:orcamento_pdf', self.url('orcamentos:orcamento_pdf', args=[pk]))
+        elif self.amostra.vendas_concluidas:
+            pk = aleatorio.choice(self.amostra.vendas_concluidas)
+            sessao.get('financeiro:venda_comprovante', self.url('financeiro:venda_comprovante', args=[pk]))
+
+    def nova_venda(self, sessao, aleatorio):
+        caminho = self.url('financeiro:venda_create')
+        status, _, pagina = sessao.get('financeiro:venda_create', caminho)
+        if status != 200:
+            return
+        itens = aleatorio.sample(self.amostra.itens, min(aleatorio.randint(1, 4), len(self.amostra.itens)))
+        status, cabecalhos, _ = sessao.post('financeiro:venda_create', caminho, {
+            'csrfmiddlewaretoken': _csrf(pagina),
+            'cliente': aleatorio.choice(self.amostra.clientes)[0],
+            'empresa': '',
+            'data_entrada': date.today().isoformat(),
+            'desconto': '0',
+            'forma_pagamento': aleatorio.choice(['pix', 'dinheiro', 'cartao_debito']),
+            'tipo_pagamento': 'a_vista',
+            'numero_parcelas': '1',
+            'observacoes': 'Teste de carga',
+            'item_id[]': [pk for pk, _, _ in itens],
+            'quantidade[]': [aleatorio.randint(1, 5) for _ in itens],
+            'valor_unitario[]': [str(preco) for _, _, preco in itens],
+            'descricao_adicional[]': ['' for _ in itens],
+        })
+        criada = re.search(r'/(\d+)/$', urlsplit(cabecalhos.get('location', '')).path)
+        if status != 302 or not criada:
+            return
+        pk = int(criada.group(1))
+        sessao.get('financeiro:venda_detail', self.url('financeiro:venda_detail', args=[pk]))
+        sessao.get('financeiro:venda_concluir', self.url('financeiro:venda_concluir', args=[pk]))
+        sessao.get('financeiro:venda_comprovante', self.url('financeiro:venda_comprovante', args=[pk]))
+
+
+class Servidor:
+    """gunicorn local com as variáveis de ambiente deste processo, mais as de `ambiente`."""
+
+    def __init__(self, workers, threads, ambiente=None):
+        with socket.socket() as livre:
+            livre.bind(('127.0.0.1', 0))
+            self.porta = livre.getsockname()[1]
+        self.url = f'http://127.0.0.1:{self.porta}'
+        self.log = tempfile.NamedTemporaryFile(prefix='carga-gunicorn-', suffix='.log', delete=False)
+        self.processo = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+                '--bind', f'127.0.0.1:{self.porta}',
+                '--workers', str(workers), '--threads', str(threads),
+            ],
+            cwd=RAIZ, stdout=self.log, stderr=subprocess.STDOUT,
+            env={**os.environ, **(ambiente or {})},
+        )
+
+    def aguardar(self, caminho, timeout=60):
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            if self.processo.poll() is not None:
+                break
+            try:
+                conexao = http.client.HTTPConnection('127.0.0.1', self.porta, timeout=5)
+                conexao.request('GET', caminho)
+                if conexao.getresponse().status < 500:
+                    return
+            except OSError:
+                time.sleep(0.2)
+        self.encerrar()
+        with open(self.log.name, encoding='utf-8', errors='replace') as log:
+            raise SystemExit(f'O gunicorn não respondeu em {caminho}:\n{log.read()[-3000:]}')
+
+    def encerrar(self):
+        if self.processo.poll() is None:
+            self.processo.terminate()
+            try:
+                self.processo.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.processo.kill()
+
+
+def executar(url, https, jornadas, pesos, concorrencia, duracao, aquecimento, semente, pausa, timeout):
+    """Roda os usuários virtuais. Devolve (registros, início da medição, fim)."""
+    registros = []
+    inicio = time.monotonic()
+    inicio_medicao = inicio + aquecimento
+    fim = inicio_medicao + duracao
+    nomes = list(pesos)
+    acumulados = []
+    for peso in pesos.values():
+        acumulados.append((acumulados[-1] if acumulados else 0) + peso)
+
+    def registrar(endpoint, momento, duracao_ms, status, erro):
+        if momento >= inicio_medicao:
+            registros.append((endpoint, duracao_ms, status, erro))
+
+    def usuario_virtual(indice):
+        aleatorio = random.Random(semente * 1000 + indice)
+        sessao = Sessao(url, https, timeout, registrar)
+        jornadas.entrar(sessao)
+        while time.monotonic() < fim:
+            getattr(jornadas, aleatorio.choices(nomes, cum_weights=acumulados)[0])(sessao, aleatorio)
+            if pausa:
+                time.sleep(pausa / 1000)
+
+    usuarios = [threading.Thread(target=usuario_virtual, args=(i,), daemon=True) for i in range(concorrencia)]
+    for usuario in usuarios:
+        usuario.start()
+    for usuario in usuarios:
+        usuario.join()
+    return registros, inicio_medicao, time.monotonic()
+
+
+def medir_servidor(ambiente, workers, threads, jornadas, https, pesos, concorrencia, duracao, aquecimento,
+                   semente, timeout):
+    """Sobe um gunicorn com as variáveis de `ambiente`, roda a carga nele e devolve `resumir()`."""
+    servidor = Servidor(workers, threads, ambiente)
+    try:
+        servidor.aguardar(jornadas.url('healthcheck'))
+        registros, inicio, fim = executar(
+            servidor.url, https, jornadas, pesos, concorrencia, duracao, aquecimento, semente, 0, timeout,
+        )
+    finally:
+        servidor.encerrar()
+    return resumir(registros, fim - inicio)
+
+
+def argumentos_antes_depois(parser, jornadas, workers=2, concorrencia=4):
+    """Opções comuns dos benchmarks que comparam duas configurações do servidor (`antes_depois`)."""
+    parser.add_argument('--workers', type=int, default=workers, help=f'Workers do gunicorn (padrão: {workers})')
+    parser.add_argument('--threads', type=int, default=1, help='Threads por worker (padrão: 1)')
+    parser.add_argument(
+        '--concorrencia', type=int, default=concorrencia, help=f'Usuários virtuais simultâneos (padrão: {concorrencia})'
+    )
+    parser.add_argument('--duracao', type=float, default=30, help='Segundos de medição de cada configuração (padrão: 30)')
+    parser.add_argument('--aquecimento', type=float, default=5, help='Segundos iniciais descartados (padrão: 5)')
+    parser.add_argument('--timeout', type=float, default=30, help='Timeout de cada requisição em segundos')
+    parser.add_argument(
+        '--jornadas', type=_pesos, default=dict(jornadas),
+        help=f'Jornadas e pesos (padrão: {",".join(f"{k}={v}" for k, v in jornadas.items())})'
+    )
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help='Arquivo JSON do resultado (padrão: benchmarks/resultados/)')
+
+
+def antes_depois(opcoes, configuracoes, nome, preparar=None):
+    """
+    Roda a mesma carga em um gunicorn para cada configuração de
+    `configuracoes` ({'antes': {variável: valor}, 'depois': {...}}),
+    chamando `preparar(variaveis)` antes de cada uma, mostra a tabela
+    comparativa e grava o resultado em JSON.
+    """
+    from django.conf import settings
+
+    usuario, senha = preparar_usuario()
+    jornadas = Jornadas(Amostra(random.Random(opcoes.semente)), usuario, senha)
+    https = bool(settings.SECURE_PROXY_SSL_HEADER)
+    resultados = {}
+    for rotulo, variaveis in configuracoes.items():
+        if preparar:
+            preparar(variaveis)
+        descricao = ', '.join(f'{variavel}={valor}' for variavel, valor in variaveis.items())
+        print(f'{rotulo}: {descricao}; {opcoes.concorrencia} usuário(s) por {opcoes.duracao:.0f}s...')
+        resultados[rotulo] = medir_servidor(
+            variaveis, opcoes.workers, opcoes.threads, jornadas, https, opcoes.jornadas,
+            opcoes.concorrencia, opcoes.duracao, opcoes.aquecimento, opcoes.semente, opcoes.timeout,
+        )
+
+    (total_antes, endpoints_antes), (total_depois, endpoints_depois) = resultados['antes'], resultados['depois']
+    print(
+        f"\n{'Endpoint':42} {'p50 antes':>10} {'depois':>8} {'p95 antes':>10} {'depois':>8}"
+        f" {'erros antes':>12} {'depois':>8}"
+    )
+    linhas = [(endpoint, e, endpoints_depois.get(endpoint)) for endpoint, e in endpoints_antes.items()]
+    linhas.append(('total', total_antes, total_depois))
+    for endpoint, a, d in linhas:
+        if d:
+            print(
+                f"{endpoint:42} {_ms(a['p50_ms']):>10} {_ms(d['p50_ms']):>8} {_ms(a['p95_ms']):>10}"
+                f" {_ms(d['p95_ms']):>8} {a['taxa_erros']:12.1%} {d['taxa_erros']:8.1%}"
+            )
+    print(f"Vazão: {total_antes['vazao_rps']:.1f} -> {total_depois['vazao_rps']:.1f} req/s")
+
+    relatorio = {
+        'ambiente': ambiente(),
+        'configuracao': {
+            'workers': opcoes.workers, 'threads': opcoes.threads, 'concorrencia': opcoes.concorrencia,
+            'duracao_s': opcoes.duracao, 'jornadas': opcoes.jornadas, 'variaveis': configuracoes,
+        },
+        'resultados': {
+            rotulo: {'total': total, 'endpoints': endpoints} for rotulo, (total, endpoints) in resultados.items()
+        },
+    }
+    if opcoes.saida:
+        saida = opcoes.saida
+    else:
+        RESULTADOS.mkdir(parents=True, exist_ok=True)
+        saida = str(RESULTADOS / f"{nome}-{relatorio['ambiente']['commit'] or 'sem-git'}-{int(time.time())}.json")
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f'Resultado: {saida}')
+    return relatorio
+
+
+def _estatisticas(duracoes, erros, segundos, status=None):
+    ordenadas = sorted(duracoes)
+    estatisticas = {
+        'requisicoes': len(ordenadas),
+        'erros': erros,
+        'taxa_erros': erros / len(ordenadas) if ordenadas else 0,
+        'vazao_rps': len(ordenadas) / segundos if segundos else 0,
+        'media_ms': sum(ordenadas) / len(ordenadas) if ordenadas else None,
+        'p50_ms': percentil(ordenadas, 50),
+        'p95_ms': percentil(ordenadas, 95),
+        'p99_ms': percentil(ordenadas, 99),
+        'max_ms': ordenadas[-1] if ordenadas else None,
+    }
+    if status is not None:
+        estatisticas['status'] = {str(codigo): vezes for codigo, vezes in sorted(status.items())}
+    return estatisticas
+
+
+def resumir(registros, segundos):
+    """Estatísticas por endpoint e do total."""
+    por_endpoint = defaultdict(list)
+    for registro in registros:
+        por_endpoint[registro[0]].append(registro)
+    endpoints = {}
+    for endpoint, linhas in sorted(por_endpoint.items()):
+        endpoints[endpoint] = _estatisticas(
+            [linha[1] for linha in linhas],
+            sum(1 for linha in linhas if linha[3]),
+            segundos,
+            Counter(linha[2] for linha in linhas),
+        )
+    total = _estatisticas([r[1] for r in registros], sum(1 for r in registros if r[3]), segundos)
+    return total, endpoints
+
+
+def comparar(relatorio, anterior, tolerancia):
+    """
+    Acrescenta ao relatório a variação de cada endpoint em relação à execução
+    anterior e devolve a lista de regressões (p95 ou taxa de erros piores).
+    """
+    regressoes = []
+    for endpoint, atual in relatorio['endpoints'].items():
+        base = anterior['endpoints'].get(endpoint)
+        if not base or min(atual['requisicoes'], base['requisicoes']) < AMOSTRAS_MINIMAS:
+            continue
+        atual['comparacao'] = {
+            campo: variacao(atual[campo], base[campo])
+            for campo in ('p50_ms', 'p95_ms', 'p99_ms', 'vazao_rps')
+        }
+        piora_p95 = atual['comparacao']['p95_ms']
+        if (
+            piora_p95 is not None and piora_p95 > tolerancia
+            and atual['p95_ms'] - base['p95_ms'] > VARIACAO_MINIMA_MS
+        ):
+            regressoes.append(f"{endpoint}: p95 {base['p95_ms']:.0f} -> {atual['p95_ms']:.0f} ms ({piora_p95:+.0f}%)")
+        if atual['taxa_erros'] > base['taxa_erros']:
+            regressoes.append(
+                f"{endpoint}: erros {base['taxa_erros']:.1%} -> {atual['taxa_erros']:.1%}"
+            )
+
+    diferencas = ['configuracao'] if relatorio['configuracao'] != anterior.get('configuracao') else []
+    dados_anteriores = anterior.get('dados', {})
+    if any(
+        abs(quantidade - dados_anteriores.get(tabela, 0)) > DIFERENCA_DADOS * max(quantidade, 1)
+        for tabela, quantidade in relatorio['dados'].items()
+    ):
+        diferencas.append('dados')
+    relatorio['comparado_com'] = {
+        'commit': anterior['ambiente'].get('commit'),
+        'data': anterior['ambiente'].get('data'),
+        'tolerancia_pct': tolerancia,
+        'regressoes': regressoes,
+        'diferencas': diferencas,
+    }
+    return regressoes
+
+
+def _ms(valor):
+    return '-' if valor is None else f'{valor:.0f}'
+
+
+def _celula_variacao(valor, maior_e_pior=True):
+    if valor is None:
+        return '<td></td>'
+    pior = valor > 0 if maior_e_pior else valor < 0
+    cor = '#b91c1c' if pior and abs(valor) >= 10 else '#15803d' if not pior and abs(valor) >= 10 else '#64748b'
+    return f'<td style="color:{cor}">{valor:+.0f}%</td>'
+
+
+def gerar_html(relatorio):
+    """Relatório HTML autocontido (sem CSS ou JS externos)."""
+    comparacao = relatorio.get('comparado_com')
+    linhas = []
+    for endpoint, e in relatorio['endpoints'].items():
+        delta = e.get('comparacao', {})
+        linhas.append(
+            f"<tr><td><code>{html.escape(endpoint)}</code></td><td>{e['requisicoes']}</td>"
+            f"<td>{e['vazao_rps']:.1f}</td><td>{e['taxa_erros']:.1%}</td>"
+            f"<td>{_ms(e['p50_ms'])}</td><td>{_ms(e['p95_ms'])}</td><td>{_ms(e['p99_ms'])}</td>"
+            f"<td>{_ms(e['max_ms'])}</td>"
+            + (
+                _celula_variacao(delta.get('p50_ms')) + _celula_variacao(delta.get('p95_ms'))
+                + _celula_variacao(delta.get('p99_ms')) + _celula_variacao(delta.get('vazao_rps'), False)
+                if comparacao else ''
+            )
+            + '</tr>'
+        )
+    total = relatorio['total']
+    cabecalho_comparacao = (
+        '<th>Δ p50</th><th>Δ p95</th><th>Δ p99</th><th>Δ req/s</th>' if comparacao else ''
+    )
+    blocos_comparacao = ''
+    if comparacao:
+        regressoes = ''.join(f'<li>{html.escape(r)}</li>' for r in comparacao['regressoes'])
+        blocos_comparacao = (
+            f"<h2>Comparação com {html.escape(comparacao['commit'] or '?')} "
+            f"({html.escape(comparacao['data'] or '')})</h2>"
+            + (
+                f"<p class=aviso>Configuração ou volume de dados diferentes: "
+                f"{html.escape(', '.join(comparacao['diferencas']))}. A comparação pode não ser válida.</p>"
+                if comparacao['diferencas'] else ''
+            )
+            + (
+                f"<p class=aviso>Regressões (tolerância {comparacao['tolerancia_pct']:.0f}%):</p><ul>{regressoes}</ul>"
+                if regressoes else '<p>Nenhuma regressão acima da tolerância.</p>'
+            )
+        )
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Teste de carga - {html.escape(relatorio['ambiente']['commit'] or '')}</title>
+<style>
+body {{ font-family: system-ui, sans-serif; margin: 2rem; color: #0f172a; }}
+table {{ border-collapse: collapse; font-size: 0.9rem; }}
+th, td {{ padding: 0.35rem 0.75rem; border-bottom: 1px solid #e2e8f0; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+th {{ background: #f1f5f9; }}
+.aviso {{ color: #b91c1c; font-weight: 600; }}
+pre {{ background: #f8fafc; padding: 0.75rem; }}
+</style>
+</head>
+<body>
+<h1>Teste de carga</h1>
+<p>{total['requisicoes']} requisições, {total['vazao_rps']:.1f} req/s, {total['taxa_erros']:.1%} de erros,
+p50 {_ms(total['p50_ms'])} ms, p95 {_ms(total['p95_ms'])} ms, p99 {_ms(total['p99_ms'])} ms.</p>
+{blocos_comparacao}
+<table>
+<thead><tr><th>Endpoint</th><th>Requisições</th><th>req/s</th><th>Erros</th><th>p50 (ms)</th><th>p95 (ms)</th>
+<th>p99 (ms)</th><th>Máx. (ms)</th>{cabecalho_comparacao}</tr></thead>
+<tbody>
+{''.join(linhas)}
+</tbody>
+</table>
+<h2>Execução</h2>
+<pre>{html.escape(json.dumps(
+    {chave: relatorio[chave] for chave in ('ambiente', 'configuracao', 'dados')}, indent=2, ensure_ascii=False
+))}</pre>
+</body>
+</html>
+"""
+
+
+def _pesos(texto):
+    """'painel=3,pdf=1' ou 'painel,pdf' (pesos padrão) -> {jornada: peso}."""
+    pesos = {}
+    for parte in filter(None, (p.strip() for p in texto.split(','))):
+        nome, _, peso = parte.partition('=')
+        if nome not in JORNADAS_PADRAO:
+            raise argparse.ArgumentTypeError(f'jornada desconhecida: {nome} (opções: {", ".join(JORNADAS_PADRAO)})')
+        pesos[nome] = float(peso) if peso else JORNADAS_PADRAO[nome]
+    if not pesos:
+        raise argparse.ArgumentTypeError('informe ao menos uma jornada')
+    return pesos
+
+
+def preparar_usuario(usuario=None, senha=None):
+    """Devolve (usuário, senha); sem `usuario`, cria ou atualiza o usuário "carga" com uma senha nova."""
+    from django.contrib.auth.models import User
+
+    if usuario:
+        return usuario, senha
+    usuario, senha = 'carga', secrets.token_urlsafe(16)
+    conta, _ = User.objects.get_or_create(username=usuario, defaults={'is_staff': True})
+    conta.set_password(senha)
+    conta.save()
+    return usuario, senha
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', help='Servidor já no ar (padrão: sobe um gunicorn local)')
+    parser.add_argument('--workers', type=int, default=2, help='Workers do gunicorn local (padrão: 2)')
+    parser.add_argument('--threads', type=int, default=1, help='Threads por worker do gunicorn local (padrão: 1)')
+    parser.add_argument('--concorrencia', type=int, default=8, help='Usuários virtuais simultâneos (padrão: 8)')
+    parser.add_argument('--duracao', type=float, default=60, help='Segundos de medição (padrão: 60)')
+    parser.add_argument('--aquecimento', type=float, default=10, help='Segundos iniciais descartados (padrão: 10)')
+    parser.add_argument('--pausa', type=float, default=0, help='Pausa em ms entre jornadas de um usuário')
+    parser.add_argument('--timeout', type=float, default=30, help='Timeout de cada requisição em segundos')
+    parser.add_argument(
+        '--jornadas', type=_pesos, default=dict(JORNADAS_PADRAO),
+        help=f'Jornadas e pesos, ex.: painel=3,pdf=1 (padrão: {",".join(f"{k}={v}" for k, v in JORNADAS_PADRAO.items())})'
+    )
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--usuario', help='Usuário existente (padrão: cria/atualiza o usuário "carga")')
+    parser.add_argument('--senha', help='Senha do --usuario')
+    parser.add_argument('--saida', help='Arquivo JSON do relatório; o HTML vai ao lado (padrão: benchmarks/resultados/)')
+    parser.add_argument('--comparar', help='Relatório JSON de uma execução anterior')
+    parser.add_argument('--tolerancia', type=float, default=10, help='Piora de p95 aceita, em %% (padrão: 10)')
+    opcoes = parser.parse_args(argumentos)
+
+    configurar_django()
+    from django.conf import settings
+
+    if settings.DEBUG:
+        print('Aviso: DEBUG=True; os números não representam produção.', file=sys.stderr)
+    usuario, senha = preparar_usuario(opcoes.usuario, opcoes.senha)
+    amostra = Amostra(random.Random(opcoes.semente))
+    jornadas = Jornadas(amostra, usuario, senha)
+    # Com DEBUG=False o Django só aceita HTTPS; o proxy informa pelo cabeçalho
+    https = bool(settings.SECURE_PROXY_SSL_HEADER)
+
+    servidor = None
+    url = opcoes.url
+    if not url:
+        servidor = Servidor(opcoes.workers, opcoes.threads)
+        servidor.aguardar(jornadas.url('healthcheck'))
+        url = servidor.url
+    if not jornadas.entrar(Sessao(url, https, opcoes.timeout, lambda *registro: None)):
+        if servidor:
+            servidor.encerrar()
+        raise SystemExit(f'Não foi possível entrar como "{usuario}" em {url}.')
+    configuracao = {
+        'url': opcoes.url or 'gunicorn local',
+        'workers': None if opcoes.url else opcoes.workers,
+        'threads': None if opcoes.url else opcoes.threads,
+        'concorrencia': opcoes.concorrencia,
+        'duracao_s': opcoes.duracao,
+        'aquecimento_s': opcoes.aquecimento,
+        'pausa_ms': opcoes.pausa,
+        'jornadas': opcoes.jornadas,
+        'semente': opcoes.semente,
+        'debug': settings.DEBUG,
+    }
+    dados = volumes_dos_dados()
+    print(
+        f'{opcoes.concorrencia} usuário(s) em {url}: {opcoes.aquecimento:.0f}s de aquecimento '
+        f'e {opcoes.duracao:.0f}s de medição...'
+    )
+    try:
+        registros, inicio, fim = executar(
+            url, https, jornadas, opcoes.jornadas, opcoes.concorrencia, opcoes.duracao,
+            opcoes.aquecimento, opcoes.semente, opcoes.pausa, opcoes.timeout,
+        )
+    finally:
+        if servidor:
+            servidor.encerrar()
+
+    total, endpoints = resumir(registros, fim - inicio)
+    relatorio = {
+        'ambiente': ambiente(),
+        'configuracao': configuracao,
+        'dados': dados,
+        'duracao_medida_s': round(fim - inicio, 2),
+        'total': total,
+        'endpoints': endpoints,
+    }
+    regressoes = []
+    if opcoes.comparar:
+        with open(opcoes.comparar, encoding='utf-8') as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), opcoes.tolerancia)
+
+    if opcoes.saida:
+        saida_json = opcoes.saida
+    else:
+        RESULTADOS.mkdir(parents=True, exist_ok=True)
+        saida_json = str(RESULTADOS / f"carga-{relatorio['ambiente']['commit'] or 'sem-git'}-{int(time.time())}.json")
+    saida_html = saida_json.removesuffix('.json') + '.html'
+    with open(saida_json, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    with open(saida_html, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(gerar_html(relatorio))
+
+    print(f"{'Endpoint':42} {'req':>6} {'req/s':>7} {'erros':>6} {'p50':>6} {'p95':>6} {'p99':>6}")
+    for endpoint, e in endpoints.items():
+        print(
+            f"{endpoint:42} {e['requisicoes']:6d} {e['vazao_rps']:7.1f} {e['taxa_erros']:6.1%} "
+            f"{_ms(e['p50_ms']):>6} {_ms(e['p95_ms']):>6} {_ms(e['p99_ms']):>6}"
+        )
+    print(
+        f"{'total':42} {total['requisicoes']:6d} {total['vazao_rps']:7.1f} {total['taxa_erros']:6.1%} "
+        f"{_ms(total['p50_ms']):>6} {_ms(total['p95_ms']):>6} {_ms(total['p99_ms']):>6}"
+    )
+    print(f'Relatório: {saida_json} e {saida_html}')
+    if relatorio.get('comparado_com', {}).get('diferencas'):
+        print(f"Aviso: {', '.join(relatorio['comparado_com']['diferencas'])} diferente(s) da execução comparada.")
+    if regressoes:
+        print('Regressões:\n  ' + '\n  '.join(regressoes))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
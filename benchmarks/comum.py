@@ -0,0 +1,79 @@
+"""
+Funções comuns aos benchmarks, que rodam a partir da raiz do projeto com
+`python -m benchmarks.<nome>` e usam o banco configurado no ambiente
+(DATABASE_URL), de preferência um banco com dados de
+`gerar_dados_sinteticos`.
+"""
+import math
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+RESULTADOS = RAIZ / 'benchmarks' / 'resultados'
+
+
+def configurar_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+
+    django.setup()
+
+
+def _git(*argumentos):
+    try:
+        return subprocess.run(
+            ['git', *argumentos], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def ambiente():
+    """Commit, máquina, versões e banco: o que precisa ser igual para comparar duas execuções."""
+    import django
+    from django.db import connection
+
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'alteracoes_locais': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'maquina': platform.platform(),
+        'cpus': os.cpu_count(),
+        'banco': connection.vendor,
+    }
+
+
+def volumes_dos_dados():
+    """Quantidade de registros das tabelas principais."""
+    from apps.cadastros.models import Cliente, Empresa
+    from apps.financeiro.models import Despesa, ItemVenda, Parcela, Venda
+    from apps.orcamentos.models import Orcamento
+    from apps.servicos.models import Item
+
+    return {
+        modelo._meta.model_name: modelo.objects.count()
+        for modelo in (Cliente, Empresa, Item, Orcamento, Venda, ItemVenda, Parcela, Despesa)
+    }
+
+
+def percentil(ordenados, p):
+    """Percentil `p` (0-100) de uma lista já ordenada, com interpolação linear."""
+    if not ordenados:
+        return None
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = math.floor(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def variacao(atual, anterior):
+    """Variação percentual de `anterior` para `atual` (None se não der para calcular)."""
+    if atual is None or not anterior:
+        return None
+    return (atual - anterior) / anterior * 100
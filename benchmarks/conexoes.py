@@ -0,0 +1,38 @@
+"""
+Latência por requisição com e sem conexões persistentes ao banco.
+
+Sobe o gunicorn duas vezes com o mesmo banco e as mesmas jornadas do
+teste de carga (por padrão listagens e autocomplete, que são leves e
+deixam o custo de abrir a conexão mais visível): primeiro com
+DB_CONN_MAX_AGE=0, uma conexão nova por requisição, depois com o valor de
+--conn-max-age. Mostra p50/p95, erros e vazão de cada configuração. A
+diferença é maior no PostgreSQL com TLS do que no SQLite local.
+
+    DATABASE_URL=postgres://... DEBUG=False python -m benchmarks.conexoes --duracao 30
+"""
+import argparse
+import sys
+
+from . import carga
+from .comum import configurar_django
+
+
+JORNADAS_PADRAO = {'listagens': 1, 'autocomplete': 1}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--conn-max-age', type=int, default=600, help='DB_CONN_MAX_AGE do "depois" (padrão: 600)')
+    carga.argumentos_antes_depois(parser, JORNADAS_PADRAO)
+    opcoes = parser.parse_args(argumentos)
+
+    configurar_django()
+    carga.antes_depois(opcoes, {
+        'antes': {'DB_CONN_MAX_AGE': '0'},
+        'depois': {'DB_CONN_MAX_AGE': str(opcoes.conn_max_age), 'DB_CONN_HEALTH_CHECKS': 'True'},
+    }, 'conexoes')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
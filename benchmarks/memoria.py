@@ -0,0 +1,133 @@
+"""
+Memória por worker do gunicorn e vazão, com e sem preload/gc.freeze().
+
+Sobe o gunicorn (gunicorn.conf.py) em três configurações: sem preload,
+com preload e com preload mais gc.freeze() (o padrão). Em cada uma roda o
+teste de carga por alguns segundos, para que os workers carreguem o que
+usam, e lê /proc/<pid>/smaps_rollup do processo principal e de cada worker:
+
+- RSS: páginas residentes, contando as compartilhadas em cada processo;
+- PSS: páginas compartilhadas divididas entre os processos que as usam
+  (a soma do PSS é a memória de fato ocupada);
+- USS: páginas só daquele processo (o que se libera ao matá-lo).
+
+Só funciona no Linux. As jornadas padrão não gravam no banco.
+
+    DATABASE_URL=sqlite:////tmp/carga.db DEBUG=False python -m benchmarks.memoria --workers 4
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from . import carga
+from .comum import RESULTADOS, ambiente, configurar_django
+
+
+CONFIGURACOES = {
+    'sem preload': {'GUNICORN_PRELOAD': 'False'},
+    'preload': {'GUNICORN_PRELOAD': 'True', 'GUNICORN_GC_FREEZE': 'False'},
+    'preload + gc.freeze': {'GUNICORN_PRELOAD': 'True', 'GUNICORN_GC_FREEZE': 'True'},
+}
+JORNADAS_PADRAO = {'painel': 2, 'listagens': 3, 'autocomplete': 2, 'pdf': 1}
+
+
+def memoria(pid):
+    """{'rss', 'pss', 'uss'} em MiB, de /proc/<pid>/smaps_rollup."""
+    campos = {}
+    with open(f'/proc/{pid}/smaps_rollup', encoding='ascii') as arquivo:
+        for linha in arquivo:
+            partes = linha.split()
+            if len(partes) == 3 and partes[2] == 'kB':
+                campos[partes[0].rstrip(':')] = int(partes[1])
+    return {
+        'rss': campos['Rss'] / 1024,
+        'pss': campos['Pss'] / 1024,
+        'uss': (campos['Private_Clean'] + campos['Private_Dirty']) / 1024,
+    }
+
+
+def workers_de(pid):
+    with open(f'/proc/{pid}/task/{pid}/children', encoding='ascii') as arquivo:
+        return [int(filho) for filho in arquivo.read().split()]
+
+
+def medir(opcoes, jornadas, https, variaveis):
+    servidor = carga.Servidor(opcoes.workers, opcoes.threads, variaveis)
+    try:
+        servidor.aguardar(jornadas.url('healthcheck'))
+        registros, inicio, fim = carga.executar(
+            servidor.url, https, jornadas, opcoes.jornadas, opcoes.concorrencia, opcoes.duracao,
+            opcoes.aquecimento, opcoes.semente, 0, opcoes.timeout,
+        )
+        principal = memoria(servidor.processo.pid)
+        workers = [memoria(pid) for pid in workers_de(servidor.processo.pid)]
+    finally:
+        servidor.encerrar()
+    total, _ = carga.resumir(registros, fim - inicio)
+
+    def media(chave):
+        return round(sum(w[chave] for w in workers) / len(workers), 1)
+
+    return {
+        'workers': len(workers),
+        'rss_worker_mb': media('rss'),
+        'pss_worker_mb': media('pss'),
+        'uss_worker_mb': media('uss'),
+        'principal_mb': {chave: round(valor, 1) for chave, valor in principal.items()},
+        'pss_total_mb': round(principal['pss'] + sum(w['pss'] for w in workers), 1),
+        'vazao_rps': total['vazao_rps'],
+        'p95_ms': total['p95_ms'],
+        'taxa_erros': total['taxa_erros'],
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    carga.argumentos_antes_depois(parser, JORNADAS_PADRAO, workers=4)
+    parser.set_defaults(duracao=20)
+    opcoes = parser.parse_args(argumentos)
+
+    configurar_django()
+    from django.conf import settings
+
+    usuario, senha = carga.preparar_usuario()
+    jornadas = carga.Jornadas(carga.Amostra(random.Random(opcoes.semente)), usuario, senha)
+    https = bool(settings.SECURE_PROXY_SSL_HEADER)
+    resultados = {}
+    for nome, variaveis in CONFIGURACOES.items():
+        print(f'{nome}: {opcoes.workers} worker(s), {opcoes.concorrencia} usuário(s) por {opcoes.duracao:.0f}s...')
+        resultados[nome] = medir(opcoes, jornadas, https, variaveis)
+
+    print(
+        f"\n{'Configuração':22} {'RSS/worker':>11} {'PSS/worker':>11} {'USS/worker':>11}"
+        f" {'PSS total':>10} {'req/s':>7} {'p95':>6} {'erros':>6}"
+    )
+    for nome, r in resultados.items():
+        print(
+            f"{nome:22} {r['rss_worker_mb']:9.1f}MB {r['pss_worker_mb']:9.1f}MB {r['uss_worker_mb']:9.1f}MB"
+            f" {r['pss_total_mb']:8.1f}MB {r['vazao_rps']:7.1f} {carga._ms(r['p95_ms']):>6} {r['taxa_erros']:6.1%}"
+        )
+
+    relatorio = {
+        'ambiente': ambiente(),
+        'configuracao': {
+            'workers': opcoes.workers, 'threads': opcoes.threads, 'concorrencia': opcoes.concorrencia,
+            'duracao_s': opcoes.duracao, 'jornadas': opcoes.jornadas, 'variaveis': CONFIGURACOES,
+        },
+        'resultados': resultados,
+    }
+    if opcoes.saida:
+        saida = opcoes.saida
+    else:
+        RESULTADOS.mkdir(parents=True, exist_ok=True)
+        saida = str(RESULTADOS / f"memoria-{relatorio['ambiente']['commit'] or 'sem-git'}-{int(time.time())}.json")
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f'Resultado: {saida}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
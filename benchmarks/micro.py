@@ -0,0 +1,361 @@
+"""
+Microbenchmarks dos trechos mais usados do código, com histórico.
+
+Mede, em volumes crescentes de dados, as propriedades e métodos de
+modelo (Venda.total/subtotal, Orcamento.total, Venda.gerar_parcelas,
+Venda.concluir, FolhaPagamento.gerar_folha), a geração dos PDFs de
+orçamento e de venda e as agregações do dashboard. Roda num banco de
+teste criado e destruído pelo próprio comando (como o `manage.py test`),
+então não mexe nos dados do DATABASE_URL. Cada chamada roda dentro de
+uma transação desfeita em seguida, para que todas partam do mesmo estado.
+
+Cada execução acrescenta uma linha ao histórico (JSON Lines) com o
+commit, o ambiente e, para cada benchmark e tamanho, a mediana, o mínimo
+e o desvio dos tempos e o número de consultas SQL de uma chamada. A
+execução é comparada com as últimas do histórico feitas no mesmo ambiente
+(máquina, Python, Django e banco) e o comando termina com código 1 se
+algum tempo piorou além da tolerância ou se alguma chamada passou a
+fazer mais consultas. Os tempos variam de uma execução para outra; o
+número de consultas não, e é o sinal mais confiável.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --somente venda_total,pdf_venda --escala 2
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from .comum import RESULTADOS, ambiente, configurar_django, variacao
+
+
+# Cada grupo monta um cenário por tamanho e mede os benchmarks dele nesse cenário
+GRUPOS = {
+    'documentos': {
+        'unidade': 'itens por documento',
+        'tamanhos': (1, 10, 50),
+        'benchmarks': (
+            'venda_subtotal', 'venda_total', 'orcamento_total', 'gerar_parcelas',
+            'concluir', 'pdf_orcamento', 'pdf_venda',
+        ),
+    },
+    'folha': {
+        'unidade': 'funcionários ativos',
+        'tamanhos': (5, 50, 500),
+        'benchmarks': ('gerar_folha',),
+    },
+    'dashboard': {
+        'unidade': 'vendas no banco',
+        'tamanhos': (500, 2000, 10000),
+        'benchmarks': ('dashboard', 'dashboard_dados_mes', 'dashboard_dados_ano'),
+    },
+}
+HISTORICO = RESULTADOS / 'micro-historico.jsonl'
+# Chaves do ambiente que precisam ser iguais para comparar duas execuções
+AMBIENTE_COMPARAVEL = ('maquina', 'cpus', 'python', 'django', 'banco')
+# Chamadas mínimas de cada medição, mesmo que passe do tempo
+REPETICOES_MINIMAS = 5
+REPETICOES_MAXIMAS = 2000
+# Execuções anteriores cuja mediana serve de base para a comparação
+EXECUCOES_BASE = 5
+
+
+def medir(executar, preparar=None, tempo=0.5):
+    """
+    Chama `executar(*preparar())` repetidamente por `tempo` segundos (ao
+    menos REPETICOES_MINIMAS vezes) e devolve as estatísticas em
+    microssegundos e o número de consultas SQL de uma chamada. Só a
+    chamada de `executar` é cronometrada; cada repetição roda numa
+    transação desfeita ao final.
+    """
+    from django.db import connection, transaction
+
+    consultas = []
+
+    def contar(execute, sql, params, many, context):
+        consultas.append(sql)
+        return execute(sql, params, many, context)
+
+    def rodar(capturar=False):
+        with transaction.atomic():
+            argumentos = preparar() if preparar else ()
+            if capturar:
+                with connection.execute_wrapper(contar):
+                    executar(*argumentos)
+                resultado = len(consultas)
+            else:
+                inicio = time.perf_counter_ns()
+                executar(*argumentos)
+                resultado = (time.perf_counter_ns() - inicio) / 1000
+            transaction.set_rollback(True)
+        return resultado
+
+    # A primeira chamada aquece os caches e conta as consultas
+    quantidade_consultas = rodar(capturar=True)
+    duracoes = []
+    limite = time.perf_counter() + tempo
+    while len(duracoes) < REPETICOES_MINIMAS or (
+        time.perf_counter() < limite and len(duracoes) < REPETICOES_MAXIMAS
+    ):
+        duracoes.append(rodar())
+    return {
+        'repeticoes': len(duracoes),
+        'mediana_us': round(statistics.median(duracoes), 1),
+        'minimo_us': round(min(duracoes), 1),
+        'desvio_us': round(statistics.stdev(duracoes), 1),
+        'consultas': quantidade_consultas,
+    }
+
+
+class Cenarios:
+    """Monta os dados de cada grupo e devolve {benchmark: (executar, preparar)}."""
+
+    def __init__(self, semente):
+        self.semente = semente
+
+    def _itens(self, aleatorio, quantidade):
+        from apps.servicos.models import Item
+
+        return Item.objects.bulk_create(
+            Item(
+                tipo='produto' if i % 2 else 'servico',
+                nome=f'Item {i}',
+                preco=Decimal(aleatorio.randint(1000, 90000)) / 100,
+                quantidade_estoque=10000,
+            )
+            for i in range(quantidade)
+        )
+
+    def documentos(self, tamanho):
+        from django.utils import timezone
+
+        from apps.cadastros.models import Cliente
+        from apps.core.models import ConfiguracaoEmpresa
+        from apps.financeiro.models import ItemVenda, Venda
+        from apps.financeiro.pdf import montar_pdf_venda
+        from apps.financeiro.views import _vendas_para_pdf
+        from apps.orcamentos.models import ItemOrcamento, Orcamento
+        from apps.orcamentos.pdf import montar_pdf_orcamento
+        from apps.orcamentos.views import _orcamentos_para_pdf
+
+        aleatorio = random.Random(self.semente)
+        ConfiguracaoEmpresa.objects.get_or_create(pk=1, defaults={'nome': 'Tornearia Jair'})
+        cliente = Cliente.objects.create(nome='Cliente Benchmark', cpf='123.456.789-00')
+        itens = self._itens(aleatorio, tamanho)
+        hoje = timezone.localdate()
+        orcamento = Orcamento.objects.create(cliente=cliente, validade=hoje + timedelta(days=15), desconto=Decimal('5'))
+        ItemOrcamento.objects.bulk_create(
+            ItemOrcamento(orcamento=orcamento, item=item, quantidade=aleatorio.randint(1, 5), valor_unitario=item.preco)
+            for item in itens
+        )
+        venda = Venda.objects.create(
+            cliente=cliente, data_entrada=hoje, desconto=Decimal('5'), forma_pagamento='boleto',
+            tipo_pagamento='parcelado', numero_parcelas=12,
+        )
+        ItemVenda.objects.bulk_create(
+            ItemVenda(venda=venda, item=item, quantidade=aleatorio.randint(1, 5), valor_unitario=item.preco)
+            for item in itens
+        )
+        venda.gerar_parcelas()
+
+        def obter_venda():
+            return (Venda.objects.get(pk=venda.pk),)
+
+        def obter_orcamento():
+            return (Orcamento.objects.get(pk=orcamento.pk),)
+
+        return {
+            'venda_subtotal': (lambda v: v.subtotal, obter_venda),
+            'venda_total': (lambda v: v.total, obter_venda),
+            'orcamento_total': (lambda o: o.total, obter_orcamento),
+            'gerar_parcelas': (lambda v: v.gerar_parcelas(), obter_venda),
+            'concluir': (lambda v: v.concluir(), obter_venda),
+            # Os PDFs recebem o registro como as views o carregam
+            'pdf_orcamento': (montar_pdf_orcamento, lambda: (_orcamentos_para_pdf().get(pk=orcamento.pk),)),
+            'pdf_venda': (montar_pdf_venda, lambda: (_vendas_para_pdf().get(pk=venda.pk),)),
+        }
+
+    def folha(self, tamanho):
+        from django.utils import timezone
+
+        from apps.cadastros.models import Funcionario
+        from apps.financeiro.models import FolhaPagamento
+
+        aleatorio = random.Random(self.semente)
+        Funcionario.objects.bulk_create(
+            Funcionario(nome=f'Funcionário {i}', salario=Decimal(aleatorio.randint(180000, 500000)) / 100)
+            for i in range(tamanho)
+        )
+        hoje = timezone.localdate()
+        return {'gerar_folha': (lambda: FolhaPagamento.gerar_folha(hoje.month, hoje.year), None)}
+
+    def dashboard(self, tamanho):
+        from django.contrib.auth.models import User
+        from django.test import RequestFactory
+
+        from apps.core.dados_sinteticos import VOLUMES_PADRAO, GeradorDadosSinteticos
+        from apps.core.views import DashboardView, dashboard_data_api
+
+        proporcao = tamanho / VOLUMES_PADRAO['vendas']
+        volumes = {nome: max(1, round(volume * proporcao)) for nome, volume in VOLUMES_PADRAO.items()}
+        volumes.update(vendas=tamanho, funcionarios=VOLUMES_PADRAO['funcionarios'])
+        GeradorDadosSinteticos(semente=self.semente, anos=1).gerar(**volumes)
+        usuario = User.objects.create(username='benchmark', is_staff=True)
+        fabrica = RequestFactory()
+
+        def requisicao(caminho, **parametros):
+            request = fabrica.get(caminho, parametros)
+            request.user = usuario
+            return request
+
+        painel = DashboardView.as_view()
+        return {
+            'dashboard': (lambda: painel(requisicao('/')).context_data, None),
+            'dashboard_dados_mes': (lambda: dashboard_data_api(requisicao('/api/dashboard-data/', periodo='mes')), None),
+            'dashboard_dados_ano': (lambda: dashboard_data_api(requisicao('/api/dashboard-data/', periodo='ano')), None),
+        }
+
+
+def executar(escala, somente, tempo, semente, progresso=print):
+    """Roda os benchmarks e devolve {benchmark: {'unidade', 'tamanhos': {tamanho: estatísticas}}}."""
+    from django.db import transaction
+
+    cenarios = Cenarios(semente)
+    resultados = {}
+    for grupo, definicao in GRUPOS.items():
+        nomes = [nome for nome in definicao['benchmarks'] if not somente or nome in somente]
+        if not nomes:
+            continue
+        for nome in nomes:
+            resultados[nome] = {'unidade': definicao['unidade'], 'tamanhos': {}}
+        for tamanho in definicao['tamanhos']:
+            tamanho = max(1, round(tamanho * escala))
+            # O cenário de cada tamanho é desfeito antes de montar o próximo
+            with transaction.atomic():
+                benchmarks = getattr(cenarios, grupo)(tamanho)
+                for nome in nomes:
+                    estatisticas = medir(*benchmarks[nome], tempo=tempo)
+                    resultados[nome]['tamanhos'][str(tamanho)] = estatisticas
+                    progresso(
+                        f"{nome:22} {tamanho:>6} {estatisticas['mediana_us'] / 1000:10.3f} ms"
+                        f" {estatisticas['minimo_us'] / 1000:10.3f} ms {estatisticas['consultas']:>5}"
+                    )
+                transaction.set_rollback(True)
+    return resultados
+
+
+def anteriores_comparaveis(caminho, ambiente_atual, quantidade=EXECUCOES_BASE):
+    """Últimas `quantidade` execuções do histórico feitas no mesmo ambiente."""
+    if not caminho.exists():
+        return []
+    anteriores = []
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            if not linha.strip():
+                continue
+            execucao = json.loads(linha)
+            if all(execucao['ambiente'].get(chave) == ambiente_atual.get(chave) for chave in AMBIENTE_COMPARAVEL):
+                anteriores.append(execucao)
+    return anteriores[-quantidade:]
+
+
+def comparar(resultados, anteriores, tolerancia):
+    """
+    Lista as regressões em relação às execuções `anteriores`: mais
+    consultas SQL por chamada que na mais recente, ou tempo pior que a
+    tolerância (%) tanto na mediana quanto no mínimo, comparados com a
+    mediana desses valores nas execuções anteriores (o que descarta boa
+    parte do ruído de uma medição isolada).
+    """
+    regressoes = []
+    for nome, benchmark in resultados.items():
+        for tamanho, atual in benchmark['tamanhos'].items():
+            antes = [
+                execucao['resultados'][nome]['tamanhos'][tamanho] for execucao in anteriores
+                if tamanho in execucao['resultados'].get(nome, {}).get('tamanhos', {})
+            ]
+            if not antes:
+                continue
+            descricao = f"{nome} ({tamanho} {benchmark['unidade']})"
+            if atual['consultas'] > antes[-1]['consultas']:
+                regressoes.append(f"{descricao}: {antes[-1]['consultas']} -> {atual['consultas']} consultas")
+                continue
+            mediana = statistics.median(base['mediana_us'] for base in antes)
+            minimo = statistics.median(base['minimo_us'] for base in antes)
+            piora_mediana = variacao(atual['mediana_us'], mediana)
+            piora_minimo = variacao(atual['minimo_us'], minimo)
+            if piora_mediana is not None and piora_minimo is not None and min(piora_mediana, piora_minimo) > tolerancia:
+                regressoes.append(
+                    f"{descricao}: mediana {mediana / 1000:.3f} -> {atual['mediana_us'] / 1000:.3f} ms "
+                    f"(+{piora_mediana:.0f}%)"
+                )
+    return regressoes
+
+
+def _lista(texto):
+    nomes = {nome.strip() for nome in texto.split(',') if nome.strip()}
+    conhecidos = {nome for grupo in GRUPOS.values() for nome in grupo['benchmarks']}
+    desconhecidos = nomes - conhecidos
+    if desconhecidos:
+        raise argparse.ArgumentTypeError(
+            f'benchmark desconhecido: {", ".join(sorted(desconhecidos))} (opções: {", ".join(sorted(conhecidos))})'
+        )
+    return nomes
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--somente', type=_lista, help='Benchmarks separados por vírgula (padrão: todos)')
+    parser.add_argument('--escala', type=float, default=1, help='Multiplica os tamanhos dos cenários (padrão: 1)')
+    parser.add_argument('--tempo', type=float, default=0.5, help='Segundos de medição por benchmark e tamanho (padrão: 0.5)')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--historico', default=str(HISTORICO), help='Arquivo do histórico (padrão: benchmarks/resultados/micro-historico.jsonl)')
+    parser.add_argument('--nao-gravar', action='store_true', help='Não acrescenta esta execução ao histórico')
+    parser.add_argument('--tolerancia', type=float, default=25, help='Piora de tempo aceita, em %% (padrão: 25)')
+    opcoes = parser.parse_args(argumentos)
+
+    configurar_django()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    nome_original = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print(f"{'Benchmark':22} {'tamanho':>6} {'mediana':>13} {'mínimo':>13} {'SQL':>5}")
+        resultados = executar(opcoes.escala, opcoes.somente, opcoes.tempo, opcoes.semente)
+        execucao = {
+            'ambiente': ambiente(),
+            'configuracao': {'escala': opcoes.escala, 'tempo_s': opcoes.tempo, 'semente': opcoes.semente},
+            'resultados': resultados,
+        }
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+        teardown_test_environment()
+
+    historico = Path(opcoes.historico)
+    anteriores = anteriores_comparaveis(historico, execucao['ambiente'])
+    regressoes = comparar(resultados, anteriores, opcoes.tolerancia)
+    if anteriores:
+        commits = ', '.join(dict.fromkeys(a['ambiente']['commit'] or 'sem git' for a in anteriores))
+        print(f'Comparado com {len(anteriores)} execução(ões) anterior(es) ({commits}).')
+    else:
+        print('Nenhuma execução anterior neste ambiente no histórico para comparar.')
+    if not opcoes.nao_gravar:
+        historico.parent.mkdir(parents=True, exist_ok=True)
+        with open(historico, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps(execucao, ensure_ascii=False) + '\n')
+        print(f'Histórico: {historico}')
+    if regressoes:
+        print('Regressões:\n  ' + '\n  '.join(regressoes))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Escritas concorrentes no SQLite com e sem o perfil de produção.
+
+Sobe o gunicorn com vários workers duas vezes sobre o mesmo arquivo
+SQLite, com jornadas que gravam (nova venda, conclusão) misturadas com
+leituras: primeiro com o backend padrão do Django (journal de rollback,
+BEGIN DEFERRED), depois com SQLITE_OTIMIZADO=True (WAL, synchronous=NORMAL,
+busy_timeout, BEGIN IMMEDIATE). Antes da primeira rodada o banco volta ao
+journal_mode=DELETE, que é persistente no arquivo. Os "database is locked"
+aparecem como erros 500 na coluna de erros.
+
+As jornadas gravam vendas no banco: use uma cópia descartável.
+
+    DATABASE_URL=sqlite:////tmp/carga.db DEBUG=False python -m benchmarks.sqlite --workers 4 --concorrencia 8
+"""
+import argparse
+import sqlite3
+import sys
+
+from . import carga
+from .comum import configurar_django
+
+
+JORNADAS_PADRAO = {'nova_venda': 3, 'listagens': 1, 'autocomplete': 1}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    carga.argumentos_antes_depois(parser, JORNADAS_PADRAO, workers=4, concorrencia=8)
+    opcoes = parser.parse_args(argumentos)
+
+    configurar_django()
+    from django.db import connection
+
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        raise SystemExit('Este benchmark precisa de um DATABASE_URL apontando para um arquivo SQLite.')
+    arquivo = connection.settings_dict['NAME']
+
+    def preparar(variaveis):
+        # Sem outras conexões abertas, para que o journal_mode possa mudar
+        connection.close()
+        if variaveis['SQLITE_OTIMIZADO'] == 'False':
+            banco = sqlite3.connect(arquivo)
+            banco.execute('PRAGMA journal_mode = DELETE')
+            banco.close()
+
+    carga.antes_depois(opcoes, {
+        'antes': {'SQLITE_OTIMIZADO': 'False'},
+        'depois': {'SQLITE_OTIMIZADO': 'True'},
+    }, 'sqlite', preparar)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
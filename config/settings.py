@@ -13,6 +13,11 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-dev-key-change-in-pro
 DEBUG = config('DEBUG', default=True, cast=bool)
 
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1', cast=Csv())
+# O healthcheck do Railway (/health/ready/, ver railway.toml) chega com este Host,
+# que não está no ALLOWED_HOSTS de quem usa domínio próprio
+HEALTHCHECK_HOST_RAILWAY = 'healthcheck.railway.app'
+if config('RAILWAY_ENVIRONMENT_NAME', default='') and HEALTHCHECK_HOST_RAILWAY not in ALLOWED_HOSTS:
+    ALLOWED_HOSTS.append(HEALTHCHECK_HOST_RAILWAY)
 
 # CSRF_TRUSTED_ORIGINS precisa incluir o protocolo (https://)
 csrf_origins = config('CSRF_TRUSTED_ORIGINS', default='http://localhost,http://127.0.0.1', cast=Csv())
@@ -42,6 +47,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
+    'apps.core.metricas.MetricasMiddleware',
+    'apps.core.consultas_lentas.ConsultasLentasMiddleware',
+    'apps.core.instrumentacao.InstrumentacaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,6 +71,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.core.context_processors.configuracao_empresa',
+                'apps.core.context_processors.assets',
             ],
         },
     },
@@ -72,18 +82,45 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 DATABASE_URL = config('DATABASE_URL', default='')
 
+# Segundos que cada thread do gunicorn mantém a conexão com o banco aberta
+# entre requisições (0 = uma conexão nova por requisição, None = sem limite),
+# o que poupa o handshake TLS e a autenticação do PostgreSQL a cada página.
+# Cada thread de cada worker fica com uma conexão: instâncias x workers x
+# threads precisa caber no max_connections do banco. Com DB_CONN_HEALTH_CHECKS
+# a conexão reaproveitada é testada no início da requisição e reaberta se o
+# banco a derrubou.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=lambda valor: None if valor == 'None' else int(valor))
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL)
+        'default': dj_database_url.parse(
+            DATABASE_URL, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=DB_CONN_HEALTH_CHECKS
+        )
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
 
+# Perfil de produção do SQLite para instalações numa única máquina
+# (apps/core/sqlite/base.py): WAL, synchronous=NORMAL, busy_timeout, cache e
+# mmap maiores e BEGIN IMMEDIATE nas transações. Sem efeito no PostgreSQL.
+SQLITE_OTIMIZADO = config('SQLITE_OTIMIZADO', default=False, cast=bool)
+
+if SQLITE_OTIMIZADO and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['ENGINE'] = 'apps.core.sqlite'
+    DATABASES['default'].setdefault('OPTIONS', {})['pragmas'] = {
+        'busy_timeout': config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int),
+        'mmap_size': config('SQLITE_MMAP_MB', default=256, cast=int) * 1024 * 1024,
+        'cache_size': -config('SQLITE_CACHE_MB', default=64, cast=int) * 1024,
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -113,9 +150,25 @@ if STATIC_DIR.exists():
 else:
     STATICFILES_DIRS = []
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# Em produção os arquivos ganham hash no nome (cache de longo prazo, marcado
+# como immutable pelo WhiteNoise) e versões pré-comprimidas em gzip e brotli
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'whitenoise.storage.CompressedStaticFilesStorage' if DEBUG
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 
-WHITENOISE_USE_FINDERS = True
+WHITENOISE_USE_FINDERS = DEBUG
+
+# CSS do Tailwind e bibliotecas JS gerados por `npm run build`; sem eles os
+# templates usam as versões de CDN
+ASSETS_LOCAIS = (STATIC_DIR / 'css' / 'app.css').exists() and (STATIC_DIR / 'vendor').is_dir()
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -146,9 +199,39 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        'apps.core.instrumentacao': {
+            'handlers': ['console'],
+            'level': config('INSTRUMENTACAO_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+        'apps.core.consultas_lentas': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
 
+# Medição de desempenho por requisição (apps/core/instrumentacao.py)
+INSTRUMENTACAO_ATIVA = config('INSTRUMENTACAO_ATIVA', default=True, cast=bool)
+# Fração das requisições medidas; em produção uma amostra mantém o custo baixo
+INSTRUMENTACAO_AMOSTRAGEM = config('INSTRUMENTACAO_AMOSTRAGEM', default=1.0 if DEBUG else 0.1, cast=float)
+INSTRUMENTACAO_SERVER_TIMING = config('INSTRUMENTACAO_SERVER_TIMING', default=True, cast=bool)
+INSTRUMENTACAO_LIMITE_REPETICOES = config('INSTRUMENTACAO_LIMITE_REPETICOES', default=5, cast=int)
+
+# Métricas do Prometheus em /metrics/ (apps/core/metricas.py). A coleta envia
+# `Authorization: Bearer <METRICAS_TOKEN>`; sem token, com DEBUG=False, só a
+# equipe logada vê as métricas
+METRICAS_ATIVAS = config('METRICAS_ATIVAS', default=True, cast=bool)
+METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+
+# Registro de consultas SQL lentas com EXPLAIN (apps/core/consultas_lentas.py).
+# Em produção só liga explicitamente: cada consulta lenta custa um EXPLAIN e uma escrita.
+CONSULTAS_LENTAS_ATIVO = config('CONSULTAS_LENTAS_ATIVO', default=DEBUG, cast=bool)
+CONSULTAS_LENTAS_LIMITE_MS = config('CONSULTAS_LENTAS_LIMITE_MS', default=200, cast=int)
+# Linhas mantidas na tabela; as mais antigas são descartadas
+CONSULTAS_LENTAS_MAXIMO = config('CONSULTAS_LENTAS_MAXIMO', default=1000, cast=int)
+
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
     SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -157,9 +240,17 @@ if not DEBUG:
     SESSION_COOKIE_SECURE = True
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
     SECURE_SSL_REDIRECT = True
+    # As sondas de saúde da plataforma chamam o container direto, por HTTP
+    SECURE_REDIRECT_EXEMPT = [r'^health/']
+
+# Verificações de /health/ready/ (apps/core/prontidao.py)
+PRONTIDAO_TIMEOUT_SEGUNDOS = config('PRONTIDAO_TIMEOUT_SEGUNDOS', default=2, cast=float)
+PRONTIDAO_CACHE_SEGUNDOS = config('PRONTIDAO_CACHE_SEGUNDOS', default=5, cast=float)
+# Ida e volta ao banco acima disso tira a instância do balanceamento
+PRONTIDAO_LIMITE_BANCO_MS = config('PRONTIDAO_LIMITE_BANCO_MS', default=500, cast=int)
 
 # Configurações de E-mail
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = 'apps.core.metricas.EmailBackendComMetricas'
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
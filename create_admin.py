@@ -1,21 +0,0 @@
-#!/usr/bin/env python
-"""Script para criar superusuário no Railway"""
-import os
-import django
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
-django.setup()
-
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-
-username = 'admin'
-email = 'admin@tornearia.com'
-password = 'Admin@2026'
-
-if not User.objects.filter(username=username).exists():
-    User.objects.create_superuser(username=username, email=email, password=password)
-    print(f'✅ Superusuário "{username}" criado com sucesso!')
-else:
-    print(f'⚠️  Usuário "{username}" já existe.')
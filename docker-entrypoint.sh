@@ -0,0 +1,14 @@
+#!/bin/sh
+# Com RUN_RELEASE=1 o container roda `python manage.py release` (migrações e
+# admin) antes do comando, para deploys com docker run/compose, que não têm
+# fase de release. O release usa uma trava no PostgreSQL, então várias
+# réplicas subindo juntas não migram ao mesmo tempo. No Railway fica
+# desligado: o preDeployCommand já roda o release uma vez por deploy.
+set -e
+
+if [ "${RUN_RELEASE:-0}" = "1" ]; then
+    python manage.py release
+fi
+
+# exec mantém o gunicorn como PID 1, para receber o SIGTERM
+exec "$@"
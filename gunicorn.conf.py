@@ -0,0 +1,169 @@
+"""
+Configuração do gunicorn (lida automaticamente a partir do diretório atual).
+
+As métricas do Prometheus em modo multiprocesso precisam de um diretório
+compartilhado pelos workers, definido antes de eles importarem a aplicação.
+
+Workers e threads saem da CPU e da memória disponíveis para o container
+(cgroup), e cada valor pode ser fixado por variável de ambiente:
+
+    GUNICORN_WORKERS (ou WEB_CONCURRENCY)  padrão: 2 x CPUs + 1, limitado pela memória
+    GUNICORN_THREADS                       padrão: 2 (gthread)
+    GUNICORN_MEMORIA_WORKER_MB             memória reservada por worker no cálculo (padrão: 150)
+    GUNICORN_PRELOAD                       padrão: True
+    GUNICORN_GC_FREEZE                     padrão: True (só com preload)
+    GUNICORN_MAX_REQUESTS                  padrão: 1000 (0 desliga a reciclagem)
+    GUNICORN_MAX_REQUESTS_JITTER           padrão: 10% de GUNICORN_MAX_REQUESTS
+    GUNICORN_TIMEOUT                       padrão: 60
+    GUNICORN_GRACEFUL_TIMEOUT              padrão: 30
+    GUNICORN_KEEPALIVE                     padrão: 5
+    PORT                                   padrão: 8080
+
+Com o preload a aplicação é importada uma vez no processo principal e os
+workers nascem por fork, compartilhando essas páginas de memória (copy on
+write). O `gc.freeze()` antes do fork tira os objetos já carregados das
+coletas do gc, que senão escreveriam nos cabeçalhos deles e copiariam as
+páginas em cada worker. A reciclagem por `max_requests` (com jitter, para
+os workers não reiniciarem juntos) limita o crescimento de memória de um
+worker ao longo do tempo.
+
+O log mostra quanto o gunicorn levou para ficar pronto e, em cada worker,
+quanto tempo passou até a primeira requisição.
+"""
+import gc
+import os
+import shutil
+import tempfile
+import time
+
+
+def _inicio_do_processo():
+    """Momento (epoch) em que o processo principal começou, incluindo a subida do Python."""
+    try:
+        inicio_ticks = int(_ler('/proc/self/stat').rsplit(')', 1)[1].split()[19])
+        uptime = float(_ler('/proc/uptime').split()[0])
+    except (IndexError, ValueError):
+        return time.time()
+    return time.time() - (uptime - inicio_ticks / os.sysconf('SC_CLK_TCK'))
+
+
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'tornearia-prometheus')
+)
+
+# Importado só depois de PROMETHEUS_MULTIPROC_DIR definido; importar dentro
+# do child_exit, chamado pelo sinal SIGCHLD, pode pegar o módulo pela metade
+from prometheus_client import multiprocess  # noqa: E402
+
+
+def _booleano(nome, padrao):
+    return os.environ.get(nome, str(padrao)).lower() in ('1', 'true', 'sim', 'yes')
+
+
+def _inteiro(nome, padrao):
+    valor = os.environ.get(nome, '')
+    return int(valor) if valor.strip() else padrao
+
+
+def _ler(caminho):
+    try:
+        with open(caminho, encoding='ascii') as arquivo:
+            return arquivo.read().strip()
+    except OSError:
+        return ''
+
+
+def cpus_disponiveis():
+    """CPUs que o processo pode usar: afinidade e cota do cgroup (v2 ou v1), a menor."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    cota, periodo = (_ler('/sys/fs/cgroup/cpu.max').split() + ['', ''])[:2]
+    if not cota:
+        cota, periodo = _ler('/sys/fs/cgroup/cpu/cpu.cfs_quota_us'), _ler('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    if cota.lstrip('-').isdigit() and int(cota) > 0 and periodo.isdigit() and int(periodo) > 0:
+        cpus = min(cpus, max(1, -(-int(cota) // int(periodo))))
+    return max(1, cpus)
+
+
+def memoria_disponivel_mb():
+    """Limite de memória do cgroup, ou a memória total da máquina (None se não der para saber)."""
+    for caminho in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limite = _ler(caminho)
+        # Sem limite o cgroup v1 informa um número enorme
+        if limite.isdigit() and int(limite) < 1 << 50:
+            return int(limite) // (1024 * 1024)
+    for linha in _ler('/proc/meminfo').splitlines():
+        if linha.startswith('MemTotal:'):
+            return int(linha.split()[1]) // 1024
+    return None
+
+
+def calcular_workers(cpus, memoria_mb, memoria_worker_mb):
+    """2 x CPUs + 1, sem passar do que cabe na memória (deixando um worker de folga para o processo principal)."""
+    workers = 2 * cpus + 1
+    if memoria_mb:
+        workers = min(workers, memoria_mb // memoria_worker_mb - 1)
+    return max(1, workers)
+
+
+INICIO = _inicio_do_processo()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = _inteiro('GUNICORN_WORKERS', _inteiro('WEB_CONCURRENCY', 0)) or calcular_workers(
+    cpus_disponiveis(), memoria_disponivel_mb(), _inteiro('GUNICORN_MEMORIA_WORKER_MB', 150)
+)
+# Threads deixam o worker atender outra requisição enquanto uma espera o
+# banco ou o SMTP; cada thread mantém a própria conexão com o banco
+threads = _inteiro('GUNICORN_THREADS', 2)
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = _booleano('GUNICORN_PRELOAD', True)
+GC_FREEZE = preload_app and _booleano('GUNICORN_GC_FREEZE', True)
+max_requests = _inteiro('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _inteiro('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+timeout = _inteiro('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _inteiro('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _inteiro('GUNICORN_KEEPALIVE', 5)
+# O heartbeat dos workers em memória não trava quando o disco do container está lento
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def on_starting(server):
+    # Arquivos de uma execução anterior somariam contadores antigos
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def when_ready(server):
+    server.log.info('Pronto em %.2f s desde o início do gunicorn', time.time() - INICIO)
+    server.log.info(
+        'workers=%s threads=%s preload=%s gc_freeze=%s max_requests=%s(+%s) timeout=%ss',
+        server.cfg.workers, server.cfg.threads, server.cfg.preload_app, GC_FREEZE,
+        server.cfg.max_requests, server.cfg.max_requests_jitter, server.cfg.timeout,
+    )
+    if GC_FREEZE:
+        gc.collect()
+
+
+def pre_fork(server, worker):
+    if GC_FREEZE:
+        # Inclui objetos criados no processo principal desde o último fork
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    worker.inicio = time.time()
+    worker.atendeu = False
+
+
+def pre_request(worker, req):
+    if not worker.atendeu:
+        worker.atendeu = True
+        agora = time.time()
+        worker.log.info(
+            'Primeira requisição do worker %s: %.2f s após o fork, %.2f s desde o início do gunicorn',
+            worker.pid, agora - worker.inicio, agora - INICIO,
+        )
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,229 @@
+"""
+Fábricas de dados para os testes.
+
+Cada método cria um registro pelo ORM (passando por save() e pelos
+signals, como as telas fazem) com valores plausíveis gerados por um
+`random.Random` com semente fixa; os campos podem ser sobrescritos por
+argumentos nomeados. `popular()` monta um cenário completo com
+`tamanho` registros de cada tipo.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from apps.cadastros.models import Cliente, Empresa, Funcionario
+from apps.core.models import ConfiguracaoEmpresa
+from apps.financeiro.models import (
+    CategoriaDespesa, Despesa, FolhaPagamento, ItemVenda, Parcela, ResumoItemMensal,
+    SaldoCliente, Venda,
+)
+from apps.orcamentos.models import ItemOrcamento, Orcamento
+from apps.servicos.models import Item
+
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elaine', 'Fábio', 'Gustavo', 'Helena', 'Igor', 'Joana']
+SOBRENOMES = ['Silva', 'Souza', 'Oliveira', 'Santos', 'Pereira', 'Lima', 'Costa', 'Ferreira']
+PECAS = ['Eixo', 'Bucha', 'Flange', 'Engrenagem', 'Pino', 'Polia', 'Rolamento', 'Mancal']
+SERVICOS = ['Torneamento', 'Fresagem', 'Solda', 'Retífica', 'Usinagem CNC', 'Recuperação de eixo']
+CATEGORIAS = [('Aluguel', '#EF4444'), ('Energia', '#F59E0B'), ('Material', '#3B82F6'), ('Ferramentas', '#10B981')]
+
+
+def _cpf(numero):
+    digitos = f'{numero:011d}'
+    return f'{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}'
+
+
+def _cnpj(numero):
+    digitos = f'{numero:014d}'
+    return f'{digitos[:2]}.{digitos[2:5]}.{digitos[5:8]}/{digitos[8:12]}-{digitos[12:]}'
+
+
+class Fabrica:
+    """Cria registros com valores aleatórios reprodutíveis (mesma semente, mesmos dados)."""
+
+    def __init__(self, semente=42):
+        self.aleatorio = random.Random(semente)
+        self.sequencia = 0
+        self.hoje = timezone.localdate()
+
+    def _proximo(self):
+        self.sequencia += 1
+        return self.sequencia
+
+    def _nome_pessoa(self):
+        return f'{self.aleatorio.choice(NOMES)} {self.aleatorio.choice(SOBRENOMES)} {self._proximo()}'
+
+    def _preco(self, minimo, maximo):
+        return Decimal(self.aleatorio.randint(minimo * 100, maximo * 100)) / 100
+
+    def _data_recente(self, dias=120):
+        return self.hoje - timedelta(days=self.aleatorio.randint(0, dias))
+
+    def usuario(self, username='admin', **campos):
+        campos.setdefault('is_staff', True)
+        campos.setdefault('is_superuser', True)
+        usuario = User.objects.create(username=username, **campos)
+        usuario.set_password('senha')
+        usuario.save()
+        return usuario
+
+    def configuracao(self, **campos):
+        campos.setdefault('nome', 'Tornearia Jair')
+        return ConfiguracaoEmpresa.objects.create(**campos)
+
+    def cliente(self, **campos):
+        numero = self._proximo()
+        campos.setdefault('nome', self._nome_pessoa())
+        campos.setdefault('cpf', _cpf(10000000000 + numero))
+        campos.setdefault('telefone', f'(11) 9{numero:04d}-{self.aleatorio.randint(0, 9999):04d}')
+        campos.setdefault('email', f'cliente{numero}@exemplo.com.br')
+        return Cliente.objects.create(**campos)
+
+    def empresa(self, **campos):
+        numero = self._proximo()
+        campos.setdefault('nome', f'Metalúrgica {self.aleatorio.choice(SOBRENOMES)} {numero} Ltda')
+        campos.setdefault('cnpj', _cnpj(10000000000000 + numero))
+        campos.setdefault('nome_contato', self._nome_pessoa())
+        campos.setdefault('email', f'compras{numero}@exemplo.com.br')
+        return Empresa.objects.create(**campos)
+
+    def funcionario(self, **campos):
+        campos.setdefault('nome', self._nome_pessoa())
+        campos.setdefault('cargo', self.aleatorio.choice(['Torneiro', 'Fresador', 'Soldador', 'Auxiliar']))
+        campos.setdefault('salario', self._preco(1800, 5000))
+        campos.setdefault('data_admissao', self._data_recente(1500))
+        return Funcionario.objects.create(**campos)
+
+    def produto(self, **campos):
+        campos.setdefault('nome', f'{self.aleatorio.choice(PECAS)} {self._proximo()}')
+        campos.setdefault('preco', self._preco(10, 400))
+        campos.setdefault('quantidade_estoque', self.aleatorio.randint(0, 80))
+        campos.setdefault('estoque_minimo', self.aleatorio.randint(2, 15))
+        return Item.objects.create(tipo='produto', **campos)
+
+    def servico(self, **campos):
+        campos.setdefault('nome', f'{self.aleatorio.choice(SERVICOS)} {self._proximo()}')
+        campos.setdefault('preco', self._preco(50, 1500))
+        return Item.objects.create(tipo='servico', **campos)
+
+    def categoria(self, **campos):
+        nome, cor = CATEGORIAS[self._proximo() % len(CATEGORIAS)]
+        campos.setdefault('nome', nome)
+        campos.setdefault('cor', cor)
+        return CategoriaDespesa.objects.create(**campos)
+
+    def despesa(self, **campos):
+        campos.setdefault('descricao', f'Despesa {self._proximo()}')
+        campos.setdefault('valor', self._preco(30, 3000))
+        campos.setdefault('data', self._data_recente())
+        campos.setdefault('tipo', self.aleatorio.choice(['fixa', 'variavel']))
+        return Despesa.objects.create(**campos)
+
+    def _destinatario(self, campos, clientes, empresas):
+        if 'cliente' in campos or 'empresa' in campos:
+            return
+        if empresas and (not clientes or self.aleatorio.random() < 0.3):
+            campos['empresa'] = self.aleatorio.choice(empresas)
+        elif clientes:
+            campos['cliente'] = self.aleatorio.choice(clientes)
+
+    def orcamento(self, itens, quantidade_itens=3, clientes=(), empresas=(), **campos):
+        """Orçamento com `quantidade_itens` itens sorteados entre `itens`."""
+        self._destinatario(campos, clientes, empresas)
+        campos.setdefault('validade', self.hoje + timedelta(days=15))
+        campos.setdefault('desconto', Decimal(self.aleatorio.choice([0, 0, 5, 10])))
+        orcamento = Orcamento.objects.create(**campos)
+        for item in self.aleatorio.sample(itens, min(quantidade_itens, len(itens))):
+            ItemOrcamento.objects.create(
+                orcamento=orcamento,
+                item=item,
+                quantidade=self.aleatorio.randint(1, 5),
+                valor_unitario=item.preco,
+            )
+        return orcamento
+
+    def venda(self, itens, quantidade_itens=3, clientes=(), empresas=(), concluir=False, **campos):
+        """Venda com `quantidade_itens` itens sorteados entre `itens` e suas parcelas."""
+        self._destinatario(campos, clientes, empresas)
+        campos.setdefault('data_entrada', self._data_recente(60))
+        campos.setdefault('desconto', Decimal(self.aleatorio.choice([0, 0, 0, 5])))
+        campos.setdefault('forma_pagamento', self.aleatorio.choice(['pix', 'dinheiro', 'boleto', 'cartao_credito']))
+        if self.aleatorio.random() < 0.4:
+            campos.setdefault('tipo_pagamento', 'parcelado')
+            campos.setdefault('numero_parcelas', self.aleatorio.randint(2, 4))
+        venda = Venda.objects.create(**campos)
+        for item in self.aleatorio.sample(itens, min(quantidade_itens, len(itens))):
+            ItemVenda.objects.create(
+                venda=venda,
+                item=item,
+                quantidade=self.aleatorio.randint(1, 4),
+                valor_unitario=item.preco,
+            )
+        venda.gerar_parcelas()
+        if concluir:
+            venda.concluir()
+        return venda
+
+    def popular(self, tamanho):
+        """
+        Cenário com `tamanho` registros de cada cadastro e de cada movimento
+        (vendas em andamento e concluídas, orçamentos, despesas), mais os
+        agregados que normalmente são mantidos pelos signals após o commit.
+        Devolve um dict com um exemplo de cada tipo para montar as URLs e
+        listas de pks para as ações em lote.
+        """
+        self.configuracao()
+        clientes = [self.cliente() for _ in range(tamanho)]
+        empresas = [self.empresa() for _ in range(tamanho)]
+        funcionarios = [self.funcionario() for _ in range(tamanho)]
+        produtos = [self.produto() for _ in range(tamanho)]
+        servicos = [self.servico() for _ in range(tamanho)]
+        itens = produtos + servicos
+        categorias = [self.categoria() for _ in range(min(tamanho, len(CATEGORIAS)))]
+        despesas = [
+            self.despesa(categoria=self.aleatorio.choice(categorias)) for _ in range(tamanho)
+        ]
+
+        orcamentos = [self.orcamento(itens, cliente=clientes[0])]
+        orcamentos += [self.orcamento(itens, clientes=clientes, empresas=empresas) for _ in range(tamanho - 1)]
+        Orcamento.objects.filter(pk=orcamentos[-1].pk).update(status='aprovado')
+        # As vendas de exemplo têm sempre o mesmo formato, para que o número de
+        # consultas das telas delas não dependa do sorteio
+        andamento = [self.venda(
+            itens, cliente=clientes[0], tipo_pagamento='parcelado', numero_parcelas=3
+        )]
+        andamento += [self.venda(itens, clientes=clientes, empresas=empresas) for _ in range(tamanho - 1)]
+        concluidas = [self.venda(itens, empresa=empresas[0], tipo_pagamento='a_vista', concluir=True)]
+        concluidas += [
+            self.venda(itens, clientes=clientes, empresas=empresas, concluir=True) for _ in range(tamanho - 1)
+        ]
+        # Algumas parcelas vencidas em aberto, para o dashboard e a conciliação
+        Parcela.objects.filter(venda__in=andamento[::2]).update(
+            data_vencimento=self.hoje - timedelta(days=10)
+        )
+        folha, _, _ = FolhaPagamento.gerar_folha(self.hoje.month, self.hoje.year)
+
+        SaldoCliente.reconstruir()
+        ResumoItemMensal.reconstruir()
+        return {
+            'cliente': clientes[0],
+            'empresa': empresas[0],
+            'funcionario': funcionarios[0],
+            'produto': produtos[0],
+            'servico': servicos[0],
+            'categoria': categorias[0],
+            'despesa': despesas[0],
+            'orcamento': orcamentos[0],
+            'orcamento_aprovado': orcamentos[-1],
+            'venda': andamento[0],
+            'venda_concluida': concluidas[0],
+            'parcela': andamento[0].parcelas.first(),
+            'vendas_em_andamento': [venda.pk for venda in andamento],
+            'parcelas_em_aberto': list(
+                Parcela.objects.filter(pago=False).values_list('pk', flat=True)
+            ),
+            'folha': folha,
+        }
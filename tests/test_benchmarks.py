@@ -0,0 +1,109 @@
+"""Partes dos benchmarks que não dependem de um servidor no ar."""
+import random
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import resolve
+
+from benchmarks import carga, micro
+from benchmarks.comum import percentil
+from .fabricas import Fabrica
+
+
+class SessaoFalsa:
+    """Registra as requisições das jornadas sem fazer HTTP."""
+
+    def __init__(self):
+        self.requisicoes = []
+        self.cookies = {'csrftoken': 'x'}
+
+    def get(self, endpoint, caminho):
+        self.requisicoes.append((endpoint, caminho))
+        return 200, {}, b'<input name="csrfmiddlewaretoken" value="abc">'
+
+    def post(self, endpoint, caminho, dados):
+        self.requisicoes.append((endpoint, caminho))
+        return 302, {'location': '/financeiro/vendas/1/'}, b''
+
+
+class PercentilTest(SimpleTestCase):
+    def test_interpola_entre_valores(self):
+        self.assertEqual(percentil([10, 20, 30, 40], 50), 25)
+        self.assertEqual(percentil([10, 20, 30, 40], 100), 40)
+        self.assertEqual(percentil([7], 99), 7)
+        self.assertIsNone(percentil([], 95))
+
+
+class ComparacaoTest(SimpleTestCase):
+    def relatorio(self, p95, requisicoes=100, erros=0):
+        registros = [('core:dashboard', p95, 200, False)] * (requisicoes - erros)
+        registros += [('core:dashboard', p95, 500, True)] * erros
+        total, endpoints = carga.resumir(registros, 10)
+        return {
+            'ambiente': {'commit': 'abc', 'data': ''},
+            'configuracao': {'concorrencia': 4},
+            'dados': {'venda': 1000},
+            'total': total,
+            'endpoints': endpoints,
+        }
+
+    def test_regressao_de_p95_acima_da_tolerancia(self):
+        regressoes = carga.comparar(self.relatorio(150), self.relatorio(100), tolerancia=10)
+        self.assertEqual(len(regressoes), 1)
+        self.assertIn('core:dashboard', regressoes[0])
+
+    def test_variacao_pequena_ou_com_poucas_amostras_nao_e_regressao(self):
+        self.assertEqual(carga.comparar(self.relatorio(104), self.relatorio(100), tolerancia=10), [])
+        self.assertEqual(carga.comparar(self.relatorio(300, 5), self.relatorio(100, 5), tolerancia=10), [])
+
+    def test_aumento_de_erros_e_regressao(self):
+        self.assertEqual(len(carga.comparar(self.relatorio(100, erros=3), self.relatorio(100), 10)), 1)
+
+
+class JornadasTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Fabrica().popular(3)
+
+    def test_jornadas_usam_urls_existentes(self):
+        aleatorio = random.Random(1)
+        jornadas = carga.Jornadas(carga.Amostra(aleatorio), 'carga', 'senha')
+        sessao = SessaoFalsa()
+        jornadas.entrar(sessao)
+        for _ in range(10):
+            for nome in carga.JORNADAS_PADRAO:
+                getattr(jornadas, nome)(sessao, aleatorio)
+
+        self.assertEqual(
+            {endpoint for endpoint, _ in sessao.requisicoes},
+            {resolve(caminho.split('?')[0]).view_name for _, caminho in sessao.requisicoes},
+        )
+        self.assertIn('financeiro:venda_comprovante', {endpoint for endpoint, _ in sessao.requisicoes})
+
+
+class MicroComparacaoTest(SimpleTestCase):
+    def execucao(self, mediana, minimo=None, consultas=2):
+        estatisticas = {'mediana_us': mediana, 'minimo_us': minimo or mediana, 'consultas': consultas}
+        return {'resultados': {'venda_total': {'unidade': 'itens', 'tamanhos': {'10': estatisticas}}}}
+
+    def test_regressao_de_tempo_na_mediana_e_no_minimo(self):
+        anteriores = [self.execucao(1000), self.execucao(1100), self.execucao(900)]
+        atual = self.execucao(1500)['resultados']
+        self.assertEqual(len(micro.comparar(atual, anteriores, tolerancia=25)), 1)
+        # Piora só na mediana (o melhor tempo continua igual) é ruído
+        self.assertEqual(micro.comparar(self.execucao(1500, 1000)['resultados'], anteriores, 25), [])
+
+    def test_mais_consultas_e_regressao(self):
+        regressoes = micro.comparar(self.execucao(1000, consultas=3)['resultados'], [self.execucao(1000)], 25)
+        self.assertEqual(regressoes, ['venda_total (10 itens): 2 -> 3 consultas'])
+
+
+class MicroCenariosTest(TestCase):
+    def test_cenarios_montam_todos_os_benchmarks(self):
+        cenarios = micro.Cenarios(semente=1)
+        for grupo, definicao in micro.GRUPOS.items():
+            with self.subTest(grupo=grupo):
+                benchmarks = getattr(cenarios, grupo)(3 if grupo != 'dashboard' else 30)
+                self.assertEqual(set(benchmarks), set(definicao['benchmarks']))
+                for nome, (executar, preparar) in benchmarks.items():
+                    estatisticas = micro.medir(executar, preparar, tempo=0)
+                    self.assertEqual(estatisticas['repeticoes'], micro.REPETICOES_MINIMAS, nome)
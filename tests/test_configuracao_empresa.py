@@ -0,0 +1,52 @@
+"""Cache em memória da configuração da empresa."""
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.core import models as core_models
+from apps.core.models import ConfiguracaoEmpresa
+
+
+class CacheConfiguracaoTest(TestCase):
+    def setUp(self):
+        ConfiguracaoEmpresa.limpar_cache()
+        self.addCleanup(ConfiguracaoEmpresa.limpar_cache)
+        self.config = ConfiguracaoEmpresa.objects.create(nome='Tornearia Antiga')
+        self.agora = 1000.0
+        relogio = mock.patch.object(core_models.time, 'monotonic', lambda: self.agora)
+        relogio.start()
+        self.addCleanup(relogio.stop)
+
+    def alterar_em_outro_processo(self, **campos):
+        # update() não dispara o sinal que limpa o cache deste processo
+        ConfiguracaoEmpresa.objects.filter(pk=self.config.pk).update(
+            atualizado_em=timezone.now() + timedelta(seconds=1), **campos
+        )
+
+    def test_leituras_seguidas_nao_consultam_o_banco(self):
+        ConfiguracaoEmpresa.obter()
+        with self.assertNumQueries(0):
+            self.assertEqual(ConfiguracaoEmpresa.obter().nome, 'Tornearia Antiga')
+
+    def test_alteracao_em_outro_processo_e_percebida_na_conferencia(self):
+        ConfiguracaoEmpresa.obter()
+        self.alterar_em_outro_processo(nome='Tornearia Nova')
+
+        self.assertEqual(ConfiguracaoEmpresa.obter().nome, 'Tornearia Antiga')
+        self.agora += core_models.VERIFICACAO_CONFIGURACAO
+        self.assertEqual(ConfiguracaoEmpresa.obter().nome, 'Tornearia Nova')
+
+    def test_conferencia_sem_alteracao_so_le_a_versao(self):
+        ConfiguracaoEmpresa.obter()
+        self.agora += core_models.VERIFICACAO_CONFIGURACAO
+        with self.assertNumQueries(1):
+            ConfiguracaoEmpresa.obter()
+
+    def test_exclusao_em_outro_processo(self):
+        ConfiguracaoEmpresa.obter()
+        # _raw_delete não dispara o sinal que limparia o cache deste processo
+        ConfiguracaoEmpresa.objects.filter(pk=self.config.pk)._raw_delete('default')
+        self.agora += core_models.VERIFICACAO_CONFIGURACAO
+        self.assertIsNone(ConfiguracaoEmpresa.obter())
@@ -0,0 +1,243 @@
+"""
+Limites de consultas SQL e de tempo de resposta por URL.
+
+Cada URL do projeto é chamada com dois volumes de dados (`TAMANHO` 3 e 30
+registros de cada tipo, o segundo maior que a paginação das listagens). O
+limite de consultas é o mesmo nos dois volumes, então uma consulta feita
+por linha (N+1) estoura o limite no volume maior; a mensagem de erro
+mostra as consultas repetidas. Toda URL nova precisa de um limite em
+`ROTAS` (ver `TodasAsRotasTemLimiteTest`).
+
+O tempo de resposta é medido com os caches vazios. Em máquinas lentas os
+limites de tempo podem ser multiplicados pela variável de ambiente
+TESTES_FATOR_LATENCIA.
+"""
+import os
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from apps.core.instrumentacao import impressao_digital
+from apps.core.models import ConfiguracaoEmpresa
+from .fabricas import Fabrica
+
+
+FATOR_LATENCIA = float(os.environ.get('TESTES_FATOR_LATENCIA', '1'))
+
+# URLs que não são do projeto
+NAMESPACES_IGNORADOS = {'admin'}
+
+
+class Rota:
+    """Como chamar uma URL e quanto ela pode gastar."""
+
+    def __init__(self, consultas, ms=500, objeto=None, metodo='get', dados=None, parametros=''):
+        self.consultas = consultas
+        self.ms = ms
+        # Chave do cenário (Fabrica.popular) cujo pk vai na URL
+        self.objeto = objeto
+        self.metodo = metodo
+        # dict ou função que recebe o cenário e devolve o dict
+        self.dados = dados
+        self.parametros = parametros
+
+
+ROTAS = {
+    'healthcheck': Rota(0),
+    # As consultas da prontidão rodam em outras threads
+    'prontidao': Rota(0),
+    # Sessão e usuário da equipe; a coleta com token não consulta o banco
+    'metricas': Rota(2),
+    'login': Rota(1),
+    'logout': Rota(4, metodo='post'),
+
+    'core:dashboard': Rota(18),
+    'core:configuracao': Rota(4),
+    'core:consultas_lentas': Rota(5),
+    'core:dashboard_data_api': Rota(5),
+
+    'cadastros:empresa_list': Rota(5),
+    'cadastros:empresa_create': Rota(3),
+    'cadastros:empresa_detail': Rota(6, objeto='empresa'),
+    'cadastros:empresa_update': Rota(4, objeto='empresa'),
+    'cadastros:empresa_delete': Rota(4, objeto='empresa'),
+    'cadastros:cliente_list': Rota(5),
+    'cadastros:cliente_create': Rota(3),
+    'cadastros:cliente_detail': Rota(6, objeto='cliente'),
+    'cadastros:cliente_update': Rota(4, objeto='cliente'),
+    'cadastros:cliente_delete': Rota(4, objeto='cliente'),
+    'cadastros:funcionario_list': Rota(5),
+    'cadastros:funcionario_create': Rota(3),
+    'cadastros:funcionario_detail': Rota(4, objeto='funcionario'),
+    'cadastros:funcionario_update': Rota(4, objeto='funcionario'),
+    'cadastros:funcionario_delete': Rota(4, objeto='funcionario'),
+    'cadastros:importar': Rota(3),
+    'cadastros:buscar_cliente_empresa': Rota(4, parametros='?q=a'),
+
+    'servicos:item_list': Rota(6),
+    'servicos:item_create': Rota(3),
+    'servicos:reajuste_precos': Rota(3),
+    'servicos:item_detail': Rota(7, objeto='produto'),
+    'servicos:item_update': Rota(4, objeto='produto'),
+    'servicos:movimentar_estoque': Rota(
+        11, objeto='produto', metodo='post', dados={'tipo': 'entrada', 'quantidade': '5'}
+    ),
+    'servicos:item_delete': Rota(4, objeto='produto'),
+    'servicos:buscar_itens': Rota(3, parametros='?q=e'),
+    'servicos:obter_preco_item': Rota(3, objeto='produto'),
+
+    'orcamentos:orcamento_list': Rota(6),
+    'orcamentos:orcamento_create': Rota(6),
+    'orcamentos:orcamento_detail': Rota(6, objeto='orcamento'),
+    'orcamentos:orcamento_update': Rota(8, objeto='orcamento'),
+    'orcamentos:orcamento_delete': Rota(5, objeto='orcamento'),
+    'orcamentos:orcamento_pdf': Rota(6, ms=1500, objeto='orcamento'),
+    'orcamentos:orcamento_aprovar': Rota(7, objeto='orcamento'),
+    'orcamentos:orcamento_rejeitar': Rota(7, objeto='orcamento'),
+    'orcamentos:orcamento_converter': Rota(17, objeto='orcamento_aprovado'),
+    'orcamentos:orcamento_email': Rota(9, ms=1500, objeto='orcamento'),
+
+    'financeiro:venda_list': Rota(6),
+    'financeiro:venda_create': Rota(6),
+    'financeiro:venda_acao_lote': Rota(
+        29, metodo='post', dados=lambda cenario: {'acao': 'concluir', 'ids': cenario['vendas_em_andamento']}
+    ),
+    'financeiro:venda_detail': Rota(10, objeto='venda'),
+    'financeiro:venda_update': Rota(8, objeto='venda'),
+    'financeiro:venda_delete': Rota(5, objeto='venda'),
+    'financeiro:venda_concluir': Rota(20, objeto='venda'),
+    'financeiro:venda_cancelar': Rota(7, objeto='venda'),
+    'financeiro:venda_comprovante': Rota(6, ms=1500, objeto='venda_concluida'),
+    'financeiro:venda_email': Rota(9, ms=1500, objeto='venda_concluida'),
+    'financeiro:venda_gerar_parcelas': Rota(13, objeto='venda'),
+    'financeiro:parcela_pagar': Rota(9, objeto='parcela'),
+    'financeiro:parcela_pagar_lote': Rota(
+        16, metodo='post', dados=lambda cenario: {'ids': cenario['parcelas_em_aberto']}
+    ),
+    'financeiro:conciliacao': Rota(3),
+    'financeiro:folha_list': Rota(5),
+    'financeiro:folha_gerar': Rota(10),
+    'financeiro:folha_processar': Rota(7, objeto='folha'),
+    'financeiro:fluxo_caixa': Rota(8),
+    'financeiro:fluxo_caixa_api': Rota(7),
+    'financeiro:dre': Rota(53, ms=1000),
+    'financeiro:saldo_cliente_list': Rota(5),
+    'financeiro:curva_abc': Rota(4),
+    'financeiro:reposicao': Rota(5),
+    'financeiro:despesa_list': Rota(6),
+    'financeiro:despesa_create': Rota(4),
+    'financeiro:despesa_update': Rota(5, objeto='despesa'),
+    'financeiro:despesa_delete': Rota(4, objeto='despesa'),
+    'financeiro:categoria_list': Rota(4),
+    'financeiro:categoria_create': Rota(3),
+    'financeiro:categoria_update': Rota(4, objeto='categoria'),
+    'financeiro:categoria_delete': Rota(4, objeto='categoria'),
+}
+
+
+def nomes_das_rotas(padroes=None, prefixo=''):
+    """Nomes (com namespace) de todas as URLs do projeto."""
+    if padroes is None:
+        padroes = get_resolver().url_patterns
+    nomes = set()
+    for padrao in padroes:
+        if isinstance(padrao, URLResolver):
+            if padrao.namespace in NAMESPACES_IGNORADOS:
+                continue
+            namespace = f'{prefixo}{padrao.namespace}:' if padrao.namespace else prefixo
+            nomes |= nomes_das_rotas(padrao.url_patterns, namespace)
+        elif isinstance(padrao, URLPattern) and padrao.name:
+            nomes.add(f'{prefixo}{padrao.name}')
+    return nomes
+
+
+def descrever_consultas(consultas, limite=5):
+    """Texto com as consultas executadas mais de uma vez, agrupadas pela impressão digital."""
+    repetidas = Counter(impressao_digital(consulta['sql']) for consulta in consultas)
+    linhas = [
+        f'  {vezes}x {sql}' for sql, vezes in repetidas.most_common(limite) if vezes > 1
+    ]
+    return '\n'.join(linhas) or '  (nenhuma consulta repetida)'
+
+
+configuracao_dos_testes = override_settings(
+    # Sem os middlewares que gravam ou registram consultas próprias
+    CONSULTAS_LENTAS_ATIVO=False,
+    INSTRUMENTACAO_ATIVA=False,
+    # Com DEBUG=False no ambiente o settings liga o redirecionamento para HTTPS
+    SECURE_SSL_REDIRECT=False,
+    # e o storage com manifesto, que exige o collectstatic
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+
+
+class LimitesPorRotaMixin:
+    TAMANHO = None
+
+    @classmethod
+    def setUpTestData(cls):
+        fabrica = Fabrica()
+        cls.usuario = fabrica.usuario()
+        cls.cenario = fabrica.popular(cls.TAMANHO)
+
+    def chamar(self, nome, rota):
+        args = [self.cenario[rota.objeto].pk] if rota.objeto else []
+        url = reverse(nome, args=args) + rota.parametros
+        dados = rota.dados(self.cenario) if callable(rota.dados) else rota.dados
+        # logout e as trocas de sessão não podem afetar as próximas rotas
+        self.client.force_login(self.usuario)
+        ConfiguracaoEmpresa.limpar_cache()
+        cache.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                resposta = getattr(self.client, rota.metodo)(url, dados or {})
+                duracao_ms = (time.perf_counter() - inicio) * 1000
+            # Ações que alteram dados (concluir, excluir...) não afetam as próximas rotas
+            transaction.set_rollback(True)
+        return url, resposta, consultas.captured_queries, duracao_ms
+
+    def test_limites_de_consultas_e_tempo(self):
+        for nome, rota in ROTAS.items():
+            with self.subTest(rota=nome):
+                url, resposta, consultas, duracao_ms = self.chamar(nome, rota)
+                self.assertLess(resposta.status_code, 400, f'{rota.metodo.upper()} {url}')
+                self.assertLessEqual(
+                    len(consultas), rota.consultas,
+                    f'{rota.metodo.upper()} {url} com {self.TAMANHO} registros de cada tipo fez '
+                    f'{len(consultas)} consultas (limite {rota.consultas}). Repetidas:\n'
+                    f'{descrever_consultas(consultas)}'
+                )
+                limite_ms = rota.ms * FATOR_LATENCIA
+                self.assertLessEqual(
+                    duracao_ms, limite_ms,
+                    f'{rota.metodo.upper()} {url} levou {duracao_ms:.0f} ms (limite {limite_ms:.0f} ms)'
+                )
+
+
+@configuracao_dos_testes
+class LimitesComPoucosDadosTest(LimitesPorRotaMixin, TestCase):
+    TAMANHO = 3
+
+
+@configuracao_dos_testes
+class LimitesComMaisDadosTest(LimitesPorRotaMixin, TestCase):
+    TAMANHO = 30
+
+
+class TodasAsRotasTemLimiteTest(SimpleTestCase):
+    def test_toda_rota_tem_limite(self):
+        sem_limite = nomes_das_rotas() - set(ROTAS)
+        self.assertFalse(sem_limite, f'URLs sem limite em ROTAS: {sorted(sem_limite)}')
+
+    def test_nenhum_limite_sobrando(self):
+        inexistentes = set(ROTAS) - nomes_das_rotas()
+        self.assertFalse(inexistentes, f'Limites para URLs que não existem: {sorted(inexistentes)}')
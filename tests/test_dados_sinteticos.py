@@ -0,0 +1,66 @@
+"""Gerador de dados sintéticos (comando gerar_dados_sinteticos) em volume pequeno."""
+from collections import Counter
+
+from django.test import TestCase
+
+from apps.core.dados_sinteticos import GeradorDadosSinteticos
+from apps.financeiro.models import Parcela, SaldoCliente, Venda
+from apps.orcamentos.models import Orcamento
+from apps.servicos.estoque import divergencias
+from .fabricas import Fabrica
+
+
+VOLUMES = {
+    'clientes': 20, 'empresas': 5, 'itens': 15, 'funcionarios': 3,
+    'vendas': 300, 'orcamentos': 60, 'despesas': 150,
+}
+
+
+class GeradorDadosSinteticosTest(TestCase):
+    def gerar(self, semente=42):
+        gerador = GeradorDadosSinteticos(semente=semente, anos=1)
+        return gerador, gerador.gerar(**VOLUMES)
+
+    def test_volumes_e_numeracao_continuam_os_existentes(self):
+        fabrica = Fabrica()
+        venda = fabrica.venda([fabrica.servico()], cliente=fabrica.cliente())
+        _, gravados = self.gerar()
+
+        self.assertEqual(gravados['Vendas/Serviços'], VOLUMES['vendas'])
+        self.assertEqual(Venda.objects.count(), VOLUMES['vendas'] + 1)
+        numeros = list(Venda.objects.order_by('id').values_list('numero', flat=True))
+        self.assertEqual(numeros[0], venda.numero)
+        self.assertEqual(numeros[-1], f'VND{VOLUMES["vendas"] + 1:05d}')
+        self.assertEqual(len(set(numeros)), len(numeros))
+        # A numeração do save() continua depois dos registros gerados
+        proxima = Venda.objects.create(data_entrada=venda.data_entrada)
+        self.assertEqual(proxima.numero, f'VND{VOLUMES["vendas"] + 2:05d}')
+        self.assertEqual(Orcamento.objects.count(), VOLUMES['orcamentos'])
+
+    def test_dados_consistentes(self):
+        gerador, _ = self.gerar()
+
+        self.assertEqual(divergencias(), [])
+        self.assertFalse(Venda.objects.filter(data_entrada__gt=gerador.ate).exists())
+        self.assertFalse(Venda.objects.filter(status='concluido', parcelas__pago=False).exists())
+        self.assertFalse(Parcela.objects.filter(pago=True, data_pagamento__isnull=True).exists())
+        self.assertEqual(
+            SaldoCliente.objects.count(),
+            Venda.objects.filter(cliente__isnull=False).values('cliente').distinct().count()
+            + Venda.objects.filter(empresa__isnull=False).values('empresa').distinct().count()
+        )
+
+    def test_mesma_semente_mesmos_dados(self):
+        def retrato(vendas):
+            return list(vendas.order_by('id', 'itens__id').values_list(
+                'cliente__nome', 'empresa__nome', 'status', 'data_entrada', 'data_conclusao', 'forma_pagamento',
+                'numero_parcelas', 'itens__item__nome', 'itens__quantidade', 'itens__valor_unitario',
+            ))
+
+        self.gerar()
+        ultimo = Venda.objects.latest('id').pk
+        self.gerar()
+        primeiro = retrato(Venda.objects.filter(pk__lte=ultimo))
+        self.assertEqual(retrato(Venda.objects.filter(pk__gt=ultimo)), primeiro)
+        self.gerar(semente=7)
+        self.assertNotEqual(retrato(Venda.objects.filter(pk__gt=ultimo + VOLUMES['vendas'])), primeiro)
@@ -0,0 +1,90 @@
+"""DRE: resumos de meses fechados descartados quando o mês é alterado, e o painel de acordo com ele."""
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.financeiro.dre import obter_resumos
+from apps.financeiro.models import Despesa, FolhaPagamento, ResumoMensal, Venda
+
+from .fabricas import Fabrica
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+class ResumoMensalInvalidadoTest(TestCase):
+    def setUp(self):
+        self.fabrica = Fabrica()
+        fechado = timezone.localdate().replace(day=1) - relativedelta(months=2)
+        self.mes = (fechado.year, fechado.month)
+        self.dia = date(*self.mes, 10)
+
+    def resumo(self):
+        return obter_resumos([self.mes])[self.mes]
+
+    def test_despesa_retroativa_entra_no_mes_fechado(self):
+        self.assertEqual(self.resumo().total_despesas, 0)
+        self.assertTrue(ResumoMensal.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fabrica.despesa(valor=Decimal('250.00'), data=self.dia)
+        self.assertFalse(ResumoMensal.objects.exists())
+        self.assertEqual(self.resumo().total_despesas, Decimal('250.00'))
+
+    def test_despesa_movida_para_o_mes_corrente_sai_do_mes_fechado(self):
+        # bulk_create: sem callbacks pendentes que encobririam o do save abaixo
+        [despesa] = Despesa.objects.bulk_create([Despesa(descricao='Aluguel', valor=Decimal('250.00'), data=self.dia)])
+        self.assertEqual(self.resumo().total_despesas, Decimal('250.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            despesa.data = timezone.localdate()
+            despesa.save()
+        self.assertEqual(self.resumo().total_despesas, 0)
+
+    def test_venda_retroativa_e_cancelamento_em_lote(self):
+        self.resumo()
+        with self.captureOnCommitCallbacks(execute=True):
+            venda = self.fabrica.venda([self.fabrica.servico(preco=Decimal('100.00'))], 1, data_entrada=self.dia)
+        self.assertEqual(self.resumo().receita_bruta, venda.subtotal)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Venda.cancelar_em_lote([venda.pk])
+        self.assertEqual(self.resumo().receita_bruta, 0)
+
+    def test_folha_gerada_para_mes_fechado(self):
+        self.fabrica.funcionario(salario=Decimal('2000.00'))
+        self.resumo()
+        FolhaPagamento.gerar_folha(self.mes[1], self.mes[0])
+        self.assertEqual(self.resumo().total_despesas, Decimal('2000.00'))
+        self.assertTrue(Despesa.objects.filter(tipo='salario').exists())
+
+
+@configuracao_dos_testes
+class PainelDeAcordoComDRETest(TestCase):
+    def test_lucro_do_painel_igual_ao_resultado_do_dre(self):
+        fabrica = Fabrica()
+        self.client.force_login(fabrica.usuario())
+        fabrica.popular(5)
+        fabrica.funcionario(salario=Decimal('3000.00'))
+        hoje = timezone.localdate()
+        FolhaPagamento.gerar_folha(hoje.month, hoje.year)
+
+        inicio = hoje.replace(day=1)
+        fim = inicio + relativedelta(months=1, days=-1)
+        resposta = self.client.get(reverse('core:dashboard'), {
+            'data_inicio': inicio.isoformat(), 'data_fim': fim.isoformat(),
+        })
+        resumo = obter_resumos([(hoje.year, hoje.month)])[(hoje.year, hoje.month)]
+        # O DRE arredonda receita e descontos aos centavos
+        self.assertAlmostEqual(resposta.context['lucro_liquido'], resumo.resultado, delta=Decimal('0.01'))
+
+        # Um único dia não carrega o salário do mês inteiro
+        resposta = self.client.get(reverse('core:dashboard'), {
+            'data_inicio': inicio.isoformat(), 'data_fim': inicio.isoformat(),
+        })
+        salarios_no_dia = sum(
+            Despesa.objects.filter(data=inicio).values_list('valor', flat=True), Decimal('0')
+        )
+        self.assertEqual(resposta.context['total_despesas'], salarios_no_dia)
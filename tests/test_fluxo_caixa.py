@@ -0,0 +1,51 @@
+"""Projeção de fluxo de caixa: despesas fixas e parâmetros da query string."""
+import json
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.financeiro.projecao import projetar_fluxo_caixa
+
+from .fabricas import Fabrica
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+class DespesasFixasTest(TestCase):
+    def setUp(self):
+        self.fabrica = Fabrica()
+        self.hoje = date(2026, 3, 10)
+        self.categoria = self.fabrica.categoria()
+        self.fabrica.despesa(
+            descricao='Aluguel', valor=1000, tipo='fixa',
+            categoria=self.categoria, data=self.hoje - relativedelta(days=5)
+        )
+
+    def saidas(self):
+        return projetar_fluxo_caixa(meses=2, agrupamento='mes', hoje=self.hoje)['saidas']
+
+    def test_fixa_se_repete_nos_meses_seguintes(self):
+        self.assertEqual(self.saidas(), [0, 1000, 1000])
+
+    def test_fixa_ja_lancada_no_mes_nao_e_projetada_de_novo(self):
+        self.fabrica.despesa(
+            descricao=' aluguel ', valor=1100, tipo='fixa',
+            categoria=self.categoria, data=date(2026, 4, 6)
+        )
+        self.assertEqual(self.saidas(), [0, 1100, 1000])
+
+
+@configuracao_dos_testes
+class SaldoInicialTest(TestCase):
+    def setUp(self):
+        self.client.force_login(Fabrica().usuario())
+
+    def test_saldo_inicial_nao_finito_vira_zero(self):
+        for valor in ('nan', 'inf', '-Infinity', 'snan', 'abc'):
+            with self.subTest(saldo_inicial=valor):
+                resposta = self.client.get(reverse('financeiro:fluxo_caixa_api'), {'saldo_inicial': valor})
+                self.assertEqual(resposta.status_code, 200)
+                self.assertNotIn(b'NaN', resposta.content)
+                self.assertNotIn(b'Infinity', resposta.content)
+                self.assertEqual(json.loads(resposta.content)['resumo']['saldo_inicial'], 0)
@@ -0,0 +1,37 @@
+"""Cálculo de workers do gunicorn.conf.py."""
+import os
+import runpy
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+def carregar_configuracao(**variaveis):
+    # patch.dict desfaz o PROMETHEUS_MULTIPROC_DIR que o arquivo define
+    with mock.patch.dict(os.environ, variaveis):
+        return runpy.run_path(str(Path(settings.BASE_DIR) / 'gunicorn.conf.py'))
+
+
+class CalcularWorkersTest(SimpleTestCase):
+    def test_dois_por_cpu_mais_um(self):
+        configuracao = carregar_configuracao()
+        self.assertEqual(configuracao['calcular_workers'](2, 8192, 150), 5)
+        self.assertEqual(configuracao['calcular_workers'](1, None, 150), 3)
+
+    def test_limitado_pela_memoria(self):
+        calcular_workers = carregar_configuracao()['calcular_workers']
+        # 512 MB / 150 MB = 3, menos um de folga para o processo principal
+        self.assertEqual(calcular_workers(4, 512, 150), 2)
+        self.assertEqual(calcular_workers(4, 100, 150), 1)
+
+    def test_variaveis_de_ambiente(self):
+        configuracao = carregar_configuracao(
+            GUNICORN_WORKERS='7', GUNICORN_THREADS='1', GUNICORN_PRELOAD='False', GUNICORN_MAX_REQUESTS='500',
+        )
+        self.assertEqual(configuracao['workers'], 7)
+        self.assertEqual(configuracao['worker_class'], 'sync')
+        self.assertFalse(configuracao['preload_app'])
+        self.assertFalse(configuracao['GC_FREEZE'])
+        self.assertEqual(configuracao['max_requests_jitter'], 50)
@@ -0,0 +1,54 @@
+"""Tempo de importação da aplicação na subida de um worker (`python -X importtime`)."""
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+# O que o worker importa: a aplicação WSGI e todas as views, pelo URLconf
+SUBIDA = (
+    "import os; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings'); "
+    "from config.wsgi import application; "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+# Só entram quando alguém gera um PDF
+IMPORTACOES_TARDIAS = ('reportlab', 'apps.financeiro.pdf', 'apps.orcamentos.pdf')
+# Em torno de 0,5 s numa máquina de desenvolvimento; folga para CI lenta
+ORCAMENTO_MS = 1500
+
+
+def importacoes(codigo):
+    """{módulo: ms acumulados} de cada importação feita por `codigo` num processo novo."""
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    modulos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        _, acumulado, nome = linha.split('|')
+        # Módulos importados por outro vêm indentados; só os de primeiro nível somam no total
+        modulos[nome.strip()] = (int(acumulado) / 1000, not nome.startswith('  '))
+    return modulos
+
+
+class ImportacaoTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.modulos = importacoes(SUBIDA)
+
+    def test_pdf_fica_fora_da_subida(self):
+        tardios = sorted(nome for nome in self.modulos if nome.startswith(IMPORTACOES_TARDIAS))
+        self.assertEqual(tardios, [])
+
+    def test_dentro_do_orcamento(self):
+        total = sum(ms for ms, primeiro_nivel in self.modulos.values() if primeiro_nivel)
+        mais_lentos = sorted(self.modulos.items(), key=lambda item: -item[1][0])[:10]
+        self.assertLess(
+            total, ORCAMENTO_MS,
+            f'Importar a aplicação levou {total:.0f} ms; mais lentos: '
+            + ', '.join(f'{nome} {ms:.0f} ms' for nome, (ms, _) in mais_lentos),
+        )
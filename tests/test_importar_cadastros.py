@@ -0,0 +1,33 @@
+"""Upload de arquivos ilegíveis na importação de cadastros."""
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.cadastros.models import Cliente
+from .fabricas import Fabrica
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+@configuracao_dos_testes
+class ArquivoInvalidoTest(TestCase):
+    def setUp(self):
+        self.client.force_login(Fabrica().usuario())
+
+    def enviar(self, nome, conteudo):
+        resposta = self.client.post(reverse('cadastros:importar'), {
+            'tipo': 'clientes', 'arquivo': SimpleUploadedFile(nome, conteudo),
+        })
+        self.assertEqual(resposta.status_code, 200)
+        return [str(mensagem) for mensagem in get_messages(resposta.wsgi_request)]
+
+    def test_xlsx_que_nao_e_zip(self):
+        mensagens = self.enviar('clientes.xlsx', b'isto nao e uma planilha')
+        self.assertEqual(mensagens, ['O arquivo não é uma planilha XLSX válida.'])
+        self.assertFalse(Cliente.objects.exists())
+
+    def test_csv_com_bytes_invalidos(self):
+        # Não é UTF-8, e 0x81 não existe no cp1252
+        mensagens = self.enviar('clientes.csv', b'nome;cpf\n\x81\x81\x81\x81;1\n')
+        self.assertEqual(len(mensagens), 1)
+        self.assertTrue(mensagens[0].startswith('Não foi possível ler o CSV'))
@@ -0,0 +1,85 @@
+"""Livro de estoque: só produtos têm movimentos, e a conciliação falha com divergências."""
+from io import BytesIO, StringIO
+
+from django.core.management import call_command
+from django.contrib.messages import get_messages
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.cadastros.importacao import importar
+from apps.servicos.estoque import divergencias
+from apps.servicos.models import Item, MovimentoEstoque
+
+from .fabricas import Fabrica
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+class LivroEstoqueTest(TestCase):
+    def setUp(self):
+        self.fabrica = Fabrica()
+
+    def test_servico_nao_tem_movimentos(self):
+        servico = self.fabrica.servico(quantidade_estoque=5)
+        servico.quantidade_estoque = 8
+        servico.save()
+        servico.atualizar_estoque(2)
+
+        self.assertFalse(MovimentoEstoque.objects.filter(item=servico).exists())
+        self.assertEqual(divergencias(), [])
+
+    def test_importacao_so_registra_produtos(self):
+        arquivo = BytesIO('tipo;nome;preco;estoque\nserviço;Instalação;100;4\nproduto;Cabo;10;6\n'.encode())
+        resultado = importar('itens', arquivo, 'itens.csv')
+
+        self.assertEqual(resultado.criados, 2)
+        self.assertFalse(MovimentoEstoque.objects.filter(item__tipo='servico').exists())
+        self.assertEqual(
+            list(MovimentoEstoque.objects.values_list('item__nome', 'quantidade')), [('Cabo', 6)]
+        )
+        self.assertEqual(divergencias(), [])
+
+    def test_servico_que_vira_produto_comeca_o_livro(self):
+        servico = self.fabrica.servico(quantidade_estoque=5)
+        item = Item.objects.get(pk=servico.pk)
+        item.tipo = 'produto'
+        item.save()
+
+        self.assertEqual(divergencias(), [])
+
+    def test_conciliacao_com_divergencia(self):
+        produto = self.fabrica.produto(quantidade_estoque=10)
+        Item.objects.filter(pk=produto.pk).update(quantidade_estoque=7)
+
+        with self.assertRaises(CommandError):
+            call_command('conciliar_estoque', stdout=StringIO())
+        call_command('conciliar_estoque', '--corrigir', stdout=StringIO())
+        call_command('conciliar_estoque', stdout=StringIO())
+
+
+@configuracao_dos_testes
+class MovimentarEstoqueTest(TestCase):
+    def setUp(self):
+        fabrica = Fabrica()
+        self.client.force_login(fabrica.usuario())
+        self.produto = fabrica.produto(quantidade_estoque=10)
+
+    def movimentar(self, tipo, quantidade):
+        resposta = self.client.post(
+            reverse('servicos:movimentar_estoque', args=[self.produto.pk]),
+            {'tipo': tipo, 'quantidade': quantidade},
+        )
+        self.assertEqual(resposta.status_code, 302)
+        # As mensagens acumulam na sessão entre as chamadas; só a última interessa
+        return [str(mensagem) for mensagem in get_messages(resposta.wsgi_request)][-1:]
+
+    def test_quantidade_fora_do_inteiro_do_banco(self):
+        for tipo, quantidade in (('entrada', '1' * 20), ('ajuste', '-' + '9' * 20), ('entrada', str(2 ** 31 - 10))):
+            with self.subTest(tipo=tipo, quantidade=quantidade):
+                mensagens = self.movimentar(tipo, quantidade)
+                self.assertEqual(mensagens, ['Informe o tipo de movimento e uma quantidade válida.'])
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.quantidade_estoque, 10)
+
+    def test_entrada_valida(self):
+        self.assertEqual(self.movimentar('entrada', '5'), ['Estoque atualizado: 15 un.'])
@@ -0,0 +1,71 @@
+"""Acesso a /metrics/ e a métrica de início dos workers."""
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .fabricas import Fabrica
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+@configuracao_dos_testes
+@override_settings(DEBUG=False, METRICAS_TOKEN='')
+class AcessoMetricasTest(TestCase):
+    def test_anonimo_sem_token_configurado_e_recusado(self):
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 403)
+
+    def test_usuario_fora_da_equipe_e_recusado(self):
+        self.client.force_login(Fabrica().usuario('operador', is_staff=False, is_superuser=False))
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 403)
+
+    def test_equipe_logada(self):
+        self.client.force_login(Fabrica().usuario())
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 200)
+
+    @override_settings(METRICAS_TOKEN='segredo')
+    def test_token(self):
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 403)
+        self.assertEqual(
+            self.client.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer errado').status_code, 403
+        )
+        resposta = self.client.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn(b'tornearia_', resposta.content)
+
+    @override_settings(DEBUG=True)
+    def test_aberto_em_desenvolvimento(self):
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 200)
+
+
+# Importa o módulo como o processo principal do gunicorn com preload e depois
+# atende uma requisição como um worker, em modo multiprocesso
+SCRIPT_INICIO_WORKER = """
+import os, django
+django.setup()
+from apps.core import metricas
+def amostras():
+    return metricas.exportar().decode().count('tornearia_worker_inicio_segundos{')
+print(amostras())
+metricas.registrar_inicio_worker()
+metricas.registrar_inicio_worker()
+print(amostras())
+"""
+
+
+class InicioWorkerTest(SimpleTestCase):
+    def test_importacao_nao_cria_amostra_do_processo_principal(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            ambiente = {
+                **os.environ,
+                'PROMETHEUS_MULTIPROC_DIR': diretorio,
+                'DJANGO_SETTINGS_MODULE': 'config.settings',
+            }
+            saida = subprocess.run(
+                [sys.executable, '-c', SCRIPT_INICIO_WORKER],
+                cwd=settings.BASE_DIR, env=ambiente, capture_output=True, text=True, check=True,
+            ).stdout.split()
+        self.assertEqual(saida, ['0', '1'])
@@ -0,0 +1,50 @@
+"""Períodos dos relatórios: parâmetros fora do intervalo e janelas de meses."""
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.financeiro.models import ResumoItemMensal
+
+from .fabricas import Fabrica
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+@configuracao_dos_testes
+class AnoForaDoIntervaloTest(TestCase):
+    def setUp(self):
+        self.client.force_login(Fabrica().usuario())
+
+    def test_dre_volta_para_o_ano_atual(self):
+        for ano in ('0', '1', '-5', '99999'):
+            with self.subTest(ano=ano):
+                resposta = self.client.get(reverse('financeiro:dre'), {'ano': ano})
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(resposta.context['ano_selecionado'], timezone.localdate().year)
+
+    def test_curva_abc_volta_para_o_periodo_padrao(self):
+        for ano in ('0', '-5', '99999'):
+            with self.subTest(ano=ano):
+                resposta = self.client.get(reverse('financeiro:curva_abc'), {'ano': ano})
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(resposta.context['ano_selecionado'], 0)
+
+
+@configuracao_dos_testes
+class HistoricoVendasItemTest(TestCase):
+    def test_so_os_ultimos_12_meses_mesmo_com_meses_sem_venda(self):
+        fabrica = Fabrica()
+        self.client.force_login(fabrica.usuario())
+        produto = fabrica.produto()
+        mes_atual = timezone.localdate().replace(day=1)
+        for meses_atras in (0, 11, 12, 30):
+            data = mes_atual - relativedelta(months=meses_atras)
+            ResumoItemMensal.objects.create(item=produto, ano=data.year, mes=data.month, quantidade=1)
+
+        resposta = self.client.get(reverse('servicos:item_detail', args=[produto.pk]))
+        antigo = mes_atual - relativedelta(months=11)
+        self.assertEqual(
+            [(r.ano, r.mes) for r in resposta.context['historico_vendas']],
+            [(mes_atual.year, mes_atual.month), (antigo.year, antigo.month)],
+        )
+        self.assertEqual(resposta.context['total_vendido'], 2)
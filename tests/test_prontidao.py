@@ -0,0 +1,64 @@
+"""Verificações de /health/ready/."""
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.core import prontidao
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+MANIFESTO = {'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'}}
+
+
+@configuracao_dos_testes
+class ProntidaoTest(TestCase):
+    def setUp(self):
+        prontidao.limpar_cache()
+        self.addCleanup(prontidao.limpar_cache)
+
+    def test_pronto(self):
+        resposta = self.client.get(reverse('prontidao'))
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertTrue(dados['pronto'])
+        self.assertEqual(list(dados['verificacoes']), list(prontidao.VERIFICACOES))
+
+    def test_sem_manifesto_dos_estaticos_nao_esta_pronto(self):
+        with tempfile.TemporaryDirectory() as vazio, override_settings(STATIC_ROOT=vazio, STORAGES=MANIFESTO):
+            resposta = self.client.get(reverse('prontidao'))
+        self.assertEqual(resposta.status_code, 503)
+        self.assertFalse(resposta.json()['verificacoes']['estaticos']['ok'])
+
+    @override_settings(PRONTIDAO_TIMEOUT_SEGUNDOS=0.1)
+    def test_verificacao_travada_estoura_o_prazo_sem_acumular_threads(self):
+        liberar = threading.Event()
+        chamadas = []
+
+        def travada():
+            chamadas.append(1)
+            liberar.wait(5)
+            return 'ok'
+
+        self.addCleanup(liberar.set)
+        with mock.patch.dict(prontidao.VERIFICACOES, {'fila': travada}):
+            primeira = prontidao.verificar()
+            segunda = prontidao.verificar()
+            liberar.set()
+            prontidao._em_andamento['fila'].join(1)
+            terceira = prontidao.verificar()
+
+        self.assertFalse(primeira['pronto'])
+        self.assertIn('sem resposta', primeira['verificacoes']['fila']['detalhe'])
+        self.assertIn('anterior', segunda['verificacoes']['fila']['detalhe'])
+        self.assertTrue(terceira['pronto'])
+        self.assertEqual(len(chamadas), 2)
+        self.assertTrue(primeira['verificacoes']['banco']['ok'])
+
+    def test_resultado_fica_em_cache(self):
+        with mock.patch.object(prontidao, 'verificar', return_value={'pronto': True, 'verificacoes': {}}) as verificar:
+            prontidao.estado()
+            prontidao.estado()
+        self.assertEqual(verificar.call_count, 1)
@@ -0,0 +1,73 @@
+"""Reajuste de preços em lote: valores inválidos e itens alcançados."""
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.servicos import reajuste
+from apps.servicos.models import HistoricoPreco, Item
+
+from .fabricas import Fabrica
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+@configuracao_dos_testes
+class ValoresInvalidosTest(TestCase):
+    def setUp(self):
+        fabrica = Fabrica()
+        self.client.force_login(fabrica.usuario())
+        self.produto = fabrica.produto(preco=Decimal('100.00'))
+
+    def mensagens(self, resposta):
+        return [str(mensagem) for mensagem in get_messages(resposta.wsgi_request)]
+
+    def test_valor_nao_finito(self):
+        for valor in ('nan', 'inf', '-Infinity', 'snan'):
+            for metodo in (self.client.get, self.client.post):
+                with self.subTest(valor=valor, metodo=metodo.__name__):
+                    resposta = metodo(reverse('servicos:reajuste_precos'), {'valor': valor})
+                    self.assertEqual(resposta.status_code, 200)
+                    self.assertIn('Informe um valor de reajuste válido.', self.mensagens(resposta))
+
+    def test_filtro_de_preco_nao_finito_e_ignorado(self):
+        resposta = self.client.get(reverse('servicos:reajuste_precos'), {'valor': '10', 'preco_min': 'nan'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['total'], 1)
+
+    def test_preco_acima_da_coluna(self):
+        for metodo in (self.client.get, self.client.post):
+            with self.subTest(metodo=metodo.__name__):
+                resposta = metodo(reverse('servicos:reajuste_precos'), {'valor': '1e30'})
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(
+                    self.mensagens(resposta)[-1:], ['O reajuste deixaria preços acima de R$ 99999999.99.']
+                )
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.preco, Decimal('100.00'))
+
+
+class AplicarTest(TestCase):
+    def test_so_reajusta_os_itens_travados(self):
+        fabrica = Fabrica()
+        travado = fabrica.produto(nome='Cabo A', preco=Decimal('10.00'))
+        itens = reajuste.filtrar_itens(nome='Cabo')
+        original = itens.select_for_update
+
+        class Travados:
+            # Um item passa a atender o filtro logo depois da trava
+            def values_list(self, *campos, **opcoes):
+                ids = list(original().values_list(*campos, **opcoes))
+                fabrica.produto(nome='Cabo B', preco=Decimal('10.00'))
+                return ids
+
+        with mock.patch.object(itens, 'select_for_update', Travados):
+            total = reajuste.aplicar(itens, 'valor', Decimal('5'), 'centavos')
+
+        self.assertEqual(total, 1)
+        self.assertEqual(
+            dict(Item.objects.values_list('nome', 'preco')),
+            {'Cabo A': Decimal('15.00'), 'Cabo B': Decimal('10.00')},
+        )
+        self.assertEqual(HistoricoPreco.objects.filter(origem='reajuste').get().item_id, travado.pk)
@@ -0,0 +1,30 @@
+"""Comando `release` (migrações e admin, uma vez por deploy)."""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from apps.core.management.commands.release import ADMIN_USUARIO, trava_release
+
+
+class ReleaseTest(TestCase):
+    def executar(self):
+        saida = StringIO()
+        call_command('release', verbosity=0, stdout=saida)
+        return saida.getvalue()
+
+    def test_cria_o_admin_uma_vez(self):
+        User = get_user_model()
+        self.assertIn('criado', self.executar())
+        self.assertTrue(User.objects.get(username=ADMIN_USUARIO).is_superuser)
+
+        self.assertIn('já existe', self.executar())
+        self.assertEqual(User.objects.filter(username=ADMIN_USUARIO).count(), 1)
+
+    def test_sem_trava_fora_do_postgresql(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('a trava consultiva só existe no PostgreSQL')
+        with trava_release(connection, espera=0) as travado:
+            self.assertFalse(travado)
@@ -0,0 +1,53 @@
+"""Saldos de clientes: carga inicial na migração, leitura no detalhe e lista de inativos."""
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.financeiro.models import SaldoCliente
+from .fabricas import Fabrica
+from .test_consultas_por_view import configuracao_dos_testes
+
+
+MIGRACAO = import_module('apps.financeiro.migrations.0005_saldocliente')
+CAMPOS = ['cliente_id', 'empresa_id', *SaldoCliente.CAMPOS_METRICAS]
+
+
+@configuracao_dos_testes
+class SaldosClientesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        fabrica = Fabrica()
+        cls.usuario = fabrica.usuario()
+        cls.cenario = fabrica.popular(3)
+
+    def saldos(self):
+        return list(SaldoCliente.objects.order_by('cliente_id', 'empresa_id').values(*CAMPOS))
+
+    def test_migracao_cria_os_saldos_das_vendas_existentes(self):
+        esperado = self.saldos()
+        self.assertTrue(esperado)
+        SaldoCliente.objects.all().delete()
+
+        MIGRACAO.popular_saldos(apps, None)
+
+        self.assertEqual(self.saldos(), esperado)
+
+    def test_detalhe_nao_grava_saldo(self):
+        SaldoCliente.objects.all().delete()
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(reverse('cadastros:cliente_detail', args=[self.cenario['cliente'].pk]))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIsNone(resposta.context['saldo'])
+        self.assertFalse(SaldoCliente.objects.exists())
+
+    def test_inativos_com_dias_fora_do_intervalo(self):
+        self.client.force_login(self.usuario)
+        for dias, esperado in (('99999999', 3650), ('-5', 1), ('abc', 90)):
+            with self.subTest(dias=dias):
+                resposta = self.client.get(
+                    reverse('financeiro:saldo_cliente_list'), {'lista': 'inativos', 'dias': dias}
+                )
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(resposta.context['dias'], esperado)
@@ -0,0 +1,60 @@
+"""Perfil de produção do SQLite (apps/core/sqlite)."""
+import os
+import tempfile
+
+from django.db import OperationalError, connection, connections, transaction
+from django.test import SimpleTestCase
+
+from apps.core.sqlite.base import DatabaseWrapper
+
+
+class PerfilSqliteTest(SimpleTestCase):
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.arquivo = os.path.join(diretorio.name, 'perfil.sqlite3')
+        self.aliases = []
+        self.addCleanup(self.remover_conexoes)
+
+    def remover_conexoes(self):
+        for alias in self.aliases:
+            del connections[alias]
+
+    def conexao(self, **pragmas):
+        configuracao = {
+            **connection.settings_dict,
+            'ENGINE': 'apps.core.sqlite',
+            'NAME': self.arquivo,
+            'OPTIONS': {'pragmas': pragmas},
+        }
+        alias = f'perfil{len(self.aliases)}'
+        conexao = DatabaseWrapper(configuracao, alias=alias)
+        # Registrada para que transaction.atomic(using=alias) a encontre
+        connections[alias] = conexao
+        self.aliases.append(alias)
+        self.addCleanup(conexao.close)
+        return conexao
+
+    def pragma(self, conexao, nome):
+        with conexao.cursor() as cursor:
+            cursor.execute(f'PRAGMA {nome}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_aplicados_ao_abrir_a_conexao(self):
+        conexao = self.conexao(busy_timeout=1234)
+        self.assertEqual(self.pragma(conexao, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(conexao, 'synchronous'), 1)
+        self.assertEqual(self.pragma(conexao, 'busy_timeout'), 1234)
+        self.assertEqual(self.pragma(conexao, 'temp_store'), 2)
+        self.assertEqual(self.pragma(conexao, 'cache_size'), -64 * 1024)
+
+    def test_transacao_pede_a_trava_de_escrita_no_inicio(self):
+        primeira = self.conexao()
+        segunda = self.conexao(busy_timeout=50)
+        with primeira.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (x INTEGER)')
+        with transaction.atomic(using=primeira.alias):
+            # Com BEGIN DEFERRED a primeira ainda não teria travado nada
+            with self.assertRaisesMessage(OperationalError, 'locked'):
+                with transaction.atomic(using=segunda.alias):
+                    pass